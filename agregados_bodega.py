@@ -0,0 +1,197 @@
+"""
+Agregados incrementales de la bodega de conocimiento de Aria
+Totales por tipo, importancia y usuario y temas más frecuentes de cada
+usuario, actualizados en cada ``almacenar`` para que las estadísticas se
+puedan consultar a menudo sin recorrer la bodega
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+
+def peso(contenido: Any) -> int:
+    """Eventos que representa una entrada: 1, o los agrupados en un muestreo o resumen."""
+    if not isinstance(contenido, dict):
+        return 1
+    if contenido.get("tipo") == "resumen":
+        return int(contenido.get("cantidad", 1))
+    return int(contenido.get("agrupadas", 1))
+
+
+class SpaceSaving:
+    """
+    Elementos más frecuentes de un flujo con memoria fija (algoritmo Space-Saving).
+
+    Se guardan como mucho ``capacidad`` contadores. Cuando llega un elemento
+    nuevo con todos ocupados, hereda el contador del menos frecuente (más
+    uno); así todo elemento con frecuencia real mayor que total/capacidad
+    está seguro en la lista, y cada recuento se pasa como mucho en su
+    ``error``. Los descuentos (entradas borradas) solo se aplican a los
+    elementos que se están siguiendo.
+    """
+
+    def __init__(self, capacidad: int = 32):
+        self.capacidad = capacidad
+        self._contadores: Dict[Any, int] = {}
+        self._errores: Dict[Any, int] = {}
+
+    def sumar(self, elemento: Any, cantidad: int = 1):
+        if elemento in self._contadores:
+            self._contadores[elemento] += cantidad
+            return
+        if len(self._contadores) < self.capacidad:
+            self._contadores[elemento] = cantidad
+            self._errores[elemento] = 0
+            return
+        # capacidad es pequeña: buscar el mínimo es tan barato como mantener un montículo
+        minimo = min(self._contadores, key=self._contadores.__getitem__)
+        cuenta = self._contadores.pop(minimo)
+        del self._errores[minimo]
+        self._contadores[elemento] = cuenta + cantidad
+        self._errores[elemento] = cuenta
+
+    def restar(self, elemento: Any, cantidad: int = 1):
+        if elemento not in self._contadores:
+            return
+        self._contadores[elemento] -= cantidad
+        if self._contadores[elemento] <= 0:
+            del self._contadores[elemento]
+            del self._errores[elemento]
+
+    def mas_frecuentes(self, n: int = 10) -> List[Tuple[Any, int]]:
+        """Los ``n`` elementos con más recuento estimado, de mayor a menor."""
+        return sorted(self._contadores.items(), key=lambda par: (-par[1], str(par[0])))[:n]
+
+    def error(self, elemento: Any) -> int:
+        """Cuánto puede sobrar como mucho en el recuento de ``elemento``."""
+        return self._errores.get(elemento, 0)
+
+    def __len__(self) -> int:
+        return len(self._contadores)
+
+
+def combinar_resumenes(usuario_id: str, base: Dict[str, Any], *otros: Dict[str, Any],
+                       temas: int = 10) -> Dict[str, Any]:
+    """
+    Suma resúmenes de usuario de varias partes de una bodega.
+
+    Se conservan los campos adicionales de ``base``; los demás resúmenes
+    deben tener el formato de ``AgregadosBodega.resumen_usuario``.
+    """
+    resumenes = (base,) + otros
+    recuentos: Counter = Counter()
+    por_tipo: Counter = Counter()
+    for resumen in resumenes:
+        recuentos.update(dict(resumen.get("temas_frecuentes") or []))
+        por_tipo.update(resumen.get("por_tipo") or {})
+    primeras = [r["primera_interaccion"] for r in resumenes if r.get("primera_interaccion") is not None]
+    ultimas = [r["ultima_interaccion"] for r in resumenes if r.get("ultima_interaccion") is not None]
+    return {
+        **base,
+        "usuario_id": usuario_id,
+        "total_entradas": sum(resumen.get("total_entradas", 0) for resumen in resumenes),
+        "por_tipo": dict(por_tipo),
+        "temas_frecuentes": recuentos.most_common(temas),
+        "primera_interaccion": min(primeras, default=None),
+        "ultima_interaccion": max(ultimas, default=None),
+    }
+
+
+@dataclass
+class _Usuario:
+    total: int = 0
+    por_tipo: Counter = field(default_factory=Counter)
+    temas: Optional[SpaceSaving] = None
+    primera: Optional[float] = None
+    ultima: Optional[float] = None
+
+
+class AgregadosBodega:
+    """
+    Agregados de una bodega, mantenidos entrada a entrada.
+
+    ``sumar`` y ``restar`` se llaman al almacenar y al borrar; las consultas
+    no dependen del tamaño de la bodega. Los temas frecuentes cuentan
+    eventos (ver ``peso``), así que un resumen de cien detecciones pesa lo
+    mismo que las detecciones que sustituye. Las fechas de primera y última
+    interacción no retroceden al borrar entradas.
+    """
+
+    def __init__(self, capacidad_temas: int = 32):
+        """
+        Args:
+            capacidad_temas: Contadores de temas por usuario (Space-Saving)
+        """
+        self.capacidad_temas = capacidad_temas
+        self._total = 0
+        self._por_tipo: Counter = Counter()
+        self._por_importancia: Counter = Counter()
+        self._usuarios: Dict[Optional[str], _Usuario] = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, tipo: Any, importancia: int, usuario_id: Optional[str], palabras_clave: Iterable[str],
+              timestamp: float, contenido: Any = None, signo: int = 1):
+        """Cuenta una entrada almacenada (o descuenta una borrada con ``signo=-1``)."""
+        eventos = peso(contenido)
+        with self._lock:
+            self._total += signo
+            self._sumar_contador(self._por_tipo, tipo, signo)
+            self._sumar_contador(self._por_importancia, importancia, signo)
+            usuario = self._usuarios.get(usuario_id)
+            if usuario is None:
+                if signo < 0:
+                    return
+                usuario = self._usuarios[usuario_id] = _Usuario(temas=SpaceSaving(self.capacidad_temas))
+            usuario.total += signo
+            self._sumar_contador(usuario.por_tipo, tipo, signo)
+            for palabra in palabras_clave:
+                if signo > 0:
+                    usuario.temas.sumar(palabra, eventos)
+                else:
+                    usuario.temas.restar(palabra, eventos)
+            if signo > 0:
+                usuario.primera = timestamp if usuario.primera is None else min(usuario.primera, timestamp)
+                usuario.ultima = timestamp if usuario.ultima is None else max(usuario.ultima, timestamp)
+            elif usuario.total <= 0:
+                del self._usuarios[usuario_id]
+
+    def restar(self, tipo: Any, importancia: int, usuario_id: Optional[str], palabras_clave: Iterable[str],
+               timestamp: float, contenido: Any = None):
+        """Descuenta una entrada borrada."""
+        self.sumar(tipo, importancia, usuario_id, palabras_clave, timestamp, contenido, signo=-1)
+
+    def sumar_entrada(self, entrada: Dict[str, Any], signo: int = 1):
+        """``sumar`` a partir de una entrada con el formato de ``buscar``."""
+        self.sumar(entrada["tipo"], entrada["importancia"], entrada["usuario_id"], entrada["palabras_clave"],
+                   entrada["timestamp"], entrada.get("contenido"), signo)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Totales de la bodega."""
+        with self._lock:
+            return {
+                "total_entradas": self._total,
+                "por_tipo": dict(self._por_tipo),
+                "por_importancia": dict(self._por_importancia),
+                "usuarios_registrados": sum(1 for usuario_id in self._usuarios if usuario_id is not None),
+            }
+
+    def resumen_usuario(self, usuario_id: str, temas: int = 10) -> Dict[str, Any]:
+        """Totales del usuario por tipo, sus temas más frecuentes y su actividad."""
+        with self._lock:
+            usuario = self._usuarios.get(usuario_id) or _Usuario(temas=SpaceSaving(self.capacidad_temas))
+            return {
+                "usuario_id": usuario_id,
+                "total_entradas": usuario.total,
+                "por_tipo": dict(usuario.por_tipo),
+                "temas_frecuentes": usuario.temas.mas_frecuentes(temas),
+                "primera_interaccion": usuario.primera,
+                "ultima_interaccion": usuario.ultima,
+            }
+
+    @staticmethod
+    def _sumar_contador(contador: Counter, clave: Any, signo: int):
+        contador[clave] += signo
+        if contador[clave] <= 0:
+            del contador[clave]
@@ -3,7 +3,6 @@ AriaConversacionAdaptativa - Sistema de conversación con adaptación al usuario
 Integra el sistema de bodega y adaptación para una experiencia personalizada
 """
 
-import os
 import time
 import random
 import logging
@@ -12,9 +11,17 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
-from bodega.BodegaConocimiento import BodegaConocimiento, TipoInformacion, ImportanciaInfo
+from bodega.BodegaConocimiento import TipoInformacion, ImportanciaInfo
 from adaptacion_usuario.AdaptacionUsuario import AdaptacionUsuario
 from personalidad.personalidad.PersonalidadCentral import PersonalidadCentral, EstadoEmocional
+from motor_voz import obtener_motor_voz, PrioridadVoz
+from escucha_continua import crear_escucha_microfono
+from calibracion_microfono import calibrar
+from estilo_texto import adaptar_texto, adaptar_por_cubeta
+from cache_perfiles import CachePerfiles, PerfilCacheado
+from bodega_diferida import BodegaDiferida
+from busqueda_semantica import BodegaSemantica
+from bodega_sqlite import crear_bodega
 
 class AriaConversacionAdaptativa:
     """Sistema de conversación adaptativo de Aria."""
@@ -25,8 +32,10 @@ class AriaConversacionAdaptativa:
         self.logger.setLevel(logging.INFO)
         
         # Componentes principales
-        self.bodega = BodegaConocimiento()
-        self.adaptacion = AdaptacionUsuario(self.bodega)
+        # Escritura por lotes en segundo plano: registrar una frase no retrasa la respuesta
+        self.bodega = BodegaDiferida(BodegaSemantica(crear_bodega()))
+        # Perfil calculado una vez por interacción, no una vez por frase
+        self.adaptacion = CachePerfiles(AdaptacionUsuario(self.bodega))
         self.personalidad = PersonalidadCentral()
         
         # Estado del sistema
@@ -43,6 +52,7 @@ class AriaConversacionAdaptativa:
         # Sistema de voz
         self.reconocedor = sr.Recognizer()
         self.microfono = None
+        self.escucha = None
         
         # Temas de conversación dinámicos
         self.temas_base = [
@@ -64,8 +74,12 @@ class AriaConversacionAdaptativa:
         try:
             # Configurar micrófono
             self.microfono = sr.Microphone()
-            with self.microfono as source:
-                self.reconocedor.adjust_for_ambient_noise(source, duration=2)
+            # Umbral guardado para este dispositivo; solo se mide el ruido la primera vez
+            dispositivo = calibrar(self.microfono, self.reconocedor)
+            # Captura continua: el micrófono queda abierto entre turnos y el
+            # umbral sigue al ruido de la sala
+            self.escucha = crear_escucha_microfono(self.microfono, self.reconocedor, obtener_motor_voz(),
+                                                   dispositivo=dispositivo)
             self.logger.info("✓ Sistema de reconocimiento de voz inicializado")
             
         except Exception as e:
@@ -74,23 +88,23 @@ class AriaConversacionAdaptativa:
         
         self.logger.info("✓ Sistemas inicializados correctamente")
 
-    def decir(self, texto: str, usuario_id: str = "default"):
+    def decir(self, texto: str, usuario_id: str = "default", prioridad: PrioridadVoz = PrioridadVoz.NORMAL,
+              clave: Optional[str] = None):
         """
         Hace que Aria hable, adaptando el estilo según el perfil del usuario.
+        
+        No espera a que termine la frase, para poder seguir escuchando mientras suena.
         """
         try:
             # Obtener adaptaciones para el usuario
-            perfil = self.adaptacion.obtener_perfil(usuario_id)
-            if perfil:
-                estilo = perfil["estilo_comunicacion"]
-                texto = self._adaptar_texto(texto, estilo)
+            perfil = self.adaptacion.obtener(usuario_id)
+            if perfil and perfil.cubeta_estilo:
+                texto = adaptar_por_cubeta(texto, perfil.cubeta_estilo)
             
             print(f"🗣️ ARIA: {texto}")
             
-            # Usar PowerShell para TTS nativo de Windows
-            comando = f'powershell -Command "Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.Rate = 0; $speak.Volume = 100; $speak.Speak(\'{texto}\')"'
-            
-            os.system(comando)
+            # Sintetizador persistente compartido (sin lanzar un proceso por frase)
+            obtener_motor_voz().decir(texto, esperar=False, prioridad=prioridad, clave=clave)
             
             # Registrar interacción en la bodega
             self._registrar_respuesta(texto, usuario_id)
@@ -103,106 +117,68 @@ class AriaConversacionAdaptativa:
             return False
 
     def _adaptar_texto(self, texto: str, estilo: Dict[str, float]) -> str:
-        """Adapta el texto según el estilo de comunicación del usuario."""
-        texto_adaptado = texto
-        
-        # Ajustar formalidad
-        if estilo["formalidad"] > 0.7:
-            # Más formal
-            texto_adaptado = texto_adaptado.replace("tu", "usted")
-            texto_adaptado = texto_adaptado.replace("te", "le")
-            if not any(palabra in texto_adaptado.lower() for palabra in ["por favor", "gracias"]):
-                texto_adaptado = f"Por favor, {texto_adaptado}"
-        elif estilo["formalidad"] < 0.3:
-            # Más informal
-            texto_adaptado = texto_adaptado.replace("usted", "tu")
-            texto_adaptado = texto_adaptado.replace("le", "te")
-        
-        # Ajustar verbosidad
-        if estilo["verbosidad"] < 0.3:
-            # Más conciso
-            texto_adaptado = texto_adaptado.split('.')[0] + '.'
-        elif estilo["verbosidad"] > 0.7:
-            # Más detallado
-            if not texto_adaptado.endswith('?'):
-                texto_adaptado += " ¿Te gustaría saber más al respecto?"
-        
-        # Ajustar emocionalidad
-        if estilo["emocionalidad"] > 0.7:
-            # Más emocional
-            texto_adaptado = f"¡{texto_adaptado}!"
-            if "!" not in texto_adaptado:
-                texto_adaptado = texto_adaptado.replace(".", "!")
-        
-        return texto_adaptado
+        """
+        Adapta el texto según el estilo de comunicación del usuario.
+        
+        Formalidad (tú/usted, solo palabras completas), verbosidad y
+        emocionalidad; la transformación se compila por nivel de estilo y el
+        resultado se memoriza (ver ``estilo_texto``).
+        """
+        return adaptar_texto(texto, estilo)
 
     def escuchar(self, timeout=5, usuario_id: str = "default") -> Optional[str]:
-        """Escucha por el micrófono y procesa la entrada del usuario."""
-        if not self.microfono:
+        """Recoge la siguiente frase del usuario y la registra en la bodega."""
+        if not self.escucha:
             return None
-            
-        try:
-            print("🎤 Escuchando... (habla ahora)")
-            
-            with self.microfono as source:
-                audio = self.reconocedor.listen(source, timeout=timeout, phrase_time_limit=10)
-            
-            print("🔄 Procesando lo que dijiste...")
-            
-            texto = self.reconocedor.recognize_google(audio, language='es-ES')
-            print(f"👤 Escuché: {texto}")
-            
-            # Registrar entrada en la bodega
-            self._registrar_entrada(texto, usuario_id)
-            
-            return texto
-            
-        except sr.UnknownValueError:
-            print("❓ No pude entender lo que dijiste")
+        
+        print("🎤 Escuchando... (habla ahora)")
+        
+        # La captura no se detiene entre turnos; si el usuario habla encima
+        # de Aria, ella se calla
+        resultado = self.escucha.escuchar(timeout=timeout)
+        if resultado is None:
+            print("⏰ No escuché nada en el tiempo esperado")
             return None
-        except sr.RequestError as e:
-            print(f"❌ Error en el servicio de reconocimiento: {e}")
+        if resultado.error:
+            print(f"❌ Error en el servicio de reconocimiento: {resultado.error}")
             return None
-        except Exception as e:
-            print(f"❌ Error al escuchar: {e}")
+        if not resultado.texto:
+            print("❓ No pude entender lo que dijiste")
             return None
+        
+        texto = resultado.texto
+        print(f"👤 Escuché: {texto}")
+        
+        # Registrar entrada en la bodega
+        self._registrar_entrada(texto, usuario_id)
+        
+        return texto
 
     def ser_proactiva(self, usuario_id: str = "default"):
         """Muestra iniciativa en la conversación de manera adaptativa."""
         tiempo_actual = time.time()
-        perfil = self.adaptacion.obtener_perfil(usuario_id)
+        perfil = self.adaptacion.obtener(usuario_id)
         
         if not perfil:
             # Comportamiento por defecto si no hay perfil
             if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 30:
                 tema = random.choice(self.temas_base)
-                self.decir(tema, usuario_id)
+                self.decir(tema, usuario_id, prioridad=PrioridadVoz.BAJA, clave="proactiva")
                 self.ultima_interaccion = tiempo_actual
             return
         
-        # Adaptar proactividad según el perfil
-        tiempo_espera = 30  # Base: 30 segundos
-        if perfil["estilo_comunicacion"]["proactividad"] < 0.3:
-            tiempo_espera = 60  # Menos proactivo: 60 segundos
-        elif perfil["estilo_comunicacion"]["proactividad"] > 0.7:
-            tiempo_espera = 15  # Más proactivo: 15 segundos
-        
-        if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > tiempo_espera:
+        # Espera adaptada a la proactividad del perfil (15, 30 o 60 segundos)
+        if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > perfil.espera_proactiva:
             # Seleccionar tema basado en intereses
-            tema = self._seleccionar_tema_personalizado(perfil)
-            self.decir(tema, usuario_id)
+            tema = self._seleccionar_tema_personalizado(perfil.tema_principal)
+            self.decir(tema, usuario_id, prioridad=PrioridadVoz.BAJA, clave="proactiva")
             self.ultima_interaccion = tiempo_actual
 
-    def _seleccionar_tema_personalizado(self, perfil: Dict[str, Any]) -> str:
-        """Selecciona un tema personalizado basado en el perfil del usuario."""
-        # Obtener temas de interés del usuario
-        temas_interes = perfil.get("temas_interes", {})
-        if not temas_interes:
+    def _seleccionar_tema_personalizado(self, tema_principal: Optional[str]) -> str:
+        """Selecciona un tema personalizado según el tema de mayor interés del usuario."""
+        if not tema_principal:
             return random.choice(self.temas_base)
         
-        # Seleccionar tema basado en intereses
-        tema_principal = max(temas_interes.items(), key=lambda x: x[1])[0]
-        
         temas_personalizados = {
             "tecnologia": [
                 "¿Te gustaría que hablemos sobre las últimas novedades en tecnología?",
@@ -247,7 +223,7 @@ class AriaConversacionAdaptativa:
         self.adaptacion.procesar_interaccion(usuario_id, datos_entrada)
         
         # Almacenar en bodega
-        self.bodega.almacenar(
+        self.bodega.almacenar_diferido(
             tipo=TipoInformacion.CONVERSACION,
             contenido=datos_entrada,
             importancia=ImportanciaInfo.MEDIA,
@@ -267,7 +243,7 @@ class AriaConversacionAdaptativa:
             }
         }
         
-        self.bodega.almacenar(
+        self.bodega.almacenar_diferido(
             tipo=TipoInformacion.CONVERSACION,
             contenido=datos_respuesta,
             importancia=ImportanciaInfo.MEDIA,
@@ -282,13 +258,13 @@ class AriaConversacionAdaptativa:
         mensaje_lower = mensaje.lower()
         
         # Obtener perfil y adaptaciones
-        perfil = self.adaptacion.obtener_perfil(usuario_id)
+        perfil = self.adaptacion.obtener(usuario_id)
         if not perfil:
             # Respuesta por defecto si no hay perfil
             return self._generar_respuesta_base(mensaje_lower)
         
         # Generar respuesta adaptativa
-        respuesta = self._generar_respuesta_adaptativa(mensaje_lower, perfil)
+        respuesta = self._generar_respuesta_adaptativa(mensaje_lower, perfil, usuario_id)
         
         # Actualizar contexto de conversación
         self.contexto_actual["tema_actual"] = self._detectar_tema(mensaje_lower)
@@ -306,10 +282,11 @@ class AriaConversacionAdaptativa:
         else:
             return "Interesante lo que dices. ¿Te gustaría contarme más al respecto?"
 
-    def _generar_respuesta_adaptativa(self, mensaje: str, perfil: Dict[str, Any]) -> str:
+    def _generar_respuesta_adaptativa(self, mensaje: str, perfil: PerfilCacheado,
+                                      usuario_id: Optional[str] = None) -> str:
         """Genera una respuesta adaptada al perfil del usuario."""
         # Obtener estilo de comunicación
-        estilo = perfil["estilo_comunicacion"]
+        estilo = perfil.datos["estilo_comunicacion"]
         
         # Base de respuestas según el tipo de mensaje
         if any(saludo in mensaje for saludo in ['hola', 'buenos días', 'buenas tardes', 'buenas noches']):
@@ -331,10 +308,15 @@ class AriaConversacionAdaptativa:
                 "¡Adiós! Espero que volvamos a charlar pronto."
             ]
         else:
-            # Respuesta basada en temas de interés
-            temas = perfil.get("temas_interes", {})
-            if temas:
-                tema_principal = max(temas.items(), key=lambda x: x[1])[0]
+            # Respuesta basada en algo parecido que el usuario ya contó, o en sus temas de interés
+            recuerdo = self._recordar(mensaje, usuario_id) if usuario_id else None
+            tema_principal = perfil.tema_principal
+            if recuerdo:
+                respuestas = [
+                    f"¡Me acuerdo de que una vez me dijiste \"{recuerdo}\"! ¿Tiene que ver con esto?",
+                    f"Esto me recuerda a cuando me contaste \"{recuerdo}\". Cuéntame más.",
+                ]
+            elif tema_principal:
                 respuestas = [
                     f"¡Qué interesante! Me recuerda a algunos temas de {tema_principal} que hemos discutido.",
                     f"¡Fascinante! ¿Te gustaría explorar cómo se relaciona esto con {tema_principal}?",
@@ -351,7 +333,20 @@ class AriaConversacionAdaptativa:
         respuesta = random.choice(respuestas)
         
         # Adaptar según el estilo de comunicación
-        return self._adaptar_texto(respuesta, estilo)
+        return adaptar_por_cubeta(respuesta, perfil.cubeta_estilo) if perfil.cubeta_estilo else respuesta
+
+    def _recordar(self, mensaje: str, usuario_id: str) -> Optional[str]:
+        """Algo que el usuario dijo antes y que se parece al mensaje, si lo hay."""
+        try:
+            similares = self.bodega.buscar_similares(mensaje, k=5, usuario_id=usuario_id, minimo=0.1)
+        except Exception as e:
+            self.logger.warning(f"No se pudo buscar en la memoria: {e}")
+            return None
+        for similar in similares:
+            # El propio mensaje ya puede estar indexado
+            if similar["origen"] == "entrada_usuario" and similar["texto"].lower() != mensaje:
+                return similar["texto"]
+        return None
 
     def _detectar_tema(self, texto: str) -> Optional[str]:
         """Detecta el tema principal del texto."""
@@ -379,7 +374,7 @@ class AriaConversacionAdaptativa:
         print("="*70)
         
         # Saludo inicial adaptativo
-        perfil = self.adaptacion.obtener_perfil(usuario_id)
+        perfil = self.adaptacion.obtener(usuario_id)
         if perfil:
             saludo = self._generar_respuesta_adaptativa("hola", perfil)
         else:
@@ -415,6 +410,9 @@ class AriaConversacionAdaptativa:
                     if not entrada:
                         continue
                     
+                    # El usuario ha tomado la palabra: cortar lo que Aria estuviera diciendo
+                    obtener_motor_voz().interrumpir()
+                    
                     if entrada.lower() in ['salir', 'terminar', 'adiós', 'chao']:
                         respuesta = self._procesar_mensaje("adiós", usuario_id)
                         self.decir(respuesta, usuario_id)
@@ -430,6 +428,13 @@ class AriaConversacionAdaptativa:
             self.logger.error(f"Error en conversación: {e}")
             self.decir("Lo siento, ha ocurrido un error. Pero ha sido genial conversar contigo.", usuario_id)
 
+    def detener(self):
+        """Detiene la escucha y escribe en la bodega lo que quede pendiente."""
+        self.activo = False
+        if self.escucha:
+            self.escucha.detener()
+        self.bodega.detener()
+
 def main():
     """Función principal."""
     print("\n🤖 INICIANDO ARIA - CONVERSACIÓN ADAPTATIVA")
@@ -438,7 +443,10 @@ def main():
     time.sleep(1)
     
     aria = AriaConversacionAdaptativa()
-    aria.modo_conversacion_adaptativa()
+    try:
+        aria.modo_conversacion_adaptativa()
+    finally:
+        aria.detener()
 
 if __name__ == "__main__":
     main()
@@ -5,18 +5,22 @@ Aria con sistema completo de conversación por voz - Habla y Escucha
 import os
 import time
 import random
-import subprocess
 import speech_recognition as sr
 import threading
 from datetime import datetime
 
-class AriaConversacionCompleta:
+from motor_voz import AsistenteVoz, PrioridadVoz
+from escucha_continua import crear_escucha_microfono
+from calibracion_microfono import calibrar
+
+class AriaConversacionCompleta(AsistenteVoz):
     def __init__(self):
         self.activo = False
         self.escuchando = False
         self.ultima_interaccion = None
         self.reconocedor = sr.Recognizer()
         self.microfono = None
+        self.escucha = None
         
         self.temas_conversacion = [
             "¿Te gustaría que te cuente sobre algún tema interesante?",
@@ -28,6 +32,7 @@ class AriaConversacionCompleta:
             "¿Te gustaría que te haga algunas preguntas interesantes?"
         ]
         
+        self.motor_voz.iniciar()
         self._inicializar_sistemas()
     
     def _inicializar_sistemas(self):
@@ -38,10 +43,14 @@ class AriaConversacionCompleta:
             # Configurar micrófono
             self.microfono = sr.Microphone()
             
-            # Ajustar para ruido ambiente
+            # Ajustar para ruido ambiente (solo se mide la primera vez en cada dispositivo)
             print("📢 Calibrando micrófono para ruido ambiente...")
-            with self.microfono as source:
-                self.reconocedor.adjust_for_ambient_noise(source, duration=2)
+            dispositivo = calibrar(self.microfono, self.reconocedor)
+            
+            # Captura continua: el micrófono queda abierto entre turnos y el
+            # umbral sigue al ruido de la sala
+            self.escucha = crear_escucha_microfono(self.microfono, self.reconocedor, self.motor_voz,
+                                                   dispositivo=dispositivo)
             
             print("✓ Sistema de reconocimiento de voz inicializado")
             print("✓ Sistema de síntesis de voz Windows inicializado")
@@ -53,55 +62,29 @@ class AriaConversacionCompleta:
             self.microfono = None
             return False
     
-    def decir(self, texto):
-        """Hace que Aria hable usando el TTS nativo de Windows."""
-        try:
-            print(f"🗣️ ARIA: {texto}")
-            
-            # Usar PowerShell para TTS nativo de Windows
-            comando = f'powershell -Command "Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.Rate = 0; $speak.Volume = 100; $speak.Speak(\'{texto}\')"'
-            
-            # Ejecutar comando
-            subprocess.run(comando, shell=True, capture_output=True)
-            return True
-            
-        except Exception as e:
-            print(f"Error al hablar: {e}")
-            print(f"🗣️ ARIA (sin audio): {texto}")
-            return False
-    
     def escuchar(self, timeout=5):
-        """Escucha por el micrófono y convierte voz a texto."""
-        if not self.microfono:
+        """Recoge la siguiente frase del usuario, ya convertida a texto."""
+        if not self.escucha:
             return None
-            
-        try:
-            print("🎤 Escuchando... (habla ahora)")
-            
-            with self.microfono as source:
-                # Escuchar audio con timeout
-                audio = self.reconocedor.listen(source, timeout=timeout, phrase_time_limit=10)
-            
-            print("🔄 Procesando lo que dijiste...")
-            
-            # Reconocer voz en español
-            try:
-                texto = self.reconocedor.recognize_google(audio, language='es-ES')
-                print(f"👤 Escuché: {texto}")
-                return texto
-            except sr.UnknownValueError:
-                print("❓ No pude entender lo que dijiste")
-                return None
-            except sr.RequestError as e:
-                print(f"❌ Error en el servicio de reconocimiento: {e}")
-                return None
-                
-        except sr.WaitTimeoutError:
+        
+        print("🎤 Escuchando... (habla ahora)")
+        
+        # La captura no se detiene entre turnos: lo dicho mientras Aria
+        # respondía ya está segmentado y reconocido (o en camino)
+        resultado = self.escucha.escuchar(timeout=timeout)
+        if resultado is None:
             print("⏰ No escuché nada en el tiempo esperado")
             return None
-        except Exception as e:
-            print(f"❌ Error al escuchar: {e}")
+        if resultado.error:
+            print(f"❌ Error en el servicio de reconocimiento: {resultado.error}")
+            return None
+        if not resultado.texto:
+            print("❓ No pude entender lo que dijiste")
             return None
+        
+        texto = resultado.texto
+        print(f"👤 Escuché: {texto}")
+        return texto
     
     def ser_proactiva(self):
         """Muestra iniciativa en la conversación."""
@@ -110,7 +93,7 @@ class AriaConversacionCompleta:
         # Si han pasado más de 30 segundos desde la última interacción
         if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 30:
             tema = random.choice(self.temas_conversacion)
-            self.decir(tema)
+            self.decir(tema, prioridad=PrioridadVoz.BAJA, clave="proactiva")
             self.ultima_interaccion = tiempo_actual
     
     def saludo_inicial(self):
@@ -262,6 +245,9 @@ class AriaConversacionCompleta:
                     if not entrada:
                         continue
                     
+                    # El usuario ha tomado la palabra: cortar lo que Aria estuviera diciendo
+                    self.interrumpir()
+                    
                     if entrada.lower() in ['salir', 'terminar', 'adiós', 'chao', 'bye']:
                         self.decir("¡Ha sido un placer conversar contigo! ¡Hasta luego!")
                         self.activo = False
@@ -2,14 +2,14 @@
 Aria con sistema de voz mejorado y personalidad proactiva
 """
 
-import pyttsx3
 import time
 import random
 from datetime import datetime
 
-class AriaVozMejorada:
+from motor_voz import AsistenteVoz, PrioridadVoz
+
+class AriaVozMejorada(AsistenteVoz):
     def __init__(self):
-        self.motor_tts = None
         self.activo = False
         self.ultima_interaccion = None
         self.temas_conversacion = [
@@ -19,57 +19,7 @@ class AriaVozMejorada:
             "Puedo contarte historias fascinantes, ¿te gustaría escuchar alguna?",
             "¿Hay algo específico que te gustaría aprender hoy?"
         ]
-        self._inicializar_voz()
-    
-    def _inicializar_voz(self):
-        """Inicializa el sistema de text-to-speech."""
-        try:
-            # Inicializar el motor TTS
-            self.motor_tts = pyttsx3.Engine()
-            
-            # Configurar velocidad y volumen
-            self.motor_tts.setProperty('rate', 150)
-            self.motor_tts.setProperty('volume', 0.9)
-            
-            # Buscar voz en español
-            voces = self.motor_tts.getProperty('voices')
-            voz_espanol = None
-            
-            print("Voces disponibles:")
-            for voz in voces:
-                print(f"- {voz.name} ({voz.id})")
-                if 'spanish' in voz.name.lower() or 'español' in voz.name.lower():
-                    voz_espanol = voz.id
-                    break
-            
-            if voz_espanol:
-                self.motor_tts.setProperty('voice', voz_espanol)
-                print(f"✓ Usando voz en español: {voz_espanol}")
-            else:
-                print("⚠ No se encontró voz en español, usando voz por defecto")
-            
-            print("✓ Sistema de voz inicializado correctamente")
-            return True
-            
-        except Exception as e:
-            print(f"⚠ Error inicializando sistema de voz: {e}")
-            self.motor_tts = None
-            return False
-    
-    def decir(self, texto):
-        """Hace que Aria hable por la bocina del dispositivo."""
-        if self.motor_tts:
-            try:
-                print(f"🗣️ ARIA: {texto}")
-                self.motor_tts.say(texto)
-                self.motor_tts.runAndWait()
-                return True
-            except Exception as e:
-                print(f"Error al hablar: {e}")
-                return False
-        else:
-            print(f"🗣️ ARIA (sin audio): {texto}")
-            return False
+        self.motor_voz.iniciar()
     
     def ser_proactiva(self):
         """Muestra iniciativa en la conversación."""
@@ -78,7 +28,7 @@ class AriaVozMejorada:
         # Si han pasado más de 30 segundos desde la última interacción
         if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 30:
             tema = random.choice(self.temas_conversacion)
-            self.decir(tema)
+            self.decir(tema, prioridad=PrioridadVoz.BAJA, clave="proactiva")
     
     def saludo_inicial(self):
         """Saludo personalizado y entusiasta al iniciar."""
@@ -188,6 +138,9 @@ class AriaVozMejorada:
                 if not entrada:
                     continue
                 
+                # El usuario ha tomado la palabra: cortar lo que Aria estuviera diciendo
+                self.interrumpir()
+                
                 if entrada.lower() in ['salir', 'terminar', 'adiós']:
                     self.decir("¡Ha sido un placer conversar contigo! Espero verte pronto. ¡Hasta luego!")
                     self.activo = False
@@ -202,9 +155,6 @@ class AriaVozMejorada:
         except Exception as e:
             print(f"Error en conversación: {e}")
             self.decir("Lo siento, ha ocurrido un error. Necesito reiniciarme.")
-        finally:
-            if self.motor_tts:
-                self.motor_tts.stop()
 
 def main():
     """Función principal."""
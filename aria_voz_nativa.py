@@ -10,7 +10,9 @@ import subprocess
 import threading
 from datetime import datetime
 
-class AriaVozNativa:
+from motor_voz import AsistenteVoz, PrioridadVoz
+
+class AriaVozNativa(AsistenteVoz):
     def __init__(self):
         self.activo = False
         self.ultima_interaccion = None
@@ -25,34 +27,9 @@ class AriaVozNativa:
             "¿Te gustaría que te haga algunas preguntas interesantes?"
         ]
         
+        self.motor_voz.iniciar()
         print("✓ Sistema de voz nativo Windows inicializado")
     
-    def decir(self, texto):
-        """Hace que Aria hable usando el TTS nativo de Windows."""
-        try:
-            print(f"🗣️ ARIA: {texto}")
-            
-            # Escapar comillas para PowerShell
-            texto_escapado = texto.replace("'", "''").replace('"', '""')
-            
-            # Comando PowerShell para TTS
-            comando = f'''powershell -Command "
-            Add-Type -AssemblyName System.Speech;
-            $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer;
-            $speak.Rate = 0;
-            $speak.Volume = 100;
-            $speak.Speak('{texto_escapado}')
-            "'''
-            
-            # Ejecutar comando
-            subprocess.run(comando, shell=True, capture_output=True)
-            return True
-            
-        except Exception as e:
-            print(f"Error al hablar: {e}")
-            print(f"🗣️ ARIA (sin audio): {texto}")
-            return False
-    
     def escuchar_windows(self):
         """Intenta escuchar usando el reconocimiento de voz nativo de Windows."""
         try:
@@ -98,7 +75,7 @@ class AriaVozNativa:
         # Si han pasado más de 30 segundos desde la última interacción
         if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 30:
             tema = random.choice(self.temas_conversacion)
-            self.decir(tema)
+            self.decir(tema, prioridad=PrioridadVoz.BAJA, clave="proactiva")
             self.ultima_interaccion = tiempo_actual
     
     def saludo_inicial(self):
@@ -224,6 +201,9 @@ class AriaVozNativa:
                 mensaje_voz = self.escuchar_windows()
                 
                 if mensaje_voz:
+                    # El usuario ha hablado: cortar lo que Aria estuviera diciendo
+                    self.interrumpir()
+                    
                     # Procesar comando de salida
                     if any(palabra in mensaje_voz.lower() for palabra in ['salir', 'adiós', 'chao', 'terminar', 'bye']):
                         self.decir("¡Ha sido un placer conversar por voz contigo! Espero escucharte muy pronto. ¡Hasta luego!")
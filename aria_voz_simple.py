@@ -2,53 +2,18 @@
 Aria con sistema de voz simplificado - Saludo inmediato por bocina
 """
 
-import pyttsx3
 import time
 import threading
 from datetime import datetime
 
-class AriaVozSimple:
+from motor_voz import AsistenteVoz
+
+class AriaVozSimple(AsistenteVoz):
     """Versión simplificada de Aria enfocada en comunicación por voz."""
     
     def __init__(self):
-        self.motor_tts = None
         self.activo = False
-        self._inicializar_voz()
-    
-    def _inicializar_voz(self):
-        """Inicializa el sistema de text-to-speech."""
-        try:
-            self.motor_tts = pyttsx3.init()
-            
-            # Configurar velocidad y volumen
-            self.motor_tts.setProperty('rate', 150)
-            self.motor_tts.setProperty('volume', 0.9)
-            
-            # Buscar voz en español
-            voces = self.motor_tts.getProperty('voices')
-            for voz in voces:
-                if 'spanish' in voz.name.lower() or 'español' in voz.name.lower():
-                    self.motor_tts.setProperty('voice', voz.id)
-                    break
-            
-            print("✓ Sistema de voz inicializado correctamente")
-            return True
-            
-        except Exception as e:
-            print(f"⚠ Error inicializando sistema de voz: {e}")
-            return False
-    
-    def decir(self, texto):
-        """Hace que Aria hable por la bocina del dispositivo."""
-        if self.motor_tts:
-            try:
-                print(f"🗣️ ARIA: {texto}")
-                self.motor_tts.say(texto)
-                self.motor_tts.runAndWait()
-            except Exception as e:
-                print(f"Error al hablar: {e}")
-        else:
-            print(f"🗣️ ARIA (sin audio): {texto}")
+        self.motor_voz.iniciar()
     
     def saludo_inicial(self):
         """Saludo inmediato al iniciar el sistema."""
@@ -87,6 +52,9 @@ class AriaVozSimple:
                 if not entrada:
                     continue
                 
+                # El usuario ha tomado la palabra: cortar lo que Aria estuviera diciendo
+                self.interrumpir()
+                
                 if entrada.lower() in ['salir', 'terminar', 'adiós']:
                     self.decir("¡Hasta luego! Ha sido un placer hablar contigo.")
                     self.activo = False
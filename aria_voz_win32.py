@@ -8,11 +8,12 @@ import time
 import random
 from datetime import datetime
 
-class AriaVozWin32:
+from motor_voz import AsistenteVoz, PrioridadVoz
+
+class AriaVozWin32(AsistenteVoz):
     def __init__(self):
         self.activo = False
         self.ultima_interaccion = None
-        self.speaker = None
         self.recognizer = None
         
         self.temas_conversacion = [
@@ -23,47 +24,7 @@ class AriaVozWin32:
             "¿Hay algo específico que te gustaría aprender hoy?"
         ]
         
-        self._inicializar_voz()
-    
-    def _inicializar_voz(self):
-        """Inicializa los sistemas de voz de Windows."""
-        try:
-            # Inicializar SAPI para hablar
-            self.speaker = win32com.client.Dispatch("SAPI.SpVoice")
-            
-            # Buscar voces en español
-            voices = self.speaker.GetVoices()
-            for voice in voices:
-                if "spanish" in voice.GetDescription().lower():
-                    self.speaker.Voice = voice
-                    break
-            
-            # Configurar velocidad y volumen
-            self.speaker.Rate = 0  # -10 a 10
-            self.speaker.Volume = 100  # 0 a 100
-            
-            print("✓ Sistema de voz Windows inicializado")
-            return True
-            
-        except Exception as e:
-            print(f"⚠ Error inicializando sistema de voz: {e}")
-            self.speaker = None
-            return False
-    
-    def decir(self, texto):
-        """Hace que Aria hable usando SAPI."""
-        if self.speaker:
-            try:
-                print(f"🗣️ ARIA: {texto}")
-                self.speaker.Speak(texto)
-                return True
-            except Exception as e:
-                print(f"Error al hablar: {e}")
-                print(f"🗣️ ARIA (sin audio): {texto}")
-                return False
-        else:
-            print(f"🗣️ ARIA (sin audio): {texto}")
-            return False
+        self.motor_voz.iniciar()
     
     def escuchar(self):
         """Escucha usando el reconocimiento de voz de Windows."""
@@ -101,7 +62,7 @@ class AriaVozWin32:
         
         if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 30:
             tema = random.choice(self.temas_conversacion)
-            self.decir(tema)
+            self.decir(tema, prioridad=PrioridadVoz.BAJA, clave="proactiva")
             self.ultima_interaccion = tiempo_actual
     
     def saludo_inicial(self):
@@ -211,6 +172,9 @@ class AriaVozWin32:
                 mensaje_voz = self.escuchar()
                 
                 if mensaje_voz:
+                    # El usuario ha hablado: cortar lo que Aria estuviera diciendo
+                    self.interrumpir()
+                    
                     if mensaje_voz.lower() in ['salir', 'terminar', 'adiós']:
                         self.decir("¡Ha sido un placer conversar contigo! Espero verte pronto. ¡Hasta luego!")
                         self.activo = False
@@ -5,10 +5,11 @@ Aria con sistema de voz nativo de Windows y personalidad proactiva
 import os
 import time
 import random
-import subprocess
 from datetime import datetime
 
-class AriaVozWindows:
+from motor_voz import AsistenteVoz, PrioridadVoz
+
+class AriaVozWindows(AsistenteVoz):
     def __init__(self):
         self.activo = False
         self.ultima_interaccion = None
@@ -19,25 +20,9 @@ class AriaVozWindows:
             "Puedo contarte historias fascinantes, ¿te gustaría escuchar alguna?",
             "¿Hay algo específico que te gustaría aprender hoy?"
         ]
+        self.motor_voz.iniciar()
         print("✓ Sistema de voz Windows inicializado correctamente")
     
-    def decir(self, texto):
-        """Hace que Aria hable usando el TTS nativo de Windows."""
-        try:
-            print(f"🗣️ ARIA: {texto}")
-            
-            # Usar PowerShell para TTS nativo de Windows
-            comando = f'powershell -Command "Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.Rate = 0; $speak.Volume = 100; $speak.Speak(\'{texto}\')"'
-            
-            # Ejecutar comando en segundo plano
-            subprocess.run(comando, shell=True, capture_output=True)
-            return True
-            
-        except Exception as e:
-            print(f"Error al hablar: {e}")
-            print(f"🗣️ ARIA (sin audio): {texto}")
-            return False
-    
     def ser_proactiva(self):
         """Muestra iniciativa en la conversación."""
         tiempo_actual = time.time()
@@ -45,7 +30,7 @@ class AriaVozWindows:
         # Si han pasado más de 45 segundos desde la última interacción
         if self.ultima_interaccion and (tiempo_actual - self.ultima_interaccion) > 45:
             tema = random.choice(self.temas_conversacion)
-            self.decir(tema)
+            self.decir(tema, prioridad=PrioridadVoz.BAJA, clave="proactiva")
             self.ultima_interaccion = tiempo_actual
     
     def saludo_inicial(self):
@@ -172,6 +157,9 @@ class AriaVozWindows:
                 if not entrada:
                     continue
                 
+                # El usuario ha tomado la palabra: cortar lo que Aria estuviera diciendo
+                self.interrumpir()
+                
                 if entrada.lower() in ['salir', 'terminar', 'adiós', 'chao', 'bye']:
                     self.decir("¡Ha sido un placer conversar contigo! Espero verte muy pronto. ¡Hasta luego!")
                     self.activo = False
@@ -0,0 +1,309 @@
+"""
+Escritura diferida en la bodega de conocimiento de Aria
+Las llamadas a ``almacenar_diferido`` solo encolan el registro; un hilo en
+segundo plano lo escribe en lotes, por tamaño o por tiempo, para que la E/S
+de la bodega nunca quede entre escuchar al usuario y responderle
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+from agregados_bodega import AgregadosBodega, combinar_resumenes
+from bodega_indexada import Criterios, Registro, marca_tiempo, valor
+
+
+@dataclass
+class _Pendiente:
+    """Registro a la espera de escribirse."""
+    instante: float
+    timestamp: float
+    registro: Dict[str, Any]
+    futuro: Future
+    # Se marca con el lock de la bodega tomado, en cuanto la bodega lo tiene
+    escrito: bool = False
+
+    def como_registro(self) -> Registro:
+        palabras = self.registro.get("palabras_clave") or []
+        return Registro(
+            id=None, secuencia=0, tipo=valor(self.registro.get("tipo")), contenido=self.registro.get("contenido"),
+            importancia=int(valor(self.registro.get("importancia"))), usuario_id=self.registro.get("usuario_id"),
+            palabras_clave=tuple(dict.fromkeys(palabra.lower() for palabra in palabras)), timestamp=self.timestamp
+        )
+
+
+class BodegaDiferida:
+    """
+    Envoltorio de ``BodegaConocimiento`` con escritura diferida por lotes.
+
+    ``almacenar_diferido`` encola el registro y devuelve enseguida un
+    ``Future`` con el id que asignará la bodega; ``almacenar`` mantiene el
+    contrato de ``BodegaConocimiento`` y devuelve el id, adelantando la
+    escritura para no esperar al intervalo. Los registros se escriben cuando
+    se juntan ``tamano_lote`` o cuando el más antiguo lleva ``intervalo``
+    segundos esperando; si la bodega ofrece ``almacenar_lote`` se usa, y si
+    no se escriben uno a uno.
+
+    Las lecturas (``buscar`` y ``obtener_resumen_usuario``) no vacían la
+    cola: combinan lo que devuelve la bodega con los registros pendientes
+    que cumplen los criterios. Los pendientes salen con ``id`` None y con su
+    ``timestamp`` (o la hora a la que se encolaron); las entradas de la
+    bodega pueden traerlo como número o como fecha ISO. Una lectura solo espera, como mucho, a que
+    termine el lote que se está escribiendo en ese momento. ``detener`` no
+    vuelve hasta haberlo escrito todo. El resto de la interfaz se delega
+    tal cual.
+    """
+
+    def __init__(self, bodega: Any, tamano_lote: int = 64, intervalo: float = 1.0,
+                 max_pendientes: int = 10000, reintentos: int = 3):
+        """
+        Args:
+            bodega: Bodega de conocimiento (``BodegaConocimiento``)
+            tamano_lote: Registros por escritura
+            intervalo: Segundos máximos que un registro espera en la cola
+            max_pendientes: Registros en cola a partir de los que ``almacenar`` espera
+            reintentos: Intentos de escritura de un lote antes de descartarlo
+        """
+        self.logger = logging.getLogger("BodegaDiferida")
+        self.bodega = bodega
+        self.tamano_lote = max(1, tamano_lote)
+        self.intervalo = intervalo
+        self.max_pendientes = max(self.tamano_lote, max_pendientes)
+        self.reintentos = reintentos
+
+        # Registros en cola y lotes sacados de la cola que se están escribiendo
+        self._pendientes: "deque[_Pendiente]" = deque()
+        self._en_escritura: List[List[_Pendiente]] = []
+        # Una escritura en la bodega y una lectura combinada con la cola no se solapan
+        self._lock_bodega = threading.Lock()
+        # Peticiones de vaciado en espera: se escribe sin esperar al intervalo
+        self._vaciados = 0
+        self._cond = threading.Condition()
+        self._activo = True
+        self._estadisticas = {"encolados": 0, "escritos": 0, "lotes": 0, "errores": 0, "descartados": 0}
+        self._hilo = threading.Thread(target=self._escribir_en_segundo_plano, name="aria-bodega-diferida",
+                                      daemon=True)
+        self._hilo.start()
+
+    def almacenar(self, **registro) -> Any:
+        """
+        Almacena un registro y devuelve su id, como ``BodegaConocimiento.almacenar``.
+
+        Pide escribir ya el lote para no esperar al intervalo; en el bucle de
+        conversación se usa ``almacenar_diferido``.
+        """
+        futuro = self.almacenar_diferido(**registro)
+        with self._cond:
+            self._vaciados += 1
+            self._cond.notify_all()
+        try:
+            return futuro.result()
+        finally:
+            with self._cond:
+                self._vaciados -= 1
+
+    def almacenar_diferido(self, **registro) -> Future:
+        """Encola un registro con los mismos argumentos que ``almacenar``; el Future da su id."""
+        futuro: Future = Future()
+        # La hora que dará la bodega: la indicada por quien llama o la actual
+        timestamp = marca_tiempo(registro.get("timestamp")) or time.time()
+        with self._cond:
+            if not self._activo:
+                raise RuntimeError("La bodega diferida está detenida")
+            while len(self._pendientes) >= self.max_pendientes and self._activo:
+                # Contrapresión: solo si la bodega no da abasto
+                self._cond.wait(0.1)
+            self._pendientes.append(_Pendiente(time.monotonic(), timestamp, registro, futuro))
+            self._estadisticas["encolados"] += 1
+            # Despertar al escritor si hay que programar el intervalo o el lote está lleno
+            if len(self._pendientes) == 1 or len(self._pendientes) >= self.tamano_lote:
+                self._cond.notify_all()
+        return futuro
+
+    def vaciar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que se escriban todos los registros encolados hasta ahora, y
+        vacía también la bodega envuelta si tiene su propio ``vaciar``.
+        """
+        if not self._esperar_cola(timeout):
+            return False
+        vaciar = getattr(self.bodega, "vaciar", None)
+        if vaciar is not None:
+            vaciar()
+        return True
+
+    def _esperar_cola(self, timeout: Optional[float] = None) -> bool:
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._vaciados += 1
+            self._cond.notify_all()
+            try:
+                while self._pendientes or self._en_escritura:
+                    if not self._hilo.is_alive():
+                        break
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        return False
+                    self._cond.wait(restante)
+            finally:
+                self._vaciados -= 1
+        if self._pendientes:
+            # El hilo ya terminó: escribir lo que quede en este hilo
+            self._escribir_pendientes()
+        return True
+
+    def detener(self, timeout: Optional[float] = None):
+        """Escribe todo lo pendiente y detiene el hilo de escritura."""
+        with self._cond:
+            if not self._activo:
+                return
+            self._activo = False
+            self._cond.notify_all()
+        self._hilo.join(timeout)
+        self._escribir_pendientes()
+        detener = getattr(self.bodega, "detener", None)
+        if detener is not None:
+            detener()
+
+    # Lecturas: ven todo lo almacenado antes de la llamada (salvo las estadísticas)
+
+    def _leer(self, leer) -> Tuple[Any, List[_Pendiente]]:
+        """Lee de la bodega junto con los registros que aún no tiene."""
+        with self._lock_bodega:
+            resultado = leer()
+            with self._cond:
+                pendientes = [pendiente for lote in self._en_escritura for pendiente in lote
+                              if not pendiente.escrito]
+                pendientes.extend(self._pendientes)
+        return resultado, pendientes
+
+    def buscar(self, criterios: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """``buscar`` de la bodega más los pendientes que coinciden; del más reciente al más antiguo."""
+        escritas, pendientes = self._leer(lambda: self.bodega.buscar(criterios))
+        if not pendientes:
+            return escritas
+        filtro = Criterios(criterios)
+        encontrados = [registro for registro in map(_Pendiente.como_registro, reversed(pendientes))
+                       if filtro.coincide(registro)]
+        resultados = sorted([registro.a_dict() for registro in encontrados] + list(escritas),
+                            key=lambda entrada: marca_tiempo(entrada.get("timestamp")) or 0.0, reverse=True)
+        return resultados if filtro.limite is None else resultados[:filtro.limite]
+
+    def obtener_resumen_usuario(self, usuario_id: str) -> Dict[str, Any]:
+        """Resumen de la bodega sumando los registros pendientes del usuario."""
+        resumen, pendientes = self._leer(lambda: self.bodega.obtener_resumen_usuario(usuario_id))
+        agregados = AgregadosBodega()
+        for pendiente in pendientes:
+            if pendiente.registro.get("usuario_id") == usuario_id:
+                registro = pendiente.como_registro()
+                agregados.sumar(registro.tipo, registro.importancia, registro.usuario_id, registro.palabras_clave,
+                                registro.timestamp, registro.contenido)
+        if not agregados.estadisticas()["total_entradas"]:
+            return resumen
+        return combinar_resumenes(usuario_id, resumen, agregados.resumen_usuario(usuario_id))
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        # Sin vaciar la cola: se puede consultar a menudo; lo que falta son los pendientes
+        estadisticas = self.bodega.obtener_estadisticas()
+        with self._cond:
+            escritura = {**self._estadisticas, "pendientes": len(self._pendientes)}
+        return {**estadisticas, "escritura_diferida": escritura}
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self.bodega, nombre)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def _escribir_en_segundo_plano(self):
+        while True:
+            with self._cond:
+                while self._activo:
+                    if len(self._pendientes) >= self.tamano_lote or (self._pendientes and self._vaciados):
+                        break
+                    if self._pendientes:
+                        espera = self._pendientes[0].instante + self.intervalo - time.monotonic()
+                        if espera <= 0:
+                            break
+                    else:
+                        espera = None
+                    self._cond.wait(espera)
+                if not self._pendientes:
+                    return
+                lote = self._extraer_lote()
+            self._escribir_lote(lote)
+
+    def _escribir_pendientes(self):
+        while True:
+            with self._cond:
+                if not self._pendientes:
+                    return
+                lote = self._extraer_lote()
+            self._escribir_lote(lote)
+
+    def _extraer_lote(self) -> List[_Pendiente]:
+        # Con el lock tomado
+        lote = [self._pendientes.popleft() for _ in range(min(self.tamano_lote, len(self._pendientes)))]
+        self._en_escritura.append(lote)
+        self._cond.notify_all()
+        return lote
+
+    def _escribir_lote(self, lote: List[_Pendiente]):
+        escritos = 0
+        try:
+            almacenar_lote = getattr(self.bodega, "almacenar_lote", None)
+            if almacenar_lote is not None:
+                # Un lote se escribe entero o no se escribe: se puede reintentar completo
+                ok, resultado = self._con_reintentos(lambda: self._escribir(
+                    lote, lambda: list(almacenar_lote([pendiente.registro for pendiente in lote]))))
+                for indice, pendiente in enumerate(lote):
+                    if ok:
+                        pendiente.futuro.set_result(resultado[indice])
+                    else:
+                        pendiente.futuro.set_exception(resultado)
+                escritos = len(lote) if ok else 0
+            else:
+                for pendiente in lote:
+                    ok, resultado = self._con_reintentos(lambda: self._escribir(
+                        [pendiente], lambda: self.bodega.almacenar(**pendiente.registro)))
+                    if ok:
+                        pendiente.futuro.set_result(resultado)
+                        escritos += 1
+                    else:
+                        pendiente.futuro.set_exception(resultado)
+        finally:
+            with self._cond:
+                self._en_escritura.remove(lote)
+                self._estadisticas["escritos"] += escritos
+                self._estadisticas["descartados"] += len(lote) - escritos
+                self._estadisticas["lotes"] += 1
+                self._cond.notify_all()
+        if escritos < len(lote):
+            self.logger.error(f"Se descartan {len(lote) - escritos} registros que no se pudieron escribir")
+
+    def _escribir(self, pendientes: List[_Pendiente], escribir) -> Any:
+        """Escribe en la bodega y marca los registros como escritos sin dejar hueco a las lecturas."""
+        with self._lock_bodega:
+            resultado = escribir()
+            for pendiente in pendientes:
+                pendiente.escrito = True
+        return resultado
+
+    def _con_reintentos(self, escribir) -> Tuple[bool, Any]:
+        error = None
+        for intento in range(max(1, self.reintentos)):
+            try:
+                return True, escribir()
+            except Exception as e:
+                error = e
+                with self._cond:
+                    self._estadisticas["errores"] += 1
+                self.logger.warning(f"Error escribiendo en la bodega (intento {intento + 1}): {e}")
+                if intento + 1 < self.reintentos:
+                    time.sleep(min(0.1 * 2 ** intento, 1.0))
+        return False, error
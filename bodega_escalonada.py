@@ -0,0 +1,372 @@
+"""
+Retención por niveles de la bodega de conocimiento de Aria
+Lo reciente se guarda en memoria, lo que se pasa a disco se compacta según
+su importancia y lo antiguo de poca importancia se resume en recuentos, para
+que memoria y disco no crezcan sin límite con semanas de funcionamiento
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from agregados_bodega import combinar_resumenes
+from bodega_indexada import BodegaIndexada
+
+
+# Importancia de las entradas de resumen: por debajo de MINIMA, nunca se vuelven a compactar
+RESUMEN = 0
+
+
+@dataclass(frozen=True)
+class Retencion:
+    """Qué se hace con las entradas de una importancia."""
+    # Segundos de la ventana de muestreo al pasar a disco (None: se guardan todas)
+    muestreo: Optional[float] = None
+    # Al pasar a disco se resumen en recuentos por esta franja de segundos
+    resumir_al_compactar: Optional[float] = None
+    # Días en disco antes de resumirse en recuentos diarios (None: se conservan)
+    dias_completas: Optional[float] = None
+
+
+# Por valor de ``ImportanciaInfo``: CRITICA y ALTA se conservan siempre
+POLITICA_RETENCION: Dict[int, Retencion] = {
+    5: Retencion(),
+    4: Retencion(),
+    3: Retencion(dias_completas=365),
+    2: Retencion(muestreo=60.0, dias_completas=30),
+    1: Retencion(resumir_al_compactar=3600.0),
+}
+
+
+def _sin_id(entrada: Dict[str, Any]) -> Dict[str, Any]:
+    return {clave: valor_campo for clave, valor_campo in entrada.items() if clave != "id"}
+
+
+def _clave_grupo(entrada: Dict[str, Any], franja: float) -> Tuple:
+    return (entrada["usuario_id"], entrada["tipo"], tuple(sorted(entrada["palabras_clave"])),
+            int(entrada["timestamp"] // franja))
+
+
+def muestrear(entradas: Iterable[Dict[str, Any]], ventana: float) -> List[Dict[str, Any]]:
+    """
+    Deja la primera entrada de cada grupo (usuario, tipo, palabras clave)
+    por ventana de tiempo, con el número de entradas que representa en
+    ``contenido["agrupadas"]``.
+    """
+    grupos: Dict[Tuple, Dict[str, Any]] = {}
+    cantidades: Counter = Counter()
+    for entrada in entradas:
+        clave = _clave_grupo(entrada, ventana)
+        grupos.setdefault(clave, entrada)
+        cantidades[clave] += 1
+    muestras = []
+    for clave, entrada in grupos.items():
+        if cantidades[clave] > 1 and isinstance(entrada["contenido"], dict):
+            entrada = {**entrada, "contenido": {**entrada["contenido"], "agrupadas": cantidades[clave]}}
+        muestras.append(entrada)
+    return muestras
+
+
+def resumir(entradas: Iterable[Dict[str, Any]], franja: float) -> List[Dict[str, Any]]:
+    """
+    Recuentos por (usuario, tipo, palabras clave, franja de tiempo) como
+    entradas de importancia ``RESUMEN``.
+    """
+    grupos: Dict[Tuple, Dict[str, Any]] = {}
+    for entrada in entradas:
+        clave = _clave_grupo(entrada, franja)
+        contenido = entrada["contenido"] if isinstance(entrada["contenido"], dict) else {}
+        if contenido.get("tipo") == "resumen":
+            cantidad, importancia = contenido["cantidad"], contenido["importancia"]
+            desde, hasta = contenido["desde"], contenido["hasta"]
+        else:
+            cantidad, importancia = contenido.get("agrupadas", 1), entrada["importancia"]
+            desde = hasta = entrada["timestamp"]
+        grupo = grupos.get(clave)
+        if grupo is None:
+            grupos[clave] = {
+                "tipo": entrada["tipo"],
+                "usuario_id": entrada["usuario_id"],
+                "palabras_clave": list(entrada["palabras_clave"]),
+                "importancia": RESUMEN,
+                "timestamp": hasta,
+                "contenido": {"tipo": "resumen", "cantidad": cantidad, "importancia": importancia,
+                              "desde": desde, "hasta": hasta},
+            }
+            continue
+        resumen = grupo["contenido"]
+        resumen["cantidad"] += cantidad
+        resumen["importancia"] = max(resumen["importancia"], importancia)
+        resumen["desde"] = min(resumen["desde"], desde)
+        resumen["hasta"] = max(resumen["hasta"], hasta)
+        grupo["timestamp"] = resumen["hasta"]
+    return list(grupos.values())
+
+
+class BodegaEscalonada:
+    """
+    Bodega de conocimiento con tres niveles de retención.
+
+    - Caliente: las entradas de los últimos ``edad_caliente`` segundos (como
+      mucho ``max_caliente``) en una ``BodegaIndexada`` en memoria.
+    - Templado: la bodega persistente. Al pasar a ella, cada entrada se trata
+      según la política de su importancia: se guarda tal cual, se muestrea
+      (una por grupo y ventana) o se resume directamente en recuentos.
+    - Frío: pasados ``dias_completas`` días, las entradas de importancia
+      media o baja se sustituyen por recuentos diarios (importancia
+      ``RESUMEN``), que siguen apareciendo en ``buscar``.
+
+    Un hilo compacta cada ``intervalo`` segundos, o antes si el nivel caliente
+    se llena. La bodega persistente debe aceptar ``timestamp`` y la
+    importancia ``RESUMEN`` en ``almacenar`` (``BodegaSQLite``,
+    ``BodegaIndexada``); el paso a frío solo se hace si ofrece ``retirar``.
+    ``vaciar`` y ``detener`` pasan a disco todo lo que haya en memoria. Los
+    ids de las entradas en memoria empiezan por ``c`` y cambian al pasar a
+    disco.
+    """
+
+    def __init__(self, persistente: Any, politica: Optional[Dict[int, Retencion]] = None,
+                 edad_caliente: float = 300.0, max_caliente: int = 50000, intervalo: float = 60.0,
+                 lote_compactacion: int = 5000, iniciar: bool = True):
+        """
+        Args:
+            persistente: Bodega en disco (``BodegaSQLite``)
+            politica: Retención por valor de importancia (``POLITICA_RETENCION`` por defecto)
+            edad_caliente: Segundos que una entrada se queda en memoria
+            max_caliente: Entradas en memoria a partir de las que se compacta antes de tiempo
+            intervalo: Segundos entre compactaciones
+            lote_compactacion: Entradas que se pasan de nivel como mucho en cada paso
+            iniciar: Arrancar el hilo de compactación
+        """
+        self.logger = logging.getLogger("BodegaEscalonada")
+        self.persistente = persistente
+        self.politica = politica or POLITICA_RETENCION
+        self.edad_caliente = edad_caliente
+        self.max_caliente = max_caliente
+        self.intervalo = intervalo
+        self.lote_compactacion = lote_compactacion
+        self.caliente = BodegaIndexada(duracion_segmento=60.0, prefijo="c")
+        # Entrada más reciente pasada a disco (las de sesiones anteriores no son del futuro)
+        self._ultimo_en_disco = time.time()
+
+        self._lock_compactacion = threading.Lock()
+        self._despertar = threading.Event()
+        self._activo = False
+        self._hilo: Optional[threading.Thread] = None
+        self._estadisticas = {"compactaciones": 0, "a_disco": 0, "descartadas_muestreo": 0,
+                              "resumidas": 0, "resumenes": 0}
+        if iniciar:
+            self.iniciar()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self):
+        """Arranca la compactación en segundo plano."""
+        if self._activo:
+            return
+        self._activo = True
+        self._hilo = threading.Thread(target=self._compactar_en_segundo_plano, name="aria-bodega-retencion",
+                                      daemon=True)
+        self._hilo.start()
+
+    def vaciar(self):
+        """Pasa a disco todas las entradas en memoria."""
+        self.compactar(todo=True)
+
+    def detener(self):
+        """Detiene la compactación y pasa a disco lo que quede en memoria."""
+        self._activo = False
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        self.vaciar()
+
+    def _compactar_en_segundo_plano(self):
+        while self._activo:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if not self._activo:
+                return
+            try:
+                self.compactar()
+            except Exception as e:
+                self.logger.error(f"Error compactando la bodega: {e}")
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def almacenar(self, **registro) -> str:
+        """Almacena una entrada en memoria (mismos argumentos que ``BodegaConocimiento.almacenar``)."""
+        id_entrada = self.caliente.almacenar(**registro)
+        self._vigilar_tamano()
+        return id_entrada
+
+    def almacenar_lote(self, registros: Iterable[Dict[str, Any]]) -> List[str]:
+        ids = self.caliente.almacenar_lote(registros)
+        self._vigilar_tamano()
+        return ids
+
+    def _vigilar_tamano(self):
+        if len(self.caliente) > self.max_caliente:
+            self._despertar.set()
+
+    def eliminar(self, id_entrada: str) -> bool:
+        if id_entrada.startswith(self.caliente.prefijo):
+            return self.caliente.eliminar(id_entrada)
+        return self.persistente.eliminar(id_entrada)
+
+    def limpiar_datos_antiguos(self, dias_antiguedad: int = 365) -> int:
+        return (self.caliente.limpiar_datos_antiguos(dias_antiguedad)
+                + self.persistente.limpiar_datos_antiguos(dias_antiguedad))
+
+    # ------------------------------------------------------------------
+    # Compactación
+    # ------------------------------------------------------------------
+
+    def compactar(self, ahora: Optional[float] = None, todo: bool = False) -> Dict[str, int]:
+        """
+        Un paso de compactación: de memoria a disco y de disco a resúmenes.
+
+        Args:
+            ahora: Instante de referencia (por defecto, el actual)
+            todo: Pasar a disco todo lo que hay en memoria, no solo lo antiguo
+
+        Returns:
+            Entradas pasadas a disco, descartadas por muestreo y resumidas
+        """
+        ahora = time.time() if ahora is None else ahora
+        with self._lock_compactacion:
+            a_disco, descartadas = self._compactar_caliente(ahora, todo)
+            resumidas, resumenes = self._compactar_templado(ahora)
+            resultado = {"a_disco": a_disco, "descartadas_muestreo": descartadas,
+                         "resumidas": resumidas, "resumenes": resumenes}
+            self._estadisticas["compactaciones"] += 1
+            for clave, cantidad in resultado.items():
+                self._estadisticas[clave] += cantidad
+            return resultado
+
+    def _compactar_caliente(self, ahora: float, todo: bool) -> Tuple[int, int]:
+        a_disco = descartadas = 0
+        exceso = len(self.caliente) - self.max_caliente
+        if todo or exceso > 0:
+            # Todo a disco, o las más antiguas que sobran aunque sean recientes
+            pendientes = None if todo else exceso
+            while pendientes is None or pendientes > 0:
+                limite = self.lote_compactacion if pendientes is None else min(self.lote_compactacion, pendientes)
+                retiradas = self.caliente.retirar(float("inf"), importancia_min=RESUMEN, limite=limite)
+                guardadas, muestreo = self._pasar_a_disco(retiradas)
+                a_disco += guardadas
+                descartadas += muestreo
+                if pendientes is not None:
+                    pendientes -= len(retiradas)
+                if len(retiradas) < limite:
+                    break
+
+        hasta = ahora - self.edad_caliente
+        for importancia, retencion in self.politica.items():
+            franja = retencion.resumir_al_compactar or retencion.muestreo
+            # Solo franjas completas: un único resumen o muestra por grupo y franja
+            hasta_nivel = hasta // franja * franja if franja else hasta
+            while True:
+                retiradas = self.caliente.retirar(hasta_nivel, importancia_min=importancia,
+                                                  importancia_max=importancia, limite=self.lote_compactacion)
+                guardadas, muestreo = self._pasar_a_disco(retiradas)
+                a_disco += guardadas
+                descartadas += muestreo
+                if len(retiradas) < self.lote_compactacion:
+                    break
+        return a_disco, descartadas
+
+    def _pasar_a_disco(self, retiradas: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Guarda en disco las entradas sacadas de memoria según su política."""
+        if not retiradas:
+            return 0, 0
+        por_importancia: Dict[int, List[Dict[str, Any]]] = {}
+        for entrada in retiradas:
+            por_importancia.setdefault(entrada["importancia"], []).append(_sin_id(entrada))
+        registros = []
+        for importancia, entradas in por_importancia.items():
+            retencion = self.politica.get(importancia, Retencion())
+            if retencion.resumir_al_compactar:
+                registros.extend(resumir(entradas, retencion.resumir_al_compactar))
+            elif retencion.muestreo:
+                registros.extend(muestrear(entradas, retencion.muestreo))
+            else:
+                registros.extend(entradas)
+        registros.sort(key=lambda registro: registro["timestamp"])
+        self._guardar(registros)
+        self._ultimo_en_disco = max(self._ultimo_en_disco, registros[-1]["timestamp"])
+        return len(registros), len(retiradas) - len(registros)
+
+    def _compactar_templado(self, ahora: float) -> Tuple[int, int]:
+        retirar = getattr(self.persistente, "retirar", None)
+        if retirar is None:
+            return 0, 0
+        resumidas = resumenes = 0
+        for importancia, retencion in self.politica.items():
+            if retencion.dias_completas is None:
+                continue
+            hasta = ahora - retencion.dias_completas * 86400
+            while True:
+                entradas = retirar(hasta, importancia_min=importancia, importancia_max=importancia,
+                                   limite=self.lote_compactacion)
+                if not entradas:
+                    break
+                registros = resumir(entradas, 86400.0)
+                self._guardar(registros)
+                resumidas += len(entradas)
+                resumenes += len(registros)
+                if len(entradas) < self.lote_compactacion:
+                    break
+        return resumidas, resumenes
+
+    def _guardar(self, registros: List[Dict[str, Any]]):
+        almacenar_lote = getattr(self.persistente, "almacenar_lote", None)
+        if almacenar_lote is not None:
+            almacenar_lote(registros)
+        else:
+            for registro in registros:
+                self.persistente.almacenar(**registro)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def obtener(self, id_entrada: str) -> Optional[Dict[str, Any]]:
+        if id_entrada.startswith(self.caliente.prefijo):
+            return self.caliente.obtener(id_entrada)
+        return self.persistente.obtener(id_entrada)
+
+    def buscar(self, criterios: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Busca en memoria y en disco; de la más reciente a la más antigua."""
+        limite = criterios.get("limite")
+        recientes = self.caliente.buscar(criterios)
+        if limite is not None and len(recientes) >= limite and recientes[limite - 1]["timestamp"] > self._ultimo_en_disco:
+            # Todo lo que hay en disco es más antiguo: no hace falta consultarlo
+            return recientes[:limite]
+        antiguas = self.persistente.buscar(criterios)
+        resultados = sorted(recientes + antiguas, key=lambda entrada: entrada["timestamp"], reverse=True)
+        return resultados if limite is None else resultados[:limite]
+
+    def obtener_resumen_usuario(self, usuario_id: str) -> Dict[str, Any]:
+        """Resumen del usuario sumando memoria y disco."""
+        return combinar_resumenes(usuario_id, self.persistente.obtener_resumen_usuario(usuario_id),
+                                  self.caliente.obtener_resumen_usuario(usuario_id))
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Estadísticas de la bodega persistente más las de cada nivel."""
+        estadisticas = dict(self.persistente.obtener_estadisticas())
+        caliente = self.caliente.obtener_estadisticas()
+        estadisticas["total_entradas"] = estadisticas.get("total_entradas", 0) + caliente["total_entradas"]
+        estadisticas["retencion"] = {**self._estadisticas, "en_memoria": caliente["total_entradas"]}
+        return estadisticas
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self.persistente, nombre)
@@ -0,0 +1,396 @@
+"""
+Bodega de conocimiento indexada de Aria
+Motor en memoria con la interfaz de ``BodegaConocimiento`` cuyas búsquedas
+no recorren toda la bodega: índice invertido de palabras clave, índices por
+usuario y por tipo y segmentos por franja de tiempo para los filtros de fecha
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+
+from agregados_bodega import AgregadosBodega
+
+
+def valor(campo: Any) -> Any:
+    """Valor de un ``TipoInformacion``/``ImportanciaInfo`` (o el propio valor si ya lo es)."""
+    return getattr(campo, "value", campo)
+
+
+def marca_tiempo(fecha: Any) -> Optional[float]:
+    """Segundos desde la época de un timestamp, ``datetime`` o fecha ISO."""
+    if fecha is None:
+        return None
+    if isinstance(fecha, datetime):
+        return fecha.timestamp()
+    if isinstance(fecha, str):
+        return datetime.fromisoformat(fecha).timestamp()
+    return float(fecha)
+
+
+@dataclass
+class Registro:
+    """Entrada de la bodega."""
+    id: str
+    secuencia: int
+    tipo: Any
+    contenido: Any
+    importancia: int
+    usuario_id: Optional[str]
+    palabras_clave: Tuple[str, ...]
+    timestamp: float
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "contenido": self.contenido,
+            "importancia": self.importancia,
+            "usuario_id": self.usuario_id,
+            "palabras_clave": list(self.palabras_clave),
+            "timestamp": self.timestamp,
+        }
+
+
+class Criterios:
+    """Criterios de ``buscar`` ya normalizados."""
+
+    def __init__(self, criterios: Dict[str, Any]):
+        self.tipo = valor(criterios.get("tipo"))
+        self.usuario_id = criterios.get("usuario_id")
+        self.palabras_clave = {palabra.lower() for palabra in criterios.get("palabras_clave") or []}
+        importancia_min = criterios.get("importancia_min")
+        self.importancia_min = None if importancia_min is None else int(valor(importancia_min))
+        self.fecha_desde = marca_tiempo(criterios.get("fecha_desde"))
+        self.limite = criterios.get("limite")
+
+    def coincide(self, registro: Registro) -> bool:
+        return ((self.tipo is None or registro.tipo == self.tipo)
+                and (self.usuario_id is None or registro.usuario_id == self.usuario_id)
+                and (self.importancia_min is None or registro.importancia >= self.importancia_min)
+                and (self.fecha_desde is None or registro.timestamp >= self.fecha_desde)
+                and (not self.palabras_clave or not self.palabras_clave.isdisjoint(registro.palabras_clave)))
+
+
+class BodegaIndexada:
+    """
+    Bodega de conocimiento en memoria con índices secundarios.
+
+    Cada registro entra en el índice de su usuario, de su tipo, de cada una
+    de sus palabras clave y en el segmento de su franja de tiempo; todas las
+    listas quedan ordenadas por orden de llegada. ``buscar`` recorre, de la
+    más reciente a la más antigua, solo la fuente de candidatos más pequeña
+    (la más selectiva), comprueba el resto de criterios sobre cada candidato
+    y se detiene al llegar a ``limite``. Los resultados van del más reciente
+    al más antiguo.
+
+    Los registros borrados se quitan del diccionario principal y de su
+    segmento; en los demás índices se saltan y se purgan cuando son mayoría.
+    """
+
+    def __init__(self, duracion_segmento: float = 3600.0, prefijo: str = "e"):
+        """
+        Args:
+            duracion_segmento: Segundos de cada segmento temporal
+            prefijo: Prefijo de los ids de las entradas
+        """
+        self.duracion_segmento = duracion_segmento
+        self.prefijo = prefijo
+        self._registros: Dict[int, Registro] = {}
+        self._por_id: Dict[str, int] = {}
+        self._por_usuario: Dict[Optional[str], List[int]] = {}
+        self._por_tipo: Dict[Any, List[int]] = {}
+        self._por_palabra: Dict[str, List[int]] = {}
+        self._segmentos: Dict[int, List[int]] = {}
+        self._claves_segmentos: List[int] = []
+        self._secuencia = itertools.count(1)
+        self._obsoletos = 0
+        self._agregados = AgregadosBodega()
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def almacenar(self, tipo: Any, contenido: Any, importancia: Any, usuario_id: Optional[str] = None,
+                  palabras_clave: Optional[Iterable[str]] = None, timestamp: Any = None) -> str:
+        """
+        Almacena una entrada.
+
+        Returns:
+            Id de la entrada
+        """
+        with self._lock:
+            secuencia = next(self._secuencia)
+            registro = Registro(
+                id=f"{self.prefijo}{secuencia:08d}",
+                secuencia=secuencia,
+                tipo=valor(tipo),
+                contenido=contenido,
+                importancia=int(valor(importancia)),
+                usuario_id=usuario_id,
+                palabras_clave=tuple(dict.fromkeys(palabra.lower() for palabra in palabras_clave or [])),
+                timestamp=time.time() if timestamp is None else marca_tiempo(timestamp)
+            )
+            self._indexar(registro)
+            return registro.id
+
+    def almacenar_lote(self, registros: Iterable[Dict[str, Any]]) -> List[str]:
+        """Almacena varias entradas (argumentos de ``almacenar``) con una sola toma del lock."""
+        with self._lock:
+            return [self.almacenar(**registro) for registro in registros]
+
+    def eliminar(self, id_entrada: str) -> bool:
+        """Elimina una entrada por su id."""
+        with self._lock:
+            secuencia = self._por_id.get(id_entrada)
+            if secuencia is None:
+                return False
+            self._desindexar(self._registros[secuencia])
+            self._purgar_si_hace_falta()
+            return True
+
+    def limpiar_datos_antiguos(self, dias_antiguedad: int = 365) -> int:
+        """
+        Elimina las entradas con más de ``dias_antiguedad`` días.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        limite = time.time() - dias_antiguedad * 86400
+        with self._lock:
+            eliminados = 0
+            for clave in list(self._claves_segmentos):
+                if clave * self.duracion_segmento >= limite:
+                    break
+                if (clave + 1) * self.duracion_segmento <= limite:
+                    # Segmento entero caducado: se descarta de una vez
+                    for secuencia in self._segmentos.pop(clave):
+                        self._desindexar(self._registros[secuencia], segmento=False)
+                        eliminados += 1
+                    self._claves_segmentos.remove(clave)
+                    continue
+                for secuencia in list(self._segmentos[clave]):
+                    registro = self._registros[secuencia]
+                    if registro.timestamp < limite:
+                        self._desindexar(registro)
+                        eliminados += 1
+            self._purgar_si_hace_falta()
+            return eliminados
+
+    def retirar(self, hasta: float, importancia_min: int = 1, importancia_max: int = 5,
+                limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Saca de la bodega las entradas anteriores a ``hasta`` con importancia
+        entre ``importancia_min`` e ``importancia_max``.
+
+        Returns:
+            Las entradas retiradas, de la más antigua a la más reciente
+        """
+        with self._lock:
+            retiradas = []
+            for clave in list(self._claves_segmentos):
+                if clave * self.duracion_segmento >= hasta:
+                    break
+                for secuencia in list(self._segmentos[clave]):
+                    registro = self._registros[secuencia]
+                    if registro.timestamp < hasta and importancia_min <= registro.importancia <= importancia_max:
+                        self._desindexar(registro)
+                        retiradas.append(registro.a_dict())
+                        if limite is not None and len(retiradas) >= limite:
+                            break
+                if limite is not None and len(retiradas) >= limite:
+                    break
+            self._purgar_si_hace_falta()
+            retiradas.sort(key=lambda entrada: entrada["timestamp"])
+            return retiradas
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def obtener(self, id_entrada: str) -> Optional[Dict[str, Any]]:
+        """Entrada por su id, o None."""
+        with self._lock:
+            secuencia = self._por_id.get(id_entrada)
+            return None if secuencia is None else self._registros[secuencia].a_dict()
+
+    def buscar(self, criterios: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Busca entradas por ``tipo``, ``usuario_id``, ``palabras_clave`` (cualquiera
+        de ellas), ``importancia_min`` y ``fecha_desde``, como mucho ``limite``.
+        """
+        filtro = Criterios(criterios)
+        with self._lock:
+            resultados = []
+            for registro in self._candidatos(filtro):
+                if filtro.coincide(registro):
+                    resultados.append(registro.a_dict())
+                    if filtro.limite is not None and len(resultados) >= filtro.limite:
+                        break
+            return resultados
+
+    def obtener_resumen_usuario(self, usuario_id: str) -> Dict[str, Any]:
+        """Totales del usuario por tipo, sus palabras clave más frecuentes y su actividad."""
+        return self._agregados.resumen_usuario(usuario_id)
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Totales de la bodega y tamaño de sus índices."""
+        return {
+            **self._agregados.estadisticas(),
+            "palabras_indexadas": len(self._por_palabra),
+            "segmentos": len(self._segmentos),
+        }
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+
+    def _clave_segmento(self, timestamp: float) -> int:
+        return int(timestamp // self.duracion_segmento)
+
+    def _indexar(self, registro: Registro):
+        secuencia = registro.secuencia
+        self._registros[secuencia] = registro
+        self._por_id[registro.id] = secuencia
+        self._agregados.sumar(registro.tipo, registro.importancia, registro.usuario_id, registro.palabras_clave,
+                              registro.timestamp, registro.contenido)
+        self._por_usuario.setdefault(registro.usuario_id, []).append(secuencia)
+        self._por_tipo.setdefault(registro.tipo, []).append(secuencia)
+        for palabra in registro.palabras_clave:
+            self._por_palabra.setdefault(palabra, []).append(secuencia)
+        clave = self._clave_segmento(registro.timestamp)
+        segmento = self._segmentos.get(clave)
+        if segmento is None:
+            segmento = self._segmentos[clave] = []
+            bisect.insort(self._claves_segmentos, clave)
+        segmento.append(secuencia)
+
+    def _desindexar(self, registro: Registro, segmento: bool = True):
+        del self._registros[registro.secuencia]
+        del self._por_id[registro.id]
+        self._agregados.restar(registro.tipo, registro.importancia, registro.usuario_id, registro.palabras_clave,
+                               registro.timestamp, registro.contenido)
+        if segmento:
+            clave = self._clave_segmento(registro.timestamp)
+            lista = self._segmentos[clave]
+            lista.remove(registro.secuencia)
+            if not lista:
+                del self._segmentos[clave]
+                self._claves_segmentos.remove(clave)
+        # En el resto de índices queda obsoleto hasta la próxima purga
+        self._obsoletos += 1
+
+    def _purgar_si_hace_falta(self):
+        if self._obsoletos <= max(1000, len(self._registros)):
+            return
+        vivos = self._registros
+        for indice in (self._por_usuario, self._por_tipo, self._por_palabra):
+            for clave in list(indice):
+                lista = [secuencia for secuencia in indice[clave] if secuencia in vivos]
+                if lista:
+                    indice[clave] = lista
+                else:
+                    del indice[clave]
+        self._obsoletos = 0
+
+    def _candidatos(self, filtro: Criterios) -> Iterator[Registro]:
+        """Registros de la fuente más selectiva, del más reciente al más antiguo."""
+        # Cada fuente: (tamaño, listas ordenadas por secuencia que la componen)
+        fuentes: List[Tuple[int, List[List[int]]]] = []
+        if filtro.usuario_id is not None:
+            lista = self._por_usuario.get(filtro.usuario_id, [])
+            fuentes.append((len(lista), [lista]))
+        if filtro.tipo is not None:
+            lista = self._por_tipo.get(filtro.tipo, [])
+            fuentes.append((len(lista), [lista]))
+        if filtro.palabras_clave:
+            listas = [self._por_palabra.get(palabra, []) for palabra in filtro.palabras_clave]
+            fuentes.append((sum(len(lista) for lista in listas), listas))
+        if filtro.fecha_desde is not None or not fuentes:
+            desde = self._clave_segmento(filtro.fecha_desde) if filtro.fecha_desde is not None else None
+            inicio = 0 if desde is None else bisect.bisect_left(self._claves_segmentos, desde)
+            listas = [self._segmentos[clave] for clave in self._claves_segmentos[inicio:]]
+            fuentes.append((sum(len(lista) for lista in listas), listas))
+
+        _, listas = min(fuentes, key=lambda fuente: fuente[0])
+        if len(listas) == 1:
+            secuencias = reversed(listas[0])
+        else:
+            # Mezcla de varias listas de la más reciente a la más antigua, sin repetir
+            mezcla = heapq.merge(*(reversed(lista) for lista in listas), reverse=True)
+            secuencias = (secuencia for secuencia, _ in itertools.groupby(mezcla))
+        registros = self._registros
+        for secuencia in secuencias:
+            registro = registros.get(secuencia)
+            if registro is not None:
+                yield registro
+
+
+def _buscar_secuencial(registros: Iterable[Registro], criterios: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Búsqueda recorriendo todos los registros (solo para comparar en el benchmark)."""
+    filtro = Criterios(criterios)
+    coincidencias = [registro for registro in registros if filtro.coincide(registro)]
+    coincidencias.sort(key=lambda registro: registro.secuencia, reverse=True)
+    return [registro.a_dict() for registro in coincidencias[:filtro.limite]]
+
+
+def medir_rendimiento(entradas: int = 200000, usuarios: int = 50, consultas: int = 200) -> Dict[str, float]:
+    """
+    Micro-benchmark de ``buscar`` con los criterios que usa la conversación.
+
+    Returns:
+        Milisegundos por consulta con índices y recorriendo toda la bodega
+    """
+    bodega = BodegaIndexada()
+    ahora = time.time()
+    palabras = ["audio", "visual", "rostro", "movimiento", "conversacion", "tecnologia", "ciencia", "arte"]
+    bodega.almacenar_lote(
+        {
+            "tipo": "conversacion" if i % 3 else "experiencia",
+            "contenido": {"texto": f"entrada {i}"},
+            "importancia": 1 + i % 5,
+            "usuario_id": f"usuario{i % usuarios}",
+            "palabras_clave": [palabras[i % len(palabras)], palabras[(i * 7) % len(palabras)]],
+            "timestamp": ahora - (entradas - i) * 10,
+        }
+        for i in range(entradas)
+    )
+    consultas_tipo = [
+        {"usuario_id": "usuario7", "palabras_clave": ["tecnologia"], "limite": 10},
+        {"tipo": "experiencia", "importancia_min": 4, "fecha_desde": ahora - 86400, "limite": 20},
+        {"palabras_clave": ["arte", "ciencia"], "fecha_desde": ahora - 3600},
+    ]
+
+    inicio = time.perf_counter()
+    for i in range(consultas):
+        bodega.buscar(consultas_tipo[i % len(consultas_tipo)])
+    tiempo_indexado = time.perf_counter() - inicio
+
+    registros = list(bodega._registros.values())
+    repeticiones = max(1, consultas // 20)
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        _buscar_secuencial(registros, consultas_tipo[i % len(consultas_tipo)])
+    tiempo_secuencial = time.perf_counter() - inicio
+
+    return {
+        "entradas": entradas,
+        "indexado_ms": tiempo_indexado / consultas * 1e3,
+        "secuencial_ms": tiempo_secuencial / repeticiones * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    for total in (10000, 100000, 1000000):
+        resultado = medir_rendimiento(entradas=total)
+        print(f"{total:8d} entradas: indexado {resultado['indexado_ms']:.3f} ms, "
+              f"recorrido completo {resultado['secuencial_ms']:.1f} ms")
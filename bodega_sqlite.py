@@ -0,0 +1,443 @@
+"""
+Bodega de conocimiento de Aria sobre SQLite
+Motor persistente con la interfaz de ``BodegaConocimiento``: los datos se
+quedan en disco y solo se leen las filas que pide cada consulta, el modo WAL
+deja leer desde otros hilos mientras la conversación escribe y el texto del
+contenido se indexa con FTS5
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from bodega_indexada import BodegaIndexada, Criterios, valor, marca_tiempo
+from agregados_bodega import peso
+
+
+RUTA_BODEGA_SQLITE = Path.home() / ".aria" / "bodega.db"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    secuencia INTEGER PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    importancia INTEGER NOT NULL,
+    usuario_id TEXT,
+    timestamp REAL NOT NULL,
+    palabras_clave TEXT NOT NULL,
+    contenido TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS palabras (
+    palabra TEXT NOT NULL,
+    secuencia INTEGER NOT NULL,
+    PRIMARY KEY (palabra, secuencia)
+) WITHOUT ROWID;
+-- Índices de cobertura: los filtros se resuelven sin leer la fila completa
+CREATE INDEX IF NOT EXISTS entradas_usuario ON entradas (usuario_id, secuencia, tipo, importancia, timestamp);
+CREATE INDEX IF NOT EXISTS entradas_tipo ON entradas (tipo, secuencia, importancia, timestamp, usuario_id);
+CREATE INDEX IF NOT EXISTS entradas_tiempo ON entradas (timestamp, tipo, importancia, usuario_id);
+CREATE INDEX IF NOT EXISTS palabras_secuencia ON palabras (secuencia);
+"""
+
+# Agregados mantenidos en la misma transacción que cada escritura (usuario '' = sin usuario)
+_ESQUEMA_AGREGADOS = """
+CREATE TABLE conteos (
+    usuario_id TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    importancia INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    primera REAL,
+    ultima REAL,
+    PRIMARY KEY (usuario_id, tipo, importancia)
+) WITHOUT ROWID;
+CREATE TABLE temas (
+    usuario_id TEXT NOT NULL,
+    palabra TEXT NOT NULL,
+    eventos INTEGER NOT NULL,
+    PRIMARY KEY (usuario_id, palabra)
+) WITHOUT ROWID;
+CREATE INDEX temas_frecuencia ON temas (usuario_id, eventos DESC);
+-- Bases creadas antes de existir los agregados: se calculan una vez
+INSERT INTO conteos
+    SELECT COALESCE(usuario_id, ''), tipo, importancia, COUNT(*), MIN(timestamp), MAX(timestamp)
+    FROM entradas GROUP BY 1, 2, 3;
+INSERT INTO temas
+    SELECT COALESCE(e.usuario_id, ''), p.palabra, COUNT(*)
+    FROM palabras p JOIN entradas e ON e.secuencia = p.secuencia GROUP BY 1, 2;
+"""
+
+_SUMAR_CONTEO = (
+    "INSERT INTO conteos (usuario_id, tipo, importancia, cantidad, primera, ultima) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (usuario_id, tipo, importancia) DO UPDATE SET cantidad = cantidad + excluded.cantidad, "
+    "primera = min(primera, excluded.primera), ultima = max(ultima, excluded.ultima)")
+_SUMAR_TEMA = ("INSERT INTO temas (usuario_id, palabra, eventos) VALUES (?, ?, ?) "
+               "ON CONFLICT (usuario_id, palabra) DO UPDATE SET eventos = eventos + excluded.eventos")
+
+_ESQUEMA_TEXTO = "CREATE VIRTUAL TABLE IF NOT EXISTS entradas_texto USING fts5(texto, tokenize='unicode61 remove_diacritics 2')"
+
+_INSERTAR = ("INSERT INTO entradas (tipo, importancia, usuario_id, timestamp, palabras_clave, contenido) "
+             "VALUES (?, ?, ?, ?, ?, ?)")
+_COLUMNAS = "secuencia, tipo, importancia, usuario_id, timestamp, palabras_clave, contenido"
+
+
+def id_entrada(secuencia: int) -> str:
+    """Id público de la entrada con esa secuencia (el mismo formato que ``BodegaIndexada``)."""
+    return f"e{secuencia:08d}"
+
+
+def _secuencia(id_entrada: str) -> Optional[int]:
+    try:
+        return int(id_entrada[1:]) if id_entrada.startswith("e") else None
+    except ValueError:
+        return None
+
+
+def texto_contenido(contenido: Any) -> str:
+    """Texto de todas las cadenas del contenido, para el índice de texto completo."""
+    if isinstance(contenido, str):
+        return contenido
+    if isinstance(contenido, dict):
+        return " ".join(filter(None, (texto_contenido(v) for v in contenido.values())))
+    if isinstance(contenido, (list, tuple)):
+        return " ".join(filter(None, (texto_contenido(v) for v in contenido)))
+    return ""
+
+
+def _consulta_texto(texto: str) -> str:
+    # Cada palabra como término entre comillas: sin operadores de FTS5 del usuario
+    return " ".join('"' + palabra.replace('"', '""') + '"' for palabra in texto.split())
+
+
+class BodegaSQLite:
+    """
+    Bodega de conocimiento persistente en un archivo SQLite.
+
+    Una única conexión escribe (protegida por un lock) y cada hilo lector
+    tiene la suya; en modo WAL los lectores no esperan a la escritura. Las
+    consultas usan siempre los mismos textos SQL con parámetros, así que
+    SQLite las prepara una vez por conexión y las reutiliza de su caché.
+    ``almacenar_lote`` inserta un lote entero en una sola transacción.
+
+    Además de los criterios de ``BodegaConocimiento.buscar``, acepta
+    ``texto``: palabras que deben aparecer en el contenido (FTS5).
+    """
+
+    def __init__(self, ruta: Any = RUTA_BODEGA_SQLITE):
+        """
+        Args:
+            ruta: Archivo de la base de datos (``":memory:"`` para no persistir)
+        """
+        self.logger = logging.getLogger("BodegaSQLite")
+        self.ruta = str(ruta)
+        self.en_memoria = self.ruta == ":memory:"
+        if not self.en_memoria:
+            Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._escritor = self._conectar()
+        self._local = threading.local()
+        self._conexiones: List[sqlite3.Connection] = [self._escritor]
+
+        with self._lock, self._escritor:
+            self._escritor.executescript(_ESQUEMA)
+            if not self._escritor.execute("SELECT 1 FROM sqlite_master WHERE name = 'conteos'").fetchone():
+                self._escritor.executescript(_ESQUEMA_AGREGADOS)
+            try:
+                self._escritor.execute(_ESQUEMA_TEXTO)
+                self.texto_completo = True
+            except sqlite3.OperationalError:
+                # SQLite compilado sin FTS5: se busca con LIKE
+                self.logger.warning("SQLite sin FTS5: la búsqueda por texto recorrerá el contenido")
+                self.texto_completo = False
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexion = sqlite3.connect(self.ruta, check_same_thread=False, cached_statements=128)
+        if not self.en_memoria:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            # En WAL, NORMAL no pierde datos si se cae el proceso (solo si se va la luz)
+            conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute("PRAGMA busy_timeout=5000")
+        return conexion
+
+    def _lector(self) -> Tuple[sqlite3.Connection, Optional[threading.Lock]]:
+        """Conexión de lectura del hilo actual y el lock que hay que tomar para usarla."""
+        if self.en_memoria:
+            # Una base en memoria no se comparte entre conexiones
+            return self._escritor, self._lock
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = self._local.conexion = self._conectar()
+            with self._lock:
+                self._conexiones.append(conexion)
+        return conexion, None
+
+    def _leer(self, sql: str, parametros: Iterable[Any] = ()) -> List[tuple]:
+        conexion, lock = self._lector()
+        if lock is None:
+            return conexion.execute(sql, tuple(parametros)).fetchall()
+        with lock:
+            return conexion.execute(sql, tuple(parametros)).fetchall()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def almacenar(self, tipo: Any, contenido: Any, importancia: Any, usuario_id: Optional[str] = None,
+                  palabras_clave: Optional[Iterable[str]] = None, timestamp: Any = None) -> str:
+        """
+        Almacena una entrada.
+
+        Returns:
+            Id de la entrada
+        """
+        return self.almacenar_lote([{
+            "tipo": tipo, "contenido": contenido, "importancia": importancia, "usuario_id": usuario_id,
+            "palabras_clave": palabras_clave, "timestamp": timestamp
+        }])[0]
+
+    def almacenar_lote(self, registros: Iterable[Dict[str, Any]]) -> List[str]:
+        """Almacena varias entradas (argumentos de ``almacenar``) en una sola transacción."""
+        registros_lista = list(registros)
+        filas = []
+        for registro in registros_lista:
+            palabras = list(dict.fromkeys(p.lower() for p in registro.get("palabras_clave") or []))
+            timestamp = registro.get("timestamp")
+            filas.append((
+                (valor(registro["tipo"]), int(valor(registro["importancia"])), registro.get("usuario_id"),
+                 time.time() if timestamp is None else marca_tiempo(timestamp),
+                 json.dumps(palabras, ensure_ascii=False),
+                 json.dumps(registro["contenido"], ensure_ascii=False, default=str)),
+                palabras,
+                texto_contenido(registro["contenido"])
+            ))
+
+        # Agregados del lote: una actualización por grupo, no por entrada
+        conteos: Dict[Tuple, List[float]] = {}
+        temas: Counter = Counter()
+        for (tipo, importancia, usuario_id, timestamp, _, _), palabras, _ in filas:
+            conteo = conteos.setdefault((usuario_id or "", tipo, importancia), [0, timestamp, timestamp])
+            conteo[0] += 1
+            conteo[1] = min(conteo[1], timestamp)
+            conteo[2] = max(conteo[2], timestamp)
+        for registro, (fila, palabras, _) in zip(registros_lista, filas):
+            eventos = peso(registro["contenido"])
+            for palabra in palabras:
+                temas[(fila[2] or "", palabra)] += eventos
+
+        ids = []
+        with self._lock, self._escritor as conexion:
+            for fila, palabras, texto in filas:
+                secuencia = conexion.execute(_INSERTAR, fila).lastrowid
+                if palabras:
+                    conexion.executemany("INSERT OR IGNORE INTO palabras (palabra, secuencia) VALUES (?, ?)",
+                                         [(palabra, secuencia) for palabra in palabras])
+                if self.texto_completo and texto:
+                    conexion.execute("INSERT INTO entradas_texto (rowid, texto) VALUES (?, ?)", (secuencia, texto))
+                ids.append(id_entrada(secuencia))
+            conexion.executemany(_SUMAR_CONTEO, [clave + tuple(conteo) for clave, conteo in conteos.items()])
+            conexion.executemany(_SUMAR_TEMA, [clave + (eventos,) for clave, eventos in temas.items()])
+        return ids
+
+    def eliminar(self, id_entrada: str) -> bool:
+        """Elimina una entrada por su id."""
+        secuencia = _secuencia(id_entrada)
+        if secuencia is None:
+            return False
+        return bool(self._eliminar("secuencia = ?", (secuencia,)))
+
+    def limpiar_datos_antiguos(self, dias_antiguedad: int = 365) -> int:
+        """
+        Elimina las entradas con más de ``dias_antiguedad`` días.
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        return len(self._eliminar("timestamp < ?", (time.time() - dias_antiguedad * 86400,)))
+
+    def retirar(self, hasta: float, importancia_min: int = 1, importancia_max: int = 5,
+                limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Saca de la bodega las entradas anteriores a ``hasta`` con importancia
+        entre ``importancia_min`` e ``importancia_max``.
+
+        Returns:
+            Las entradas retiradas, de la más antigua a la más reciente
+        """
+        entradas = self._eliminar("timestamp < ? AND importancia BETWEEN ? AND ? ORDER BY timestamp LIMIT ?",
+                                  (hasta, importancia_min, importancia_max, -1 if limite is None else limite))
+        return [self._a_dict(fila) for fila in entradas]
+
+    def _eliminar(self, condicion: str, parametros: tuple) -> List[tuple]:
+        """Borra las entradas que cumplen la condición y descuenta sus agregados."""
+        with self._lock, self._escritor as conexion:
+            filas = conexion.execute(f"SELECT {_COLUMNAS} FROM entradas WHERE {condicion}", parametros).fetchall()
+            if not filas:
+                return filas
+            secuencias = [(fila[0],) for fila in filas]
+            conexion.executemany("DELETE FROM palabras WHERE secuencia = ?", secuencias)
+            if self.texto_completo:
+                conexion.executemany("DELETE FROM entradas_texto WHERE rowid = ?", secuencias)
+            conexion.executemany("DELETE FROM entradas WHERE secuencia = ?", secuencias)
+
+            conteos: Counter = Counter()
+            temas: Counter = Counter()
+            for _, tipo, importancia, usuario_id, _, palabras_clave, contenido in filas:
+                conteos[(usuario_id or "", tipo, importancia)] += 1
+                eventos = peso(json.loads(contenido))
+                for palabra in json.loads(palabras_clave):
+                    temas[(usuario_id or "", palabra)] += eventos
+            conexion.executemany("UPDATE conteos SET cantidad = cantidad - ? "
+                                 "WHERE usuario_id = ? AND tipo = ? AND importancia = ?",
+                                 [(cantidad,) + clave for clave, cantidad in conteos.items()])
+            conexion.executemany("UPDATE temas SET eventos = eventos - ? WHERE usuario_id = ? AND palabra = ?",
+                                 [(eventos,) + clave for clave, eventos in temas.items()])
+            conexion.executemany("DELETE FROM conteos WHERE usuario_id = ? AND tipo = ? AND importancia = ? "
+                                 "AND cantidad <= 0", list(conteos))
+            conexion.executemany("DELETE FROM temas WHERE usuario_id = ? AND palabra = ? AND eventos <= 0",
+                                 list(temas))
+        return filas
+
+    def cerrar(self):
+        """Cierra todas las conexiones."""
+        with self._lock:
+            for conexion in self._conexiones:
+                conexion.close()
+            self._conexiones.clear()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def obtener(self, id_entrada: str) -> Optional[Dict[str, Any]]:
+        """Entrada por su id, o None."""
+        secuencia = _secuencia(id_entrada)
+        filas = self._leer(f"SELECT {_COLUMNAS} FROM entradas WHERE secuencia = ?", (secuencia,))
+        return self._a_dict(filas[0]) if filas else None
+
+    def buscar(self, criterios: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Busca entradas por ``tipo``, ``usuario_id``, ``palabras_clave`` (cualquiera
+        de ellas), ``importancia_min``, ``fecha_desde`` y ``texto``, como mucho
+        ``limite``, de la más reciente a la más antigua.
+        """
+        filtro = Criterios(criterios)
+        condiciones, parametros = [], []
+        if filtro.usuario_id is not None:
+            condiciones.append("usuario_id = ?")
+            parametros.append(filtro.usuario_id)
+        if filtro.tipo is not None:
+            condiciones.append("tipo = ?")
+            parametros.append(filtro.tipo)
+        if filtro.importancia_min is not None:
+            condiciones.append("importancia >= ?")
+            parametros.append(filtro.importancia_min)
+        if filtro.fecha_desde is not None:
+            condiciones.append("timestamp >= ?")
+            parametros.append(filtro.fecha_desde)
+        if filtro.palabras_clave:
+            palabras = sorted(filtro.palabras_clave)
+            condiciones.append(f"secuencia IN (SELECT secuencia FROM palabras WHERE palabra IN "
+                               f"({', '.join('?' * len(palabras))}))")
+            parametros.extend(palabras)
+        texto = (criterios.get("texto") or "").strip()
+        if texto:
+            if self.texto_completo:
+                condiciones.append("secuencia IN (SELECT rowid FROM entradas_texto WHERE entradas_texto MATCH ?)")
+                parametros.append(_consulta_texto(texto))
+            else:
+                for palabra in texto.split():
+                    condiciones.append("contenido LIKE ?")
+                    parametros.append(f"%{palabra}%")
+
+        sql = f"SELECT {_COLUMNAS} FROM entradas"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        # Por fecha y no por orden de llegada: la compactación reinserta resúmenes de días
+        # antiguos con secuencias nuevas, y con ``limite`` taparían a lo realmente reciente.
+        # Si solo acota la fecha, el orden recorre el índice de tiempo hacia atrás
+        sql += " ORDER BY timestamp DESC, secuencia DESC"
+        if filtro.limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(int(filtro.limite))
+        return [self._a_dict(fila) for fila in self._leer(sql, parametros)]
+
+    def obtener_resumen_usuario(self, usuario_id: str) -> Dict[str, Any]:
+        """Totales del usuario por tipo, sus palabras clave más frecuentes y su actividad."""
+        conteos = self._leer("SELECT tipo, SUM(cantidad), MIN(primera), MAX(ultima) FROM conteos "
+                             "WHERE usuario_id = ? GROUP BY tipo", (usuario_id or "",))
+        temas = self._leer("SELECT palabra, eventos FROM temas WHERE usuario_id = ? "
+                           "ORDER BY eventos DESC, palabra LIMIT 10", (usuario_id or "",))
+        return {
+            "usuario_id": usuario_id,
+            "total_entradas": sum(cantidad for _, cantidad, _, _ in conteos),
+            "por_tipo": {tipo: cantidad for tipo, cantidad, _, _ in conteos},
+            "temas_frecuentes": [tuple(tema) for tema in temas],
+            "primera_interaccion": min((primera for _, _, primera, _ in conteos), default=None),
+            "ultima_interaccion": max((ultima for _, _, _, ultima in conteos), default=None),
+        }
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Totales de la bodega (de los agregados, sin recorrer las entradas) y tamaño del archivo."""
+        conteos = self._leer("SELECT usuario_id, tipo, importancia, cantidad FROM conteos")
+        por_tipo: Counter = Counter()
+        por_importancia: Counter = Counter()
+        for _, tipo, importancia, cantidad in conteos:
+            por_tipo[tipo] += cantidad
+            por_importancia[importancia] += cantidad
+        usuarios = len({usuario_id for usuario_id, _, _, _ in conteos if usuario_id})
+        tamano = 0
+        if not self.en_memoria:
+            for sufijo in ("", "-wal"):
+                try:
+                    tamano += os.path.getsize(self.ruta + sufijo)
+                except OSError:
+                    pass
+        return {
+            "total_entradas": sum(por_tipo.values()),
+            "por_tipo": dict(por_tipo),
+            "por_importancia": dict(por_importancia),
+            "usuarios_registrados": usuarios,
+            "texto_completo": self.texto_completo,
+            "tamano_bytes": tamano,
+        }
+
+    def __len__(self) -> int:
+        return self._leer("SELECT COUNT(*) FROM entradas")[0][0]
+
+    @staticmethod
+    def _a_dict(fila: tuple) -> Dict[str, Any]:
+        secuencia, tipo, importancia, usuario_id, timestamp, palabras_clave, contenido = fila
+        return {
+            "id": id_entrada(secuencia),
+            "tipo": tipo,
+            "contenido": json.loads(contenido),
+            "importancia": importancia,
+            "usuario_id": usuario_id,
+            "palabras_clave": json.loads(palabras_clave),
+            "timestamp": timestamp,
+        }
+
+
+def crear_bodega(motor: Optional[str] = None) -> Any:
+    """
+    Crea la bodega de conocimiento.
+
+    Args:
+        motor: ``"sqlite"`` (con retención por niveles), ``"memoria"`` (``BodegaIndexada``) o ``"json"``
+            (``BodegaConocimiento``, la de siempre). Por defecto, la variable de
+            entorno ``ARIA_BODEGA`` o ``"json"``.
+    """
+    motor = motor or os.environ.get("ARIA_BODEGA") or "json"
+    if motor == "sqlite":
+        # Lo reciente en memoria; lo de poca importancia se compacta al pasar a disco
+        from bodega_escalonada import BodegaEscalonada
+        return BodegaEscalonada(BodegaSQLite())
+    if motor == "memoria":
+        return BodegaIndexada()
+    from bodega.BodegaConocimiento import BodegaConocimiento
+    return BodegaConocimiento()
@@ -0,0 +1,652 @@
+"""
+Búsqueda semántica en la bodega de conocimiento de Aria
+Índice local de vectores TF-IDF (sin red) sobre el texto de las entradas,
+con temas relacionados para que "me encanta programar" aparezca al buscar
+"tecnología". Con NumPy los vectores se guardan en una matriz float32 en
+disco (memmap) y la búsqueda es aproximada con listas invertidas (IVF); sin
+NumPy se usa un índice disperso en memoria
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from bodega_indexada import marca_tiempo
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+RUTA_INDICE_SEMANTICO = Path.home() / ".aria" / "semantica"
+
+# Palabras que llevan a cada tema (las mismas familias que detecta la conversación)
+TEMAS_SEMANTICOS = {
+    "tecnologia": ["tecnología", "computadora", "ordenador", "internet", "software", "app", "aplicación",
+                   "programar", "programación", "código", "robot", "videojuego", "móvil", "celular", "digital"],
+    "ciencia": ["ciencia", "investigación", "estudio", "descubrimiento", "experimento", "física", "química",
+                "biología", "espacio", "planeta", "universo", "matemáticas"],
+    "arte": ["arte", "música", "pintura", "creatividad", "dibujar", "cantar", "canción", "película", "cine",
+             "libro", "poesía", "teatro"],
+    "deportes": ["deporte", "fútbol", "ejercicio", "juego", "correr", "gimnasio", "partido", "baloncesto",
+                 "tenis", "nadar", "entrenar"],
+    "negocios": ["negocio", "empresa", "trabajo", "proyecto", "dinero", "cliente", "venta", "emprender",
+                 "oficina", "reunión"],
+}
+
+PALABRAS_VACIAS = {
+    "que", "los", "las", "una", "uno", "unos", "unas", "por", "con", "para", "del", "como", "pero", "mas",
+    "muy", "este", "esta", "esto", "eso", "esa", "ese", "hay", "fue", "ser", "son", "sus", "les", "nos",
+    "porque", "cuando", "donde", "tambien", "sobre", "entre", "todo", "todos", "algo", "ahora", "estoy",
+    "estas", "tengo", "tiene", "hola",
+}
+
+_PALABRA = re.compile(r"[a-zñ]+")
+# Peso del tema respecto a una palabra del texto
+PESO_TEMA = 0.7
+
+
+def raiz(palabra: str) -> str:
+    """Raíz aproximada: sin tildes y recortada a cinco letras (programar ~ programación)."""
+    return palabra[:5]
+
+
+def _sin_tildes(texto: str) -> str:
+    # La ñ se aparta antes de descomponer para no perder la tilde
+    descompuesto = unicodedata.normalize("NFD", texto.lower().replace("ñ", "\0"))
+    return "".join(c for c in descompuesto if unicodedata.category(c) != "Mn").replace("\0", "ñ")
+
+
+_RAIZ_A_TEMA = {raiz(_sin_tildes(palabra)): tema for tema, palabras in TEMAS_SEMANTICOS.items()
+                for palabra in palabras}
+
+
+def terminos(texto: str) -> Counter:
+    """Términos del texto con su peso: raíces de las palabras y los temas a los que remiten."""
+    contador: Counter = Counter()
+    for palabra in _PALABRA.findall(_sin_tildes(texto)):
+        if len(palabra) < 3 or palabra in PALABRAS_VACIAS:
+            continue
+        termino = raiz(palabra)
+        contador[termino] += 1
+        tema = _RAIZ_A_TEMA.get(termino)
+        if tema is not None:
+            contador["#" + tema] += PESO_TEMA
+    return contador
+
+
+class IndiceSemantico:
+    """
+    Índice de vectores TF-IDF para buscar textos parecidos.
+
+    Cada término va a una de ``dimension`` posiciones (hashing), con peso
+    ``1 + log(tf)``, y el vector del documento se normaliza. El IDF se
+    aplica a la consulta con las frecuencias del momento, así que insertar
+    no obliga a recalcular nada.
+
+    Con NumPy los vectores van a una matriz float32 (en ``directorio``, como
+    memmap) y, a partir de ``entrenar_desde`` documentos, se agrupan con
+    k-medias en ``listas`` listas; cada búsqueda puntúa solo las ``sondeo``
+    listas más cercanas. Sin NumPy, un índice invertido disperso en memoria
+    da resultados exactos.
+
+    Los documentos borrados (por id o por antigüedad) dejan un hueco en su
+    fila y una marca en ``documentos.jsonl``; cuando los huecos superan a
+    los documentos vivos, ``compactar`` los quita de memoria, de la matriz
+    y del archivo.
+    """
+
+    def __init__(self, directorio: Optional[Path] = None, dimension: int = 512, listas: int = 64,
+                 sondeo: int = 8, entrenar_desde: int = 4096, usar_numpy: bool = True):
+        """
+        Args:
+            directorio: Dónde guardar documentos y vectores (None: solo en memoria)
+            dimension: Posiciones de cada vector
+            listas: Listas (centroides) del índice IVF
+            sondeo: Listas que se puntúan en cada búsqueda
+            entrenar_desde: Documentos a partir de los que se usa el IVF
+            usar_numpy: Usar NumPy si está instalado
+        """
+        self.logger = logging.getLogger("IndiceSemantico")
+        self.directorio = Path(directorio) if directorio is not None else None
+        self.dimension = dimension
+        self.listas = listas
+        self.sondeo = sondeo
+        self.entrenar_desde = entrenar_desde
+        self.denso = usar_numpy and np is not None
+
+        self._lock = threading.RLock()
+        # Una fila por documento; None en las de los borrados hasta compactar
+        self._documentos: List[Optional[Dict[str, Any]]] = []
+        self._por_id: Dict[Any, int] = {}
+        self._borrados = 0
+        self._frecuencias: Counter = Counter()
+        # Disperso: posición -> [(fila, peso)]
+        self._invertido: Dict[int, List[Tuple[int, float]]] = {}
+        # Denso
+        self._matriz = None
+        self._centroides = None
+        self._miembros: List[List[int]] = []
+        self._miembros_np: List[Any] = []
+        self._entrenado_con = 0
+        self._archivo_documentos = None
+
+        if self.directorio is not None:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            self._cargar()
+            if self._archivo_documentos is None:
+                self._archivo_documentos = open(self.directorio / "documentos.jsonl", "a", encoding="utf-8")
+
+    # ------------------------------------------------------------------
+    # Vectores
+    # ------------------------------------------------------------------
+
+    def _posiciones(self, texto: str) -> Dict[int, float]:
+        vector: Dict[int, float] = {}
+        for termino, cuenta in terminos(texto).items():
+            posicion = zlib.crc32(termino.encode("utf-8")) % self.dimension
+            peso = 1.0 + math.log(cuenta) if cuenta >= 1 else cuenta
+            vector[posicion] = vector.get(posicion, 0.0) + peso
+        norma = math.sqrt(sum(peso * peso for peso in vector.values()))
+        return {posicion: peso / norma for posicion, peso in vector.items()} if norma else {}
+
+    def _idf(self, posicion: int) -> float:
+        return math.log((1 + len(self)) / (1 + self._frecuencias.get(posicion, 0))) + 1.0
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    def agregar(self, texto: str, id_entrada: Any = None, usuario_id: Optional[str] = None,
+                timestamp: Optional[float] = None, origen: Optional[str] = None) -> bool:
+        """
+        Añade un texto al índice.
+
+        Returns:
+            False si el texto no tiene términos que indexar
+        """
+        return self.agregar_lote([{"texto": texto, "id": id_entrada, "usuario_id": usuario_id,
+                                   "timestamp": timestamp, "origen": origen}]) > 0
+
+    def agregar_lote(self, documentos: Iterable[Dict[str, Any]]) -> int:
+        """Añade varios documentos (``texto``, ``id``, ``usuario_id``, ``timestamp``, ``origen``)."""
+        with self._lock:
+            agregados = 0
+            for documento in documentos:
+                vector = self._posiciones(documento.get("texto") or "")
+                if not vector:
+                    continue
+                documento = {
+                    "texto": documento["texto"],
+                    "id": documento.get("id"),
+                    "usuario_id": documento.get("usuario_id"),
+                    "timestamp": documento.get("timestamp") or time.time(),
+                    "origen": documento.get("origen"),
+                }
+                self._insertar(documento, vector)
+                if self._archivo_documentos is not None:
+                    self._archivo_documentos.write(json.dumps(documento, ensure_ascii=False) + "\n")
+                agregados += 1
+            if agregados and self.denso and self._hay_que_entrenar():
+                self._entrenar()
+            return agregados
+
+    def _insertar(self, documento: Dict[str, Any], vector: Dict[int, float]):
+        fila = len(self._documentos)
+        self._documentos.append(documento)
+        if documento["id"] is not None:
+            self._por_id[documento["id"]] = fila
+        self._frecuencias.update(vector.keys())
+        if not self.denso:
+            for posicion, peso in vector.items():
+                self._invertido.setdefault(posicion, []).append((fila, peso))
+            return
+        self._reservar(fila + 1)
+        denso = self._matriz[fila]
+        denso[:] = 0.0
+        for posicion, peso in vector.items():
+            denso[posicion] = peso
+        if self._centroides is not None:
+            lista = int(np.argmax(self._centroides @ denso))
+            self._miembros[lista].append(fila)
+            self._miembros_np[lista] = None
+
+    def _reservar(self, filas: int):
+        """Garantiza capacidad para ``filas`` vectores (duplicando la matriz)."""
+        capacidad = 0 if self._matriz is None else self._matriz.shape[0]
+        if filas <= capacidad:
+            return
+        nueva = max(1024, capacidad * 2, filas)
+        if self.directorio is None:
+            matriz = np.zeros((nueva, self.dimension), dtype=np.float32)
+            if self._matriz is not None:
+                matriz[:capacidad] = self._matriz
+            self._matriz = matriz
+            return
+        ruta = self.directorio / "vectores.f32"
+        if self._matriz is not None:
+            self._matriz.flush()
+            self._matriz = None
+        with open(ruta, "ab") as archivo:
+            archivo.truncate(nueva * self.dimension * 4)
+        self._matriz = np.memmap(ruta, dtype=np.float32, mode="r+", shape=(nueva, self.dimension))
+
+    # ------------------------------------------------------------------
+    # Borrado
+    # ------------------------------------------------------------------
+
+    def eliminar(self, ids: Iterable[Any]) -> int:
+        """
+        Borra los documentos de esas entradas.
+
+        Returns:
+            Documentos borrados
+        """
+        with self._lock:
+            return self._borrar([self._por_id[id_entrada] for id_entrada in ids if id_entrada in self._por_id])
+
+    def eliminar_anteriores(self, hasta: float) -> int:
+        """Borra los documentos con ``timestamp`` anterior a ``hasta``; devuelve cuántos."""
+        with self._lock:
+            return self._borrar([fila for fila, documento in enumerate(self._documentos)
+                                 if documento is not None and documento["timestamp"] < hasta])
+
+    def _borrar(self, filas: List[int]) -> int:
+        for fila in filas:
+            documento = self._documentos[fila]
+            self._documentos[fila] = None
+            if self._por_id.get(documento["id"]) == fila:
+                del self._por_id[documento["id"]]
+            self._frecuencias.subtract(self._posiciones(documento["texto"]).keys())
+            if self.denso:
+                # Puntúa 0 y no atrae a los centroides al reagrupar
+                self._matriz[fila] = 0.0
+            if self._archivo_documentos is not None:
+                self._archivo_documentos.write(json.dumps({"borrado": fila}) + "\n")
+        if filas:
+            self._frecuencias = +self._frecuencias
+            self._borrados += len(filas)
+            if self._borrados > max(1000, len(self)):
+                self.compactar()
+        return len(filas)
+
+    def compactar(self) -> int:
+        """
+        Quita los huecos de los documentos borrados de memoria, de la matriz
+        y de ``documentos.jsonl``.
+
+        Returns:
+            Huecos quitados
+        """
+        with self._lock:
+            if not self._borrados:
+                return 0
+            total = len(self._documentos)
+            vivas = [fila for fila, documento in enumerate(self._documentos) if documento is not None]
+            nuevas = {fila: nueva for nueva, fila in enumerate(vivas)}
+            self._documentos = [self._documentos[fila] for fila in vivas]
+            self._por_id = {id_entrada: nuevas[fila] for id_entrada, fila in self._por_id.items()}
+            if self.denso:
+                if vivas:
+                    self._matriz[:len(vivas)] = self._matriz[vivas]
+                self._matriz[len(vivas):total] = 0.0
+                self._miembros = [[nuevas[fila] for fila in lista if fila in nuevas] for lista in self._miembros]
+                self._miembros_np = [None] * len(self._miembros)
+            else:
+                self._invertido = {}
+                for fila, documento in enumerate(self._documentos):
+                    for posicion, peso in self._posiciones(documento["texto"]).items():
+                        self._invertido.setdefault(posicion, []).append((fila, peso))
+            quitados, self._borrados = self._borrados, 0
+            if self.directorio is not None:
+                self._reescribir_documentos()
+                self.guardar()
+            self.logger.info(f"Índice semántico compactado: {quitados} borrados, {len(vivas)} documentos")
+            return quitados
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _hay_que_entrenar(self) -> bool:
+        total = len(self._documentos)
+        return total >= self.entrenar_desde and total >= 2 * self._entrenado_con
+
+    def _entrenar(self, iteraciones: int = 8, muestra: int = 20000):
+        """K-medias esféricas sobre una muestra y reparto de todas las filas en listas."""
+        total = len(self._documentos)
+        generador = np.random.default_rng(0)
+        filas = generador.choice(total, size=min(total, muestra), replace=False)
+        datos = np.asarray(self._matriz[np.sort(filas)])
+        listas = min(self.listas, len(datos))
+        centroides = datos[generador.choice(len(datos), size=listas, replace=False)].copy()
+        for _ in range(iteraciones):
+            asignacion = np.argmax(datos @ centroides.T, axis=1)
+            for lista in range(listas):
+                miembros = datos[asignacion == lista]
+                if len(miembros):
+                    centroides[lista] = miembros.sum(axis=0)
+            centroides /= np.maximum(np.linalg.norm(centroides, axis=1, keepdims=True), 1e-9)
+
+        self._centroides = centroides.astype(np.float32)
+        self._miembros = [[] for _ in range(listas)]
+        for inicio in range(0, total, 65536):
+            bloque = np.asarray(self._matriz[inicio:min(total, inicio + 65536)])
+            for desplazamiento, lista in enumerate(np.argmax(bloque @ self._centroides.T, axis=1)):
+                self._miembros[int(lista)].append(inicio + desplazamiento)
+        self._miembros_np = [None] * listas
+        self._entrenado_con = total
+        self.logger.info(f"Índice semántico reagrupado: {total} documentos en {listas} listas")
+
+    def _candidatas(self, consulta: Any) -> Any:
+        if self._centroides is None:
+            return None
+        cercanas = np.argsort(-(self._centroides @ consulta))[:self.sondeo]
+        partes = []
+        for lista in cercanas:
+            if self._miembros_np[lista] is None:
+                self._miembros_np[lista] = np.array(self._miembros[lista], dtype=np.int64)
+            partes.append(self._miembros_np[lista])
+        return np.concatenate(partes) if partes else np.array([], dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def buscar(self, texto: str, k: int = 5, usuario_id: Optional[str] = None,
+               minimo: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Los ``k`` documentos más parecidos al texto.
+
+        Returns:
+            Documentos con su ``similitud`` (de 0 a 1), de más a menos parecido
+        """
+        with self._lock:
+            if not len(self):
+                return []
+            consulta = {posicion: peso * self._idf(posicion) ** 2
+                        for posicion, peso in self._posiciones(texto).items()}
+            norma = math.sqrt(sum(peso * peso for peso in consulta.values()))
+            if not norma:
+                return []
+            consulta = {posicion: peso / norma for posicion, peso in consulta.items()}
+            puntuadas = self._puntuar_denso(consulta, k) if self.denso else self._puntuar_disperso(consulta)
+
+            resultados = []
+            for fila, similitud in puntuadas:
+                if similitud <= minimo:
+                    break
+                documento = self._documentos[fila]
+                if documento is None or (usuario_id is not None and documento["usuario_id"] != usuario_id):
+                    continue
+                resultados.append({**documento, "similitud": round(float(similitud), 4)})
+                if len(resultados) >= k:
+                    break
+            return resultados
+
+    def _puntuar_disperso(self, consulta: Dict[int, float]) -> List[Tuple[int, float]]:
+        puntuaciones: Dict[int, float] = {}
+        for posicion, peso_consulta in consulta.items():
+            for fila, peso in self._invertido.get(posicion, ()):
+                puntuaciones[fila] = puntuaciones.get(fila, 0.0) + peso_consulta * peso
+        return sorted(puntuaciones.items(), key=lambda par: par[1], reverse=True)
+
+    def _puntuar_denso(self, consulta: Dict[int, float], k: int) -> Iterable[Tuple[int, float]]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for posicion, peso in consulta.items():
+            vector[posicion] = peso
+        total = len(self._documentos)
+        candidatas = self._candidatas(vector)
+        if candidatas is None:
+            puntuaciones = np.concatenate([np.asarray(self._matriz[inicio:min(total, inicio + 65536)]) @ vector
+                                           for inicio in range(0, total, 65536)])
+            filas = np.arange(total)
+        else:
+            puntuaciones = np.asarray(self._matriz[candidatas]) @ vector if len(candidatas) else np.array([])
+            filas = candidatas
+        # Margen para el filtro por usuario sin ordenar todas las puntuaciones
+        mejores = min(len(puntuaciones), max(k * 8, 64))
+        if mejores == 0:
+            return []
+        seleccion = np.argpartition(-puntuaciones, mejores - 1)[:mejores]
+        seleccion = seleccion[np.argsort(-puntuaciones[seleccion])]
+        return [(int(filas[i]), float(puntuaciones[i])) for i in seleccion]
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def _cargar(self):
+        ruta_documentos = self.directorio / "documentos.jsonl"
+        documentos = []
+        borrados = []
+        linea_rota = False
+        try:
+            with open(ruta_documentos, "r", encoding="utf-8") as archivo:
+                for linea in archivo:
+                    try:
+                        dato = json.loads(linea)
+                    except ValueError:
+                        # Última línea a medio escribir tras un cierre brusco
+                        linea_rota = True
+                        break
+                    if "borrado" in dato:
+                        borrados.append(dato["borrado"])
+                    else:
+                        documentos.append(dato)
+        except OSError:
+            return
+
+        ruta_vectores = self.directorio / "vectores.f32"
+        filas_guardadas = 0
+        if self.denso and ruta_vectores.exists():
+            filas_guardadas = ruta_vectores.stat().st_size // (4 * self.dimension)
+            if filas_guardadas:
+                self._matriz = np.memmap(ruta_vectores, dtype=np.float32, mode="r+",
+                                         shape=(filas_guardadas, self.dimension))
+        try:
+            with open(self.directorio / "estado.json", "r", encoding="utf-8") as archivo:
+                estado = json.load(archivo)
+        except (OSError, ValueError):
+            estado = {}
+        # Los vectores guardados solo valen si son de los mismos documentos
+        vectores_validos = estado.get("documentos") == len(documentos) and estado.get("dimension") == self.dimension
+
+        for fila, documento in enumerate(documentos):
+            vector = self._posiciones(documento["texto"])
+            if self.denso and vectores_validos and fila < filas_guardadas:
+                self._documentos.append(documento)
+                self._frecuencias.update(vector.keys())
+                if documento["id"] is not None:
+                    self._por_id[documento["id"]] = fila
+            else:
+                self._insertar(documento, vector)
+        self._borrar(sorted({fila for fila in borrados if fila < len(documentos)}))
+        if self._borrados:
+            self.compactar()
+        elif linea_rota:
+            # Sin la línea rota, para que lo siguiente no se pegue a ella
+            self._reescribir_documentos()
+        if self.denso and self._hay_que_entrenar():
+            self._entrenar()
+
+    def _reescribir_documentos(self):
+        """Sustituye ``documentos.jsonl`` por los documentos vivos (sin marcas de borrado)."""
+        ruta = self.directorio / "documentos.jsonl"
+        temporal = ruta.with_name(ruta.name + ".tmp")
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            for documento in self._documentos:
+                archivo.write(json.dumps(documento, ensure_ascii=False) + "\n")
+        abierto = self._archivo_documentos is not None
+        if abierto:
+            self._archivo_documentos.close()
+        os.replace(temporal, ruta)
+        if abierto:
+            self._archivo_documentos = open(ruta, "a", encoding="utf-8")
+
+    def guardar(self):
+        """Escribe a disco documentos, vectores y el estado del índice."""
+        if self.directorio is None:
+            return
+        with self._lock:
+            if self._archivo_documentos is not None:
+                self._archivo_documentos.flush()
+            if self.denso and self._matriz is not None:
+                self._matriz.flush()
+            with open(self.directorio / "estado.json", "w", encoding="utf-8") as archivo:
+                json.dump({"documentos": len(self._documentos), "dimension": self.dimension}, archivo)
+
+    def cerrar(self):
+        self.guardar()
+        if self._archivo_documentos is not None:
+            self._archivo_documentos.close()
+            self._archivo_documentos = None
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documentos": len(self),
+                "borrados": self._borrados,
+                "motor": "numpy" if self.denso else "disperso",
+                "listas": 0 if self._centroides is None else len(self._centroides),
+            }
+
+    def __len__(self) -> int:
+        return len(self._documentos) - self._borrados
+
+
+class BodegaSemantica:
+    """
+    Envoltorio de una bodega que indexa el texto de cada entrada y añade
+    ``buscar_similares``.
+
+    Se indexa ``contenido["texto"]`` (lo dicho por el usuario y por Aria);
+    las detecciones de los sentidos no tienen texto y no se indexan. Los
+    resultados llevan el texto y los datos de la entrada, así que no
+    dependen de que su id siga siendo válido en la bodega. Lo que se borra
+    de la bodega con ``eliminar``, ``limpiar_datos_antiguos`` o ``retirar``
+    se borra también del índice. El resto de la interfaz se delega tal cual.
+    """
+
+    def __init__(self, bodega: Any, indice: Optional[IndiceSemantico] = None):
+        self.bodega = bodega
+        self.indice = indice if indice is not None else IndiceSemantico(RUTA_INDICE_SEMANTICO)
+
+    def almacenar(self, **registro) -> Any:
+        id_entrada = self.bodega.almacenar(**registro)
+        self._indexar([registro], [id_entrada])
+        return id_entrada
+
+    def almacenar_lote(self, registros: Iterable[Dict[str, Any]]) -> List[Any]:
+        registros = list(registros)
+        almacenar_lote = getattr(self.bodega, "almacenar_lote", None)
+        if almacenar_lote is not None:
+            ids = list(almacenar_lote(registros))
+        else:
+            ids = [self.bodega.almacenar(**registro) for registro in registros]
+        self._indexar(registros, ids)
+        return ids
+
+    def _indexar(self, registros: List[Dict[str, Any]], ids: List[Any]):
+        documentos = []
+        for registro, id_entrada in zip(registros, ids):
+            contenido = registro.get("contenido")
+            if not isinstance(contenido, dict) or not isinstance(contenido.get("texto"), str):
+                continue
+            documentos.append({
+                "texto": contenido["texto"],
+                "id": id_entrada,
+                "usuario_id": registro.get("usuario_id"),
+                # La hora de la entrada (sin ella, la bodega y el índice toman la actual),
+                # para borrar del índice lo mismo que limpia la bodega
+                "timestamp": marca_tiempo(registro.get("timestamp")),
+                "origen": contenido.get("tipo"),
+            })
+        if documentos:
+            self.indice.agregar_lote(documentos)
+
+    def eliminar(self, id_entrada: str) -> bool:
+        eliminada = self.bodega.eliminar(id_entrada)
+        if eliminada:
+            self.indice.eliminar([id_entrada])
+        return eliminada
+
+    def limpiar_datos_antiguos(self, dias_antiguedad: int = 365) -> int:
+        eliminadas = self.bodega.limpiar_datos_antiguos(dias_antiguedad)
+        self.indice.eliminar_anteriores(time.time() - dias_antiguedad * 86400)
+        return eliminadas
+
+    def retirar(self, hasta: float, importancia_min: int = 1, importancia_max: int = 5,
+                limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        retiradas = self.bodega.retirar(hasta, importancia_min=importancia_min, importancia_max=importancia_max,
+                                        limite=limite)
+        self.indice.eliminar(entrada["id"] for entrada in retiradas)
+        return retiradas
+
+    def buscar_similares(self, texto: str, k: int = 5, usuario_id: Optional[str] = None,
+                         minimo: float = 0.0) -> List[Dict[str, Any]]:
+        """Las ``k`` entradas con el texto más parecido (ver ``IndiceSemantico.buscar``)."""
+        return self.indice.buscar(texto, k=k, usuario_id=usuario_id, minimo=minimo)
+
+    def vaciar(self):
+        self.indice.guardar()
+        vaciar = getattr(self.bodega, "vaciar", None)
+        if vaciar is not None:
+            vaciar()
+
+    def detener(self):
+        self.indice.cerrar()
+        detener = getattr(self.bodega, "detener", None)
+        if detener is not None:
+            detener()
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        return {**self.bodega.obtener_estadisticas(), "semantica": self.indice.obtener_estadisticas()}
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self.bodega, nombre)
+
+
+def medir_rendimiento(documentos: int = 20000, consultas: int = 100, **opciones) -> Dict[str, float]:
+    """
+    Micro-benchmark de ``IndiceSemantico.buscar``.
+
+    Returns:
+        Milisegundos por consulta y por inserción
+    """
+    indice = IndiceSemantico(**opciones)
+    temas = list(TEMAS_SEMANTICOS.values())
+    textos = [f"me gusta {temas[i % len(temas)][i % 7]} y {temas[(i * 3) % len(temas)][i % 5]} número {i}"
+              for i in range(documentos)]
+    inicio = time.perf_counter()
+    for desde in range(0, documentos, 500):
+        indice.agregar_lote({"texto": texto, "usuario_id": "ana"} for texto in textos[desde:desde + 500])
+    tiempo_insercion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for i in range(consultas):
+        indice.buscar(f"háblame de {temas[i % len(temas)][0]}", k=5)
+    tiempo_busqueda = time.perf_counter() - inicio
+    return {
+        "documentos": documentos,
+        "motor": indice.obtener_estadisticas()["motor"],
+        "busqueda_ms": tiempo_busqueda / consultas * 1e3,
+        "insercion_ms": tiempo_insercion / documentos * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    for total in (1000, 20000, 100000):
+        resultado = medir_rendimiento(documentos=total)
+        print(f"{total:7d} documentos ({resultado['motor']}): búsqueda {resultado['busqueda_ms']:.2f} ms, "
+              f"inserción {resultado['insercion_ms']:.3f} ms")
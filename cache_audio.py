@@ -0,0 +1,208 @@
+"""
+Caché de audio sintetizado de Aria
+Guarda en disco el audio de las frases que se repiten, direccionado por su
+contenido (texto, motor, voz, velocidad y volumen), con desalojo LRU
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+
+
+RUTA_CACHE = Path.home() / ".aria" / "cache_voz"
+
+# Frases fijas que conviene tener renderizadas desde la instalación
+FRASES_FRECUENTES = [
+    # Saludos y temas proactivos de los asistentes
+    "¡Hola! Soy Aria, tu asistente de inteligencia artificial.",
+    "Estoy aquí para ayudarte en todo lo que necesites.",
+    "¿En qué puedo ayudarte hoy?",
+    "¿Te gustaría que te cuente sobre algún tema interesante?",
+    "¿Qué te parece si hablamos sobre tecnología?",
+    "¿Te interesa que conversemos sobre ciencia o arte?",
+    "Puedo contarte historias fascinantes, ¿te gustaría escuchar alguna?",
+    "¿Hay algo específico que te gustaría aprender hoy?",
+    "¿Cómo ha estado tu día hasta ahora?",
+    "¿Te gustaría que te haga algunas preguntas interesantes?",
+    # Avisos de AriaUniversal
+    "Tarea completada exitosamente",
+    "Error en la tarea",
+    "Modo administrador activado. Tengo acceso total a todos los sistemas.",
+    "Perfecto, ahora responderé por escrito.",
+    "Perfecto, ahora responderé por voz.",
+    # Despedidas y cierres
+    "Entendido, cerrando sistema. Hasta luego.",
+    "Interrumpido. Cerrando sistema.",
+    "Ha ocurrido un error. Cerrando sistema.",
+    "¡Hasta luego! Ha sido un placer hablar contigo.",
+    "¡Ha sido un placer conversar contigo! Espero verte pronto. ¡Hasta luego!",
+    "¡Oh! Parece que tenemos que terminar. ¡Hasta pronto!",
+    "Lo siento, ha ocurrido un error. Necesito reiniciarme.",
+    "Lo siento, ha ocurrido un error técnico. Pero ha sido genial conversar contigo.",
+]
+
+
+def clave_audio(texto: str, parametros: Dict[str, Any]) -> str:
+    """Clave de contenido de una frase para unos parámetros de voz dados."""
+    contenido = json.dumps({"texto": " ".join(texto.split()), **parametros},
+                           sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+class CacheAudio:
+    """
+    Almacén de archivos WAV direccionado por contenido.
+
+    El índice LRU se reconstruye al arrancar a partir del directorio (por
+    fecha de último uso) y se desaloja por tamaño total. Las frases que no
+    están en caché se cuentan; al repetirse ``umbral`` veces se renderizan.
+    """
+
+    def __init__(self, directorio: Path = RUTA_CACHE, max_bytes: int = 256 * 1024 * 1024,
+                 umbral: int = 2):
+        """
+        Args:
+            directorio: Directorio del almacén en disco
+            max_bytes: Tamaño máximo del almacén
+            umbral: Apariciones de una frase a partir de las que se renderiza
+        """
+        self.logger = logging.getLogger("CacheAudio")
+        self.directorio = Path(directorio)
+        self.max_bytes = max_bytes
+        self.umbral = umbral
+        self._indice: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._apariciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._estadisticas = {"aciertos": 0, "fallos": 0, "renderizadas": 0, "desalojadas": 0}
+        self._cargar_indice()
+
+    def ruta(self, clave: str) -> Path:
+        return self.directorio / clave[:2] / f"{clave}.wav"
+
+    def obtener(self, clave: str) -> Optional[Path]:
+        """Ruta del audio en caché o None; un acierto lo marca como usado."""
+        with self._lock:
+            if clave not in self._indice:
+                self._estadisticas["fallos"] += 1
+                return None
+            self._indice.move_to_end(clave)
+            self._estadisticas["aciertos"] += 1
+        ruta = self.ruta(clave)
+        try:
+            os.utime(ruta)
+        except OSError:
+            # Borrado por fuera: olvidarlo
+            self._olvidar(clave)
+            return None
+        return ruta
+
+    def contiene(self, clave: str) -> bool:
+        with self._lock:
+            return clave in self._indice
+
+    def registrar_aparicion(self, clave: str) -> bool:
+        """Cuenta una aparición de una frase no cacheada; True si ya merece renderizarse."""
+        with self._lock:
+            apariciones = self._apariciones.get(clave, 0) + 1
+            if len(self._apariciones) > 10000:
+                self._apariciones.clear()
+            self._apariciones[clave] = apariciones
+            return apariciones >= self.umbral
+
+    def reservar(self, clave: str) -> Path:
+        """Ruta temporal donde renderizar una frase antes de ``guardar``."""
+        ruta = self.ruta(clave)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        # Con extensión .wav: algunos motores deciden el formato por ella
+        return ruta.with_name(f"{clave}.parcial.wav")
+
+    def guardar(self, clave: str, temporal: Path) -> Optional[Path]:
+        """Incorpora al almacén un audio renderizado en ``temporal``."""
+        ruta = self.ruta(clave)
+        try:
+            os.replace(temporal, ruta)
+            tamano = ruta.stat().st_size
+        except OSError as e:
+            self.logger.warning(f"No se pudo guardar audio en caché: {e}")
+            return None
+
+        with self._lock:
+            self._bytes += tamano - self._indice.get(clave, 0)
+            self._indice[clave] = tamano
+            self._indice.move_to_end(clave)
+            self._apariciones.pop(clave, None)
+            self._estadisticas["renderizadas"] += 1
+            desalojar = self._seleccionar_desalojo()
+        for antigua in desalojar:
+            self._borrar(antigua)
+        return ruta
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._estadisticas, "entradas": len(self._indice), "bytes": self._bytes}
+
+    def _seleccionar_desalojo(self) -> List[str]:
+        desalojar = []
+        while self._bytes > self.max_bytes and len(self._indice) > 1:
+            clave, tamano = self._indice.popitem(last=False)
+            self._bytes -= tamano
+            self._estadisticas["desalojadas"] += 1
+            desalojar.append(clave)
+        return desalojar
+
+    def _borrar(self, clave: str):
+        try:
+            self.ruta(clave).unlink()
+        except OSError:
+            pass
+
+    def _olvidar(self, clave: str):
+        with self._lock:
+            self._bytes -= self._indice.pop(clave, 0)
+
+    def _cargar_indice(self):
+        if not self.directorio.exists():
+            return
+        entradas: List[Tuple[float, str, int]] = []
+        for ruta in self.directorio.glob("*/*.wav"):
+            try:
+                if not ruta.stem.isalnum():
+                    # Renderizado a medias de una ejecución anterior
+                    ruta.unlink()
+                    continue
+                estado = ruta.stat()
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime, ruta.stem, estado.st_size))
+        for _, clave, tamano in sorted(entradas):
+            self._indice[clave] = tamano
+            self._bytes += tamano
+        for clave in self._seleccionar_desalojo():
+            self._borrar(clave)
+
+
+def prerenderizar(frases: Iterable[str] = FRASES_FRECUENTES, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Renderiza un conjunto de frases con el motor de voz seleccionado.
+
+    Pensado para ejecutarse en la instalación: ``python cache_audio.py``.
+    """
+    from motor_voz import MotorVoz
+
+    motor = MotorVoz()
+    try:
+        for futuro in motor.prerenderizar(frases):
+            futuro.result(timeout)
+        return motor.obtener_estadisticas()
+    finally:
+        motor.cerrar()
+
+
+if __name__ == "__main__":
+    print(prerenderizar())
@@ -0,0 +1,128 @@
+"""
+Caché de perfiles de usuario de Aria
+Evita recalcular el perfil de adaptación en cada frase: se calcula una vez
+por cambio (cada interacción procesada lo invalida) junto con los valores
+derivados que usa la conversación
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Mapping, Tuple
+
+from instantanea_estado import congelar
+from estilo_texto import cubeta_estilo
+
+
+def espera_proactiva(proactividad: float) -> float:
+    """Segundos sin interacción antes de que Aria tome la iniciativa."""
+    if proactividad < 0.3:
+        return 60.0  # Menos proactiva
+    if proactividad > 0.7:
+        return 15.0  # Más proactiva
+    return 30.0
+
+
+@dataclass(frozen=True)
+class PerfilCacheado:
+    """Perfil de usuario inmutable con sus valores derivados precalculados."""
+    datos: Mapping[str, Any]
+    tema_principal: Optional[str]
+    espera_proactiva: float
+    cubeta_estilo: Optional[Tuple[int, int, int]]
+    version: int
+
+
+@dataclass
+class _Entrada:
+    version: int = 0
+    perfil: Optional[PerfilCacheado] = None
+    vigente: bool = False
+    instante: float = 0.0
+
+
+class CachePerfiles:
+    """
+    Envoltorio de ``AdaptacionUsuario`` con caché por usuario.
+
+    ``obtener_perfil`` devuelve el perfil calculado la última vez (de solo
+    lectura); ``procesar_interaccion`` lo pasa al sistema de adaptación e
+    invalida el perfil de ese usuario. El resto de la interfaz se delega tal
+    cual.
+    """
+
+    def __init__(self, adaptacion: Any, ttl: Optional[float] = None):
+        """
+        Args:
+            adaptacion: Sistema de adaptación (``AdaptacionUsuario``)
+            ttl: Segundos de validez de un perfil aunque no cambie (None: sin límite)
+        """
+        self.adaptacion = adaptacion
+        self.ttl = ttl
+        self._entradas: Dict[str, _Entrada] = {}
+        self._lock = threading.Lock()
+        self._estadisticas = {"aciertos": 0, "calculos": 0, "invalidaciones": 0}
+
+    def obtener(self, usuario_id: str) -> Optional[PerfilCacheado]:
+        """Perfil del usuario con sus valores derivados, o None si no tiene perfil."""
+        with self._lock:
+            entrada = self._entradas.setdefault(usuario_id, _Entrada())
+            caducado = self.ttl is not None and time.monotonic() - entrada.instante > self.ttl
+            if entrada.vigente and not caducado:
+                self._estadisticas["aciertos"] += 1
+                return entrada.perfil
+            version = entrada.version
+            self._estadisticas["calculos"] += 1
+
+        # Fuera del lock: el cálculo puede consultar la bodega
+        perfil = self._calcular(self.adaptacion.obtener_perfil(usuario_id), version)
+
+        with self._lock:
+            # Si hubo una interacción mientras se calculaba, no se guarda
+            if entrada.version == version:
+                entrada.perfil = perfil
+                entrada.vigente = True
+                entrada.instante = time.monotonic()
+        return perfil
+
+    def obtener_perfil(self, usuario_id: str) -> Optional[Mapping[str, Any]]:
+        """Igual que ``AdaptacionUsuario.obtener_perfil``, pero de la caché y de solo lectura."""
+        perfil = self.obtener(usuario_id)
+        return perfil.datos if perfil is not None else None
+
+    def procesar_interaccion(self, usuario_id: str, datos: Dict[str, Any]) -> Any:
+        """Procesa la interacción e invalida el perfil del usuario."""
+        try:
+            return self.adaptacion.procesar_interaccion(usuario_id, datos)
+        finally:
+            self.invalidar(usuario_id)
+
+    def invalidar(self, usuario_id: Optional[str] = None):
+        """Invalida el perfil de un usuario (o de todos)."""
+        with self._lock:
+            entradas = self._entradas.values() if usuario_id is None else [self._entradas.setdefault(usuario_id, _Entrada())]
+            for entrada in entradas:
+                entrada.version += 1
+                entrada.vigente = False
+            self._estadisticas["invalidaciones"] += 1
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._estadisticas, "usuarios": len(self._entradas)}
+
+    def __getattr__(self, nombre: str) -> Any:
+        return getattr(self.adaptacion, nombre)
+
+    @staticmethod
+    def _calcular(datos: Optional[Dict[str, Any]], version: int) -> Optional[PerfilCacheado]:
+        if not datos:
+            return None
+        temas = datos.get("temas_interes") or {}
+        estilo = datos.get("estilo_comunicacion") or {}
+        return PerfilCacheado(
+            datos=congelar(datos),
+            tema_principal=max(temas.items(), key=lambda x: x[1])[0] if temas else None,
+            espera_proactiva=espera_proactiva(estilo.get("proactividad", 0.5)),
+            cubeta_estilo=cubeta_estilo(estilo) if {"formalidad", "verbosidad", "emocionalidad"} <= set(estilo) else None,
+            version=version
+        )
@@ -0,0 +1,170 @@
+"""
+Calibración del micrófono de Aria
+Guarda por dispositivo el umbral de energía medido con el ruido ambiente y
+lo adapta durante la sesión a partir del suelo de ruido de la captura
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+
+RUTA_CALIBRACION = Path.home() / ".aria" / "calibracion_microfono.json"
+
+
+def nombre_dispositivo(microfono: Any) -> str:
+    """Nombre del dispositivo de entrada de un ``sr.Microphone``."""
+    try:
+        audio = microfono.pyaudio_module.PyAudio()
+        try:
+            if microfono.device_index is None:
+                informacion = audio.get_default_input_device_info()
+            else:
+                informacion = audio.get_device_info_by_index(microfono.device_index)
+            return f"{informacion['name']}@{microfono.SAMPLE_RATE}"
+        finally:
+            audio.terminate()
+    except Exception:
+        return f"predeterminado@{getattr(microfono, 'SAMPLE_RATE', 0)}"
+
+
+class CalibracionMicrofono:
+    """Umbrales de energía guardados en disco, uno por dispositivo."""
+
+    def __init__(self, ruta: Optional[Path] = RUTA_CALIBRACION, intervalo_guardado: float = 60.0):
+        """
+        Args:
+            ruta: Archivo JSON de calibraciones (None para no persistir)
+            intervalo_guardado: Segundos mínimos entre escrituras de un mismo dispositivo
+        """
+        self.logger = logging.getLogger("CalibracionMicrofono")
+        self.ruta = ruta
+        self.intervalo_guardado = intervalo_guardado
+        self._ultimo_guardado: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def cargar(self, dispositivo: str) -> Optional[float]:
+        """Umbral guardado para el dispositivo, o None si nunca se calibró."""
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as archivo:
+                return float(json.load(archivo)[dispositivo]["umbral"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def guardar(self, dispositivo: str, umbral: float, forzar: bool = False) -> bool:
+        """Guarda el umbral del dispositivo; sin ``forzar``, como mucho una vez por intervalo."""
+        if self.ruta is None:
+            return False
+        with self._lock:
+            ahora = time.monotonic()
+            ultimo = self._ultimo_guardado.get(dispositivo)
+            if not forzar and ultimo is not None and ahora - ultimo < self.intervalo_guardado:
+                return False
+            self._ultimo_guardado[dispositivo] = ahora
+            try:
+                with open(self.ruta, "r", encoding="utf-8") as archivo:
+                    calibraciones = json.load(archivo)
+            except (OSError, ValueError):
+                calibraciones = {}
+            calibraciones[dispositivo] = {"umbral": umbral, "fecha": datetime.now().isoformat()}
+            try:
+                Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+                with open(self.ruta, "w", encoding="utf-8") as archivo:
+                    json.dump(calibraciones, archivo, indent=2, ensure_ascii=False)
+                return True
+            except OSError as e:
+                self.logger.warning(f"No se pudo guardar la calibración del micrófono: {e}")
+                return False
+
+
+class UmbralAdaptativo:
+    """
+    Umbral de energía que sigue al ruido de la sala.
+
+    El suelo de ruido es el mínimo de la energía de los bloques en una
+    ventana deslizante: incluso mientras alguien habla hay pausas entre
+    palabras que bajan al nivel del ruido, así que el mínimo sube cuando la
+    sala se vuelve más ruidosa y baja cuando se calma. El umbral es el suelo
+    multiplicado por ``relacion`` y suavizado para no dar saltos. Hasta
+    llenar la primera ventana se usa el umbral inicial (el calibrado).
+    """
+
+    def __init__(self, inicial: float, duracion_bloque: float, ventana: float = 5.0, relacion: float = 2.5,
+                 minimo: float = 50.0, suavizado: float = 0.05,
+                 al_cambiar: Optional[Callable[[float], Any]] = None):
+        """
+        Args:
+            inicial: Umbral de partida (calibrado o guardado)
+            duracion_bloque: Segundos de audio de cada bloque observado
+            ventana: Segundos de la ventana del suelo de ruido
+            relacion: Umbral respecto al suelo de ruido
+            minimo: Umbral mínimo (evita disparos en silencio digital)
+            suavizado: Peso de cada nueva estimación en el umbral
+            al_cambiar: Se llama con el nuevo umbral tras cada actualización
+        """
+        self.valor = max(minimo, inicial)
+        self.relacion = relacion
+        self.minimo = minimo
+        self.suavizado = suavizado
+        self.al_cambiar = al_cambiar
+        self._tamano_ventana = max(1, round(ventana / duracion_bloque))
+        # Cola monótona creciente de (índice, energía): el frente es el mínimo de la ventana
+        self._minimos: deque = deque()
+        self._observados = 0
+
+    def __call__(self) -> float:
+        return self.valor
+
+    @property
+    def piso(self) -> Optional[float]:
+        """Suelo de ruido actual, o None si aún no se ha llenado la ventana."""
+        if self._observados < self._tamano_ventana or not self._minimos:
+            return None
+        return self._minimos[0][1]
+
+    def observar(self, energia: float):
+        """Incorpora la energía de un bloque de la captura."""
+        indice = self._observados
+        self._observados += 1
+        while self._minimos and self._minimos[-1][1] >= energia:
+            self._minimos.pop()
+        self._minimos.append((indice, energia))
+        if self._minimos[0][0] <= indice - self._tamano_ventana:
+            self._minimos.popleft()
+
+        piso = self.piso
+        if piso is None:
+            return
+        objetivo = max(self.minimo, piso * self.relacion)
+        self.valor += (objetivo - self.valor) * self.suavizado
+        if self.al_cambiar is not None:
+            self.al_cambiar(self.valor)
+
+
+def calibrar(microfono: Any, reconocedor: Any, calibracion: Optional[CalibracionMicrofono] = None,
+             duracion: float = 2.0, recalibrar: bool = False) -> str:
+    """
+    Fija el umbral de energía del reconocedor para el micrófono.
+
+    Usa el umbral guardado para el dispositivo; solo la primera vez (o con
+    ``recalibrar``) se mide el ruido ambiente durante ``duracion`` segundos.
+
+    Returns:
+        Nombre del dispositivo calibrado
+    """
+    calibracion = calibracion or CalibracionMicrofono()
+    dispositivo = nombre_dispositivo(microfono)
+    umbral = None if recalibrar else calibracion.cargar(dispositivo)
+    if umbral is not None:
+        reconocedor.energy_threshold = umbral
+        return dispositivo
+
+    with microfono as source:
+        reconocedor.adjust_for_ambient_noise(source, duration=duracion)
+    calibracion.guardar(dispositivo, reconocedor.energy_threshold, forzar=True)
+    return dispositivo
@@ -0,0 +1,205 @@
+"""
+Despachador de comandos administrativos de Aria
+Resuelve comandos del tipo ``grupo:subgrupo:accion`` con un trie de
+segmentos, valida sus argumentos y permite ejecutar lotes y scripts
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Iterable, Tuple, Union
+
+
+class ErrorComando(Exception):
+    """Error esperado de un comando (se devuelve como ``{"error": ...}``)."""
+
+
+@dataclass
+class Parametro:
+    """Esquema de un argumento posicional de un comando."""
+    nombre: str
+    convertir: Callable[[str], Any] = str
+    # Valores admitidos; puede ser una función para opciones que cambian en ejecución
+    opciones: Optional[Union[Iterable[str], Callable[[], Iterable[str]]]] = None
+
+    def validar(self, valor: str) -> Any:
+        opciones = self.opciones() if callable(self.opciones) else self.opciones
+        if opciones is not None and valor not in opciones:
+            raise ErrorComando(f"Valor no válido para {self.nombre}: {valor}")
+        try:
+            return self.convertir(valor)
+        except (TypeError, ValueError):
+            raise ErrorComando(f"Valor no válido para {self.nombre}: {valor}")
+
+
+@dataclass
+class Comando:
+    """Comando registrado en el despachador."""
+    patron: str
+    manejador: Callable[..., Any]
+    parametros: List[Parametro]
+    descripcion: str = ""
+
+
+@dataclass
+class _Nodo:
+    literales: Dict[str, "_Nodo"] = field(default_factory=dict)
+    parametro: Optional[Tuple[Parametro, "_Nodo"]] = None
+    comando: Optional[Comando] = None
+
+
+class DespachadorComandos:
+    """
+    Tabla de comandos administrativos indexada por un trie de segmentos.
+
+    Los patrones se escriben como los comandos, con ``{nombre}`` en los
+    segmentos variables, p. ej. ``red:{conexion}:reconectar``. Resolver un
+    comando recorre sus segmentos, sin importar cuántos comandos haya
+    registrados. Los segmentos literales tienen preferencia
+    sobre los variables; si la rama literal no lleva a ningún comando, se
+    vuelve atrás y se prueba la variable (con ``red:local:estado``
+    registrado, ``red:local:reconectar`` sigue llegando a
+    ``red:{conexion}:reconectar``). Un comando debe tener exactamente los
+    segmentos de su patrón: los segmentos de más no se ignoran, se rechazan.
+    """
+
+    def __init__(self, separador: str = ":"):
+        self.separador = separador
+        self.logger = logging.getLogger("DespachadorComandos")
+        self._raiz = _Nodo()
+        self._comandos: Dict[str, Comando] = {}
+        self._ejecuciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, patron: str, manejador: Callable[..., Any], descripcion: str = "",
+                  **esquema: Union[Parametro, Callable[[str], Any]]):
+        """
+        Registra un comando.
+
+        Args:
+            patron: Patrón del comando, con ``{nombre}`` en los segmentos variables
+            manejador: Función invocada con los argumentos como palabras clave
+            descripcion: Texto de ayuda
+            **esquema: Parametro (o función de conversión) por argumento
+        """
+        if patron in self._comandos:
+            raise ValueError(f"Comando ya registrado: {patron}")
+
+        nodo = self._raiz
+        parametros = []
+        for segmento in patron.split(self.separador):
+            if segmento.startswith("{") and segmento.endswith("}"):
+                nombre = segmento[1:-1]
+                parametro = esquema.get(nombre, Parametro(nombre))
+                if not isinstance(parametro, Parametro):
+                    parametro = Parametro(nombre, convertir=parametro)
+                if nodo.parametro is None:
+                    nodo.parametro = (parametro, _Nodo())
+                elif nodo.parametro[0].nombre != nombre:
+                    raise ValueError(f"Conflicto de parámetros en {patron}: "
+                                     f"{nodo.parametro[0].nombre} / {nombre}")
+                parametros.append(nodo.parametro[0])
+                nodo = nodo.parametro[1]
+            else:
+                nodo = nodo.literales.setdefault(segmento, _Nodo())
+
+        if nodo.comando is not None:
+            raise ValueError(f"Patrón ambiguo: {patron} / {nodo.comando.patron}")
+
+        comando = Comando(patron, manejador, parametros, descripcion)
+        nodo.comando = comando
+        self._comandos[patron] = comando
+        self._ejecuciones[patron] = 0
+
+    def resolver(self, texto: str) -> Tuple[Comando, Dict[str, Any]]:
+        """
+        Localiza el comando y valida sus argumentos.
+
+        Raises:
+            ErrorComando: Si el comando no existe o algún argumento no es válido
+        """
+        encontrado = self._buscar(self._raiz, texto.strip().split(self.separador), 0, [])
+        if encontrado is None:
+            raise ErrorComando("Comando no reconocido")
+
+        comando, valores = encontrado
+        argumentos = {
+            parametro.nombre: parametro.validar(valor)
+            for parametro, valor in zip(comando.parametros, valores)
+        }
+        return comando, argumentos
+
+    def _buscar(self, nodo: _Nodo, segmentos: List[str], posicion: int,
+                valores: List[str]) -> Optional[Tuple[Comando, List[str]]]:
+        """Recorre el trie desde ``nodo``: primero el literal y, si no lleva a un comando, el parámetro."""
+        if posicion == len(segmentos):
+            return (nodo.comando, valores) if nodo.comando is not None else None
+
+        siguiente = nodo.literales.get(segmentos[posicion])
+        if siguiente is not None:
+            encontrado = self._buscar(siguiente, segmentos, posicion + 1, valores)
+            if encontrado is not None:
+                return encontrado
+        if nodo.parametro is not None:
+            return self._buscar(nodo.parametro[1], segmentos, posicion + 1, valores + [segmentos[posicion]])
+        return None
+
+    def ejecutar(self, texto: str) -> Dict[str, Any]:
+        """
+        Ejecuta un comando.
+
+        Returns:
+            ``{"resultado": ...}`` o ``{"error": ...}``
+        """
+        try:
+            comando, argumentos = self.resolver(texto)
+            resultado = comando.manejador(**argumentos)
+        except ErrorComando as e:
+            return {"error": str(e)}
+
+        with self._lock:
+            self._ejecuciones[comando.patron] += 1
+        return {"resultado": resultado}
+
+    def ejecutar_lote(self, comandos: Iterable[str], detener_en_error: bool = False) -> List[Dict[str, Any]]:
+        """
+        Ejecuta varios comandos en orden.
+
+        Las líneas vacías y las que empiezan por ``#`` se ignoran, de modo que
+        el contenido de un script puede pasarse directamente.
+
+        Args:
+            comandos: Comandos a ejecutar
+            detener_en_error: Interrumpir el lote en el primer error
+
+        Returns:
+            Un resultado por comando ejecutado, con el comando incluido
+        """
+        resultados = []
+        for linea in comandos:
+            texto = linea.strip()
+            if not texto or texto.startswith("#"):
+                continue
+            try:
+                resultado = self.ejecutar(texto)
+            except Exception as e:
+                self.logger.error(f"Error ejecutando {texto}: {e}")
+                resultado = {"error": str(e)}
+            resultados.append({"comando": texto, **resultado})
+            if detener_en_error and "error" in resultado:
+                break
+        return resultados
+
+    def ejecutar_script(self, ruta: str, detener_en_error: bool = True) -> List[Dict[str, Any]]:
+        """Ejecuta un archivo de comandos, uno por línea."""
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            return self.ejecutar_lote(archivo, detener_en_error=detener_en_error)
+
+    def comandos(self) -> Dict[str, str]:
+        """Patrones registrados con su descripción."""
+        return {patron: comando.descripcion for patron, comando in self._comandos.items()}
+
+    def obtener_estadisticas(self) -> Dict[str, int]:
+        """Ejecuciones correctas por comando."""
+        with self._lock:
+            return dict(self._ejecuciones)
@@ -0,0 +1,218 @@
+"""
+Enrutador de intenciones de Aria
+Reconoce la intención de una frase con una sola pasada de un autómata
+Aho-Corasick, independientemente del número de intenciones registradas
+"""
+
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Tuple
+
+
+class AutomataAhoCorasick:
+    """Autómata Aho-Corasick para buscar muchos patrones a la vez."""
+
+    def __init__(self):
+        self._transiciones: List[Dict[str, int]] = [{}]
+        self._fallo: List[int] = [0]
+        self._propias: List[List[Any]] = [[]]
+        self._salidas: List[List[Any]] = [[]]
+        self._compilado = True
+
+    def agregar(self, patron: str, valor: Any):
+        """Agrega un patrón con el valor a devolver cuando aparezca."""
+        estado = 0
+        for caracter in patron:
+            siguiente = self._transiciones[estado].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[estado][caracter] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._propias.append([])
+            estado = siguiente
+        self._propias[estado].append(valor)
+        self._compilado = False
+
+    def compilar(self):
+        """Calcula los enlaces de fallo y las salidas (recorrido en anchura)."""
+        self._salidas = [list(propias) for propias in self._propias]
+        cola = deque()
+        for estado in self._transiciones[0].values():
+            self._fallo[estado] = 0
+            cola.append(estado)
+
+        while cola:
+            actual = cola.popleft()
+            for caracter, siguiente in self._transiciones[actual].items():
+                cola.append(siguiente)
+                fallo = self._fallo[actual]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                self._fallo[siguiente] = self._transiciones[fallo].get(caracter, 0)
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallo[siguiente]]
+        self._compilado = True
+
+    def buscar(self, texto: str) -> Iterator[Any]:
+        """Devuelve los valores de todos los patrones que aparecen en el texto."""
+        if not self._compilado:
+            self.compilar()
+
+        transiciones, fallo, salidas = self._transiciones, self._fallo, self._salidas
+        estado = 0
+        for caracter in texto:
+            while estado and caracter not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(caracter, 0)
+            if salidas[estado]:
+                yield from salidas[estado]
+
+
+@dataclass
+class Intencion:
+    """Intención registrada en el enrutador."""
+    nombre: str
+    frases: Tuple[str, ...]
+    manejador: Callable[..., Any]
+    prioridad: int
+
+
+class EnrutadorIntenciones:
+    """
+    Enrutador de frases a intenciones.
+
+    Cada intención se asocia a un conjunto de frases clave; una frase activa
+    la intención si contiene alguna de ellas. Si se activan varias, gana la
+    de menor prioridad (por defecto, el orden de registro), igual que en una
+    cadena de ``if 'x' in texto``.
+    """
+
+    def __init__(self, normalizar: Callable[[str], str] = str.lower):
+        self.normalizar = normalizar
+        self._intenciones: Dict[str, Intencion] = {}
+        self._automata = AutomataAhoCorasick()
+        self._aciertos: Dict[str, int] = {}
+        self._sin_coincidencia = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, frases: Iterable[str], manejador: Callable[..., Any],
+                  prioridad: Optional[int] = None):
+        """
+        Registra una intención.
+
+        Args:
+            nombre: Nombre único de la intención
+            frases: Frases clave que la activan
+            manejador: Función a invocar con la frase original
+            prioridad: Menor gana; por defecto, el orden de registro
+        """
+        if nombre in self._intenciones:
+            raise ValueError(f"Intención ya registrada: {nombre}")
+
+        intencion = Intencion(
+            nombre=nombre,
+            frases=tuple(self.normalizar(frase) for frase in frases),
+            manejador=manejador,
+            prioridad=len(self._intenciones) if prioridad is None else prioridad
+        )
+        self._intenciones[nombre] = intencion
+        self._aciertos[nombre] = 0
+        for frase in intencion.frases:
+            self._automata.agregar(frase, intencion)
+
+    def compilar(self):
+        """Compila el autómata (se hace automáticamente en el primer uso)."""
+        self._automata.compilar()
+
+    def enrutar(self, texto: str) -> Optional[Intencion]:
+        """
+        Determina la intención de una frase.
+
+        Args:
+            texto: Frase del usuario
+
+        Returns:
+            Intención ganadora o None si ninguna coincide
+        """
+        mejor = None
+        for intencion in self._automata.buscar(self.normalizar(texto)):
+            if mejor is None or intencion.prioridad < mejor.prioridad:
+                mejor = intencion
+
+        with self._lock:
+            if mejor is None:
+                self._sin_coincidencia += 1
+            else:
+                self._aciertos[mejor.nombre] += 1
+        return mejor
+
+    def despachar(self, texto: str, *args, **kwargs) -> Tuple[Optional[str], Any]:
+        """
+        Enruta una frase e invoca el manejador de la intención ganadora.
+
+        Returns:
+            Tupla (nombre de la intención, resultado del manejador) o
+            (None, None) si ninguna coincide
+        """
+        intencion = self.enrutar(texto)
+        if intencion is None:
+            return None, None
+        return intencion.nombre, intencion.manejador(texto, *args, **kwargs)
+
+    def intenciones(self) -> List[str]:
+        """Nombres de las intenciones registradas."""
+        return list(self._intenciones)
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Contadores de aciertos por intención."""
+        with self._lock:
+            return {
+                "aciertos": dict(self._aciertos),
+                "sin_coincidencia": self._sin_coincidencia
+            }
+
+
+def medir_rendimiento(num_intenciones: int = 500, repeticiones: int = 2000) -> Dict[str, float]:
+    """
+    Micro-benchmark del enrutador frente a una cadena lineal de ``in``.
+
+    Args:
+        num_intenciones: Intenciones sintéticas a registrar
+        repeticiones: Frases a enrutar por medición
+
+    Returns:
+        Microsegundos por frase para el enrutador y para la cadena lineal
+    """
+    frases = [f"comando numero {i} de prueba" for i in range(num_intenciones)]
+    enrutador = EnrutadorIntenciones()
+    for i, frase in enumerate(frases):
+        enrutador.registrar(f"intencion_{i}", [frase], lambda texto: None)
+    enrutador.compilar()
+
+    entrada = "por favor ejecuta el comando que no existe en la lista de prueba"
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        enrutador.enrutar(entrada)
+    tiempo_enrutador = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        texto = entrada.lower()
+        next((frase for frase in frases if frase in texto), None)
+    tiempo_lineal = time.perf_counter() - inicio
+
+    return {
+        "intenciones": num_intenciones,
+        "enrutador_us": tiempo_enrutador / repeticiones * 1e6,
+        "cadena_lineal_us": tiempo_lineal / repeticiones * 1e6
+    }
+
+
+if __name__ == "__main__":
+    for cantidad in (10, 100, 1000):
+        resultado = medir_rendimiento(num_intenciones=cantidad)
+        print(f"{cantidad:5d} intenciones: enrutador {resultado['enrutador_us']:.1f} µs/frase, "
+              f"cadena lineal {resultado['cadena_lineal_us']:.1f} µs/frase")
@@ -0,0 +1,478 @@
+"""
+Escucha continua de Aria
+Captura el micrófono sin interrupciones en un hilo propio, segmenta las
+frases con detección local de actividad de voz y las reconoce en otro hilo,
+de modo que no se pierde audio entre turnos ni se reabre el micrófono
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Iterable, Union
+
+from motor_voz import energia_rms, MotorVoz
+from calibracion_microfono import CalibracionMicrofono, UmbralAdaptativo
+
+
+class ErrorReconocimiento(Exception):
+    """El servicio de reconocimiento no está disponible o ha fallado."""
+
+
+@dataclass
+class Segmento:
+    """Frase de audio PCM delimitada por el detector de actividad de voz."""
+    datos: bytes
+    frecuencia: int
+    ancho_muestra: int
+    inicio: float
+    fin: float
+
+    @property
+    def duracion(self) -> float:
+        return len(self.datos) / float(self.frecuencia * self.ancho_muestra)
+
+
+@dataclass
+class Transcripcion:
+    """Resultado del reconocimiento de un segmento."""
+    texto: Optional[str]
+    segmento: Segmento
+    latencia_ms: float
+    error: Optional[str] = None
+
+
+class BufferCircular:
+    """
+    Buffer circular de audio con un escritor (el hilo de captura) y un lector.
+
+    El escritor nunca se bloquea: si el lector se queda atrás más de la
+    capacidad del buffer, se descarta el audio más antiguo y se contabiliza.
+    """
+
+    def __init__(self, capacidad: int):
+        self._datos = bytearray(capacidad)
+        self._capacidad = capacidad
+        self._escritos = 0
+        self._leidos = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+        self.perdidos = 0
+
+    def escribir(self, datos: bytes):
+        with self._condicion:
+            if len(datos) > self._capacidad:
+                self._escritos += len(datos) - self._capacidad
+                datos = datos[-self._capacidad:]
+            posicion = self._escritos % self._capacidad
+            primero = min(len(datos), self._capacidad - posicion)
+            self._datos[posicion:posicion + primero] = datos[:primero]
+            self._datos[:len(datos) - primero] = datos[primero:]
+            self._escritos += len(datos)
+
+            atraso = self._escritos - self._leidos - self._capacidad
+            if atraso > 0:
+                self.perdidos += atraso
+                self._leidos += atraso
+            self._condicion.notify_all()
+
+    def leer(self, tamano: int, timeout: Optional[float] = None) -> bytes:
+        """Espera a tener ``tamano`` bytes sin leer y los devuelve (menos si expira o se cierra)."""
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._escritos - self._leidos >= tamano or self._cerrado, timeout)
+            cantidad = min(tamano, self._escritos - self._leidos)
+            posicion = self._leidos % self._capacidad
+            primero = min(cantidad, self._capacidad - posicion)
+            datos = bytes(self._datos[posicion:posicion + primero]) + bytes(self._datos[:cantidad - primero])
+            self._leidos += cantidad
+            return datos
+
+    def pendientes(self) -> int:
+        with self._condicion:
+            return self._escritos - self._leidos
+
+    def cerrar(self):
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify_all()
+
+
+class DetectorActividadVoz:
+    """
+    Segmentador de frases por energía.
+
+    Una frase empieza tras ``bloques_inicio`` bloques seguidos por encima del
+    umbral (incluyendo ``previo`` segundos de audio anterior, para no cortar
+    el principio) y termina tras ``silencio`` segundos por debajo, o al
+    alcanzar ``duracion_maxima``.
+    """
+
+    def __init__(self, frecuencia: int, ancho_muestra: int, tamano_bloque: int,
+                 umbral: Callable[[], float], silencio: float = 0.5, previo: float = 0.3,
+                 bloques_inicio: int = 2, duracion_maxima: float = 10.0,
+                 al_iniciar: Optional[Callable[[], Any]] = None,
+                 al_medir: Optional[Callable[[float], Any]] = None):
+        """
+        Args:
+            frecuencia: Muestras por segundo
+            ancho_muestra: Bytes por muestra
+            tamano_bloque: Muestras por bloque
+            umbral: Energía RMS a partir de la que un bloque es voz
+            silencio: Segundos de silencio que cierran una frase
+            previo: Segundos de audio previo que se añaden al inicio
+            bloques_inicio: Bloques de voz seguidos que abren una frase
+            duracion_maxima: Duración máxima de una frase en segundos
+            al_iniciar: Se llama cuando empieza una frase
+            al_medir: Recibe la energía de cada bloque (p. ej. un ``UmbralAdaptativo``)
+        """
+        self.frecuencia = frecuencia
+        self.ancho_muestra = ancho_muestra
+        self.umbral = umbral
+        self.bloques_inicio = bloques_inicio
+        self.al_iniciar = al_iniciar
+        self.al_medir = al_medir
+        duracion_bloque = tamano_bloque / float(frecuencia)
+        self._bloques_silencio = max(1, round(silencio / duracion_bloque))
+        self._bloques_maximos = max(1, round(duracion_maxima / duracion_bloque))
+        self._previo: deque = deque(maxlen=max(bloques_inicio, round(previo / duracion_bloque)))
+        self._frase: Optional[List[bytes]] = None
+        self._inicio = 0.0
+        self._voz_seguidos = 0
+        self._silencio_seguidos = 0
+
+    @property
+    def en_frase(self) -> bool:
+        return self._frase is not None
+
+    def procesar(self, bloque: bytes) -> Optional[Segmento]:
+        """Procesa un bloque de audio; devuelve el segmento si con él termina una frase."""
+        energia = energia_rms(bloque, self.ancho_muestra)
+        if self.al_medir is not None:
+            self.al_medir(energia)
+        voz = energia > self.umbral()
+
+        if self._frase is None:
+            self._previo.append(bloque)
+            self._voz_seguidos = self._voz_seguidos + 1 if voz else 0
+            if self._voz_seguidos >= self.bloques_inicio:
+                self._frase = list(self._previo)
+                self._previo.clear()
+                self._inicio = time.monotonic()
+                self._silencio_seguidos = 0
+                if self.al_iniciar is not None:
+                    self.al_iniciar()
+            return None
+
+        self._frase.append(bloque)
+        self._silencio_seguidos = 0 if voz else self._silencio_seguidos + 1
+        if self._silencio_seguidos >= self._bloques_silencio or len(self._frase) >= self._bloques_maximos:
+            return self.cerrar_frase()
+        return None
+
+    def cerrar_frase(self) -> Optional[Segmento]:
+        """Termina la frase en curso (si la hay) y la devuelve."""
+        if self._frase is None:
+            return None
+        # El silencio final no aporta nada al reconocedor
+        bloques = self._frase[:len(self._frase) - max(0, self._silencio_seguidos - 1)]
+        segmento = Segmento(b"".join(bloques), self.frecuencia, self.ancho_muestra, self._inicio, time.monotonic())
+        self._frase = None
+        self._voz_seguidos = 0
+        self._silencio_seguidos = 0
+        return segmento
+
+
+class MotorReconocimiento:
+    """Interfaz de un motor de reconocimiento de voz."""
+
+    nombre = "base"
+
+    def reconocer(self, segmento: Segmento) -> Optional[str]:
+        """
+        Texto de un segmento de audio.
+
+        Returns:
+            El texto, o None si no se entendió nada
+
+        Raises:
+            ErrorReconocimiento: Si el servicio no está disponible
+        """
+        raise NotImplementedError
+
+
+class ReconocimientoGoogle(MotorReconocimiento):
+    """Servicio web de Google a través de ``speech_recognition``."""
+
+    nombre = "google"
+
+    def __init__(self, reconocedor: Any, idioma: str = "es-ES"):
+        self.reconocedor = reconocedor
+        self.idioma = idioma
+
+    def reconocer(self, segmento: Segmento) -> Optional[str]:
+        import speech_recognition as sr
+
+        audio = sr.AudioData(segmento.datos, segmento.frecuencia, segmento.ancho_muestra)
+        try:
+            return self.reconocedor.recognize_google(audio, language=self.idioma)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise ErrorReconocimiento(str(e))
+
+
+class ReconocimientoSimulado(MotorReconocimiento):
+    """Motor sin conexión que devuelve textos prefijados, para pruebas."""
+
+    nombre = "simulado"
+
+    def __init__(self, respuestas: Union[Iterable[Optional[str]], Callable[[Segmento], Optional[str]]] = ()):
+        self._responder = respuestas if callable(respuestas) else None
+        self._respuestas = deque() if callable(respuestas) else deque(respuestas)
+        self.segmentos: List[Segmento] = []
+
+    def reconocer(self, segmento: Segmento) -> Optional[str]:
+        self.segmentos.append(segmento)
+        if self._responder is not None:
+            return self._responder(segmento)
+        return self._respuestas.popleft() if self._respuestas else None
+
+
+@dataclass
+class _Estadisticas:
+    segmentos: int = 0
+    reconocidos: int = 0
+    no_entendidos: int = 0
+    errores: int = 0
+    latencias: deque = field(default_factory=lambda: deque(maxlen=100))
+
+
+class EscuchaContinua:
+    """
+    Escucha continua sobre una fuente de audio.
+
+    Tres etapas en hilos separados: captura (lee la fuente sin pausa y
+    escribe en un ``BufferCircular``), segmentación (``DetectorActividadVoz``)
+    y reconocimiento (consume los segmentos de una cola). ``escuchar`` recoge
+    la siguiente transcripción; lo que se diga entre dos llamadas queda en
+    cola para la siguiente.
+
+    La fuente sigue la interfaz de ``sr.Microphone``: gestor de contexto con
+    ``stream``, ``SAMPLE_RATE``, ``SAMPLE_WIDTH`` y ``CHUNK``.
+    """
+
+    def __init__(self, fuente: Any, motor: MotorReconocimiento, umbral: Callable[[], float],
+                 al_iniciar_frase: Optional[Callable[[], Any]] = None, segundos_buffer: float = 10.0,
+                 **vad):
+        """
+        Args:
+            fuente: Fuente de audio (p. ej. ``sr.Microphone``)
+            motor: Motor de reconocimiento
+            umbral: Energía RMS a partir de la que un bloque es voz
+            al_iniciar_frase: Se llama cuando el usuario empieza a hablar
+            segundos_buffer: Audio que puede acumularse sin segmentar
+            **vad: Parámetros adicionales de ``DetectorActividadVoz``
+        """
+        self.logger = logging.getLogger("EscuchaContinua")
+        self.fuente = fuente
+        self.motor = motor
+        self.frecuencia = fuente.SAMPLE_RATE
+        self.ancho_muestra = fuente.SAMPLE_WIDTH
+        self.tamano_bloque = fuente.CHUNK
+        self.detector = DetectorActividadVoz(self.frecuencia, self.ancho_muestra, self.tamano_bloque,
+                                             umbral, al_iniciar=al_iniciar_frase, **vad)
+        self._capacidad_buffer = int(segundos_buffer * self.frecuencia) * self.ancho_muestra
+        self.buffer = BufferCircular(self._capacidad_buffer)
+        self._segmentos: "queue.Queue[Optional[Segmento]]" = queue.Queue()
+        self._resultados: "queue.Queue[Transcripcion]" = queue.Queue()
+        self._reconociendo = 0
+        self._activo = threading.Event()
+        self._hilos: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._estadisticas = _Estadisticas()
+
+    def iniciar(self):
+        """Abre la fuente y arranca los hilos (si no lo estaban)."""
+        with self._lock:
+            if self._activo.is_set():
+                return
+            self._activo.set()
+            self.buffer = BufferCircular(self._capacidad_buffer)
+            self._hilos = [
+                threading.Thread(target=self._capturar, name="aria-captura", daemon=True),
+                threading.Thread(target=self._segmentar, name="aria-vad", daemon=True),
+                threading.Thread(target=self._reconocer, name="aria-reconocimiento", daemon=True),
+            ]
+            for hilo in self._hilos:
+                hilo.start()
+
+    def detener(self, timeout: float = 2.0):
+        """Cierra la fuente y termina los hilos; la frase en curso se reconoce igualmente."""
+        with self._lock:
+            if not self._activo.is_set():
+                return
+            self._activo.clear()
+            hilos, self._hilos = self._hilos, []
+        self.buffer.cerrar()
+        for hilo in hilos:
+            hilo.join(timeout)
+
+    def escuchar(self, timeout: Optional[float] = None) -> Optional[Transcripcion]:
+        """
+        Siguiente transcripción.
+
+        Args:
+            timeout: Segundos que se espera a que el usuario empiece a hablar;
+                si ya está hablando o hay una frase reconociéndose, se espera
+                a su resultado
+
+        Returns:
+            La transcripción, o None si nadie habló en ``timeout`` segundos
+        """
+        self.iniciar()
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._resultados.get(timeout=0.05)
+            except queue.Empty:
+                pass
+            if limite is not None and time.monotonic() >= limite and not self.ocupada():
+                return None
+            if not self._activo.is_set() and not self.ocupada():
+                return None
+
+    def ocupada(self) -> bool:
+        """True si el usuario está hablando o hay frases pendientes de reconocer."""
+        with self._lock:
+            return self.detector.en_frase or self._reconociendo > 0 or not self._segmentos.empty()
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Segmentos, reconocimientos, audio perdido y latencia desde el fin de la frase al texto."""
+        with self._lock:
+            latencias = list(self._estadisticas.latencias)
+            return {
+                "motor": self.motor.nombre,
+                "segmentos": self._estadisticas.segmentos,
+                "reconocidos": self._estadisticas.reconocidos,
+                "no_entendidos": self._estadisticas.no_entendidos,
+                "errores": self._estadisticas.errores,
+                "bytes_perdidos": self.buffer.perdidos,
+                "latencia_media_ms": sum(latencias) / len(latencias) if latencias else 0.0,
+                "latencia_maxima_ms": max(latencias) if latencias else 0.0,
+                "reconocimiento": getattr(self.motor, "obtener_estadisticas", dict)(),
+            }
+
+    def _capturar(self):
+        while self._activo.is_set():
+            try:
+                with self.fuente as fuente:
+                    while self._activo.is_set():
+                        self.buffer.escribir(fuente.stream.read(self.tamano_bloque))
+            except Exception as e:
+                self.logger.error(f"Error capturando audio: {e}")
+                # Micrófono desconectado u ocupado: reintentar en un momento
+                time.sleep(1.0)
+
+    def _segmentar(self):
+        tamano = self.tamano_bloque * self.ancho_muestra
+        while True:
+            bloque = self.buffer.leer(tamano, timeout=0.5)
+            if len(bloque) == tamano:
+                with self._lock:
+                    segmento = self.detector.procesar(bloque)
+            elif not self._activo.is_set():
+                with self._lock:
+                    segmento = self.detector.cerrar_frase()
+                if segmento is not None:
+                    self._encolar_segmento(segmento)
+                break
+            else:
+                continue
+            if segmento is not None:
+                self._encolar_segmento(segmento)
+        self._segmentos.put(None)
+
+    def _encolar_segmento(self, segmento: Segmento):
+        with self._lock:
+            self._estadisticas.segmentos += 1
+            self._segmentos.put(segmento)
+
+    def _reconocer(self):
+        while True:
+            segmento = self._segmentos.get()
+            if segmento is None:
+                break
+            with self._lock:
+                self._reconociendo += 1
+            texto, error = None, None
+            try:
+                texto = self.motor.reconocer(segmento)
+            except ErrorReconocimiento as e:
+                error = str(e)
+            except Exception as e:
+                self.logger.error(f"Error en el motor de reconocimiento: {e}")
+                error = str(e)
+            latencia = (time.monotonic() - segmento.fin) * 1000
+            with self._lock:
+                self._reconociendo -= 1
+                if error is not None:
+                    self._estadisticas.errores += 1
+                elif texto:
+                    self._estadisticas.reconocidos += 1
+                    self._estadisticas.latencias.append(latencia)
+                else:
+                    self._estadisticas.no_entendidos += 1
+                self._resultados.put(Transcripcion(texto, segmento, latencia, error))
+
+
+def crear_escucha_microfono(microfono: Any, reconocedor: Any, motor_voz: Optional[MotorVoz] = None,
+                            idioma: str = "es-ES", factor_eco: float = 1.5, dispositivo: Optional[str] = None,
+                            calibracion: Optional[CalibracionMicrofono] = None,
+                            motor: Optional[MotorReconocimiento] = None) -> EscuchaContinua:
+    """
+    Escucha continua sobre un ``sr.Microphone`` ya calibrado.
+
+    Parte del umbral de energía del reconocedor y lo adapta al suelo de
+    ruido de la propia captura (``UmbralAdaptativo``); si se indica el
+    ``dispositivo``, el umbral adaptado se guarda para el próximo arranque.
+    Mientras Aria habla se exige ``factor_eco`` veces más energía, para no
+    tomar su propia voz por la del usuario, y si el usuario empieza a hablar
+    encima de ella se la interrumpe.
+
+    Por defecto los comandos conocidos se reconocen localmente y solo el
+    habla libre va a Google (``reconocimiento_local.crear_reconocimiento``).
+    """
+    if motor is None:
+        from reconocimiento_local import crear_reconocimiento
+
+        motor = crear_reconocimiento(ReconocimientoGoogle(reconocedor, idioma))
+
+    if dispositivo is not None:
+        calibracion = calibracion or CalibracionMicrofono()
+
+    def al_cambiar(valor: float):
+        reconocedor.energy_threshold = valor
+        if dispositivo is not None:
+            calibracion.guardar(dispositivo, valor)
+
+    adaptativo = UmbralAdaptativo(reconocedor.energy_threshold, microfono.CHUNK / float(microfono.SAMPLE_RATE),
+                                  al_cambiar=al_cambiar)
+
+    def hablando() -> bool:
+        return motor_voz is not None and motor_voz.hablando()
+
+    def umbral() -> float:
+        return adaptativo() * factor_eco if hablando() else adaptativo()
+
+    def al_medir(energia: float):
+        # La voz de Aria no es ruido de la sala
+        if not hablando():
+            adaptativo.observar(energia)
+
+    def al_iniciar_frase():
+        if motor_voz is not None and motor_voz.hablando():
+            motor_voz.interrumpir()
+
+    return EscuchaContinua(microfono, motor, umbral, al_iniciar_frase=al_iniciar_frase, al_medir=al_medir)
@@ -0,0 +1,188 @@
+"""
+Adaptación de estilo de las respuestas de Aria
+Transforma un texto según el estilo de comunicación del usuario
+(formalidad, verbosidad, emocionalidad) con transformaciones compiladas una
+vez por combinación de niveles y sustituciones que respetan las palabras
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+
+BAJO, MEDIO, ALTO = -1, 0, 1
+
+# Pronombres de tú a usted y al revés (solo palabras completas)
+TUTEO_A_USTED = {"tú": "usted", "tu": "su", "tus": "sus", "te": "le", "ti": "usted", "contigo": "con usted"}
+USTED_A_TUTEO = {"usted": "tú", "le": "te", "con usted": "contigo"}
+
+COLETILLA_DETALLE = "¿Te gustaría saber más al respecto?"
+
+_FIN_FRASE = re.compile(r"[.!?](?=\s|$)")
+
+
+def nivel(valor: float) -> int:
+    """Nivel de un rasgo de estilo: BAJO (< 0.3), MEDIO o ALTO (> 0.7)."""
+    if valor > 0.7:
+        return ALTO
+    if valor < 0.3:
+        return BAJO
+    return MEDIO
+
+
+def cubeta_estilo(estilo: Dict[str, float]) -> Tuple[int, int, int]:
+    """Niveles de formalidad, verbosidad y emocionalidad de un estilo de comunicación."""
+    return nivel(estilo["formalidad"]), nivel(estilo["verbosidad"]), nivel(estilo["emocionalidad"])
+
+
+def _compilar_sustitucion(tabla: Dict[str, str]):
+    # Variantes en mayúscula inicial precalculadas: sin IGNORECASE ni lógica por coincidencia
+    completa = dict(tabla)
+    completa.update({origen[0].upper() + origen[1:]: destino[0].upper() + destino[1:]
+                     for origen, destino in tabla.items()})
+    # Las frases más largas primero, para que "con usted" gane a "usted"
+    claves = sorted(completa, key=len, reverse=True)
+    patron = re.compile(r"\b(?:" + "|".join(re.escape(clave) for clave in claves) + r")\b")
+    reemplazar = lambda coincidencia: completa[coincidencia.group()]
+    return lambda texto: patron.sub(reemplazar, texto)
+
+
+_A_USTED = _compilar_sustitucion(TUTEO_A_USTED)
+_A_TUTEO = _compilar_sustitucion(USTED_A_TUTEO)
+
+
+@dataclass(frozen=True)
+class TransformacionEstilo:
+    """Transformación compilada para una combinación de niveles de estilo."""
+    formalidad: int
+    verbosidad: int
+    emocionalidad: int
+    coletilla: str
+
+    def aplicar(self, texto: str) -> str:
+        # Formalidad
+        if self.formalidad == ALTO:
+            texto = _A_USTED(texto)
+            minusculas = texto.lower()
+            if "por favor" not in minusculas and "gracias" not in minusculas:
+                texto = f"Por favor, {texto}"
+        elif self.formalidad == BAJO:
+            texto = _A_TUTEO(texto)
+
+        # Verbosidad
+        if self.verbosidad == BAJO:
+            # Solo la primera frase
+            fin = _FIN_FRASE.search(texto)
+            texto = texto[:fin.end()] if fin else texto.rstrip() + "."
+        elif self.verbosidad == ALTO and not texto.endswith("?"):
+            texto = f"{texto} {self.coletilla}"
+
+        # Emocionalidad
+        if self.emocionalidad == ALTO and not (texto.startswith("¡") and texto.endswith("!")):
+            texto = f"¡{texto}!"
+        return texto
+
+
+@lru_cache(maxsize=None)
+def compilar_estilo(cubeta: Tuple[int, int, int]) -> TransformacionEstilo:
+    """Transformación de una cubeta de estilo (se construye una sola vez)."""
+    formalidad, verbosidad, emocionalidad = cubeta
+    coletilla = COLETILLA_DETALLE
+    if formalidad == ALTO:
+        coletilla = _A_USTED(coletilla)
+    return TransformacionEstilo(formalidad, verbosidad, emocionalidad, coletilla)
+
+
+@lru_cache(maxsize=4096)
+def _adaptar(cubeta: Tuple[int, int, int], texto: str) -> str:
+    return compilar_estilo(cubeta).aplicar(texto)
+
+
+def adaptar_texto(texto: str, estilo: Dict[str, float]) -> str:
+    """
+    Adapta un texto al estilo de comunicación del usuario.
+
+    El resultado se memoriza por (cubeta de estilo, texto): las frases fijas
+    de Aria se adaptan una sola vez por nivel de estilo.
+    """
+    return _adaptar(cubeta_estilo(estilo), texto)
+
+
+def adaptar_por_cubeta(texto: str, cubeta: Tuple[int, int, int]) -> str:
+    """Como ``adaptar_texto``, con la cubeta de estilo ya calculada."""
+    return _adaptar(cubeta, texto)
+
+
+def obtener_estadisticas() -> Dict[str, Any]:
+    """Aciertos de la memoria de textos adaptados y transformaciones compiladas."""
+    textos = _adaptar.cache_info()
+    return {
+        "aciertos": textos.hits,
+        "fallos": textos.misses,
+        "textos": textos.currsize,
+        "transformaciones": compilar_estilo.cache_info().currsize,
+    }
+
+
+def _adaptar_ingenuo(texto: str, estilo: Dict[str, float]) -> str:
+    """Versión anterior con str.replace encadenados (solo para comparar en el benchmark)."""
+    if estilo["formalidad"] > 0.7:
+        texto = texto.replace("tu", "usted").replace("te", "le")
+        if not any(palabra in texto.lower() for palabra in ["por favor", "gracias"]):
+            texto = f"Por favor, {texto}"
+    elif estilo["formalidad"] < 0.3:
+        texto = texto.replace("usted", "tu").replace("le", "te")
+    if estilo["verbosidad"] < 0.3:
+        texto = texto.split('.')[0] + '.'
+    elif estilo["verbosidad"] > 0.7 and not texto.endswith('?'):
+        texto += " ¿Te gustaría saber más al respecto?"
+    if estilo["emocionalidad"] > 0.7:
+        texto = f"¡{texto}!"
+    return texto
+
+
+def medir_rendimiento(repeticiones: int = 2000, frases_parrafo: int = 40,
+                      estilo: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Micro-benchmark de la adaptación de un párrafo largo.
+
+    Returns:
+        Microsegundos por texto para la transformación compilada (primera vez
+        y memorizada) y para la cadena de ``str.replace``
+    """
+    estilo = estilo or {"formalidad": 0.9, "verbosidad": 0.8, "emocionalidad": 0.9}
+    parrafo = " ".join(f"Te cuento que tu texto número {i} está listo para ti." for i in range(frases_parrafo))
+    cubeta = cubeta_estilo(estilo)
+    transformacion = compilar_estilo(cubeta)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        transformacion.aplicar(parrafo)
+    tiempo_compilado = time.perf_counter() - inicio
+
+    adaptar_texto(parrafo, estilo)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        adaptar_texto(parrafo, estilo)
+    tiempo_memorizado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        _adaptar_ingenuo(parrafo, estilo)
+    tiempo_ingenuo = time.perf_counter() - inicio
+
+    return {
+        "caracteres": len(parrafo),
+        "compilado_us": tiempo_compilado / repeticiones * 1e6,
+        "memorizado_us": tiempo_memorizado / repeticiones * 1e6,
+        "str_replace_us": tiempo_ingenuo / repeticiones * 1e6
+    }
+
+
+if __name__ == "__main__":
+    for frases in (1, 10, 100):
+        resultado = medir_rendimiento(frases_parrafo=frases)
+        print(f"{resultado['caracteres']:6d} caracteres: compilado {resultado['compilado_us']:.1f} µs, "
+              f"memorizado {resultado['memorizado_us']:.2f} µs, str.replace {resultado['str_replace_us']:.1f} µs")
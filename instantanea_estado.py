@@ -0,0 +1,172 @@
+"""
+Instantánea de estado de Aria
+Mantiene una vista inmutable del estado que se actualiza por secciones a
+medida que ocurren los eventos, con caché temporal para los sondeos caros
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Callable, Mapping
+
+
+def congelar(valor: Any) -> Any:
+    """Copia inmutable de un valor: dicts de solo lectura, listas como tuplas."""
+    if isinstance(valor, Mapping):
+        return MappingProxyType({clave: congelar(v) for clave, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return frozenset(valor)
+    return valor
+
+
+_SIN_VALOR = object()
+
+
+@dataclass
+class _Sonda:
+    funcion: Callable[[], Any]
+    ttl: Optional[float]
+    en_segundo_plano: bool
+    valor: Any = _SIN_VALOR
+    instante: float = 0.0
+    generacion: int = 0
+    vigente_en: int = -1
+    refrescando: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class InstantaneaEstado:
+    """
+    Estado compuesto por secciones independientes.
+
+    Las secciones se fijan con ``actualizar`` cuando ocurre un evento o se
+    calculan con sondas registradas. Una sonda se vuelve a ejecutar cuando se
+    invalida o cuando vence su ``ttl`` (``None``: solo al invalidarla); las
+    sondas en segundo plano devuelven el último valor mientras se refrescan.
+    ``obtener`` solo reconstruye el nivel superior si alguna sección cambió,
+    así que las lecturas repetidas devuelven el mismo objeto inmutable.
+    """
+
+    def __init__(self, estaticos: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            estaticos: Secciones que no cambian durante la sesión
+        """
+        self.logger = logging.getLogger("InstantaneaEstado")
+        self._secciones: Dict[str, Any] = {clave: congelar(v) for clave, v in (estaticos or {}).items()}
+        self._sondas: Dict[str, _Sonda] = {}
+        self._version = 0
+        self._version_congelada = -1
+        self._congelada: Mapping[str, Any] = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._estadisticas = {"lecturas": 0, "reconstrucciones": 0, "sondeos": 0}
+
+    def actualizar(self, seccion: str, valor: Any):
+        """Sustituye una sección (``None`` la elimina)."""
+        congelado = congelar(valor)
+        with self._lock:
+            if valor is None:
+                if self._secciones.pop(seccion, _SIN_VALOR) is _SIN_VALOR:
+                    return
+            elif self._secciones.get(seccion, _SIN_VALOR) == congelado:
+                return
+            else:
+                self._secciones[seccion] = congelado
+            self._version += 1
+
+    def registrar_sonda(self, seccion: str, funcion: Callable[[], Any], ttl: Optional[float] = None,
+                        en_segundo_plano: bool = False):
+        """
+        Calcula una sección bajo demanda.
+
+        Args:
+            seccion: Nombre de la sección
+            funcion: Devuelve el valor de la sección (``None`` la omite)
+            ttl: Segundos de validez del último valor; ``None`` hasta invalidarla
+            en_segundo_plano: Refrescar sin bloquear al lector una vez hay valor
+        """
+        with self._lock:
+            self._sondas[seccion] = _Sonda(funcion, ttl, en_segundo_plano)
+
+    def invalidar(self, seccion: Optional[str] = None):
+        """Fuerza a recalcular una sonda (o todas) en la próxima lectura."""
+        with self._lock:
+            sondas = self._sondas.values() if seccion is None else [self._sondas[seccion]]
+            for sonda in sondas:
+                sonda.generacion += 1
+
+    def obtener(self) -> Mapping[str, Any]:
+        """Vista inmutable del estado; barata si nada ha cambiado."""
+        ahora = time.monotonic()
+        with self._lock:
+            self._estadisticas["lecturas"] += 1
+            caducadas = [(nombre, sonda) for nombre, sonda in self._sondas.items()
+                         if self._caducada(sonda, ahora)]
+
+        for nombre, sonda in caducadas:
+            if sonda.en_segundo_plano and sonda.valor is not _SIN_VALOR:
+                self._refrescar_en_segundo_plano(nombre, sonda)
+            else:
+                self._refrescar(nombre, sonda)
+
+        with self._lock:
+            if self._version != self._version_congelada:
+                self._congelada = MappingProxyType({
+                    **self._secciones,
+                    "timestamp": datetime.now().isoformat()
+                })
+                self._version_congelada = self._version
+                self._estadisticas["reconstrucciones"] += 1
+            return self._congelada
+
+    def obtener_estadisticas(self) -> Dict[str, int]:
+        """Lecturas, reconstrucciones y sondeos realizados."""
+        with self._lock:
+            return dict(self._estadisticas)
+
+    @staticmethod
+    def _caducada(sonda: _Sonda, ahora: float) -> bool:
+        if sonda.vigente_en != sonda.generacion:
+            return True
+        return sonda.ttl is not None and ahora - sonda.instante > sonda.ttl
+
+    def _refrescar(self, nombre: str, sonda: _Sonda):
+        # Un solo sondeo a la vez por sección; el resto espera y reutiliza su valor
+        with sonda.lock:
+            with self._lock:
+                if not self._caducada(sonda, time.monotonic()):
+                    return
+                generacion = sonda.generacion
+            try:
+                valor = sonda.funcion()
+            except Exception as e:
+                self.logger.warning(f"Error sondeando {nombre}: {e}")
+                valor = None if sonda.valor is _SIN_VALOR else sonda.valor
+
+            self.actualizar(nombre, valor)
+            with self._lock:
+                sonda.valor = valor
+                sonda.instante = time.monotonic()
+                # Si se invalidó durante el sondeo, seguirá caducada
+                sonda.vigente_en = generacion
+                self._estadisticas["sondeos"] += 1
+
+    def _refrescar_en_segundo_plano(self, nombre: str, sonda: _Sonda):
+        with self._lock:
+            if sonda.refrescando:
+                return
+            sonda.refrescando = True
+
+        def refrescar():
+            try:
+                self._refrescar(nombre, sonda)
+            finally:
+                with self._lock:
+                    sonda.refrescando = False
+
+        threading.Thread(target=refrescar, name=f"aria-sonda-{nombre}", daemon=True).start()
@@ -3,13 +3,30 @@ Sistema IA Aria Universal - Punto de entrada principal con acceso total
 Integra capacidades sensoriales y control administrativo completo
 """
 
+import asyncio
 import logging
+import queue
+import threading
 import time
 import os
 import sys
-from typing import Dict, Any, Optional, List
+from concurrent.futures import (
+    Future, CancelledError, ThreadPoolExecutor, ProcessPoolExecutor,
+    TimeoutError as FuturoTimeoutError, wait
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial, lru_cache
+from typing import Dict, Any, Optional, List, Iterator, Mapping
 from datetime import datetime
 
+from registro_tareas import GeneradorIdTareas, RegistroTareas
+from registro_subsistemas import RegistroSubsistemas, SubsistemaPerezoso
+from pool_conexiones import PoolConexiones
+from enrutador_intenciones import EnrutadorIntenciones
+from despachador_comandos import DespachadorComandos, ErrorComando, Parametro
+from instantanea_estado import InstantaneaEstado, congelar
+
 # Importaciones con manejo de errores
 def importar_modulo_seguro(modulo, nombre_clase=None):
     """Importa un módulo de manera segura, retornando None si falla."""
@@ -23,89 +40,171 @@ def importar_modulo_seguro(modulo, nombre_clase=None):
         print(f"Advertencia: No se pudo importar {modulo}: {e}")
         return None
 
-# Importar componentes principales
-try:
-    from nucleo_cognitivo.red_neuronal.RedNeuronal2 import Cerebro
-    from nucleo_cognitivo.procesamiento_paralelo.GestorTareas import GestorTareas, PrioridadTarea, Tarea
-    from nucleo_cognitivo.adaptabilidad_universal.SistemaAdaptativo import SistemaAdaptativo, ModoOperacion
-    print("✓ Núcleo cognitivo cargado")
-except ImportError as e:
-    print(f"⚠ Error cargando núcleo cognitivo: {e}")
-    Cerebro = None
-    GestorTareas = None
-    SistemaAdaptativo = None
-
-# Importar módulo avanzado
-from D.X2.mejoras.modulo_avanzado import aria_avanzada
+# Subsistemas de Aria: nombre -> (módulo, atributo, crear instancia).
+# Ninguno se importa al cargar este módulo; el registro los carga en el
+# primer acceso o al precalentarlos explícitamente.
+MODULO_TAREAS = "nucleo_cognitivo.procesamiento_paralelo.GestorTareas"
+
+SUBSISTEMAS = {
+    # Núcleo cognitivo
+    "cerebro": ("nucleo_cognitivo.red_neuronal.RedNeuronal2", "Cerebro", True),
+    "gestor_tareas": (MODULO_TAREAS, "GestorTareas", True),
+    "sistema_adaptativo": ("nucleo_cognitivo.adaptabilidad_universal.SistemaAdaptativo", "SistemaAdaptativo", True),
+    "personalidad": ("personalidad.personalidad.PersonalidadCentral", "PersonalidadCentral", True),
+    # Sistema sensorial
+    "sistema_sensorial": ("interfaz_sensorial.integrador_sensorial", "IntegradorSensorial", True),
+    # Procesamiento de lenguaje
+    "gramatica": ("lenguaje_y_abstraccion.gramatica_espanol", "GramaticaEspanol", True),
+    "procesador_lenguaje": ("lenguaje_y_abstraccion.LenguajeYAbstraccion", "LenguajeYAbstraccion", True),
+    # Dominios especializados
+    "gestor_administrativo": ("dominios_especializados.administrativo.GestorAdministrativo", "GestorAdministrativo", True),
+    "inteligencia_militar": ("dominios_especializados.militar.InteligenciaMilitar", "InteligenciaMilitar", True),
+    # Módulos avanzados y de transferencia (instancias ya creadas por el módulo)
+    "aria_avanzada": ("D.X2.mejoras.modulo_avanzado", "aria_avanzada", False),
+    "gestor_conexiones": ("conexiones", "gestor_conexiones", False),
+    "transferencia_datos": ("conexiones.transferencia", "transferencia_datos", False),
+}
 
-# Importar módulo de conexiones y transferencia
-from conexiones import gestor_conexiones
-from conexiones.transferencia import transferencia_datos
+# Conexiones: nombre -> (módulo, clase)
+CONEXIONES = {
+    "local": ("conexiones.local", "ConexionLocal"),
+    "nube": ("conexiones.nube", "ConexionNube"),
+    "onedrive": ("conexiones.onedrive", "ConexionOneDrive"),
+    "sd": ("conexiones.sd", "ConexionSD"),
+    "servidor": ("conexiones.servidor", "ConexionServidor"),
+    "contenedor": ("conexiones.contenedor", "Contenedor"),
+}
+
+# Conexiones servidas desde un pool: nombre -> parámetros de PoolConexiones
+POOLS_CONEXIONES = {
+    "servidor": {"minimo": 1, "maximo": 8},
+    "nube": {"minimo": 1, "maximo": 4},
+    "onedrive": {"minimo": 1, "maximo": 4},
+}
 
-# Importar sistema sensorial
-try:
-    from interfaz_sensorial.integrador_sensorial import IntegradorSensorial
-    from interfaz_sensorial.ojos import SistemaVisual
-    from interfaz_sensorial.oido import SistemaAuditivo
-    from interfaz_sensorial.voz import SistemaVocal
-    print("✓ Sistema sensorial cargado")
-except ImportError as e:
-    print(f"⚠ Error cargando sistema sensorial: {e}")
-    IntegradorSensorial = None
-    SistemaVisual = None
-    SistemaAuditivo = None
-    SistemaVocal = None
-
-# Importar procesamiento de lenguaje
-try:
-    from lenguaje_y_abstraccion.gramatica_espanol import GramaticaEspanol
-    from lenguaje_y_abstraccion.LenguajeYAbstraccion import LenguajeYAbstraccion
-    print("✓ Procesamiento de lenguaje cargado")
-except ImportError as e:
-    print(f"⚠ Error cargando procesamiento de lenguaje: {e}")
-    GramaticaEspanol = None
-    LenguajeYAbstraccion = None
-
-# Importar dominios especializados
-try:
-    from dominios_especializados.administrativo.GestorAdministrativo import GestorAdministrativo
-    from dominios_especializados.militar.InteligenciaMilitar import InteligenciaMilitar, NivelSeguridad
-    print("✓ Dominios especializados cargados")
-except ImportError as e:
-    print(f"⚠ Error cargando dominios especializados: {e}")
-    GestorAdministrativo = None
-    InteligenciaMilitar = None
-
-# Importar personalidad
-try:
-    from personalidad.personalidad.PersonalidadCentral import PersonalidadCentral
-    print("✓ Personalidad cargada")
-except ImportError as e:
-    print(f"⚠ Error cargando personalidad: {e}")
-    PersonalidadCentral = None
-
-# Importar conexiones
-try:
-    from conexiones.local import ConexionLocal
-    from conexiones.nube import ConexionNube
-    from conexiones.onedrive import ConexionOneDrive
-    from conexiones.sd import ConexionSD
-    from conexiones.servidor import ConexionServidor
-    from conexiones.contenedor import Contenedor
-    print("✓ Conexiones cargadas")
-except ImportError as e:
-    print(f"⚠ Error cargando conexiones: {e}")
-    ConexionLocal = None
-    ConexionNube = None
-    ConexionOneDrive = None
-    ConexionSD = None
-    ConexionServidor = None
-    Contenedor = None
+# Subsistemas que se cargan junto con AriaUniversal.inicializar
+PRECALENTAR_INICIO = ["sistema_sensorial", "gestor_tareas"]
+
+# Conexiones que deben estar listas antes de dar la sesión por iniciada
+CONEXIONES_ESENCIALES = ["local"]
+
+# Tiempo máximo (segundos) de inicialización o cierre de cada conexión
+TIMEOUT_CONEXION = 10.0
+
+# Segundos de validez de los sondeos caros de obtener_estado_completo
+TTL_SONDEO_CONEXIONES = 5.0
+TTL_SONDEO_SENSORIAL = 2.0
+TTL_SONDEO_SUBSISTEMAS = 1.0
+
+@lru_cache(maxsize=None)
+def importar_clase(modulo: str, nombre_clase: str):
+    """Importa una clase bajo demanda y la guarda en caché."""
+    return importar_modulo_seguro(modulo, nombre_clase)
+
+# Tipos de solicitud intensivos en CPU: en modo asíncrono se ejecutan en un pool de procesos
+TIPOS_SOLICITUD_CPU = {"militar"}
+
+# Instancias de dominio creadas dentro de cada proceso del pool
+_dominios_proceso: Dict[str, Any] = {}
+
+def _convertir_enum(enum_cls, valor, defecto):
+    """Convierte el nombre de un miembro (str) al enum, con valor por defecto."""
+    if isinstance(valor, str):
+        return getattr(enum_cls, valor.upper(), defecto)
+    return valor
+
+def _enums_dominio(tipo: str) -> Dict[str, tuple]:
+    """Campos de ``datos`` que cada dominio recibe como enum: campo -> (enum, nombre por defecto, defecto)."""
+    if tipo == "administrativo":
+        from dominios_especializados.administrativo.GestorAdministrativo import TipoDocumento, NivelPrioridad
+        
+        return {
+            "tipo_documento": (TipoDocumento, "informe", TipoDocumento.INFORME),
+            "prioridad": (NivelPrioridad, "media", NivelPrioridad.MEDIA)
+        }
+    elif tipo == "militar":
+        from dominios_especializados.militar.InteligenciaMilitar import TipoAmenaza
+        
+        return {"tipo_amenaza": (TipoAmenaza, "cibernetica", TipoAmenaza.CIBERNETICA)}
+    raise ValueError(f"Dominio no soportado: {tipo}")
+
+def _convertir_campos(campos: Dict[str, tuple], datos: Dict[str, Any],
+                      cache: Optional[Dict[tuple, Any]] = None) -> Dict[str, Any]:
+    """
+    Convierte los campos enum de una solicitud.
+    
+    ``cache`` permite reutilizar las conversiones entre las solicitudes de
+    un mismo lote, de modo que cada nombre se resuelve una sola vez.
+    """
+    convertidos = {}
+    for campo, (enum_cls, nombre_defecto, defecto) in campos.items():
+        valor = datos.get(campo, nombre_defecto)
+        if cache is None or not isinstance(valor, str):
+            convertidos[campo] = _convertir_enum(enum_cls, valor, defecto)
+            continue
+        
+        clave = (campo, valor)
+        if clave not in cache:
+            cache[clave] = _convertir_enum(enum_cls, valor, defecto)
+        convertidos[campo] = cache[clave]
+    return convertidos
+
+def _invocar_dominio(dominio, tipo: str, datos: Dict[str, Any], convertidos: Dict[str, Any]) -> Any:
+    """Llama al manejador del dominio con los enums ya convertidos."""
+    if tipo == "administrativo":
+        return dominio.generar_documento(
+            tipo=convertidos["tipo_documento"],
+            contenido=datos,
+            prioridad=convertidos["prioridad"]
+        )
+    return dominio.analizar_amenaza(
+        datos=datos,
+        tipo=convertidos["tipo_amenaza"]
+    )
+
+def _subsistema_dominio(tipo: str) -> str:
+    """Subsistema que atiende un dominio especializado."""
+    return "gestor_administrativo" if tipo == "administrativo" else "inteligencia_militar"
+
+def _dominio_no_disponible(tipo: str) -> RuntimeError:
+    """Error de un dominio cuyo subsistema no se pudo cargar (igual en hilos y en procesos)."""
+    return RuntimeError(f"Subsistema {_subsistema_dominio(tipo)} no disponible")
+
+def _ejecutar_dominio(dominio, tipo: str, datos: Dict[str, Any]) -> Any:
+    """Ejecuta el manejador de un dominio especializado (administrativo o militar)."""
+    return _invocar_dominio(dominio, tipo, datos, _convertir_campos(_enums_dominio(tipo), datos))
+
+def _procesar_en_proceso(tipo: str, datos: Dict[str, Any]) -> Any:
+    """
+    Punto de entrada de las solicitudes ejecutadas en el pool de procesos.
+    
+    Cada proceso crea su propia instancia del dominio en la primera llamada
+    y la reutiliza después; el estado no se comparte con el proceso principal.
+    """
+    dominio = _dominios_proceso.get(tipo)
+    if dominio is None:
+        modulo, clase, _ = SUBSISTEMAS[_subsistema_dominio(tipo)]
+        fabrica = importar_clase(modulo, clase)
+        if fabrica is None:
+            raise _dominio_no_disponible(tipo)
+        dominio = _dominios_proceso[tipo] = fabrica()
+    return _ejecutar_dominio(dominio, tipo, datos)
 
 class AriaUniversal:
     """Sistema IA Aria Universal con acceso total y capacidades sensoriales."""
     
-    def __init__(self, modo_admin: bool = True):
+    # Subsistemas: se importan y crean en el primer acceso
+    cerebro = SubsistemaPerezoso()
+    gestor_tareas = SubsistemaPerezoso()
+    sistema_adaptativo = SubsistemaPerezoso()
+    personalidad = SubsistemaPerezoso()
+    sistema_sensorial = SubsistemaPerezoso()
+    gramatica = SubsistemaPerezoso()
+    procesador_lenguaje = SubsistemaPerezoso()
+    gestor_administrativo = SubsistemaPerezoso()
+    inteligencia_militar = SubsistemaPerezoso()
+    
+    def __init__(self, modo_admin: bool = True, precalentar: Optional[List[str]] = None):
         # Configurar logging avanzado
         os.makedirs('logs', exist_ok=True)
         logging.basicConfig(
@@ -125,22 +224,22 @@ class AriaUniversal:
             "acceso_red": True
         } if modo_admin else {}
         
-        # Inicializar núcleo cognitivo
-        self.cerebro = Cerebro() if Cerebro else None
-        self.gestor_tareas = GestorTareas() if GestorTareas else None
-        self.sistema_adaptativo = SistemaAdaptativo() if SistemaAdaptativo else None
-        self.personalidad = PersonalidadCentral() if PersonalidadCentral else None
-        
-        # Inicializar sistema sensorial
-        self.sistema_sensorial = IntegradorSensorial() if IntegradorSensorial else None
-        
-        # Inicializar procesamiento de lenguaje
-        self.gramatica = GramaticaEspanol() if GramaticaEspanol else None
-        self.procesador_lenguaje = LenguajeYAbstraccion() if LenguajeYAbstraccion else None
+        # Registro de subsistemas con carga diferida
+        self.subsistemas = RegistroSubsistemas(
+            {
+                **SUBSISTEMAS,
+                **{f"conexion_{nombre}": (modulo, clase, True) for nombre, (modulo, clase) in CONEXIONES.items()}
+            },
+            importador=importar_clase
+        )
+        self._conexiones: Optional[Dict[str, Any]] = None
+        self.timeout_conexion = TIMEOUT_CONEXION
+        self.pools: Dict[str, PoolConexiones] = {}
         
-        # Inicializar dominios especializados con acceso total
-        self.gestor_administrativo = GestorAdministrativo() if GestorAdministrativo else None
-        self.inteligencia_militar = InteligenciaMilitar() if InteligenciaMilitar else None
+        # Enrutador de comandos de voz (compilado una sola vez)
+        self.enrutador_voz = self._crear_enrutador_voz()
+        self.comandos_admin = self._crear_despachador_admin()
+        self._lock_estado = threading.Lock()
         
         # Estado del sistema
         self.estado = {
@@ -148,34 +247,75 @@ class AriaUniversal:
             "modo_admin": modo_admin,
             "sistemas_activos": [],
             "conexiones_activas": [],
-            "tareas_pendientes": [],
             "estado_sensorial": None
         }
         
-        # Inicializar conexiones
-        self.conexiones = {}
-        if ConexionLocal:
-            self.conexiones["local"] = ConexionLocal()
-        if ConexionNube:
-            self.conexiones["nube"] = ConexionNube()
-        if ConexionOneDrive:
-            self.conexiones["onedrive"] = ConexionOneDrive()
-        if ConexionSD:
-            self.conexiones["sd"] = ConexionSD()
-        if ConexionServidor:
-            self.conexiones["servidor"] = ConexionServidor()
-        if Contenedor:
-            self.conexiones["contenedor"] = Contenedor()
+        # Instantánea del estado para lecturas frecuentes (monitorización);
+        # cada sección se recalcula solo cuando cambia o vence su sondeo
+        self.instantanea = InstantaneaEstado({"modo_admin": modo_admin, "permisos": self.permisos_admin})
+        self.instantanea.registrar_sonda("sistema", self._sondear_sistema)
+        self.instantanea.registrar_sonda("tareas", self._sondear_tareas)
+        self.instantanea.registrar_sonda("sistemas", self._sondear_subsistemas, ttl=TTL_SONDEO_SUBSISTEMAS)
+        self.instantanea.registrar_sonda("conexiones", self._sondear_conexiones,
+                                         ttl=TTL_SONDEO_CONEXIONES, en_segundo_plano=True)
+        self.instantanea.registrar_sonda("sensorial", self._sondear_sensorial,
+                                         ttl=TTL_SONDEO_SENSORIAL, en_segundo_plano=True)
+        
+        # Registro de tareas enviadas al gestor
+        self.generador_ids = GeneradorIdTareas()
+        self.registro_tareas = RegistroTareas(al_cambiar=partial(self.instantanea.invalidar, "tareas"))
+        
+        # Pools de la API asíncrona (se crean en el primer uso)
+        self.tipos_cpu = set(TIPOS_SOLICITUD_CPU)
+        self._ejecutor_hilos: Optional[ThreadPoolExecutor] = None
+        self._ejecutor_procesos: Optional[ProcessPoolExecutor] = None
+        
+        if precalentar:
+            self.precalentar(precalentar)
+
+    @property
+    def conexiones(self) -> Dict[str, Any]:
+        """Conexiones disponibles; se crean en el primer acceso."""
+        if self._conexiones is None:
+            self._conexiones = {}
+            for nombre in CONEXIONES:
+                conexion = self.subsistemas.obtener(f"conexion_{nombre}")
+                if conexion:
+                    self._conexiones[nombre] = conexion
+        return self._conexiones
+
+    def precalentar(self, nombres: Optional[List[str]] = None, en_segundo_plano: bool = False) -> Dict[str, bool]:
+        """
+        Carga por adelantado subsistemas para no pagar su coste en el primer uso.
+        
+        Args:
+            nombres: Subsistemas a cargar (ver SUBSISTEMAS; "conexiones" carga
+                todas las conexiones). Todos si es None.
+            en_segundo_plano: Cargar en un hilo aparte sin esperar
+            
+        Returns:
+            Dict nombre -> disponible (vacío si se carga en segundo plano)
+        """
+        if nombres is None:
+            nombres = list(SUBSISTEMAS) + ["conexiones"]
+        nombres = [n for nombre in nombres
+                   for n in ([f"conexion_{c}" for c in CONEXIONES] if nombre == "conexiones" else [nombre])]
+        return self.subsistemas.precalentar(nombres, en_segundo_plano=en_segundo_plano)
 
     def inicializar(self) -> bool:
         """Inicializa el sistema."""
         try:
             self.logger.info("Iniciando Sistema IA Aria Universal...")
+            self.precalentar(PRECALENTAR_INICIO)
+            
+            # Inicializar conexiones en paralelo mientras arranca el resto
+            futuros_conexiones = self._iniciar_conexiones()
             
             # Inicializar sistema sensorial
             if self.sistema_sensorial:
                 self.sistema_sensorial.iniciar()
                 self.estado["sistemas_activos"].append("sensorial")
+                self.instantanea.invalidar("sistema")
                 self.logger.info("Sistema sensorial iniciado")
                 
                 # Mensaje de bienvenida por voz inmediato
@@ -186,16 +326,13 @@ class AriaUniversal:
                     "¿En qué puedo ayudarte hoy?"
                 )
             
-            # Inicializar conexiones con privilegios de administrador
-            for nombre, conexion in self.conexiones.items():
-                try:
-                    if conexion.inicializar():
-                        self.logger.info(f"Conexión {nombre} inicializada")
-                        self.estado["conexiones_activas"].append(nombre)
-                    else:
-                        self.logger.warning(f"No se pudo inicializar conexión {nombre}")
-                except Exception as e:
-                    self.logger.error(f"Error inicializando conexión {nombre}: {str(e)}")
+            # La sesión queda lista en cuanto responden las conexiones esenciales;
+            # el resto termina en segundo plano
+            esenciales = [futuros_conexiones[n] for n in CONEXIONES_ESENCIALES if n in futuros_conexiones]
+            wait(esenciales, timeout=self.timeout_conexion)
+            pendientes = self.conexiones_pendientes()
+            if pendientes:
+                self.logger.info(f"Conexiones aún en curso: {', '.join(pendientes)}")
             
             # Verificar permisos de administrador
             if self.modo_admin:
@@ -207,52 +344,254 @@ class AriaUniversal:
             
             self.logger.info("Sistema Aria Universal inicializado correctamente")
             self.estado["estado"] = "activo"
+            self.instantanea.invalidar("sistema")
             return True
         except Exception as e:
             self.logger.error(f"Error inicializando sistema: {str(e)}")
             return False
 
-    def procesar_solicitud(self, tipo: str, datos: Dict[str, Any], prioridad_admin: bool = False) -> Dict[str, Any]:
-        """Procesa una solicitud con opción de prioridad administrativa."""
+    def _iniciar_conexiones(self) -> Dict[str, Future]:
+        """
+        Lanza la inicialización de todas las conexiones en paralelo.
+        
+        Returns:
+            Dict nombre -> Future con el resultado de ``inicializar()``
+        """
+        conexiones = self.conexiones
+        with self._lock_estado:
+            self.estado["conexiones_pendientes"] = list(conexiones)
+            self.estado["conexiones_fallidas"] = []
+        self.instantanea.invalidar("sistema")
+        if not conexiones:
+            return {}
+        
+        pool = ThreadPoolExecutor(max_workers=len(conexiones), thread_name_prefix="aria-conexion")
+        futuros = {}
+        for nombre, conexion in conexiones.items():
+            futuros[nombre] = pool.submit(conexion.inicializar)
+            futuros[nombre].add_done_callback(partial(self._conexion_inicializada, nombre))
+        pool.shutdown(wait=False)
+        
+        # Vigilar el tiempo límite de cada conexión sin bloquear el arranque
+        threading.Thread(
+            target=self._vigilar_conexiones, args=(futuros,),
+            name="aria-vigilancia-conexiones", daemon=True
+        ).start()
+        return futuros
+
+    def _conexion_inicializada(self, nombre: str, futuro: Future):
+        """Actualiza el estado cuando termina la inicialización de una conexión."""
         try:
-            inicio = time.time()
-            
-            # Crear tarea con prioridad administrativa si corresponde
-            prioridad = PrioridadTarea.CRITICA if (self.modo_admin and prioridad_admin) else PrioridadTarea.ALTA
-            
-            tarea = Tarea(
-                id=f"TAREA-{int(time.time())}",
-                funcion=self._procesar_segun_tipo,
-                argumentos={"tipo": tipo, "datos": datos},
-                prioridad=prioridad
-            )
-            
-            # Registrar tarea en estado
-            self.estado["tareas_pendientes"].append({
-                "id": tarea.id,
-                "tipo": tipo,
-                "prioridad": prioridad.name,
-                "inicio": datetime.now().isoformat()
-            })
+            exito = futuro.result()
+            error = None
+        except Exception as e:
+            exito = False
+            error = str(e)
+        
+        with self._lock_estado:
+            if nombre in self.estado.get("conexiones_pendientes", []):
+                self.estado["conexiones_pendientes"].remove(nombre)
+            if exito:
+                if nombre not in self.estado["conexiones_activas"]:
+                    self.estado["conexiones_activas"].append(nombre)
+                if nombre in self.estado.get("conexiones_fallidas", []):
+                    self.estado["conexiones_fallidas"].remove(nombre)
+            elif nombre not in self.estado.setdefault("conexiones_fallidas", []):
+                self.estado["conexiones_fallidas"].append(nombre)
+        self.instantanea.invalidar("sistema")
+        self.instantanea.invalidar("conexiones")
+        
+        if exito:
+            self.logger.info(f"Conexión {nombre} inicializada")
+            if nombre in POOLS_CONEXIONES and nombre not in self.pools:
+                self._activar_pool(nombre)
+        elif error:
+            self.logger.error(f"Error inicializando conexión {nombre}: {error}")
+        else:
+            self.logger.warning(f"No se pudo inicializar conexión {nombre}")
+
+    def _activar_pool(self, nombre: str):
+        """Incorpora la conexión ya inicializada a un pool y arranca su mantenimiento."""
+        modulo, clase = CONEXIONES[nombre]
+        pool = PoolConexiones(nombre, fabrica=importar_clase(modulo, clase), **POOLS_CONEXIONES[nombre])
+        pool.adoptar(self.conexiones[nombre])
+        pool.iniciar()
+        self.pools[nombre] = pool
+        self.logger.info(f"Pool de conexiones {nombre} activo")
+
+    @contextmanager
+    def prestar_conexion(self, nombre: str, timeout: Optional[float] = None):
+        """
+        Presta una conexión durante un bloque ``with``.
+        
+        Los tipos con pool entregan una conexión sana del pool (reconectada si
+        hacía falta); el resto entrega la conexión compartida.
+        
+        Args:
+            nombre: Nombre de la conexión (local, nube, servidor, ...)
+            timeout: Espera máxima si el pool está agotado
+        """
+        pool = self.pools.get(nombre)
+        if pool:
+            with pool.prestar(timeout) as conexion:
+                yield conexion
+        else:
+            yield self.conexiones[nombre]
+
+    def _vigilar_conexiones(self, futuros: Dict[str, Future]):
+        """Marca como fallidas las conexiones que superan el tiempo límite."""
+        _, sin_terminar = wait(list(futuros.values()), timeout=self.timeout_conexion)
+        for nombre, futuro in futuros.items():
+            if futuro in sin_terminar:
+                # Si termina más tarde, _conexion_inicializada corrige el estado
+                self.logger.warning(f"Conexión {nombre} sin respuesta tras {self.timeout_conexion}s")
+                with self._lock_estado:
+                    if nombre in self.estado.get("conexiones_pendientes", []):
+                        self.estado["conexiones_pendientes"].remove(nombre)
+                    if nombre not in self.estado.setdefault("conexiones_fallidas", []):
+                        self.estado["conexiones_fallidas"].append(nombre)
+                self.instantanea.invalidar("sistema")
+
+    def conexiones_pendientes(self) -> List[str]:
+        """Conexiones cuya inicialización sigue en curso."""
+        with self._lock_estado:
+            return list(self.estado.get("conexiones_pendientes", []))
+
+    def _cerrar_conexiones(self) -> List[str]:
+        """
+        Cierra todas las conexiones en paralelo con tiempo límite.
+        
+        Returns:
+            Conexiones que no terminaron de cerrarse a tiempo
+        """
+        conexiones = self._conexiones or {}
+        if not conexiones:
+            return []
+        
+        # Las conexiones con pool se cierran a través de él
+        pools, self.pools = self.pools, {}
+        ejecutor = ThreadPoolExecutor(max_workers=len(conexiones), thread_name_prefix="aria-cierre")
+        futuros = {
+            ejecutor.submit(pools[nombre].cerrar if nombre in pools else conexion.cerrar): nombre
+            for nombre, conexion in conexiones.items()
+        }
+        ejecutor.shutdown(wait=False)
+        
+        terminados, sin_terminar = wait(list(futuros), timeout=self.timeout_conexion)
+        for futuro in terminados:
+            nombre = futuros[futuro]
+            try:
+                if futuro.result():
+                    self.logger.info(f"Conexión {nombre} cerrada")
+                else:
+                    self.logger.warning(f"Error cerrando conexión {nombre}")
+            except Exception as e:
+                self.logger.error(f"Error cerrando conexión {nombre}: {str(e)}")
+        
+        pendientes = sorted(futuros[f] for f in sin_terminar)
+        if pendientes:
+            self.logger.warning(f"Conexiones sin cerrar tras {self.timeout_conexion}s: {', '.join(pendientes)}")
+        
+        with self._lock_estado:
+            self.estado["conexiones_activas"] = []
+            self.estado["conexiones_pendientes"] = []
+        self.instantanea.invalidar("sistema")
+        self.instantanea.invalidar("conexiones")
+        return pendientes
+
+    def enviar_solicitud(self, tipo: str, datos: Dict[str, Any], prioridad_admin: bool = False) -> Future:
+        """
+        Envía una solicitud al gestor de tareas sin bloquear.
+        
+        Args:
+            tipo: Tipo de solicitud (administrativo, militar, ...)
+            datos: Datos de la solicitud
+            prioridad_admin: Usar prioridad crítica en modo administrador
             
-            # Agregar tarea al gestor
-            self.gestor_tareas.agregar_tarea(tarea)
+        Returns:
+            Future que se resuelve en cuanto el trabajador termina la tarea.
+            Cancelarlo antes de que la tarea empiece evita su ejecución.
+        """
+        futuro = Future()
+        prioridad = self._prioridad_solicitud(prioridad_admin)
+        
+        Tarea = importar_clase(MODULO_TAREAS, "Tarea")
+        tarea = Tarea(
+            id=self.generador_ids.generar(),
+            funcion=partial(self._ejecutar_con_futuro, futuro),
+            argumentos={"tipo": tipo, "datos": datos},
+            prioridad=prioridad
+        )
+        
+        # Registrar tarea; se retira del registro en cuanto termina
+        self.registro_tareas.registrar(tarea.id, tipo=tipo, prioridad=prioridad.name)
+        futuro.add_done_callback(partial(self._finalizar_registro_tarea, tarea.id))
+        
+        # Agregar tarea al gestor
+        self.gestor_tareas.agregar_tarea(tarea)
+        return futuro
+
+    def _finalizar_registro_tarea(self, id_tarea: str, futuro: Future):
+        """Pasa una tarea terminada del registro de pendientes al de recientes."""
+        if futuro.cancelled():
+            self.registro_tareas.finalizar(id_tarea, estado="cancelada")
+        elif futuro.exception() is not None:
+            self.registro_tareas.finalizar(id_tarea, estado="error", error=str(futuro.exception()))
+        else:
+            self.registro_tareas.finalizar(id_tarea)
+
+    def _prioridad_solicitud(self, prioridad_admin: bool):
+        """Determina la prioridad de tarea para una solicitud."""
+        PrioridadTarea = importar_clase(MODULO_TAREAS, "PrioridadTarea")
+        return PrioridadTarea.CRITICA if (self.modo_admin and prioridad_admin) else PrioridadTarea.ALTA
+
+    def _ejecutar_con_futuro(self, futuro: Future, tipo: str, datos: Dict[str, Any]) -> Any:
+        """Ejecuta la solicitud en el trabajador y resuelve su Future."""
+        if not futuro.set_running_or_notify_cancel():
+            # Cancelada antes de empezar
+            return None
+        
+        try:
+            resultado = self._procesar_segun_tipo(tipo, datos)
+        except Exception as e:
+            futuro.set_exception(e)
+            raise
+        
+        futuro.set_result(resultado)
+        return resultado
+
+    def procesar_solicitud(self, tipo: str, datos: Dict[str, Any], prioridad_admin: bool = False,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Procesa una solicitud con opción de prioridad administrativa y tiempo límite."""
+        try:
+            inicio = time.time()
+            prioridad = self._prioridad_solicitud(prioridad_admin)
             
-            # Esperar resultado
-            while not tarea.completada and not tarea.error:
-                time.sleep(0.1)
+            # Esperar resultado: el Future despierta al llamador al terminar la tarea
+            futuro = self.enviar_solicitud(tipo, datos, prioridad_admin)
+            resultado = None
+            error = None
+            try:
+                resultado = futuro.result(timeout=timeout)
+            except FuturoTimeoutError:
+                futuro.cancel()
+                error = f"Tiempo de espera agotado ({timeout}s)"
+            except CancelledError:
+                error = "Tarea cancelada"
+            except Exception as e:
+                error = str(e)
             
             tiempo_proceso = time.time() - inicio
             self.logger.info(f"Solicitud procesada en {tiempo_proceso:.2f}s")
             
             # Notificar resultado por voz si es relevante
-            if self.sistema_sensorial and (tarea.error or self.modo_admin):
-                mensaje = "Error en la tarea" if tarea.error else "Tarea completada exitosamente"
+            if self.sistema_sensorial and (error or self.modo_admin):
+                mensaje = "Error en la tarea" if error else "Tarea completada exitosamente"
                 self.sistema_sensorial.decir(mensaje)
 
             return {
-                "resultado": tarea.resultado if not tarea.error else None,
-                "error": tarea.error,
+                "resultado": resultado if not error else None,
+                "error": error,
                 "tiempo_proceso": tiempo_proceso,
                 "modo_admin": self.modo_admin,
                 "prioridad": prioridad.name
@@ -261,47 +600,259 @@ class AriaUniversal:
             self.logger.error(f"Error procesando solicitud: {str(e)}")
             return {"error": str(e)}
 
-    def _procesar_segun_tipo(self, tipo: str, datos: Dict[str, Any]) -> Any:
-        """Procesa una solicitud según su tipo."""
-        if tipo == "administrativo":
-            from dominios_especializados.administrativo.GestorAdministrativo import TipoDocumento, NivelPrioridad
-            
-            # Convertir string a enum
-            tipo_doc = datos.get("tipo_documento", "informe")
-            if isinstance(tipo_doc, str):
-                tipo_doc = getattr(TipoDocumento, tipo_doc.upper(), TipoDocumento.INFORME)
-            
-            prioridad = datos.get("prioridad", "media")
-            if isinstance(prioridad, str):
-                prioridad = getattr(NivelPrioridad, prioridad.upper(), NivelPrioridad.MEDIA)
+    def procesar_lote(self, solicitudes: List[Dict[str, Any]], prioridad_admin: bool = False,
+                      timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Procesa un lote de solicitudes agrupándolas por tipo.
+        
+        Cada grupo se envía al gestor de tareas como una única tarea que
+        convierte los enums una sola vez y llama al manejador del dominio
+        para todas sus solicitudes. Las tareas se envían al llamar a este
+        método; los resultados se entregan a medida que terminan.
+        
+        Args:
+            solicitudes: Lista de dicts con "tipo" y "datos"
+            prioridad_admin: Usar prioridad crítica en modo administrador
+            timeout: Tiempo máximo de espera del lote completo en segundos
             
-            return self.gestor_administrativo.generar_documento(
-                tipo=tipo_doc,
-                contenido=datos,
+        Returns:
+            Iterador de dicts con "indice" (posición en ``solicitudes``),
+            "tipo", "resultado" y "error"
+        """
+        prioridad = self._prioridad_solicitud(prioridad_admin)
+        cola: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        
+        # Agrupar por tipo conservando el índice original
+        grupos: Dict[str, List[tuple]] = {}
+        for indice, solicitud in enumerate(solicitudes):
+            grupos.setdefault(solicitud.get("tipo"), []).append((indice, solicitud.get("datos", {})))
+        
+        Tarea = importar_clase(MODULO_TAREAS, "Tarea")
+        for tipo, lote in grupos.items():
+            id_tarea = self.generador_ids.generar()
+            self.registro_tareas.registrar(id_tarea, tipo=tipo, prioridad=prioridad.name, solicitudes=len(lote))
+            self.gestor_tareas.agregar_tarea(Tarea(
+                id=id_tarea,
+                funcion=partial(self._procesar_grupo, cola, id_tarea),
+                argumentos={"tipo": tipo, "lote": lote},
                 prioridad=prioridad
-            )
-        elif tipo == "militar":
-            from dominios_especializados.militar.InteligenciaMilitar import TipoAmenaza, NivelSeguridad
-            
-            # Convertir string a enum
-            tipo_amenaza = datos.get("tipo_amenaza", "cibernetica")
-            if isinstance(tipo_amenaza, str):
-                # Mapear nombres especiales
-                if tipo_amenaza == "hibrida":
-                    tipo_amenaza = TipoAmenaza.HIBRIDA
-                else:
-                    tipo_amenaza = getattr(TipoAmenaza, tipo_amenaza.upper(), TipoAmenaza.CIBERNETICA)
+            ))
+        
+        self.logger.info(f"Lote de {len(solicitudes)} solicitudes enviado en {len(grupos)} tareas")
+        return self._recibir_lote(cola, len(solicitudes), timeout)
+
+    def _recibir_lote(self, cola: "queue.Queue[Dict[str, Any]]", total: int,
+                      timeout: Optional[float]) -> Iterator[Dict[str, Any]]:
+        """Entrega los resultados de un lote a medida que llegan a la cola."""
+        limite = time.time() + timeout if timeout is not None else None
+        entregados = set()
+        
+        while len(entregados) < total:
+            espera = None if limite is None else max(0.0, limite - time.time())
+            try:
+                resultado = cola.get(timeout=espera)
+            except queue.Empty:
+                self.logger.warning(f"Lote incompleto: {total - len(entregados)} solicitudes sin resultado")
+                return
             
-            return self.inteligencia_militar.analizar_amenaza(
-                datos=datos,
-                tipo=tipo_amenaza
-            )
+            entregados.add(resultado["indice"])
+            yield resultado
+
+    def _procesar_grupo(self, cola: "queue.Queue[Dict[str, Any]]", id_tarea: str,
+                        tipo: str, lote: List[tuple]) -> int:
+        """Ejecuta en el trabajador todas las solicitudes de un grupo del mismo tipo."""
+        procesadas = 0
+        try:
+            ejecutar = self._ejecutor_grupo(tipo)
+            for indice, datos in lote:
+                try:
+                    cola.put({"indice": indice, "tipo": tipo, "resultado": ejecutar(datos), "error": None})
+                except Exception as e:
+                    cola.put({"indice": indice, "tipo": tipo, "resultado": None, "error": str(e)})
+                procesadas += 1
+        except Exception as e:
+            # Fallo al preparar el grupo: todas las solicitudes restantes fallan
+            for indice, _ in lote[procesadas:]:
+                cola.put({"indice": indice, "tipo": tipo, "resultado": None, "error": str(e)})
+        finally:
+            self.registro_tareas.finalizar(id_tarea)
+        return procesadas
+
+    def _ejecutor_grupo(self, tipo: str):
+        """Prepara una función datos -> resultado que comparte el estado precalculado del grupo."""
+        if tipo in ("administrativo", "militar"):
+            dominio = self._dominio(tipo)
+            campos = _enums_dominio(tipo)
+            cache: Dict[tuple, Any] = {}
+            return lambda datos: _invocar_dominio(dominio, tipo, datos, _convertir_campos(campos, datos, cache))
+        return partial(self._procesar_segun_tipo, tipo)
+
+    def _dominio(self, tipo: str):
+        """Subsistema de un dominio especializado; error si no está disponible."""
+        dominio = self.subsistemas.obtener(_subsistema_dominio(tipo))
+        if dominio is None:
+            raise _dominio_no_disponible(tipo)
+        return dominio
+
+    def _procesar_segun_tipo(self, tipo: str, datos: Dict[str, Any]) -> Any:
+        """Procesa una solicitud según su tipo."""
+        if tipo in ("administrativo", "militar"):
+            return _ejecutar_dominio(self._dominio(tipo), tipo, datos)
         else:
             return self.sistema_adaptativo.procesar_solicitud_adaptativa({
                 "tipo": tipo,
                 "datos": datos
             })
 
+    def _pool_hilos(self) -> ThreadPoolExecutor:
+        """Pool de hilos para manejadores de E/S (se crea en el primer uso)."""
+        if self._ejecutor_hilos is None:
+            self._ejecutor_hilos = ThreadPoolExecutor(thread_name_prefix="aria-async")
+        return self._ejecutor_hilos
+
+    def _pool_procesos(self) -> ProcessPoolExecutor:
+        """Pool de procesos para manejadores intensivos en CPU (se crea en el primer uso)."""
+        if self._ejecutor_procesos is None:
+            self._ejecutor_procesos = ProcessPoolExecutor()
+        return self._ejecutor_procesos
+
+    def _cerrar_pools(self):
+        """Cierra los pools de la API asíncrona."""
+        if self._ejecutor_hilos is not None:
+            self._ejecutor_hilos.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor_hilos = None
+        if self._ejecutor_procesos is not None:
+            self._ejecutor_procesos.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor_procesos = None
+
+    async def _ejecutar_async(self, tipo: str, datos: Dict[str, Any]) -> Any:
+        """Ejecuta el manejador de una solicitud en el pool adecuado a su tipo."""
+        loop = asyncio.get_running_loop()
+        
+        if tipo in self.tipos_cpu:
+            try:
+                return await loop.run_in_executor(self._pool_procesos(), _procesar_en_proceso, tipo, datos)
+            except BrokenProcessPool as e:
+                self.logger.warning(f"Pool de procesos no disponible, usando hilos: {e}")
+                self._ejecutor_procesos = None
+        
+        return await loop.run_in_executor(self._pool_hilos(), self._procesar_segun_tipo, tipo, datos)
+
+    async def procesar_solicitud_async(self, tipo: str, datos: Dict[str, Any], prioridad_admin: bool = False,
+                                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Versión asíncrona de procesar_solicitud.
+        
+        Los manejadores de tipos en ``tipos_cpu`` se ejecutan en un pool de
+        procesos y el resto en un pool de hilos, de modo que muchas
+        solicitudes pueden estar en curso sin bloquear el bucle de eventos.
+        
+        Args:
+            tipo: Tipo de solicitud (administrativo, militar, ...)
+            datos: Datos de la solicitud
+            prioridad_admin: Usar prioridad crítica en modo administrador
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            Dict con el mismo formato que procesar_solicitud
+        """
+        try:
+            inicio = time.time()
+            prioridad = self._prioridad_solicitud(prioridad_admin)
+            id_tarea = self.generador_ids.generar()
+            self.registro_tareas.registrar(id_tarea, tipo=tipo, prioridad=prioridad.name)
+            
+            resultado = None
+            error = None
+            try:
+                resultado = await asyncio.wait_for(self._ejecutar_async(tipo, datos), timeout)
+                self.registro_tareas.finalizar(id_tarea)
+            except asyncio.TimeoutError:
+                error = f"Tiempo de espera agotado ({timeout}s)"
+                self.registro_tareas.finalizar(id_tarea, estado="cancelada", error=error)
+            except asyncio.CancelledError:
+                self.registro_tareas.finalizar(id_tarea, estado="cancelada")
+                raise
+            except Exception as e:
+                error = str(e)
+                self.registro_tareas.finalizar(id_tarea, estado="error", error=error)
+            
+            tiempo_proceso = time.time() - inicio
+            self.logger.info(f"Solicitud asíncrona procesada en {tiempo_proceso:.2f}s")
+            
+            # Notificar resultado por voz sin bloquear el bucle de eventos
+            if self.sistema_sensorial and (error or self.modo_admin):
+                mensaje = "Error en la tarea" if error else "Tarea completada exitosamente"
+                await asyncio.get_running_loop().run_in_executor(
+                    self._pool_hilos(), self.sistema_sensorial.decir, mensaje
+                )
+            
+            return {
+                "resultado": resultado if not error else None,
+                "error": error,
+                "tiempo_proceso": tiempo_proceso,
+                "modo_admin": self.modo_admin,
+                "prioridad": prioridad.name
+            }
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error procesando solicitud asíncrona: {str(e)}")
+            return {"error": str(e)}
+
+    async def procesar_comando_voz_async(self, comando: str) -> str:
+        """Versión asíncrona de _procesar_comando_voz, ejecutada en el pool de hilos."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool_hilos(), self._procesar_comando_voz, comando)
+
+    def _crear_despachador_admin(self) -> DespachadorComandos:
+        """Registra los comandos administrativos."""
+        despachador = DespachadorComandos()
+        conexion = Parametro("conexion", opciones=lambda: self.conexiones)
+        
+        # Comandos de sistema
+        despachador.registrar("sistema:estado", self.obtener_estado_completo,
+                              "Estado completo del sistema")
+        despachador.registrar("sistema:reiniciar", self._admin_reiniciar, "Reinicia todos los sistemas")
+        despachador.registrar("sistema:comandos", despachador.comandos, "Lista los comandos disponibles")
+        
+        # Comandos del sistema sensorial
+        despachador.registrar("sensorial:iniciar", self._admin_sensorial_iniciar,
+                              "Inicia el sistema sensorial")
+        despachador.registrar("sensorial:detener", self._admin_sensorial_detener,
+                              "Detiene el sistema sensorial")
+        
+        # Comandos de red y conexiones
+        despachador.registrar("red:{conexion}:reconectar", self._admin_reconectar,
+                              "Reconecta una conexión", conexion=conexion)
+        return despachador
+
+    def _admin_reiniciar(self) -> str:
+        self.reiniciar()
+        return "Sistema reiniciado"
+
+    def _sistema_sensorial_requerido(self):
+        if not self.sistema_sensorial:
+            raise ErrorComando("Sistema sensorial no disponible")
+        return self.sistema_sensorial
+
+    def _admin_sensorial_iniciar(self) -> str:
+        self._sistema_sensorial_requerido().iniciar()
+        return "Sistema sensorial iniciado"
+
+    def _admin_sensorial_detener(self) -> str:
+        self._sistema_sensorial_requerido().detener()
+        return "Sistema sensorial detenido"
+
+    def _admin_reconectar(self, conexion: str) -> str:
+        if conexion in self.pools:
+            self.pools[conexion].reconectar()
+        else:
+            self.conexiones[conexion].cerrar()
+            self.conexiones[conexion].inicializar()
+        self.instantanea.invalidar("conexiones")
+        return f"Conexión {conexion} reconectada"
+
     def ejecutar_comando_admin(self, comando: str) -> Dict[str, Any]:
         """Ejecuta un comando administrativo con privilegios totales."""
         if not self.modo_admin:
@@ -309,45 +860,37 @@ class AriaUniversal:
             
         try:
             self.logger.debug(f"Ejecutando comando administrativo: {comando}")
-            
-            if comando.startswith("sistema:"):
-                # Comandos de sistema
-                if comando == "sistema:estado":
-                    return {"resultado": self.obtener_estado_completo()}
-                elif comando == "sistema:reiniciar":
-                    self.reiniciar()
-                    return {"resultado": "Sistema reiniciado"}
-                    
-            elif comando.startswith("sensorial:"):
-                # Comandos del sistema sensorial
-                if not self.sistema_sensorial:
-                    return {"error": "Sistema sensorial no disponible"}
-                    
-                if comando == "sensorial:iniciar":
-                    self.sistema_sensorial.iniciar()
-                    return {"resultado": "Sistema sensorial iniciado"}
-                elif comando == "sensorial:detener":
-                    self.sistema_sensorial.detener()
-                    return {"resultado": "Sistema sensorial detenido"}
-                    
-            elif comando.startswith("red:"):
-                # Comandos de red y conexiones
-                partes = comando.split(":")
-                if len(partes) >= 3:
-                    conexion = partes[1]
-                    accion = partes[2]
-                    if conexion in self.conexiones:
-                        if accion == "reconectar":
-                            self.conexiones[conexion].cerrar()
-                            self.conexiones[conexion].inicializar()
-                            return {"resultado": f"Conexión {conexion} reconectada"}
-                            
-            return {"error": "Comando no reconocido"}
+            return self.comandos_admin.ejecutar(comando)
             
         except Exception as e:
             self.logger.error(f"Error ejecutando comando administrativo: {str(e)}")
             return {"error": str(e)}
 
+    def ejecutar_lote_admin(self, comandos: List[str], detener_en_error: bool = False) -> List[Dict[str, Any]]:
+        """
+        Ejecuta varios comandos administrativos en una sola llamada.
+        
+        Args:
+            comandos: Comandos en orden (se ignoran líneas vacías y comentarios '#')
+            detener_en_error: Interrumpir en el primer comando que falle
+            
+        Returns:
+            Lista de resultados, uno por comando ejecutado
+        """
+        if not self.modo_admin:
+            return [{"error": "Acceso denegado - Se requiere modo administrador"}]
+        return self.comandos_admin.ejecutar_lote(comandos, detener_en_error=detener_en_error)
+
+    def ejecutar_script_admin(self, ruta: str, detener_en_error: bool = True) -> List[Dict[str, Any]]:
+        """Ejecuta un archivo de comandos administrativos, uno por línea."""
+        if not self.modo_admin:
+            return [{"error": "Acceso denegado - Se requiere modo administrador"}]
+        try:
+            return self.comandos_admin.ejecutar_script(ruta, detener_en_error=detener_en_error)
+        except OSError as e:
+            self.logger.error(f"Error leyendo script administrativo: {str(e)}")
+            return [{"error": str(e)}]
+
     def reiniciar(self):
         """Reinicia todos los sistemas con privilegios de administrador."""
         if not self.modo_admin:
@@ -365,38 +908,59 @@ class AriaUniversal:
             "modo_admin": self.modo_admin,
             "sistemas_activos": [],
             "conexiones_activas": [],
-            "tareas_pendientes": [],
             "estado_sensorial": None
         }
+        self.instantanea.invalidar("sistema")
         
         # Reiniciar sistemas
         self.inicializar()
 
-    def obtener_estado_completo(self) -> Dict[str, Any]:
-        """Obtiene el estado completo del sistema."""
-        estado = {
-            "sistema": self.estado,
-            "modo_admin": self.modo_admin,
-            "permisos": self.permisos_admin,
-            "timestamp": datetime.now().isoformat(),
-            "sistemas": {
-                "cerebro": self.cerebro is not None,
-                "gestor_tareas": self.gestor_tareas is not None,
-                "adaptativo": self.sistema_adaptativo is not None,
-                "personalidad": self.personalidad is not None,
-                "sensorial": self.sistema_sensorial is not None
-            },
-            "conexiones": {
-                nombre: conexion.esta_activa() 
-                for nombre, conexion in self.conexiones.items()
-            }
-        }
+    def obtener_estado_completo(self, refrescar: bool = False) -> Mapping[str, Any]:
+        """
+        Obtiene el estado completo del sistema.
         
-        # Agregar estado sensorial si está disponible
-        if self.sistema_sensorial:
-            estado["sensorial"] = self.sistema_sensorial.obtener_estado_completo()
-            
-        return estado
+        Devuelve una vista inmutable que se reconstruye solo cuando alguna
+        sección cambia; los sondeos de conexiones y del sistema sensorial se
+        reutilizan durante unos segundos y se refrescan en segundo plano.
+        
+        Args:
+            refrescar: Repetir todos los sondeos antes de responder
+        """
+        if refrescar:
+            self.instantanea.invalidar()
+        return self.instantanea.obtener()
+
+    def _sondear_sistema(self) -> Mapping[str, Any]:
+        with self._lock_estado:
+            return congelar(self.estado)
+
+    def _sondear_tareas(self) -> Dict[str, Any]:
+        return {
+            "pendientes": self.registro_tareas.pendientes(),
+            "recientes": self.registro_tareas.recientes()
+        }
+
+    def _sondear_subsistemas(self) -> Dict[str, bool]:
+        # Solo se informa de lo ya cargado para no forzar la carga de nada
+        return {
+            "cerebro": self.subsistemas.cargado("cerebro"),
+            "gestor_tareas": self.subsistemas.cargado("gestor_tareas"),
+            "adaptativo": self.subsistemas.cargado("sistema_adaptativo"),
+            "personalidad": self.subsistemas.cargado("personalidad"),
+            "sensorial": self.subsistemas.cargado("sistema_sensorial")
+        }
+
+    def _sondear_conexiones(self) -> Dict[str, bool]:
+        # Como con los subsistemas, solo se sondean las conexiones ya creadas
+        return {
+            nombre: conexion.esta_activa() 
+            for nombre, conexion in (self._conexiones or {}).items()
+        }
+
+    def _sondear_sensorial(self) -> Optional[Dict[str, Any]]:
+        if not self.subsistemas.cargado("sistema_sensorial") or not self.sistema_sensorial:
+            return None
+        return self.sistema_sensorial.obtener_estado_completo()
 
     def _modo_voz_continua(self):
         """Modo de comunicación continua por voz."""
@@ -456,75 +1020,89 @@ class AriaUniversal:
             if self.sistema_sensorial:
                 self.sistema_sensorial.decir("Ha ocurrido un error. Cerrando sistema.")
 
+    def _crear_enrutador_voz(self) -> EnrutadorIntenciones:
+        """Registra las intenciones de voz; el orden de registro decide los empates."""
+        enrutador = EnrutadorIntenciones()
+        
+        # Comandos administrativos
+        enrutador.registrar("estado", ["estado del sistema", "cómo estás"], self._intencion_estado)
+        enrutador.registrar("hora", ["qué hora es"], self._intencion_hora)
+        enrutador.registrar("reiniciar", ["reiniciar sistema"], self._intencion_reiniciar)
+        enrutador.registrar("conexiones", ["conexiones"], self._intencion_conexiones)
+        
+        # Comandos de procesamiento cognitivo
+        enrutador.registrar("analizar", ["analizar", "procesar"], self._intencion_analizar)
+        
+        # Comandos de personalidad
+        enrutador.registrar("emocion", ["cómo te sientes", "estado emocional"], self._intencion_emocion)
+        
+        # Comandos generales
+        enrutador.registrar("saludo", ["hola", "buenos días", "buenas tardes"],
+                            lambda comando: "¡Hola! Soy Aria, tu asistente de inteligencia artificial. ¿En qué puedo ayudarte?")
+        enrutador.registrar("gracias", ["gracias"], lambda comando: "De nada, es un placer ayudarte.")
+        enrutador.registrar("ayuda", ["ayuda", "qué puedes hacer"],
+                            lambda comando: ("Puedo ayudarte con análisis de datos, gestión administrativa, "
+                                             "procesamiento de información, control de sistemas y mucho más. "
+                                             "Solo háblame naturalmente."))
+        
+        enrutador.compilar()
+        return enrutador
+
+    def _intencion_estado(self, comando: str) -> str:
+        estado = self.obtener_estado_completo()
+        sistemas_activos = len(estado['sistemas'])
+        return f"Estoy funcionando correctamente. Tengo {sistemas_activos} sistemas activos y acceso administrativo total."
+
+    def _intencion_hora(self, comando: str) -> str:
+        hora_actual = datetime.now().strftime("%H:%M")
+        return f"Son las {hora_actual}."
+
+    def _intencion_reiniciar(self, comando: str) -> str:
+        if self.modo_admin:
+            self.reiniciar()
+            return "Sistema reiniciado correctamente."
+        else:
+            return "No tengo permisos para reiniciar el sistema."
+
+    def _intencion_conexiones(self, comando: str) -> str:
+        conexiones_activas = len(self.estado.get('conexiones_activas', []))
+        return f"Tengo {conexiones_activas} conexiones activas."
+
+    def _intencion_analizar(self, comando: str) -> str:
+        if self.sistema_adaptativo:
+            resultado = self.sistema_adaptativo.procesar_solicitud_adaptativa({
+                "tipo": "comando_voz",
+                "contenido": comando,
+                "timestamp": datetime.now().isoformat()
+            })
+            return resultado.get("respuesta", "Análisis completado.")
+        else:
+            return "Sistema de análisis no disponible."
+
+    def _intencion_emocion(self, comando: str) -> str:
+        if self.personalidad:
+            estado_emocional = self.personalidad.obtener_estado_emocional()
+            return f"Mi estado emocional es {estado_emocional.get('estado_principal', 'neutral')}."
+        else:
+            return "Sistema de personalidad no disponible."
+
     def _procesar_comando_voz(self, comando: str) -> str:
         """Procesa un comando de voz y retorna la respuesta."""
         try:
-            comando_lower = comando.lower()
-            
-            # Comandos administrativos
-            if 'estado del sistema' in comando_lower or 'cómo estás' in comando_lower:
-                estado = self.obtener_estado_completo()
-                sistemas_activos = len(estado['sistemas'])
-                return f"Estoy funcionando correctamente. Tengo {sistemas_activos} sistemas activos y acceso administrativo total."
-            
-            elif 'qué hora es' in comando_lower:
-                hora_actual = datetime.now().strftime("%H:%M")
-                return f"Son las {hora_actual}."
-            
-            elif 'reiniciar sistema' in comando_lower:
-                if self.modo_admin:
-                    self.reiniciar()
-                    return "Sistema reiniciado correctamente."
-                else:
-                    return "No tengo permisos para reiniciar el sistema."
-            
-            elif 'conexiones' in comando_lower:
-                conexiones_activas = len(self.estado.get('conexiones_activas', []))
-                return f"Tengo {conexiones_activas} conexiones activas."
-            
-            # Comandos de procesamiento cognitivo
-            elif 'analizar' in comando_lower or 'procesar' in comando_lower:
-                if self.sistema_adaptativo:
-                    resultado = self.sistema_adaptativo.procesar_solicitud_adaptativa({
-                        "tipo": "comando_voz",
-                        "contenido": comando,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    return resultado.get("respuesta", "Análisis completado.")
-                else:
-                    return "Sistema de análisis no disponible."
-            
-            # Comandos de personalidad
-            elif 'cómo te sientes' in comando_lower or 'estado emocional' in comando_lower:
-                if self.personalidad:
-                    estado_emocional = self.personalidad.obtener_estado_emocional()
-                    return f"Mi estado emocional es {estado_emocional.get('estado_principal', 'neutral')}."
-                else:
-                    return "Sistema de personalidad no disponible."
-            
-            # Comandos generales
-            elif 'hola' in comando_lower or 'buenos días' in comando_lower or 'buenas tardes' in comando_lower:
-                return "¡Hola! Soy Aria, tu asistente de inteligencia artificial. ¿En qué puedo ayudarte?"
-            
-            elif 'gracias' in comando_lower:
-                return "De nada, es un placer ayudarte."
-            
-            elif 'ayuda' in comando_lower or 'qué puedes hacer' in comando_lower:
-                return ("Puedo ayudarte con análisis de datos, gestión administrativa, "
-                       "procesamiento de información, control de sistemas y mucho más. "
-                       "Solo háblame naturalmente.")
+            intencion, respuesta = self.enrutador_voz.despachar(comando)
+            if intencion is not None:
+                return respuesta
             
+            # Comando no reconocido, intentar procesamiento adaptativo
+            if self.sistema_adaptativo:
+                resultado = self.sistema_adaptativo.procesar_solicitud_adaptativa({
+                    "tipo": "comando_general",
+                    "contenido": comando,
+                    "timestamp": datetime.now().isoformat()
+                })
+                return resultado.get("respuesta", "He procesado tu solicitud.")
             else:
-                # Comando no reconocido, intentar procesamiento adaptativo
-                if self.sistema_adaptativo:
-                    resultado = self.sistema_adaptativo.procesar_solicitud_adaptativa({
-                        "tipo": "comando_general",
-                        "contenido": comando,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    return resultado.get("respuesta", "He procesado tu solicitud.")
-                else:
-                    return "No he entendido completamente tu solicitud, pero estoy aquí para ayudarte."
+                return "No he entendido completamente tu solicitud, pero estoy aquí para ayudarte."
                     
         except Exception as e:
             self.logger.error(f"Error procesando comando de voz: {e}")
@@ -534,30 +1112,29 @@ class AriaUniversal:
         """Detiene el sistema con gestión de recursos."""
         self.logger.info("Deteniendo Sistema Aria Universal...")
         
-        # Mensaje de despedida por voz
-        if self.sistema_sensorial:
+        # Mensaje de despedida por voz (solo se detiene lo que llegó a cargarse)
+        if self.subsistemas.cargado("sistema_sensorial"):
             self.sistema_sensorial.decir(
                 "Iniciando proceso de apagado. Gracias por tu trabajo."
             )
             self.sistema_sensorial.detener()
         
         # Detener sistemas principales
-        if self.sistema_adaptativo:
+        if self.subsistemas.cargado("sistema_adaptativo"):
             self.sistema_adaptativo.detener()
         
-        # Cerrar conexiones ordenadamente
-        for nombre, conexion in self.conexiones.items():
-            try:
-                if conexion.cerrar():
-                    self.logger.info(f"Conexión {nombre} cerrada")
-                else:
-                    self.logger.warning(f"Error cerrando conexión {nombre}")
-            except Exception as e:
-                self.logger.error(f"Error cerrando conexión {nombre}: {str(e)}")
+        # Cerrar conexiones en paralelo
+        sin_cerrar = self._cerrar_conexiones()
+        if sin_cerrar:
+            self.estado["conexiones_sin_cerrar"] = sin_cerrar
+        
+        # Cerrar pools de la API asíncrona
+        self._cerrar_pools()
         
         # Actualizar estado
         self.estado["estado"] = "detenido"
         self.estado["fin_sesion"] = datetime.now().isoformat()
+        self.instantanea.invalidar("sistema")
         
         self.logger.info("Sistema detenido correctamente")
         
@@ -8,8 +8,12 @@ import time
 import threading
 from typing import Dict, Any
 from interfaz_sensorial.integrador_sensorial import IntegradorSensorial
-from bodega.BodegaConocimiento import BodegaConocimiento, TipoInformacion, ImportanciaInfo
+from bodega.BodegaConocimiento import TipoInformacion, ImportanciaInfo
 from adaptacion_usuario.AdaptacionUsuario import AdaptacionUsuario
+from cache_perfiles import CachePerfiles
+from bodega_diferida import BodegaDiferida
+from busqueda_semantica import BodegaSemantica
+from bodega_sqlite import crear_bodega
 
 class SistemaAriaIntegrado:
     """Sistema principal de Aria con integración sensorial completa."""
@@ -23,8 +27,11 @@ class SistemaAriaIntegrado:
         self.logger = logging.getLogger("SistemaAriaIntegrado")
         
         # Inicializar componentes
-        self.bodega = BodegaConocimiento()
-        self.adaptacion = AdaptacionUsuario(self.bodega)
+        # Escritura por lotes en segundo plano: cada rostro o movimiento detectado
+        # no espera a la bodega
+        self.bodega = BodegaDiferida(BodegaSemantica(crear_bodega()))
+        # Perfil calculado una vez por interacción, no en cada evento de audio
+        self.adaptacion = CachePerfiles(AdaptacionUsuario(self.bodega))
         self.integrador = IntegradorSensorial()
         
         # Estado del sistema
@@ -72,7 +79,7 @@ class SistemaAriaIntegrado:
                 )
             
             # Almacenar en bodega
-            self.bodega.almacenar(
+            self.bodega.almacenar_diferido(
                 tipo=TipoInformacion.CONVERSACION,
                 contenido={
                     "texto": datos["texto"],
@@ -105,7 +112,7 @@ class SistemaAriaIntegrado:
                     self._ajustar_modo_atencion("atento")
                     
                     # Almacenar en bodega
-                    self.bodega.almacenar(
+                    self.bodega.almacenar_diferido(
                         tipo=TipoInformacion.EXPERIENCIA,
                         contenido={
                             "tipo": "deteccion_rostro",
@@ -125,7 +132,7 @@ class SistemaAriaIntegrado:
                         self._ajustar_modo_atencion("atento")
                     
                     # Almacenar en bodega
-                    self.bodega.almacenar(
+                    self.bodega.almacenar_diferido(
                         tipo=TipoInformacion.EXPERIENCIA,
                         contenido={
                             "tipo": "deteccion_movimiento",
@@ -156,7 +163,7 @@ class SistemaAriaIntegrado:
                 self._ajustar_modo_atencion("concentrado")
                 
                 # Almacenar experiencia
-                self.bodega.almacenar(
+                self.bodega.almacenar_diferido(
                     tipo=TipoInformacion.EXPERIENCIA,
                     contenido={
                         "tipo": "interaccion_cara_a_cara",
@@ -296,6 +303,9 @@ class SistemaAriaIntegrado:
             # Detener integrador
             self.integrador.detener()
             
+            # Escribir lo pendiente (la bodega sigue disponible si se reinicia)
+            self.bodega.vaciar()
+            
             self.activo = False
             self.usuario_actual = None
             
@@ -0,0 +1,1033 @@
+"""
+Motor de voz de Aria
+Interfaz única de síntesis para todos los asistentes conversacionales: el
+motor más rápido disponible se elige una vez (con el sondeo guardado en
+disco), se carga una sola vez y recibe las frases por una cola
+"""
+
+import array
+import atexit
+import base64
+import importlib.util
+import itertools
+import json
+import logging
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Union, Iterable
+
+from cache_audio import CacheAudio, clave_audio
+
+
+class BackendVoz:
+    """Interfaz de un motor de síntesis; solo lo usa el hilo del trabajador."""
+
+    nombre = "base"
+    # True si el motor sabe renderizar frases a un archivo WAV (caché de audio)
+    graba_audio = False
+    # False si hablar() vuelve antes de que termine la frase
+    hablar_sincrono = True
+
+    @classmethod
+    def disponible(cls) -> bool:
+        """Comprobación barata de que el motor puede usarse en esta máquina."""
+        return True
+
+    def iniciar(self):
+        """Carga el motor (puede tardar; se hace una sola vez)."""
+
+    def hablar(self, texto: str):
+        """Pronuncia una frase; lanza una excepción si el motor ha caído."""
+        raise NotImplementedError
+
+    def detener(self):
+        """Corta la frase en curso; se llama desde otro hilo."""
+
+    def parametros(self) -> Dict[str, Any]:
+        """Lo que determina el audio generado, además del texto (clave de la caché)."""
+        return {
+            "backend": self.nombre,
+            "voz": getattr(self, "voz", None),
+            "velocidad": getattr(self, "velocidad", None),
+            "volumen": getattr(self, "volumen", None),
+        }
+
+    def sintetizar(self, texto: str, ruta: Path):
+        """Renderiza una frase a un archivo WAV sin reproducirla."""
+        raise NotImplementedError
+
+    def cerrar(self):
+        """Libera el motor."""
+
+
+class BackendNulo(BackendVoz):
+    """Motor sin audio para entornos sin síntesis disponible y para pruebas."""
+
+    nombre = "nulo"
+
+    def __init__(self):
+        self.pronunciadas: List[str] = []
+
+    def hablar(self, texto: str):
+        self.pronunciadas.append(texto)
+
+
+class _BackendProceso(BackendVoz):
+    """Motor alojado en un proceso hijo que recibe una frase por línea en stdin."""
+
+    def __init__(self):
+        self._proceso: Optional[subprocess.Popen] = None
+        self._detenido = False
+
+    def _comando(self) -> List[str]:
+        raise NotImplementedError
+
+    def iniciar(self):
+        self._detenido = False
+        self._proceso = subprocess.Popen(
+            self._comando(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, encoding="utf-8", bufsize=1
+        )
+
+    def _enviar(self, *campos: str):
+        if self._detenido:
+            # El proceso se terminó para cortar una frase: relanzarlo
+            self.cerrar()
+            self.iniciar()
+        if self._proceso is None or self._proceso.poll() is not None:
+            raise RuntimeError(f"Motor {self.nombre} no disponible")
+        # Una orden por línea y campos separados por tabuladores: los saltos
+        # de línea y tabuladores internos se convierten en espacios
+        self._proceso.stdin.write("\t".join(" ".join(campo.split()) for campo in campos) + "\n")
+        self._proceso.stdin.flush()
+
+    def hablar(self, texto: str):
+        self._enviar(texto)
+
+    def detener(self):
+        # El motor no admite órdenes mientras habla: se termina el proceso
+        proceso = self._proceso
+        if proceso is not None and proceso.poll() is None:
+            self._detenido = True
+            proceso.terminate()
+
+    def cerrar(self):
+        proceso, self._proceso = self._proceso, None
+        if proceso is None:
+            return
+        try:
+            proceso.stdin.close()
+            proceso.wait(timeout=2)
+        except Exception:
+            proceso.kill()
+
+
+class BackendPowerShell(_BackendProceso):
+    """System.Speech de Windows en un único proceso PowerShell persistente."""
+
+    nombre = "powershell"
+    graba_audio = True
+
+    @classmethod
+    def disponible(cls) -> bool:
+        return sys.platform == "win32" and shutil.which("powershell") is not None
+
+    SCRIPT = """
+[Console]::InputEncoding = [System.Text.Encoding]::UTF8
+Add-Type -AssemblyName System.Speech
+$speak = New-Object System.Speech.Synthesis.SpeechSynthesizer
+$speak.Rate = {velocidad}
+$speak.Volume = {volumen}
+[Console]::Out.WriteLine('LISTO'); [Console]::Out.Flush()
+while (($linea = [Console]::In.ReadLine()) -ne $null) {{
+    $orden = $linea -split "`t", 3
+    try {{
+        if ($orden[0] -eq 'G') {{
+            # G <ruta> <texto>: renderizar a WAV
+            $speak.SetOutputToWaveFile($orden[1])
+            try {{ $speak.Speak($orden[2]) }} finally {{ $speak.SetOutputToDefaultAudioDevice() }}
+        }} else {{
+            # D <texto>: decir
+            $speak.Speak($orden[1])
+        }}
+    }} catch {{ }}
+    [Console]::Out.WriteLine('OK'); [Console]::Out.Flush()
+}}
+"""
+
+    def __init__(self, velocidad: int = 0, volumen: int = 100):
+        super().__init__()
+        self.velocidad = velocidad
+        self.volumen = volumen
+
+    def _comando(self) -> List[str]:
+        script = self.SCRIPT.format(velocidad=self.velocidad, volumen=self.volumen)
+        codificado = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+        return ["powershell", "-NoProfile", "-NonInteractive", "-EncodedCommand", codificado]
+
+    def iniciar(self):
+        super().iniciar()
+        if self._proceso.stdout.readline().strip() != "LISTO":
+            self.cerrar()
+            raise RuntimeError("PowerShell no pudo cargar System.Speech")
+
+    def _esperar_confirmacion(self):
+        # Speak() es síncrono: la confirmación llega al terminar la frase
+        if self._proceso.stdout.readline().strip() != "OK":
+            raise RuntimeError("El proceso de PowerShell terminó inesperadamente")
+
+    def hablar(self, texto: str):
+        self._enviar("D", texto)
+        self._esperar_confirmacion()
+
+    def sintetizar(self, texto: str, ruta: Path):
+        self._enviar("G", str(ruta), texto)
+        self._esperar_confirmacion()
+        if not Path(ruta).exists():
+            raise RuntimeError("PowerShell no generó el audio")
+
+
+class BackendEspeak(BackendVoz):
+    """
+    espeak/espeak-ng con un proceso por frase (Linux).
+
+    Un proceso persistente leyendo de stdin aceptaría todas las frases de
+    golpe y hablar() volvería con el audio aún sonando; así hablar() espera
+    a que termine la frase y ``detener`` la corta terminando su proceso.
+    """
+
+    nombre = "espeak"
+    graba_audio = True
+
+    @classmethod
+    def disponible(cls) -> bool:
+        return bool(shutil.which("espeak-ng") or shutil.which("espeak"))
+
+    def __init__(self, ejecutable: Optional[str] = None, voz: str = "es", velocidad: int = 160):
+        super().__init__()
+        self.ejecutable = ejecutable or shutil.which("espeak-ng") or shutil.which("espeak") or "espeak"
+        self.voz = voz
+        self.velocidad = velocidad
+        self._cancelar = threading.Event()
+
+    def _comando(self) -> List[str]:
+        return [self.ejecutable, "-v", self.voz, "-s", str(self.velocidad)]
+
+    def hablar(self, texto: str):
+        # Se limpia al empezar y no al terminar: un detener() que llega justo
+        # al acabar la frase no debe cortar la siguiente
+        self._cancelar.clear()
+        proceso = subprocess.Popen(self._comando() + [" ".join(texto.split())],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while proceso.poll() is None:
+            if self._cancelar.wait(0.05):
+                proceso.terminate()
+                proceso.wait()
+                return
+        if proceso.returncode != 0:
+            raise RuntimeError(f"{self.ejecutable} terminó con código {proceso.returncode}")
+
+    def detener(self):
+        self._cancelar.set()
+
+    def sintetizar(self, texto: str, ruta: Path):
+        subprocess.run(self._comando() + ["-w", str(ruta), " ".join(texto.split())],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=60)
+
+
+def _buscar_voz_espanol(voces, descripcion) -> Optional[Any]:
+    for voz in voces:
+        texto = descripcion(voz).lower()
+        if "spanish" in texto or "español" in texto:
+            return voz
+    return None
+
+
+class BackendSapi(BackendVoz):
+    """SAPI de Windows en proceso a través de win32com."""
+
+    nombre = "sapi"
+    graba_audio = True
+
+    @classmethod
+    def disponible(cls) -> bool:
+        return sys.platform == "win32" and importlib.util.find_spec("win32com") is not None
+
+    # Flags de SpVoice.Speak
+    ASINCRONO = 1
+    PURGAR = 2
+    # Modo de SpFileStream.Open
+    CREAR_PARA_ESCRITURA = 3
+
+    def __init__(self, velocidad: int = 0, volumen: int = 100):
+        self.velocidad = velocidad
+        self.volumen = volumen
+        self.voz: Optional[str] = None
+        self._voz = None
+        self._cancelar = threading.Event()
+
+    def iniciar(self):
+        import pythoncom
+        import win32com.client
+
+        # COM se inicializa en el hilo que usará el motor
+        pythoncom.CoInitialize()
+        self._voz = win32com.client.Dispatch("SAPI.SpVoice")
+        voz = _buscar_voz_espanol(self._voz.GetVoices(), lambda v: v.GetDescription())
+        if voz is not None:
+            self._voz.Voice = voz
+            self.voz = voz.GetDescription()
+        self._voz.Rate = self.velocidad
+        self._voz.Volume = self.volumen
+
+    def hablar(self, texto: str):
+        # Asíncrono para poder cortar la frase desde otro hilo
+        try:
+            self._voz.Speak(texto, self.ASINCRONO)
+            while not self._voz.WaitUntilDone(50):
+                if self._cancelar.is_set():
+                    self._voz.Speak("", self.ASINCRONO | self.PURGAR)
+                    break
+        finally:
+            self._cancelar.clear()
+
+    def detener(self):
+        self._cancelar.set()
+
+    def sintetizar(self, texto: str, ruta: Path):
+        import win32com.client
+
+        archivo = win32com.client.Dispatch("SAPI.SpFileStream")
+        archivo.Open(str(ruta), self.CREAR_PARA_ESCRITURA, False)
+        salida = self._voz.AudioOutputStream
+        try:
+            self._voz.AudioOutputStream = archivo
+            self._voz.Speak(texto)
+        finally:
+            self._voz.AudioOutputStream = salida
+            archivo.Close()
+
+    def cerrar(self):
+        self._voz = None
+
+
+class BackendPyttsx3(BackendVoz):
+    """pyttsx3 (SAPI5, NSSpeechSynthesizer o espeak según la plataforma)."""
+
+    nombre = "pyttsx3"
+    graba_audio = True
+
+    @classmethod
+    def disponible(cls) -> bool:
+        return importlib.util.find_spec("pyttsx3") is not None
+
+    def __init__(self, velocidad: int = 150, volumen: float = 0.9):
+        self.velocidad = velocidad
+        self.volumen = volumen
+        self.voz: Optional[str] = None
+        self._motor = None
+        self._cancelar = threading.Event()
+
+    def iniciar(self):
+        import pyttsx3
+
+        self._motor = pyttsx3.init()
+        self._motor.setProperty('rate', self.velocidad)
+        self._motor.setProperty('volume', self.volumen)
+        voz = _buscar_voz_espanol(self._motor.getProperty('voices'), lambda v: v.name)
+        if voz is not None:
+            self._motor.setProperty('voice', voz.id)
+            self.voz = voz.id
+        # pyttsx3 solo admite stop() desde sus propias retrollamadas
+        self._motor.connect('started-word', self._comprobar_cancelacion)
+
+    def _comprobar_cancelacion(self, nombre, posicion, longitud):
+        if self._cancelar.is_set():
+            self._motor.stop()
+
+    def hablar(self, texto: str):
+        try:
+            self._motor.say(texto)
+            self._motor.runAndWait()
+        finally:
+            self._cancelar.clear()
+
+    def detener(self):
+        self._cancelar.set()
+
+    def sintetizar(self, texto: str, ruta: Path):
+        self._motor.save_to_file(texto, str(ruta))
+        self._motor.runAndWait()
+
+    def cerrar(self):
+        motor, self._motor = self._motor, None
+        if motor is not None:
+            motor.stop()
+
+
+def _reproductor_externo() -> Optional[str]:
+    for ejecutable in ("paplay", "aplay", "afplay"):
+        if shutil.which(ejecutable):
+            return ejecutable
+    return None
+
+
+class ReproductorWav:
+    """
+    Reproduce el audio renderizado de la caché.
+
+    En Windows usa ``winsound``; en otras plataformas, el primer reproductor
+    de línea de órdenes disponible. ``detener`` corta la reproducción desde
+    otro hilo.
+    """
+
+    def __init__(self):
+        self._reproduciendo = threading.Event()
+        self._cancelar = threading.Event()
+
+    @staticmethod
+    def disponible() -> bool:
+        return sys.platform == "win32" or _reproductor_externo() is not None
+
+    def reproducir(self, ruta: Path) -> bool:
+        """Reproduce un WAV hasta el final; False si se ha cortado."""
+        self._reproduciendo.set()
+        try:
+            if sys.platform == "win32":
+                return self._reproducir_winsound(ruta)
+            return self._reproducir_externo(ruta)
+        finally:
+            self._reproduciendo.clear()
+            self._cancelar.clear()
+
+    def reproduciendo(self) -> bool:
+        return self._reproduciendo.is_set()
+
+    def detener(self):
+        if self._reproduciendo.is_set():
+            self._cancelar.set()
+
+    def _reproducir_winsound(self, ruta: Path) -> bool:
+        import winsound
+
+        with wave.open(str(ruta), "rb") as archivo:
+            duracion = archivo.getnframes() / float(archivo.getframerate() or 1)
+        # Asíncrono para poder cortarlo; la duración dice cuándo ha terminado
+        winsound.PlaySound(str(ruta), winsound.SND_FILENAME | winsound.SND_ASYNC)
+        if self._cancelar.wait(duracion):
+            winsound.PlaySound(None, 0)
+            return False
+        return True
+
+    def _reproducir_externo(self, ruta: Path) -> bool:
+        ejecutable = _reproductor_externo()
+        if ejecutable is None:
+            raise RuntimeError("No hay reproductor de audio disponible")
+        proceso = subprocess.Popen([ejecutable, str(ruta)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while proceso.poll() is None:
+            if self._cancelar.wait(0.05):
+                proceso.terminate()
+                proceso.wait()
+                return False
+        if proceso.returncode != 0:
+            raise RuntimeError(f"{ejecutable} terminó con código {proceso.returncode}")
+        return True
+
+
+BACKENDS = {
+    BackendSapi.nombre: BackendSapi,
+    BackendPyttsx3.nombre: BackendPyttsx3,
+    BackendPowerShell.nombre: BackendPowerShell,
+    BackendEspeak.nombre: BackendEspeak,
+    BackendNulo.nombre: BackendNulo,
+}
+
+# Orden de preferencia en caso de empate (de menor a mayor coste habitual)
+PREFERENCIA = [BackendSapi.nombre, BackendPyttsx3.nombre, BackendPowerShell.nombre,
+               BackendEspeak.nombre, BackendNulo.nombre]
+
+RUTA_SONDEO = Path.home() / ".aria" / "motor_voz.json"
+# Sube cuando cambia la forma de medir, para no reutilizar elecciones de sondeos anteriores
+VERSION_SONDEO = 3
+
+
+def sondear_backends(candidatos: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Mide cada motor disponible: tiempo de carga y de una frase vacía.
+
+    Si ``hablar`` no espera a que termine la frase, su tiempo no dice nada:
+    se mide ``sintetizar`` a un archivo temporal, que sí es síncrono, y si
+    el motor no sabe grabar audio queda sin medir (``frase_ms`` None).
+
+    Returns:
+        Dict nombre -> {"disponible", "inicio_ms", "frase_ms", "medida", "error"}
+    """
+    resultados = {}
+    for nombre in candidatos or PREFERENCIA:
+        clase = BACKENDS[nombre]
+        resultado = {"disponible": False, "inicio_ms": None, "frase_ms": None, "medida": None, "error": None}
+        resultados[nombre] = resultado
+        if not clase.disponible():
+            continue
+
+        backend = clase()
+        try:
+            inicio = time.perf_counter()
+            backend.iniciar()
+            resultado["inicio_ms"] = (time.perf_counter() - inicio) * 1000
+            if clase.hablar_sincrono:
+                inicio = time.perf_counter()
+                backend.hablar(" ")
+                resultado["frase_ms"] = (time.perf_counter() - inicio) * 1000
+                resultado["medida"] = "hablar"
+            elif clase.graba_audio:
+                with tempfile.TemporaryDirectory() as directorio:
+                    inicio = time.perf_counter()
+                    backend.sintetizar(" ", Path(directorio) / "sondeo.wav")
+                    resultado["frase_ms"] = (time.perf_counter() - inicio) * 1000
+                resultado["medida"] = "sintetizar"
+            resultado["disponible"] = True
+        except Exception as e:
+            resultado["error"] = str(e)
+        finally:
+            try:
+                backend.cerrar()
+            except Exception:
+                pass
+    return resultados
+
+
+def _elegir(resultados: Dict[str, Dict[str, Any]]) -> str:
+    disponibles = [nombre for nombre in PREFERENCIA
+                   if nombre != BackendNulo.nombre and resultados.get(nombre, {}).get("disponible")]
+    if not disponibles:
+        return BackendNulo.nombre
+    # El más rápido por frase (los no medidos, al final); el orden de preferencia decide los empates
+    def coste(nombre):
+        frase_ms = resultados[nombre]["frase_ms"]
+        return frase_ms is None, round(frase_ms or 0), PREFERENCIA.index(nombre)
+    return min(disponibles, key=coste)
+
+
+def seleccionar_backend(ruta: Optional[Path] = RUTA_SONDEO, resondear: bool = False) -> str:
+    """
+    Nombre del motor a usar en esta máquina.
+
+    La variable de entorno ``ARIA_VOZ`` tiene prioridad. Si no, se usa el
+    sondeo guardado en ``ruta`` mientras el motor elegido siga disponible; en
+    otro caso se sondean todos los motores y se guarda el resultado.
+    """
+    forzado = os.environ.get("ARIA_VOZ")
+    if forzado:
+        return forzado
+
+    if ruta is not None and not resondear:
+        try:
+            with open(ruta, "r", encoding="utf-8") as archivo:
+                guardado = json.load(archivo)
+            nombre = guardado.get("backend")
+            if (guardado.get("version") == VERSION_SONDEO and guardado.get("plataforma") == sys.platform
+                    and nombre in BACKENDS and BACKENDS[nombre].disponible()):
+                return nombre
+        except (OSError, ValueError):
+            pass
+
+    resultados = sondear_backends()
+    nombre = _elegir(resultados)
+    if ruta is not None:
+        try:
+            Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump({
+                    "version": VERSION_SONDEO,
+                    "backend": nombre,
+                    "plataforma": sys.platform,
+                    "fecha": datetime.now().isoformat(),
+                    "mediciones": resultados
+                }, archivo, indent=2, ensure_ascii=False)
+        except OSError as e:
+            logging.getLogger("MotorVoz").warning(f"No se pudo guardar el sondeo de voz: {e}")
+    return nombre
+
+
+def crear_backend(nombre: Optional[str] = None) -> BackendVoz:
+    """Crea el motor indicado o el seleccionado para esta máquina."""
+    return BACKENDS[nombre or seleccionar_backend()]()
+
+
+class PrioridadVoz(IntEnum):
+    """Prioridad de una frase en la cola (menor se pronuncia antes)."""
+    ALTA = 0
+    NORMAL = 1
+    BAJA = 2
+
+
+@dataclass
+class _Frase:
+    texto: str
+    prioridad: PrioridadVoz
+    clave: Optional[str]
+    futuro: Future
+    encolado: float
+    interrumpida: bool = False
+    solo_renderizar: bool = False
+
+
+class TrabajadorVoz:
+    """
+    Hilo que posee el motor de voz y pronuncia las frases de su cola.
+
+    Las frases salen por prioridad y, dentro de la misma prioridad, en orden
+    de llegada. Una frase idéntica a otra pendiente no se duplica, y una frase
+    con ``clave`` sustituye a la pendiente con la misma clave (p. ej. los
+    avisos proactivos). ``interrumpir`` vacía la cola y corta la frase en
+    curso cuando el usuario empieza a hablar.
+
+    El motor se carga al arrancar el hilo, de modo que la primera frase no
+    paga el coste de inicio. Si el motor cae, se reinicia una vez y se
+    reintenta la frase.
+
+    Con una ``CacheAudio``, las frases ya renderizadas se reproducen desde
+    disco sin pasar por el motor, y las que se repiten se renderizan cuando
+    la cola queda libre.
+    """
+
+    def __init__(self, backend: Optional[BackendVoz] = None, cache: Optional[CacheAudio] = None,
+                 reproductor: Optional[ReproductorWav] = None):
+        self.logger = logging.getLogger("TrabajadorVoz")
+        self.backend = backend or crear_backend()
+        self.cache = cache
+        self.reproductor = reproductor or ReproductorWav()
+        self._cola: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._secuencia = itertools.count()
+        self._pendientes: Dict[Any, _Frase] = {}
+        self._renderizados: Dict[str, _Frase] = {}
+        self._actual: Optional[_Frase] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._estadisticas = {"frases": 0, "errores": 0, "reinicios": 0, "fusionadas": 0,
+                              "interrumpidas": 0, "desde_cache": 0, "espera_total": 0.0}
+
+    def iniciar(self):
+        """Arranca el hilo y carga el motor en segundo plano."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._ejecutar, name="aria-voz", daemon=True)
+            self._hilo.start()
+
+    def encolar(self, texto: str, prioridad: PrioridadVoz = PrioridadVoz.NORMAL,
+                clave: Optional[str] = None) -> Future:
+        """
+        Encola una frase sin esperar.
+
+        Args:
+            texto: Frase a pronunciar
+            prioridad: Prioridad en la cola
+            clave: Las frases con la misma clave se sustituyen entre sí
+
+        Returns:
+            Future que se resuelve a True al terminar de pronunciarse, o a
+            False si falla, se sustituye o se interrumpe
+        """
+        self.iniciar()
+        identificador = ("clave", clave) if clave is not None else ("texto", texto)
+        with self._lock:
+            anterior = self._pendientes.get(identificador)
+            if anterior is not None:
+                self._estadisticas["fusionadas"] += 1
+                if clave is None:
+                    return anterior.futuro
+                # Sustituir el aviso anterior por el nuevo
+                anterior.interrumpida = True
+                anterior.futuro.set_result(False)
+
+            frase = _Frase(texto, PrioridadVoz(prioridad), clave, Future(), time.perf_counter())
+            self._pendientes[identificador] = frase
+            self._cola.put((frase.prioridad, next(self._secuencia), frase))
+        return frase.futuro
+
+    def decir(self, texto: str, esperar: bool = True, timeout: Optional[float] = None,
+              prioridad: PrioridadVoz = PrioridadVoz.NORMAL, clave: Optional[str] = None) -> bool:
+        """
+        Encola una frase.
+
+        Args:
+            texto: Frase a pronunciar
+            esperar: Bloquear hasta que termine de pronunciarse
+            timeout: Espera máxima en segundos
+            prioridad: Prioridad en la cola
+            clave: Las frases con la misma clave se sustituyen entre sí
+
+        Returns:
+            True si se pronunció (o se encoló, si no se espera)
+        """
+        futuro = self.encolar(texto, prioridad=prioridad, clave=clave)
+        if not esperar:
+            return True
+        try:
+            return futuro.result(timeout)
+        except Exception:
+            return False
+
+    def prerenderizar(self, frases: Iterable[str]) -> List[Future]:
+        """
+        Renderiza frases en la caché de audio sin pronunciarlas.
+
+        Se hacen con prioridad baja y no cuentan como voz de Aria (no se
+        interrumpen ni hacen que ``hablando`` sea True).
+
+        Returns:
+            Un Future por frase que se resuelve a True si quedó en caché
+        """
+        return [self._encolar_renderizado(texto) for texto in frases]
+
+    def _encolar_renderizado(self, texto: str) -> Future:
+        if self.cache is None or not self.backend.graba_audio:
+            futuro = Future()
+            futuro.set_result(False)
+            return futuro
+        self.iniciar()
+        with self._lock:
+            anterior = self._renderizados.get(texto)
+            if anterior is not None:
+                return anterior.futuro
+            frase = _Frase(texto, PrioridadVoz.BAJA, None, Future(), time.perf_counter(), solo_renderizar=True)
+            self._renderizados[texto] = frase
+            self._cola.put((frase.prioridad, next(self._secuencia), frase))
+        return frase.futuro
+
+    def interrumpir(self, prioridad_minima: PrioridadVoz = PrioridadVoz.ALTA) -> int:
+        """
+        Descarta las frases pendientes y corta la que está sonando.
+
+        Args:
+            prioridad_minima: Solo se descartan frases de esta prioridad o menos urgentes
+
+        Returns:
+            Número de frases descartadas o cortadas
+        """
+        with self._lock:
+            descartadas = [frase for frase in self._pendientes.values() if frase.prioridad >= prioridad_minima]
+            actual = self._actual
+            if actual is not None and actual.prioridad >= prioridad_minima and not actual.interrumpida:
+                descartadas.append(actual)
+            else:
+                actual = None
+            for frase in descartadas:
+                frase.interrumpida = True
+                self._pendientes.pop(self._identificador(frase), None)
+            self._estadisticas["interrumpidas"] += len(descartadas)
+
+        for frase in descartadas:
+            if frase is not actual and not frase.futuro.done():
+                frase.futuro.set_result(False)
+        if actual is not None:
+            try:
+                if self.reproductor.reproduciendo():
+                    self.reproductor.detener()
+                else:
+                    self.backend.detener()
+            except Exception as e:
+                self.logger.warning(f"Error deteniendo el motor de voz: {e}")
+        return len(descartadas)
+
+    def hablando(self) -> bool:
+        """True si hay una frase sonando o pendiente."""
+        with self._lock:
+            return self._actual is not None or bool(self._pendientes)
+
+    def cerrar(self, timeout: float = 5.0):
+        """Termina las frases pendientes y libera el motor."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is None:
+            return
+        # Detrás de todas las frases pendientes, sea cual sea su prioridad
+        self._cola.put((len(PrioridadVoz), next(self._secuencia), None))
+        hilo.join(timeout)
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Frases pronunciadas, errores, fusiones, interrupciones y espera media en cola."""
+        with self._lock:
+            estadisticas = dict(self._estadisticas)
+            estadisticas["en_cola"] = len(self._pendientes)
+        espera_total = estadisticas.pop("espera_total")
+        frases = estadisticas["frases"] + estadisticas["errores"]
+        estadisticas["espera_media_ms"] = espera_total / frases * 1000 if frases else 0.0
+        estadisticas["backend"] = self.backend.nombre
+        if self.cache is not None:
+            estadisticas["cache"] = self.cache.obtener_estadisticas()
+        return estadisticas
+
+    @staticmethod
+    def _identificador(frase: _Frase) -> Any:
+        return ("clave", frase.clave) if frase.clave is not None else ("texto", frase.texto)
+
+    def _ejecutar(self):
+        iniciado = self._iniciar_backend()
+        while True:
+            _, _, frase = self._cola.get()
+            if frase is None:
+                break
+            if frase.solo_renderizar:
+                with self._lock:
+                    self._renderizados.pop(frase.texto, None)
+                frase.futuro.set_result(iniciado and self._renderizar(frase.texto) is not None)
+                continue
+            with self._lock:
+                if frase.interrumpida:
+                    continue
+                self._pendientes.pop(self._identificador(frase), None)
+                self._actual = frase
+                self._estadisticas["espera_total"] += time.perf_counter() - frase.encolado
+            try:
+                resultado = self._pronunciar(frase, iniciado)
+            finally:
+                with self._lock:
+                    self._actual = None
+            frase.futuro.set_result(resultado)
+            iniciado = True
+        try:
+            self.backend.cerrar()
+        except Exception as e:
+            self.logger.warning(f"Error cerrando motor de voz: {e}")
+
+    def _iniciar_backend(self) -> bool:
+        try:
+            self.backend.iniciar()
+            return True
+        except Exception as e:
+            self.logger.error(f"No se pudo iniciar el motor de voz {self.backend.nombre}: {e}")
+            return False
+
+    def _pronunciar(self, frase: _Frase, iniciado: bool) -> bool:
+        for intento in range(2):
+            if intento or not iniciado:
+                with self._lock:
+                    self._estadisticas["reinicios"] += 1
+                self.backend.cerrar()
+                if not self._iniciar_backend():
+                    break
+            try:
+                self._hablar(frase)
+            except Exception as e:
+                if frase.interrumpida:
+                    # Cortada a la fuerza: dejar el motor listo para la siguiente frase
+                    self.backend.cerrar()
+                    self._iniciar_backend()
+                    return False
+                self.logger.warning(f"Error en el motor de voz: {e}")
+                continue
+
+            if frase.interrumpida:
+                return False
+            with self._lock:
+                self._estadisticas["frases"] += 1
+            return True
+
+        with self._lock:
+            self._estadisticas["errores"] += 1
+        return False
+
+    def _hablar(self, frase: _Frase):
+        if self.cache is not None and self.backend.graba_audio:
+            clave = clave_audio(frase.texto, self.backend.parametros())
+            ruta = self.cache.obtener(clave)
+            if ruta is not None:
+                try:
+                    self.reproductor.reproducir(ruta)
+                    with self._lock:
+                        self._estadisticas["desde_cache"] += 1
+                    return
+                except Exception as e:
+                    self.logger.warning(f"No se pudo reproducir el audio en caché: {e}")
+            elif self.cache.registrar_aparicion(clave):
+                # Frase repetida: se renderiza cuando la cola quede libre
+                self._encolar_renderizado(frase.texto)
+        self.backend.hablar(frase.texto)
+
+    def _renderizar(self, texto: str) -> Optional[Path]:
+        clave = clave_audio(texto, self.backend.parametros())
+        if self.cache.contiene(clave):
+            return self.cache.ruta(clave)
+        temporal = self.cache.reservar(clave)
+        try:
+            self.backend.sintetizar(texto, temporal)
+        except Exception as e:
+            self.logger.warning(f"No se pudo renderizar la frase: {e}")
+            try:
+                temporal.unlink()
+            except OSError:
+                pass
+            return None
+        return self.cache.guardar(clave, temporal)
+
+
+class MotorVoz:
+    """
+    Interfaz única de síntesis de voz.
+
+    Elige el motor (``seleccionar_backend``), lo precalienta en su hilo y
+    serializa las frases a través de un ``TrabajadorVoz``. Si el motor sabe
+    renderizar a WAV, las frases repetidas se sirven desde una ``CacheAudio``.
+    """
+
+    def __init__(self, backend: Optional[Union[str, BackendVoz]] = None,
+                 ruta_sondeo: Optional[Path] = RUTA_SONDEO, cache: Optional[CacheAudio] = None,
+                 usar_cache: bool = True):
+        """
+        Args:
+            backend: Motor o nombre de motor; por defecto, el seleccionado
+            ruta_sondeo: Archivo donde se guarda el sondeo de motores
+            cache: Caché de audio; por defecto, la de ``~/.aria/cache_voz``
+            usar_cache: False para pronunciar siempre con el motor
+        """
+        if backend is None:
+            backend = seleccionar_backend(ruta_sondeo)
+        if isinstance(backend, str):
+            backend = BACKENDS[backend]()
+        self.backend = backend
+        if cache is None and usar_cache and backend.graba_audio and ReproductorWav.disponible():
+            cache = CacheAudio()
+        self.trabajador = TrabajadorVoz(backend, cache=cache if usar_cache else None)
+
+    @property
+    def nombre(self) -> str:
+        return self.backend.nombre
+
+    def iniciar(self):
+        """Carga el motor en segundo plano."""
+        self.trabajador.iniciar()
+
+    def decir(self, texto: str, esperar: bool = True, timeout: Optional[float] = None,
+              prioridad: PrioridadVoz = PrioridadVoz.NORMAL, clave: Optional[str] = None) -> bool:
+        """Pronuncia una frase (ver ``TrabajadorVoz.decir``)."""
+        return self.trabajador.decir(texto, esperar=esperar, timeout=timeout, prioridad=prioridad, clave=clave)
+
+    def encolar(self, texto: str, prioridad: PrioridadVoz = PrioridadVoz.NORMAL,
+                clave: Optional[str] = None) -> Future:
+        """Encola una frase sin esperar (ver ``TrabajadorVoz.encolar``)."""
+        return self.trabajador.encolar(texto, prioridad=prioridad, clave=clave)
+
+    def interrumpir(self, prioridad_minima: PrioridadVoz = PrioridadVoz.ALTA) -> int:
+        """Corta la voz de Aria (ver ``TrabajadorVoz.interrumpir``)."""
+        return self.trabajador.interrumpir(prioridad_minima)
+
+    def hablando(self) -> bool:
+        """True si hay una frase sonando o pendiente."""
+        return self.trabajador.hablando()
+
+    def prerenderizar(self, frases: Iterable[str]) -> List[Future]:
+        """Deja frases renderizadas en la caché de audio (ver ``TrabajadorVoz.prerenderizar``)."""
+        return self.trabajador.prerenderizar(frases)
+
+    def medir(self, frases: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Micro-benchmark del motor cargado.
+
+        Returns:
+            Milisegundos de la primera frase, media y máximo
+        """
+        frases = frases or ["Hola.", "Son las doce.", "De nada, es un placer ayudarte."]
+        tiempos = []
+        for frase in frases:
+            inicio = time.perf_counter()
+            self.decir(frase)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return {
+            "backend": self.nombre,
+            "primera_ms": tiempos[0],
+            "media_ms": sum(tiempos) / len(tiempos),
+            "maximo_ms": max(tiempos)
+        }
+
+    def cerrar(self, timeout: float = 5.0):
+        """Termina las frases pendientes y libera el motor."""
+        self.trabajador.cerrar(timeout)
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        return self.trabajador.obtener_estadisticas()
+
+
+class AsistenteVoz:
+    """
+    Base de los asistentes conversacionales.
+
+    Proporciona ``decir`` sobre el motor de voz compartido, de modo que cada
+    asistente solo implementa su conversación.
+    """
+
+    @property
+    def motor_voz(self) -> MotorVoz:
+        return obtener_motor_voz()
+
+    def decir(self, texto: str, esperar: bool = False, prioridad: PrioridadVoz = PrioridadVoz.NORMAL,
+              clave: Optional[str] = None) -> bool:
+        """
+        Hace que Aria hable por la bocina del dispositivo.
+
+        Por defecto no espera a que termine la frase, para poder seguir
+        escuchando mientras suena.
+        """
+        print(f"🗣️ ARIA: {texto}")
+        if self.motor_voz.decir(texto, esperar=esperar, prioridad=prioridad, clave=clave):
+            return True
+        print(f"🗣️ ARIA (sin audio): {texto}")
+        return False
+
+    def interrumpir(self) -> int:
+        """Corta lo que Aria está diciendo (el usuario ha tomado la palabra)."""
+        return self.motor_voz.interrumpir()
+
+
+def energia_rms(datos: bytes, ancho_muestra: int = 2) -> float:
+    """Energía RMS de un bloque de audio PCM con signo."""
+    util = len(datos) - len(datos) % ancho_muestra
+    muestras = array.array({1: "b", 2: "h", 4: "i"}[ancho_muestra], datos[:util])
+    if not muestras:
+        return 0.0
+    return math.sqrt(sum(muestra * muestra for muestra in muestras) / len(muestras))
+
+
+_motor: Optional[MotorVoz] = None
+_lock_motor = threading.Lock()
+
+
+def obtener_motor_voz() -> MotorVoz:
+    """Motor de voz compartido por el proceso (se crea y precalienta en el primer uso)."""
+    global _motor
+    with _lock_motor:
+        if _motor is None:
+            _motor = MotorVoz()
+            _motor.iniciar()
+            # Al salir se deja terminar lo que quede en cola (p. ej. la despedida)
+            atexit.register(_motor.cerrar, 30.0)
+        return _motor
+
+
+if __name__ == "__main__":
+    for nombre, resultado in sondear_backends().items():
+        if resultado["disponible"] and resultado["frase_ms"] is not None:
+            print(f"{nombre:10s} carga {resultado['inicio_ms']:8.1f} ms   frase {resultado['frase_ms']:8.1f} ms "
+                  f"({resultado['medida']})")
+        elif resultado["disponible"]:
+            print(f"{nombre:10s} carga {resultado['inicio_ms']:8.1f} ms   frase sin medir")
+        else:
+            print(f"{nombre:10s} no disponible {resultado['error'] or ''}")
+    motor = MotorVoz(seleccionar_backend(resondear=True))
+    print(motor.medir())
+    motor.cerrar()
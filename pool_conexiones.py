@@ -0,0 +1,300 @@
+"""
+Pool de conexiones de Aria
+Reutiliza conexiones de un mismo tipo, las verifica periódicamente y
+reconecta de forma transparente las que fallan
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterator
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones de un mismo tipo.
+
+    Las conexiones deben ofrecer la interfaz habitual de ``conexiones``:
+    ``inicializar() -> bool``, ``cerrar() -> bool`` y ``esta_activa() -> bool``.
+    Un hilo de mantenimiento sondea las conexiones libres, descarta las que
+    llevan demasiado tiempo inactivas por encima del mínimo y repone el
+    mínimo configurado.
+    """
+
+    def __init__(self, nombre: str, fabrica: Callable[[], Any], minimo: int = 1, maximo: int = 4,
+                 max_inactividad: float = 300.0, intervalo_sondeo: float = 30.0):
+        """
+        Args:
+            nombre: Nombre del tipo de conexión (para logs)
+            fabrica: Crea una conexión nueva sin inicializar
+            minimo: Conexiones que se mantienen abiertas aunque no se usen
+            maximo: Conexiones abiertas como máximo (libres + prestadas)
+            max_inactividad: Segundos sin uso tras los que se cierra una conexión sobrante
+            intervalo_sondeo: Segundos entre sondeos de mantenimiento
+        """
+        self.nombre = nombre
+        self.logger = logging.getLogger(f"PoolConexiones.{nombre}")
+        self.fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = max(maximo, minimo, 1)
+        self.max_inactividad = max_inactividad
+        self.intervalo_sondeo = intervalo_sondeo
+
+        # Conexiones libres: (conexion, instante del último uso)
+        self._libres: deque = deque()
+        self._total = 0
+        self._cond = threading.Condition()
+        # Solo lo activa cerrar(): el mantenimiento no debe despertar con cada devolución
+        self._parar = threading.Event()
+        self._activo = False
+        self._hilo_mantenimiento: Optional[threading.Thread] = None
+        self._estadisticas = {"prestamos": 0, "creadas": 0, "reconexiones": 0, "descartadas": 0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def adoptar(self, conexion: Any):
+        """Incorpora al pool una conexión ya inicializada."""
+        with self._cond:
+            self._total += 1
+            self._libres.append((conexion, time.monotonic()))
+            self._cond.notify()
+
+    def iniciar(self) -> bool:
+        """Abre el mínimo de conexiones y arranca el mantenimiento en segundo plano."""
+        with self._cond:
+            if self._activo:
+                return True
+            self._activo = True
+            self._parar.clear()
+
+        self._reponer_minimo()
+        self._hilo_mantenimiento = threading.Thread(
+            target=self._mantener, name=f"aria-pool-{self.nombre}", daemon=True
+        )
+        self._hilo_mantenimiento.start()
+        return self.libres() > 0 or self.minimo == 0
+
+    def cerrar(self) -> bool:
+        """Detiene el mantenimiento y cierra las conexiones libres."""
+        with self._cond:
+            self._activo = False
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres.clear()
+            self._total -= len(libres)
+            self._cond.notify_all()
+        self._parar.set()
+
+        exito = True
+        for conexion in libres:
+            exito = self._cerrar_conexion(conexion) and exito
+        return exito
+
+    def reconectar(self) -> bool:
+        """Reconecta todas las conexiones libres."""
+        with self._cond:
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres.clear()
+
+        exito = True
+        for conexion in libres:
+            if self._reconectar(conexion):
+                self._devolver(conexion)
+            else:
+                self._descartar(conexion)
+                exito = False
+        self._reponer_minimo()
+        return exito
+
+    # ------------------------------------------------------------------
+    # Préstamo
+    # ------------------------------------------------------------------
+
+    def adquirir(self, timeout: Optional[float] = None) -> Any:
+        """
+        Toma una conexión sana del pool, creando una nueva si hay cupo.
+
+        Args:
+            timeout: Segundos máximos de espera si el pool está agotado
+
+        Returns:
+            Conexión inicializada
+
+        Raises:
+            TimeoutError: Si no se libera ninguna conexión a tiempo
+            ConnectionError: Si no se puede abrir una conexión nueva
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            conexion = None
+            crear = False
+            with self._cond:
+                while not self._libres and self._total >= self.maximo:
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise TimeoutError(f"Pool {self.nombre} agotado")
+                    self._cond.wait(restante)
+
+                if self._libres:
+                    # LIFO: la conexión usada más recientemente es la más probable de seguir viva
+                    conexion, _ = self._libres.pop()
+                else:
+                    self._total += 1
+                    crear = True
+
+            if crear:
+                conexion = self._crear()
+            elif not self._sana(conexion) and not self._reconectar(conexion):
+                # Reconexión transparente fallida: descartar y volver a intentar
+                self._descartar(conexion)
+                continue
+
+            with self._cond:
+                self._estadisticas["prestamos"] += 1
+            return conexion
+
+    def liberar(self, conexion: Any, descartar: bool = False):
+        """Devuelve una conexión al pool (o la cierra si está marcada para descarte)."""
+        if descartar or not self._activo:
+            self._descartar(conexion)
+        else:
+            self._devolver(conexion)
+
+    @contextmanager
+    def prestar(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Presta una conexión durante un bloque ``with``."""
+        conexion = self.adquirir(timeout)
+        fallo = False
+        try:
+            yield conexion
+        except Exception:
+            fallo = True
+            raise
+        finally:
+            # Tras un error se descarta si ya no responde
+            self.liberar(conexion, descartar=fallo and not self._sana(conexion))
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def libres(self) -> int:
+        """Número de conexiones libres."""
+        with self._cond:
+            return len(self._libres)
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Estadísticas del pool."""
+        with self._cond:
+            return {
+                "activo": self._activo,
+                "total": self._total,
+                "libres": len(self._libres),
+                "prestadas": self._total - len(self._libres),
+                "minimo": self.minimo,
+                "maximo": self.maximo,
+                **self._estadisticas
+            }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _crear(self) -> Any:
+        """Crea e inicializa una conexión; el cupo ya debe estar reservado."""
+        try:
+            conexion = self.fabrica()
+            if not conexion.inicializar():
+                raise ConnectionError(f"No se pudo inicializar conexión {self.nombre}")
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._estadisticas["creadas"] += 1
+        return conexion
+
+    def _devolver(self, conexion: Any):
+        with self._cond:
+            self._libres.append((conexion, time.monotonic()))
+            self._cond.notify()
+
+    def _descartar(self, conexion: Any):
+        self._cerrar_conexion(conexion)
+        with self._cond:
+            self._total -= 1
+            self._estadisticas["descartadas"] += 1
+            self._cond.notify()
+
+    def _sana(self, conexion: Any) -> bool:
+        try:
+            return bool(conexion.esta_activa())
+        except Exception:
+            return False
+
+    def _reconectar(self, conexion: Any) -> bool:
+        self._cerrar_conexion(conexion)
+        try:
+            exito = bool(conexion.inicializar())
+        except Exception as e:
+            self.logger.warning(f"Error reconectando: {e}")
+            exito = False
+        if exito:
+            with self._cond:
+                self._estadisticas["reconexiones"] += 1
+        return exito
+
+    def _cerrar_conexion(self, conexion: Any) -> bool:
+        try:
+            return bool(conexion.cerrar())
+        except Exception as e:
+            self.logger.warning(f"Error cerrando conexión: {e}")
+            return False
+
+    def _reponer_minimo(self):
+        """Abre conexiones hasta alcanzar el mínimo."""
+        while True:
+            with self._cond:
+                if not self._activo or self._total >= self.minimo:
+                    return
+                self._total += 1
+            try:
+                self._devolver(self._crear())
+            except Exception as e:
+                self.logger.warning(f"No se pudo reponer el mínimo del pool: {e}")
+                return
+
+    def _mantener(self):
+        """Bucle de mantenimiento: sondeo, desalojo de inactivas y reposición."""
+        while not self._parar.wait(self.intervalo_sondeo):
+            with self._cond:
+                if not self._activo:
+                    return
+                ahora = time.monotonic()
+                sobrantes = self._total - self.minimo
+                revisar = []
+                for conexion, ultimo_uso in self._libres:
+                    if sobrantes > 0 and ahora - ultimo_uso > self.max_inactividad:
+                        revisar.append((conexion, None))
+                        sobrantes -= 1
+                    else:
+                        revisar.append((conexion, ultimo_uso))
+                self._libres = deque()
+
+            # Sondeos fuera del lock para no bloquear préstamos
+            for conexion, ultimo_uso in reversed(revisar):
+                if ultimo_uso is None:
+                    self._descartar(conexion)
+                elif self._sana(conexion) or self._reconectar(conexion):
+                    with self._cond:
+                        self._libres.appendleft((conexion, ultimo_uso))
+                        self._cond.notify()
+                else:
+                    self._descartar(conexion)
+
+            self._reponer_minimo()
@@ -0,0 +1,339 @@
+"""
+Reconocimiento local de comandos de voz de Aria
+Resuelve en el propio equipo las frases de comando conocidas (huellas de
+audio aprendidas y, si está instalado, Vosk con una gramática cerrada) y
+solo envía al reconocedor pesado el habla libre
+"""
+
+import array
+import importlib.util
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from escucha_continua import MotorReconocimiento, Segmento, ErrorReconocimiento
+
+
+# Frases de control de las conversaciones y de _procesar_comando_voz
+VOCABULARIO_COMANDOS = [
+    "salir", "terminar", "apagar", "adiós", "chao", "bye",
+    "por escrito", "por voz",
+    "qué hora es", "estado del sistema", "cómo estás", "reiniciar sistema", "conexiones",
+    "cómo te sientes", "estado emocional",
+    "hola", "buenos días", "buenas tardes", "buenas noches",
+    "gracias", "ayuda", "qué puedes hacer",
+]
+
+RUTA_HUELLAS = Path.home() / ".aria" / "huellas_comandos.json"
+RUTA_MODELO_VOSK = Path.home() / ".aria" / "modelos" / "vosk-es"
+
+
+def normalizar_frase(texto: str) -> str:
+    """Minúsculas, sin tildes ni signos de puntuación (para comparar con el vocabulario)."""
+    sin_tildes = "".join(c for c in unicodedata.normalize("NFD", texto.lower()) if unicodedata.category(c) != "Mn")
+    return " ".join(re.sub(r"[^\w\s]", " ", sin_tildes).split())
+
+
+def calcular_huella(segmento: Segmento, puntos: int = 24, trama: float = 0.02) -> Optional[List[float]]:
+    """
+    Huella acústica compacta de una frase corta.
+
+    Envolvente de energía logarítmica (normalizada, para no depender del
+    volumen) y tasa de cruces por cero de cada trama (distingue sonidos
+    como la "s"), remuestreadas a ``puntos`` valores tras recortar el
+    silencio de los extremos.
+    """
+    if segmento.ancho_muestra != 2:
+        return None
+    muestras = array.array("h", segmento.datos[:len(segmento.datos) - len(segmento.datos) % 2])
+    tamano = max(1, int(segmento.frecuencia * trama))
+    energias, cruces = [], []
+    for inicio in range(0, len(muestras) - tamano + 1, tamano):
+        bloque = muestras[inicio:inicio + tamano]
+        energias.append(math.sqrt(sum(m * m for m in bloque) / tamano))
+        cruces.append(sum((a < 0) != (b < 0) for a, b in zip(bloque, bloque[1:])) / tamano)
+    if not energias:
+        return None
+
+    # Recortar el silencio (pre-roll del detector y cola final)
+    corte = max(energias) * 0.1
+    voz = [i for i, energia in enumerate(energias) if energia > corte]
+    if len(voz) < 3:
+        return None
+    energias = energias[voz[0]:voz[-1] + 1]
+    cruces = cruces[voz[0]:voz[-1] + 1]
+
+    logaritmos = [math.log(energia + 1.0) for energia in energias]
+    media = sum(logaritmos) / len(logaritmos)
+    desviacion = math.sqrt(sum((v - media) ** 2 for v in logaritmos) / len(logaritmos)) or 1.0
+    envolvente = [(v - media) / desviacion for v in logaritmos]
+    return _remuestrear(envolvente, puntos) + [c * 4 for c in _remuestrear(cruces, puntos)]
+
+
+def _remuestrear(valores: List[float], puntos: int) -> List[float]:
+    if len(valores) == 1:
+        return valores * puntos
+    resultado = []
+    for i in range(puntos):
+        posicion = i * (len(valores) - 1) / float(puntos - 1)
+        base = int(posicion)
+        fraccion = posicion - base
+        siguiente = valores[min(base + 1, len(valores) - 1)]
+        resultado.append(valores[base] * (1 - fraccion) + siguiente * fraccion)
+    return resultado
+
+
+def _distancia(a: List[float], b: List[float]) -> float:
+    return math.sqrt(sum((x - y) ** 2 for x, y in zip(a, b)) / len(a))
+
+
+class CacheHuellas:
+    """
+    Huellas de audio de comandos ya reconocidos.
+
+    Solo se aprenden frases cortas que el reconocedor pesado transcribió
+    como un comando del vocabulario. Una frase nueva se resuelve si su
+    huella más cercana está a menos de ``umbral`` y no hay otro comando a
+    una distancia parecida (``margen``).
+    """
+
+    def __init__(self, ruta: Optional[Path] = RUTA_HUELLAS, umbral: float = 0.35, margen: float = 0.1,
+                 por_comando: int = 8):
+        """
+        Args:
+            ruta: Archivo JSON donde se guardan las huellas (None para no persistir)
+            umbral: Distancia máxima para aceptar una coincidencia
+            margen: Ventaja mínima sobre la huella más cercana de otro comando
+            por_comando: Huellas que se conservan por comando (las más recientes)
+        """
+        self.logger = logging.getLogger("CacheHuellas")
+        self.ruta = ruta
+        self.umbral = umbral
+        self.margen = margen
+        self.por_comando = por_comando
+        self._huellas: Dict[str, List[Tuple[float, List[float]]]] = {}
+        self._lock = threading.Lock()
+        self._cargar()
+
+    def buscar(self, huella: List[float], duracion: float) -> Optional[str]:
+        """Comando cuya huella coincide, o None."""
+        mejores: Dict[str, float] = {}
+        with self._lock:
+            for comando, huellas in self._huellas.items():
+                for duracion_guardada, guardada in huellas:
+                    # Una misma orden no cambia tanto de duración
+                    if not 0.67 <= duracion / duracion_guardada <= 1.5:
+                        continue
+                    distancia = _distancia(huella, guardada)
+                    if distancia < mejores.get(comando, math.inf):
+                        mejores[comando] = distancia
+        if not mejores:
+            return None
+        ordenados = sorted(mejores.items(), key=lambda item: item[1])
+        comando, distancia = ordenados[0]
+        if distancia > self.umbral:
+            return None
+        if len(ordenados) > 1 and ordenados[1][1] - distancia < self.margen:
+            return None
+        return comando
+
+    def aprender(self, comando: str, huella: List[float], duracion: float):
+        with self._lock:
+            huellas = self._huellas.setdefault(comando, [])
+            huellas.append((duracion, huella))
+            del huellas[:-self.por_comando]
+            datos = {c: [[d, h] for d, h in lista] for c, lista in self._huellas.items()}
+        self._guardar(datos)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(huellas) for huellas in self._huellas.values())
+
+    def _cargar(self):
+        if self.ruta is None:
+            return
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+            self._huellas = {comando: [(float(d), list(h)) for d, h in lista] for comando, lista in datos.items()}
+        except (OSError, ValueError, TypeError):
+            self._huellas = {}
+
+    def _guardar(self, datos: Dict[str, Any]):
+        if self.ruta is None:
+            return
+        try:
+            Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.ruta, "w", encoding="utf-8") as archivo:
+                json.dump(datos, archivo)
+        except OSError as e:
+            self.logger.warning(f"No se pudieron guardar las huellas de comandos: {e}")
+
+
+class ReconocimientoVosk(MotorReconocimiento):
+    """
+    Vosk sin conexión, opcionalmente restringido a una gramática cerrada.
+
+    Con gramática solo devuelve frases completas del vocabulario reconocidas
+    con confianza suficiente; sin ella, transcribe habla libre.
+    """
+
+    nombre = "vosk"
+
+    # Los modelos pesan decenas de MB: uno por ruta para todo el proceso
+    _modelos: Dict[str, Any] = {}
+    _lock_modelos = threading.Lock()
+
+    def __init__(self, ruta_modelo: Optional[Path] = None, gramatica: Optional[Iterable[str]] = None,
+                 confianza_minima: float = 0.8):
+        self.ruta_modelo = Path(ruta_modelo or os.environ.get("ARIA_MODELO_VOSK") or RUTA_MODELO_VOSK)
+        self.gramatica = list(gramatica) if gramatica is not None else None
+        self.confianza_minima = confianza_minima
+
+    @classmethod
+    def disponible(cls, ruta_modelo: Optional[Path] = None) -> bool:
+        ruta = Path(ruta_modelo or os.environ.get("ARIA_MODELO_VOSK") or RUTA_MODELO_VOSK)
+        return importlib.util.find_spec("vosk") is not None and ruta.is_dir()
+
+    def _cargar_modelo(self):
+        with self._lock_modelos:
+            clave = str(self.ruta_modelo)
+            if clave not in self._modelos:
+                import vosk
+
+                vosk.SetLogLevel(-1)
+                self._modelos[clave] = vosk.Model(clave)
+            return self._modelos[clave]
+
+    def reconocer(self, segmento: Segmento) -> Optional[str]:
+        import vosk
+
+        if self.gramatica is not None:
+            reconocedor = vosk.KaldiRecognizer(self._cargar_modelo(), segmento.frecuencia,
+                                               json.dumps(self.gramatica + ["[unk]"], ensure_ascii=False))
+        else:
+            reconocedor = vosk.KaldiRecognizer(self._cargar_modelo(), segmento.frecuencia)
+        reconocedor.SetWords(True)
+        reconocedor.AcceptWaveform(segmento.datos)
+        resultado = json.loads(reconocedor.FinalResult())
+        texto = resultado.get("text", "").strip()
+        if not texto:
+            return None
+        if self.gramatica is None:
+            return texto
+
+        palabras = resultado.get("result", [])
+        confianza = min((palabra.get("conf", 0.0) for palabra in palabras), default=0.0)
+        if "[unk]" in texto or texto not in self.gramatica or confianza < self.confianza_minima:
+            return None
+        return texto
+
+
+class ReconocimientoEscalonado(MotorReconocimiento):
+    """
+    Reconocimiento en escalones, del más barato al más caro.
+
+    1. Huellas de audio de comandos ya oídos (frases cortas, milisegundos).
+    2. Gramática local del vocabulario de comandos (Vosk, si está instalado).
+    3. El reconocedor pesado (p. ej. Google) para el habla libre.
+
+    Si el pesado falla (sin red), se usa el respaldo local de habla libre si
+    lo hay. Las transcripciones del pesado que son un comando enseñan su
+    huella a la caché.
+    """
+
+    nombre = "escalonado"
+
+    def __init__(self, pesado: MotorReconocimiento, vocabulario: Iterable[str] = VOCABULARIO_COMANDOS,
+                 huellas: Optional[CacheHuellas] = None, gramatica: Optional[MotorReconocimiento] = None,
+                 respaldo: Optional[MotorReconocimiento] = None, duracion_comando: float = 2.5):
+        """
+        Args:
+            pesado: Reconocedor de habla libre
+            vocabulario: Frases de comando que se resuelven localmente
+            huellas: Caché de huellas de audio (por defecto, la de ``~/.aria``)
+            gramatica: Reconocedor local restringido al vocabulario
+            respaldo: Reconocedor local de habla libre para cuando el pesado falla
+            duracion_comando: Segundos máximos de una frase de comando
+        """
+        self.pesado = pesado
+        self.huellas = huellas if huellas is not None else CacheHuellas()
+        self.gramatica = gramatica
+        self.respaldo = respaldo
+        self.duracion_comando = duracion_comando
+        self._vocabulario = {normalizar_frase(frase): frase for frase in vocabulario}
+        self._lock = threading.Lock()
+        self._estadisticas = {nivel: {"frases": 0, "tiempo_total": 0.0}
+                              for nivel in ("huella", "gramatica", "pesado", "respaldo")}
+
+    def reconocer(self, segmento: Segmento) -> Optional[str]:
+        huella = None
+        if segmento.duracion <= self.duracion_comando:
+            inicio = time.perf_counter()
+            huella = calcular_huella(segmento)
+            texto = self.huellas.buscar(huella, segmento.duracion) if huella else None
+            if texto:
+                return self._contar("huella", inicio, texto)
+
+            if self.gramatica is not None:
+                inicio = time.perf_counter()
+                texto = self._intentar(self.gramatica, segmento)
+                if texto:
+                    return self._contar("gramatica", inicio, self._vocabulario.get(normalizar_frase(texto), texto))
+
+        inicio = time.perf_counter()
+        try:
+            texto = self.pesado.reconocer(segmento)
+        except ErrorReconocimiento:
+            if self.respaldo is None:
+                raise
+            inicio = time.perf_counter()
+            return self._contar("respaldo", inicio, self._intentar(self.respaldo, segmento))
+        self._contar("pesado", inicio, texto)
+
+        comando = self._vocabulario.get(normalizar_frase(texto or ""))
+        if comando and huella:
+            self.huellas.aprender(comando, huella, segmento.duracion)
+        return texto
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """Frases resueltas y tiempo medio de cada escalón."""
+        with self._lock:
+            return {
+                nivel: {
+                    "frases": datos["frases"],
+                    "media_ms": datos["tiempo_total"] / datos["frases"] * 1000 if datos["frases"] else 0.0
+                }
+                for nivel, datos in self._estadisticas.items()
+            }
+
+    def _intentar(self, motor: MotorReconocimiento, segmento: Segmento) -> Optional[str]:
+        try:
+            return motor.reconocer(segmento)
+        except Exception as e:
+            logging.getLogger("ReconocimientoEscalonado").warning(f"Error en el reconocedor {motor.nombre}: {e}")
+            return None
+
+    def _contar(self, nivel: str, inicio: float, texto: Optional[str]) -> Optional[str]:
+        with self._lock:
+            self._estadisticas[nivel]["frases"] += 1
+            self._estadisticas[nivel]["tiempo_total"] += time.perf_counter() - inicio
+        return texto
+
+
+def crear_reconocimiento(pesado: MotorReconocimiento,
+                         vocabulario: Iterable[str] = VOCABULARIO_COMANDOS) -> ReconocimientoEscalonado:
+    """Escalones con los motores locales disponibles en esta máquina."""
+    vocabulario = list(vocabulario)
+    gramatica = respaldo = None
+    if ReconocimientoVosk.disponible():
+        gramatica = ReconocimientoVosk(gramatica=vocabulario)
+        respaldo = ReconocimientoVosk()
+    return ReconocimientoEscalonado(pesado, vocabulario, gramatica=gramatica, respaldo=respaldo)
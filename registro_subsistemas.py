@@ -0,0 +1,131 @@
+"""
+Registro de subsistemas de Aria con carga diferida
+Cada componente se importa y se crea la primera vez que se accede a él
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+# Definición de un subsistema: (módulo, atributo, crear_instancia)
+Definicion = Tuple[str, str, bool]
+
+
+def _importar(modulo: str, nombre: str) -> Any:
+    """Importa un atributo de un módulo, retornando None si falla."""
+    try:
+        mod = __import__(modulo, fromlist=[nombre])
+        return getattr(mod, nombre)
+    except (ImportError, AttributeError) as e:
+        print(f"Advertencia: No se pudo importar {modulo}: {e}")
+        return None
+
+
+class RegistroSubsistemas:
+    """
+    Registro perezoso de subsistemas.
+
+    Los módulos se importan y los componentes se instancian en el primer
+    acceso; el resultado (incluido un fallo, guardado como None) queda en
+    caché para no repetir el intento en cada acceso.
+    """
+
+    def __init__(self, definiciones: Dict[str, Definicion],
+                 importador: Optional[Callable[[str, str], Any]] = None):
+        self.logger = logging.getLogger("RegistroSubsistemas")
+        self._definiciones = dict(definiciones)
+        self._importador = importador or _importar
+        self._instancias: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def definidos(self) -> List[str]:
+        """Nombres de todos los subsistemas registrados."""
+        return list(self._definiciones)
+
+    def cargado(self, nombre: str) -> bool:
+        """Indica si el subsistema ya fue creado con éxito."""
+        return self._instancias.get(nombre) is not None
+
+    def obtener(self, nombre: str) -> Any:
+        """
+        Obtiene un subsistema, creándolo si es el primer acceso.
+
+        Args:
+            nombre: Nombre del subsistema
+
+        Returns:
+            Instancia (o atributo del módulo) o None si no está disponible
+        """
+        if nombre in self._instancias:
+            return self._instancias[nombre]
+
+        with self._lock:
+            if nombre in self._instancias:
+                return self._instancias[nombre]
+
+            modulo, atributo, crear = self._definiciones[nombre]
+            inicio = time.perf_counter()
+            objeto = self._importador(modulo, atributo)
+            if objeto is not None and crear:
+                try:
+                    objeto = objeto()
+                except Exception as e:
+                    self.logger.error(f"Error creando subsistema {nombre}: {e}")
+                    objeto = None
+
+            if objeto is not None:
+                self.logger.info(f"Subsistema {nombre} cargado en {time.perf_counter() - inicio:.3f}s")
+            self._instancias[nombre] = objeto
+            return objeto
+
+    def precalentar(self, nombres: Optional[List[str]] = None,
+                    en_segundo_plano: bool = False) -> Dict[str, bool]:
+        """
+        Carga por adelantado una lista de subsistemas.
+
+        Args:
+            nombres: Subsistemas a cargar (todos si es None)
+            en_segundo_plano: Cargar en un hilo aparte sin esperar
+
+        Returns:
+            Dict nombre -> disponible (vacío si se carga en segundo plano)
+        """
+        nombres = list(nombres) if nombres is not None else self.definidos()
+        if en_segundo_plano:
+            threading.Thread(target=self.precalentar, args=(nombres,),
+                             name="aria-precalentar", daemon=True).start()
+            return {}
+        return {nombre: self.obtener(nombre) is not None for nombre in nombres}
+
+    def establecer(self, nombre: str, objeto: Any):
+        """Sustituye un subsistema por una instancia ya creada."""
+        with self._lock:
+            self._instancias[nombre] = objeto
+
+    def olvidar(self, nombre: str):
+        """Descarta la instancia en caché para que se vuelva a crear en el próximo acceso."""
+        with self._lock:
+            self._instancias.pop(nombre, None)
+
+
+class SubsistemaPerezoso:
+    """
+    Atributo de clase que resuelve un subsistema a través del registro
+    ``subsistemas`` de la instancia.
+    """
+
+    def __init__(self, nombre: Optional[str] = None):
+        self.nombre = nombre
+
+    def __set_name__(self, propietario, nombre: str):
+        if self.nombre is None:
+            self.nombre = nombre
+
+    def __get__(self, instancia, propietario=None):
+        if instancia is None:
+            return self
+        return instancia.subsistemas.obtener(self.nombre)
+
+    def __set__(self, instancia, valor):
+        instancia.subsistemas.establecer(self.nombre, valor)
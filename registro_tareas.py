@@ -0,0 +1,139 @@
+"""
+Registro de tareas de Aria
+Genera identificadores monótonos sin colisiones y lleva el seguimiento
+de las tareas en curso y de las completadas recientemente
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+# Alfabeto base32 de Crockford (el mismo que usan los ULID)
+_ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def _base32(valor: int, longitud: int) -> str:
+    """Codifica un entero en base32 con longitud fija."""
+    caracteres = []
+    for _ in range(longitud):
+        caracteres.append(_ALFABETO[valor & 31])
+        valor >>= 5
+    return "".join(reversed(caracteres))
+
+
+class GeneradorIdTareas:
+    """
+    Genera IDs de tarea al estilo ULID: milisegundos + secuencia + nodo.
+
+    Los IDs generados por una misma instancia son estrictamente crecientes
+    (también en orden lexicográfico), aunque se pidan muchos en el mismo
+    milisegundo o el reloj del sistema retroceda.
+    """
+
+    def __init__(self, prefijo: str = "TAREA"):
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self._ultimo_ms = 0
+        self._secuencia = 0
+        # Sufijo aleatorio por proceso para evitar colisiones entre procesos
+        self._nodo = _base32(int.from_bytes(os.urandom(3), "big"), 4)
+
+    def generar(self) -> str:
+        """Genera un nuevo ID único."""
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms <= self._ultimo_ms:
+                # Mismo milisegundo (o reloj hacia atrás): avanzar la secuencia
+                self._secuencia += 1
+            else:
+                self._ultimo_ms = ms
+                self._secuencia = 0
+            return f"{self.prefijo}-{_base32(self._ultimo_ms, 10)}{_base32(self._secuencia, 6)}{self._nodo}"
+
+
+class RegistroTareas:
+    """
+    Registro de tareas indexado por ID.
+
+    Las tareas en curso se guardan en un diccionario (búsqueda O(1)) y se
+    retiran al finalizar; las finalizadas pasan a un historial acotado que
+    descarta las más antiguas. ``al_cambiar`` se invoca (fuera del lock)
+    cada vez que se registra o finaliza una tarea.
+    """
+
+    def __init__(self, max_recientes: int = 100, al_cambiar: Optional[Callable[[], None]] = None):
+        self.max_recientes = max_recientes
+        self.al_cambiar = al_cambiar
+        self._activas: Dict[str, Dict[str, Any]] = {}
+        self._recientes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, id_tarea: str, **info) -> Dict[str, Any]:
+        """
+        Registra una tarea en curso.
+
+        Args:
+            id_tarea: ID de la tarea
+            **info: Datos descriptivos (tipo, prioridad, ...)
+
+        Returns:
+            Registro creado
+        """
+        registro = {"id": id_tarea, **info, "inicio": datetime.now().isoformat(), "estado": "pendiente"}
+        with self._lock:
+            self._activas[id_tarea] = registro
+        if self.al_cambiar:
+            self.al_cambiar()
+        return registro
+
+    def finalizar(self, id_tarea: str, estado: str = "completada",
+                  error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retira una tarea en curso y la pasa al historial de recientes.
+
+        Args:
+            id_tarea: ID de la tarea
+            estado: Estado final (completada, error, cancelada)
+            error: Mensaje de error, si lo hubo
+
+        Returns:
+            Registro finalizado o None si la tarea no estaba en curso
+        """
+        with self._lock:
+            registro = self._activas.pop(id_tarea, None)
+            if registro is None:
+                return None
+
+            registro["estado"] = estado
+            registro["fin"] = datetime.now().isoformat()
+            if error:
+                registro["error"] = error
+
+            self._recientes[id_tarea] = registro
+            while len(self._recientes) > self.max_recientes:
+                self._recientes.popitem(last=False)
+        if self.al_cambiar:
+            self.al_cambiar()
+        return registro
+
+    def obtener(self, id_tarea: str) -> Optional[Dict[str, Any]]:
+        """Obtiene una tarea en curso o reciente por su ID."""
+        with self._lock:
+            registro = self._activas.get(id_tarea) or self._recientes.get(id_tarea)
+            return dict(registro) if registro else None
+
+    def pendientes(self) -> List[Dict[str, Any]]:
+        """Lista las tareas en curso."""
+        with self._lock:
+            return [dict(registro) for registro in self._activas.values()]
+
+    def recientes(self) -> List[Dict[str, Any]]:
+        """Lista las tareas finalizadas recientemente, de la más antigua a la más nueva."""
+        with self._lock:
+            return [dict(registro) for registro in self._recientes.values()]
+
+    def __len__(self) -> int:
+        return len(self._activas)
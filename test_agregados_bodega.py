@@ -0,0 +1,101 @@
+"""
+Tests para los agregados incrementales de la bodega de Aria
+"""
+
+import random
+import sqlite3
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from agregados_bodega import AgregadosBodega, SpaceSaving, peso
+from bodega_indexada import BodegaIndexada
+from bodega_sqlite import BodegaSQLite
+
+def entradas(cantidad=500, semilla=5):
+    azar = random.Random(semilla)
+    palabras = ["tecnologia"] * 6 + ["ciencia"] * 3 + ["arte", "deportes", "audio", "visual"]
+    return [
+        {"tipo": azar.choice(["conversacion", "experiencia"]), "contenido": {"n": i},
+         "importancia": azar.randint(1, 5), "usuario_id": azar.choice(["ana", "luis", None]),
+         "palabras_clave": azar.sample(palabras, 2), "timestamp": 1_700_000_000 + i}
+        for i in range(cantidad)
+    ]
+
+class TestAgregadosBodega(unittest.TestCase):
+    """Suite de pruebas para los agregados de la bodega."""
+
+    def test_01_space_saving(self):
+        """Test de que los elementos frecuentes se detectan con memoria fija."""
+        azar = random.Random(1)
+        flujo = ["tecnologia"] * 400 + ["ciencia"] * 250 + [f"raro{azar.randint(0, 5000)}" for _ in range(2000)]
+        azar.shuffle(flujo)
+        boceto = SpaceSaving(capacidad=16)
+        for elemento in flujo:
+            boceto.sumar(elemento)
+        self.assertEqual(len(boceto), 16)
+        primeros = boceto.mas_frecuentes(2)
+        self.assertEqual([elemento for elemento, _ in primeros], ["tecnologia", "ciencia"])
+        reales = Counter(flujo)
+        for elemento, cuenta in primeros:
+            self.assertGreaterEqual(cuenta, reales[elemento])
+            self.assertLessEqual(cuenta - boceto.error(elemento), reales[elemento])
+
+    def test_02_sumar_y_restar(self):
+        """Test de que restar deshace sumar, con el peso de muestreos y resúmenes."""
+        agregados = AgregadosBodega()
+        agregados.sumar("experiencia", 1, "ana", ["movimiento"], 10.0, {"tipo": "resumen", "cantidad": 40})
+        agregados.sumar("conversacion", 3, "ana", ["saludo"], 20.0, {"texto": "hola"})
+        resumen = agregados.resumen_usuario("ana")
+        self.assertEqual(resumen["temas_frecuentes"], [("movimiento", 40), ("saludo", 1)])
+        self.assertEqual((resumen["primera_interaccion"], resumen["ultima_interaccion"]), (10.0, 20.0))
+        agregados.restar("conversacion", 3, "ana", ["saludo"], 20.0, {"texto": "hola"})
+        self.assertEqual(agregados.estadisticas(),
+                         {"total_entradas": 1, "por_tipo": {"experiencia": 1}, "por_importancia": {1: 1},
+                          "usuarios_registrados": 1})
+        self.assertEqual(peso({"agrupadas": 3}), 3)
+
+    def test_03_motores_coinciden_con_recalcular(self):
+        """Test de que los agregados de ambos motores coinciden con recorrer la bodega."""
+        with tempfile.TemporaryDirectory() as directorio:
+            for bodega in (BodegaIndexada(), BodegaSQLite(Path(directorio) / "bodega.db")):
+                datos = entradas()
+                ids = bodega.almacenar_lote(datos)
+                for id_entrada in ids[:50]:
+                    bodega.eliminar(id_entrada)
+                bodega.retirar(1_700_000_000 + 100, importancia_min=1, importancia_max=2)
+                vivas = bodega.buscar({})
+                estadisticas = bodega.obtener_estadisticas()
+                self.assertEqual(estadisticas["total_entradas"], len(vivas))
+                self.assertEqual(estadisticas["por_tipo"], dict(Counter(e["tipo"] for e in vivas)))
+                self.assertEqual(estadisticas["por_importancia"], dict(Counter(e["importancia"] for e in vivas)))
+                resumen = bodega.obtener_resumen_usuario("ana")
+                de_ana = [e for e in vivas if e["usuario_id"] == "ana"]
+                self.assertEqual(resumen["total_entradas"], len(de_ana))
+                temas = Counter(p for e in de_ana for p in e["palabras_clave"])
+                self.assertEqual(resumen["temas_frecuentes"][0], temas.most_common(1)[0])
+
+    def test_04_bodega_sqlite_anterior(self):
+        """Test de que una base sin tablas de agregados los calcula al abrirse."""
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = Path(directorio) / "bodega.db"
+            bodega = BodegaSQLite(ruta)
+            bodega.almacenar_lote(entradas(100))
+            esperado = bodega.obtener_estadisticas()
+            bodega.cerrar()
+            conexion = sqlite3.connect(ruta)
+            conexion.executescript("DROP TABLE conteos; DROP TABLE temas;")
+            conexion.close()
+
+            bodega = BodegaSQLite(ruta)
+            estadisticas = bodega.obtener_estadisticas()
+            for clave in ("total_entradas", "por_tipo", "por_importancia", "usuarios_registrados"):
+                self.assertEqual(estadisticas[clave], esperado[clave])
+            bodega.cerrar()
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Tests para el procesamiento de solicitudes de AriaUniversal
+Los subsistemas externos (gestor de tareas, sistema adaptativo) se
+sustituyen por versiones en memoria
+"""
+
+import asyncio
+import enum
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+logging.basicConfig(level=logging.CRITICAL)
+
+from main import AriaUniversal, MODULO_TAREAS, CONEXIONES, importar_clase
+
+@dataclass
+class Tarea:
+    id: str
+    funcion: Callable
+    argumentos: Dict[str, Any]
+    prioridad: Any
+
+PrioridadTarea = enum.Enum("PrioridadTarea", "BAJA MEDIA ALTA CRITICA")
+
+class Gestor:
+    """Gestor de tareas en memoria: cada tarea se ejecuta en su hilo al liberarla."""
+
+    def __init__(self, automatico=True):
+        self.automatico = automatico
+        self.tareas = []
+
+    def agregar_tarea(self, tarea):
+        self.tareas.append(tarea)
+        if self.automatico:
+            self.ejecutar(tarea)
+
+    def ejecutar(self, tarea):
+        def correr():
+            try:
+                tarea.funcion(**tarea.argumentos)
+            except Exception:
+                pass
+        hilo = threading.Thread(target=correr, daemon=True)
+        hilo.start()
+        return hilo
+
+class Adaptativo:
+    """Sistema adaptativo que devuelve los datos recibidos; se puede bloquear con ``bloqueo``."""
+
+    def __init__(self):
+        self.llamadas = []
+        self.bloqueo = None
+
+    def procesar_solicitud_adaptativa(self, solicitud):
+        self.llamadas.append(solicitud)
+        if self.bloqueo is not None:
+            self.bloqueo.wait(5)
+        if solicitud["datos"].get("fallar"):
+            raise ValueError("fallo del dominio")
+        return {"eco": solicitud["datos"], "hilo": threading.current_thread().name}
+
+class Conexion:
+    """Conexión cuyo inicio o cierre puede quedarse esperando un evento."""
+
+    def __init__(self, espera_inicio=None, espera_cierre=None):
+        self.espera_inicio = espera_inicio
+        self.espera_cierre = espera_cierre
+
+    def inicializar(self):
+        if self.espera_inicio is not None:
+            self.espera_inicio.wait(5)
+        return True
+
+    def cerrar(self):
+        if self.espera_cierre is not None:
+            self.espera_cierre.wait(5)
+        return True
+
+    def esta_activa(self):
+        return True
+
+class PoolRoto(Executor):
+    """Pool de procesos cuyos trabajadores han muerto."""
+
+    def submit(self, funcion, *args, **kwargs):
+        futuro = Future()
+        futuro.set_exception(BrokenProcessPool("trabajador terminado"))
+        return futuro
+
+_originales = {}
+_directorio = None
+
+def setUpModule():
+    global _directorio
+    modulo = types.ModuleType(MODULO_TAREAS)
+    modulo.Tarea = Tarea
+    modulo.PrioridadTarea = PrioridadTarea
+    modulo.GestorTareas = Gestor
+    _originales["modulo"] = sys.modules.get(MODULO_TAREAS)
+    sys.modules[MODULO_TAREAS] = modulo
+    importar_clase.cache_clear()
+    # AriaUniversal crea su carpeta de logs en el directorio actual
+    _originales["cwd"] = os.getcwd()
+    _directorio = tempfile.TemporaryDirectory()
+    os.chdir(_directorio.name)
+
+def tearDownModule():
+    os.chdir(_originales["cwd"])
+    _directorio.cleanup()
+    if _originales["modulo"] is None:
+        sys.modules.pop(MODULO_TAREAS, None)
+    else:
+        sys.modules[MODULO_TAREAS] = _originales["modulo"]
+    importar_clase.cache_clear()
+
+class TestAriaUniversal(unittest.TestCase):
+    """Suite de pruebas para las APIs de solicitudes de AriaUniversal."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        self.aria = AriaUniversal(modo_admin=False)
+        self.gestor = Gestor()
+        self.adaptativo = Adaptativo()
+        self.aria.gestor_tareas = self.gestor
+        self.aria.sistema_adaptativo = self.adaptativo
+        self.aria.sistema_sensorial = None
+
+    def tearDown(self):
+        if self.adaptativo.bloqueo is not None:
+            self.adaptativo.bloqueo.set()
+        self.aria._cerrar_pools()
+
+    def test_01_async_resuelve(self):
+        """Test de que procesar_solicitud_async devuelve el resultado y registra la tarea."""
+        respuesta = asyncio.run(self.aria.procesar_solicitud_async("consulta", {"n": 1}))
+        self.assertIsNone(respuesta["error"])
+        self.assertEqual(respuesta["resultado"]["eco"], {"n": 1})
+        self.assertTrue(respuesta["resultado"]["hilo"].startswith("aria-async"))
+        self.assertEqual([t["estado"] for t in self.aria.registro_tareas.recientes()], ["completada"])
+
+    def test_02_async_timeout(self):
+        """Test de que un timeout en modo asíncrono deja la tarea como cancelada."""
+        self.adaptativo.bloqueo = threading.Event()
+        respuesta = asyncio.run(self.aria.procesar_solicitud_async("consulta", {}, timeout=0.05))
+        self.assertIn("Tiempo de espera agotado", respuesta["error"])
+        self.assertIsNone(respuesta["resultado"])
+        self.assertEqual(self.aria.registro_tareas.recientes()[0]["estado"], "cancelada")
+
+    def test_03_pool_procesos_roto(self):
+        """Test de que con el pool de procesos roto la solicitud se atiende en hilos."""
+        self.aria.tipos_cpu = {"consulta"}
+        self.aria._ejecutor_procesos = PoolRoto()
+        respuesta = asyncio.run(self.aria.procesar_solicitud_async("consulta", {"n": 2}))
+        self.assertIsNone(respuesta["error"])
+        self.assertEqual(respuesta["resultado"]["eco"], {"n": 2})
+        self.assertIsNone(self.aria._ejecutor_procesos)
+
+    def test_04_dominio_ausente(self):
+        """Test de que un dominio ausente da el mismo error en hilos y en el pool de procesos."""
+        self.aria.inteligencia_militar = None
+        esperado = "Subsistema inteligencia_militar no disponible"
+        self.aria.tipos_cpu = set()
+        en_hilos = asyncio.run(self.aria.procesar_solicitud_async("militar", {}))
+        self.assertEqual(en_hilos["error"], esperado)
+        self.aria.tipos_cpu = {"militar"}
+        en_procesos = asyncio.run(self.aria.procesar_solicitud_async("militar", {}))
+        self.assertEqual(en_procesos["error"], esperado)
+
+    def test_05_futuro_resuelve(self):
+        """Test de que enviar_solicitud devuelve un Future que resuelve el trabajador."""
+        futuro = self.aria.enviar_solicitud("consulta", {"n": 3})
+        self.assertEqual(futuro.result(timeout=5)["eco"], {"n": 3})
+        self.assertEqual(self.aria.registro_tareas.pendientes(), [])
+        self.assertEqual(self.aria.registro_tareas.recientes()[0]["estado"], "completada")
+
+        fallida = self.aria.enviar_solicitud("consulta", {"fallar": True})
+        with self.assertRaises(ValueError):
+            fallida.result(timeout=5)
+        self.assertEqual(self.aria.registro_tareas.recientes()[-1]["estado"], "error")
+
+    def test_06_timeout_cancela(self):
+        """Test de que un timeout cancela la tarea y ya no se ejecuta al llegar su turno."""
+        self.gestor.automatico = False
+        respuesta = self.aria.procesar_solicitud("consulta", {"n": 4}, timeout=0.05)
+        self.assertIn("Tiempo de espera agotado", respuesta["error"])
+        self.assertEqual(self.aria.registro_tareas.recientes()[0]["estado"], "cancelada")
+
+        self.gestor.ejecutar(self.gestor.tareas[0]).join(5)
+        self.assertEqual(self.adaptativo.llamadas, [])
+
+    def test_07_lote_por_tipo(self):
+        """Test de que procesar_lote envía una tarea por tipo y conserva los índices."""
+        solicitudes = [{"tipo": "consulta" if i % 2 else "analisis", "datos": {"n": i}} for i in range(5)]
+        resultados = sorted(self.aria.procesar_lote(solicitudes, timeout=5), key=lambda r: r["indice"])
+        self.assertEqual(len(self.gestor.tareas), 2)
+        self.assertEqual(sorted(len(t.argumentos["lote"]) for t in self.gestor.tareas), [2, 3])
+        self.assertEqual([(r["indice"], r["tipo"], r["resultado"]["eco"]["n"]) for r in resultados],
+                         [(i, solicitudes[i]["tipo"], i) for i in range(5)])
+        self.assertEqual(len(self.aria.registro_tareas.recientes()), 2)
+
+    def test_08_lote_timeout(self):
+        """Test de que el lote entrega lo terminado y se detiene al agotar el tiempo."""
+        self.gestor.automatico = False
+        solicitudes = [{"tipo": "consulta", "datos": {"n": 0}}, {"tipo": "analisis", "datos": {"n": 1}},
+                       {"tipo": "consulta", "datos": {"fallar": True}}]
+        resultados = self.aria.procesar_lote(solicitudes, timeout=0.2)
+        consulta = next(t for t in self.gestor.tareas if t.argumentos["tipo"] == "consulta")
+        self.gestor.ejecutar(consulta).join(5)
+        recibidos = sorted(resultados, key=lambda r: r["indice"])
+        self.assertEqual([r["indice"] for r in recibidos], [0, 2])
+        self.assertEqual(recibidos[1]["error"], "fallo del dominio")
+
+    def usar_conexiones(self, **conexiones):
+        for nombre in CONEXIONES:
+            self.aria.subsistemas.establecer(f"conexion_{nombre}", conexiones.get(nombre))
+        self.aria.timeout_conexion = 0.2
+
+    def test_09_vigilancia_conexiones(self):
+        """Test de que una conexión lenta se marca fallida al vencer el plazo y se corrige al terminar."""
+        liberar = threading.Event()
+        self.usar_conexiones(local=Conexion(), sd=Conexion(espera_inicio=liberar))
+        futuros = self.aria._iniciar_conexiones()
+        futuros["local"].result(timeout=5)
+        self.assertEqual(self.aria.conexiones_pendientes(), ["sd"])
+
+        esperar_hasta(lambda: "sd" in self.aria.estado["conexiones_fallidas"])
+        self.assertEqual(self.aria.conexiones_pendientes(), [])
+        self.assertEqual(self.aria.estado["conexiones_activas"], ["local"])
+
+        liberar.set()
+        futuros["sd"].result(timeout=5)
+        esperar_hasta(lambda: "sd" in self.aria.estado["conexiones_activas"])
+        self.assertEqual(self.aria.estado["conexiones_fallidas"], [])
+
+    def test_10_cierre_con_plazo(self):
+        """Test de que el cierre no espera más del plazo a una conexión colgada."""
+        liberar = threading.Event()
+        self.addCleanup(liberar.set)
+        self.usar_conexiones(local=Conexion(), sd=Conexion(espera_cierre=liberar))
+        self.assertEqual(set(self.aria.conexiones), {"local", "sd"})
+        self.assertEqual(self.aria._cerrar_conexiones(), ["sd"])
+        self.assertFalse(liberar.is_set())
+        self.assertEqual(self.aria.estado["conexiones_activas"], [])
+
+    def test_11_detener_sin_cargar(self):
+        """Test de que detener no carga subsistemas que nunca se usaron."""
+        aria = AriaUniversal(modo_admin=False)
+        importados = []
+        aria.subsistemas._importador = lambda modulo, clase: importados.append(modulo)
+        aria.detener()
+        self.assertEqual(importados, [])
+        self.assertEqual(aria.estado["estado"], "detenido")
+
+    def test_12_sondeo_conexiones_sin_cargar(self):
+        """Test de que sondear el estado no crea las conexiones perezosas."""
+        importados = []
+        self.aria.subsistemas._importador = lambda modulo, clase: importados.append(modulo)
+        self.assertEqual(self.aria._sondear_conexiones(), {})
+        self.assertEqual(importados, [])
+
+        self.usar_conexiones(local=Conexion())
+        self.assertEqual(list(self.aria.conexiones), ["local"])
+        self.assertEqual(self.aria._sondear_conexiones(), {"local": True})
+
+def esperar_hasta(condicion, plazo=5.0):
+    limite = time.monotonic() + plazo
+    while not condicion():
+        if time.monotonic() > limite:
+            raise AssertionError("La condición no se cumplió a tiempo")
+        time.sleep(0.01)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
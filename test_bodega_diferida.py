@@ -0,0 +1,169 @@
+"""
+Tests para la escritura diferida en la bodega de Aria
+"""
+
+import threading
+import time
+import unittest
+from datetime import datetime
+from bodega_diferida import BodegaDiferida
+
+class BodegaFalsa:
+    """Bodega en memoria que registra cada escritura."""
+
+    def __init__(self, retraso=0.0, fallos=0):
+        self.registros = []
+        self.escrituras = 0
+        self.retraso = retraso
+        self.fallos = fallos
+        self.lock = threading.Lock()
+
+    def almacenar(self, **registro):
+        time.sleep(self.retraso)
+        with self.lock:
+            if self.fallos:
+                self.fallos -= 1
+                raise IOError("disco ocupado")
+            self.escrituras += 1
+            id_entrada = f"id_{len(self.registros) + 1}"
+            self.registros.append({**registro, "id": id_entrada, "timestamp": time.time()})
+            return id_entrada
+
+    def buscar(self, criterios):
+        with self.lock:
+            return [r for r in self.registros if r.get("usuario_id") == criterios.get("usuario_id")]
+
+    def obtener_resumen_usuario(self, usuario_id):
+        with self.lock:
+            total = sum(1 for r in self.registros if r.get("usuario_id") == usuario_id)
+        return {"usuario_id": usuario_id, "total_entradas": total, "por_tipo": {}, "temas_frecuentes": []}
+
+    def obtener_estadisticas(self):
+        return {"total_entradas": len(self.registros)}
+
+class BodegaLotes(BodegaFalsa):
+    """Bodega con escritura por lotes."""
+
+    def __init__(self):
+        super().__init__()
+        self.lotes = []
+
+    def almacenar_lote(self, registros):
+        self.lotes.append(len(registros))
+        return [self.almacenar(**registro) for registro in registros]
+
+class BodegaBloqueada(BodegaFalsa):
+    """Bodega que no escribe hasta que se le da paso."""
+
+    def __init__(self):
+        super().__init__()
+        self.paso = threading.Event()
+
+    def almacenar(self, **registro):
+        self.paso.wait(timeout=5)
+        return super().almacenar(**registro)
+
+class TestBodegaDiferida(unittest.TestCase):
+    """Suite de pruebas para la bodega diferida."""
+
+    def test_01_almacenar_diferido_no_espera_a_la_bodega(self):
+        """Test de que almacenar_diferido vuelve antes de que la bodega escriba."""
+        bodega = BodegaBloqueada()
+        diferida = BodegaDiferida(bodega, tamano_lote=10, intervalo=0.01)
+        futuros = [diferida.almacenar_diferido(texto=f"frase {i}", usuario_id="ana") for i in range(5)]
+        self.assertFalse(any(f.done() for f in futuros))
+        bodega.paso.set()
+        self.assertEqual([f.result(timeout=2) for f in futuros], [f"id_{i}" for i in range(1, 6)])
+        diferida.detener()
+
+    def test_02_lotes_por_tamano_y_por_tiempo(self):
+        """Test de que se escribe al llenar un lote o al pasar el intervalo."""
+        bodega = BodegaLotes()
+        diferida = BodegaDiferida(bodega, tamano_lote=4, intervalo=60)
+        for i in range(8):
+            diferida.almacenar_diferido(texto=str(i))
+        self.assertTrue(diferida.vaciar(timeout=2))
+        self.assertEqual(bodega.lotes, [4, 4])
+        diferida.detener()
+
+        bodega = BodegaLotes()
+        diferida = BodegaDiferida(bodega, tamano_lote=100, intervalo=0.05)
+        futuro = diferida.almacenar_diferido(texto="sola")
+        self.assertEqual(futuro.result(timeout=2), "id_1")
+        self.assertEqual(bodega.lotes, [1])
+        diferida.detener()
+
+    def test_03_detener_escribe_todo(self):
+        """Test de que detener no pierde registros encolados."""
+        bodega = BodegaFalsa()
+        diferida = BodegaDiferida(bodega, tamano_lote=1000, intervalo=60)
+        for i in range(250):
+            diferida.almacenar_diferido(texto=str(i))
+        diferida.detener()
+        self.assertEqual(len(bodega.registros), 250)
+        with self.assertRaises(RuntimeError):
+            diferida.almacenar_diferido(texto="tarde")
+
+    def test_04_lecturas_combinan_los_pendientes(self):
+        """Test de que buscar y el resumen incluyen lo pendiente sin vaciar la cola."""
+        bodega = BodegaFalsa()
+        diferida = BodegaDiferida(bodega, tamano_lote=1000, intervalo=60)
+        escrito = diferida.almacenar(texto="antes", usuario_id="ana")
+        diferida.almacenar_diferido(tipo="conversacion", contenido={"texto": "hola"}, importancia=3,
+                                    usuario_id="ana", palabras_clave=["Saludo"])
+        diferida.almacenar_diferido(tipo="conversacion", contenido={"texto": "adiós"}, importancia=3,
+                                    usuario_id="luis", palabras_clave=["saludo"])
+        resultados = diferida.buscar({"usuario_id": "ana", "limite": 5})
+        self.assertEqual([r["id"] for r in resultados], [None, escrito])
+        self.assertEqual(resultados[0]["palabras_clave"], ["saludo"])
+        self.assertEqual(len(diferida.buscar({"usuario_id": "ana", "limite": 1})), 1)
+        resumen = diferida.obtener_resumen_usuario("ana")
+        self.assertEqual((resumen["total_entradas"], resumen["por_tipo"]), (2, {"conversacion": 1}))
+        self.assertEqual(diferida.obtener_estadisticas()["escritura_diferida"]["pendientes"], 2)
+        self.assertEqual(len(bodega.registros), 1)
+        diferida.detener()
+
+    def test_05_reintentos(self):
+        """Test de que un error transitorio se reintenta sin duplicar registros."""
+        bodega = BodegaFalsa(fallos=1)
+        diferida = BodegaDiferida(bodega, tamano_lote=2, intervalo=60)
+        diferida.almacenar_diferido(texto="a")
+        diferida.almacenar_diferido(texto="b")
+        diferida.detener()
+        self.assertEqual([r["texto"] for r in bodega.registros], ["a", "b"])
+        estadisticas = diferida.obtener_estadisticas()["escritura_diferida"]
+        self.assertEqual((estadisticas["errores"], estadisticas["descartados"]), (1, 0))
+
+    def test_06_almacenar_devuelve_el_id(self):
+        """Test de que almacenar mantiene el contrato de la bodega y devuelve el id."""
+        bodega = BodegaLotes()
+        diferida = BodegaDiferida(bodega, tamano_lote=100, intervalo=60)
+        self.assertEqual(diferida.almacenar(texto="uno"), "id_1")
+        self.assertEqual(diferida.almacenar(texto="dos"), "id_2")
+        self.assertEqual(bodega.lotes, [1, 1])
+        diferida.detener()
+
+    def test_07_lecturas_con_fechas_iso(self):
+        """Test de que la combinación ordena fechas ISO, números y entradas sin fecha."""
+        bodega = BodegaFalsa()
+        ahora = time.time()
+        bodega.registros = [
+            {"id": "iso", "usuario_id": "ana", "timestamp": datetime.fromtimestamp(ahora - 60).isoformat()},
+            {"id": "sin_fecha", "usuario_id": "ana"},
+        ]
+        diferida = BodegaDiferida(bodega, tamano_lote=1000, intervalo=60)
+        diferida.almacenar_diferido(contenido={"texto": "antigua"}, importancia=3, usuario_id="ana",
+                                    timestamp=ahora - 3600)
+        diferida.almacenar_diferido(contenido={"texto": "nueva"}, importancia=3, usuario_id="ana")
+        resultados = diferida.buscar({"usuario_id": "ana"})
+        self.assertEqual([r["id"] or r["contenido"]["texto"] for r in resultados],
+                         ["nueva", "iso", "antigua", "sin_fecha"])
+        self.assertEqual(resultados[2]["timestamp"], ahora - 3600)
+        diferida.detener()
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
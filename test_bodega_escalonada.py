@@ -0,0 +1,92 @@
+"""
+Tests para la retención por niveles de la bodega de Aria
+"""
+
+import time
+import unittest
+from bodega_indexada import BodegaIndexada
+from bodega_escalonada import BodegaEscalonada, RESUMEN, muestrear, resumir
+
+HORA = 3600.0
+DIA = 86400.0
+
+def entrada(timestamp, importancia, palabras=("visual", "movimiento"), usuario="ana", **contenido):
+    return {"tipo": "experiencia", "contenido": {"tipo": "deteccion_movimiento", **contenido},
+            "importancia": importancia, "usuario_id": usuario, "palabras_clave": list(palabras),
+            "timestamp": timestamp}
+
+class TestBodegaEscalonada(unittest.TestCase):
+    """Suite de pruebas para la bodega escalonada."""
+
+    def setUp(self):
+        self.disco = BodegaIndexada()
+        self.bodega = BodegaEscalonada(self.disco, edad_caliente=300, iniciar=False)
+        # Inicio de una hora, para que las franjas sean predecibles
+        self.ahora = (time.time() // HORA) * HORA - 10 * DIA
+
+    def test_01_lo_reciente_queda_en_memoria(self):
+        """Test de que solo pasa a disco lo que supera la edad del nivel caliente."""
+        self.bodega.almacenar(**entrada(self.ahora - 600, 4))
+        self.bodega.almacenar(**entrada(self.ahora - 60, 4))
+        resultado = self.bodega.compactar(ahora=self.ahora)
+        self.assertEqual(resultado["a_disco"], 1)
+        self.assertEqual((len(self.bodega.caliente), len(self.disco)), (1, 1))
+        self.assertEqual(len(self.bodega.buscar({"usuario_id": "ana"})), 2)
+        self.assertEqual(self.bodega.obtener_estadisticas()["total_entradas"], 2)
+
+    def test_02_politica_por_importancia(self):
+        """Test de que lo importante se guarda entero, lo bajo se muestrea y lo mínimo se resume."""
+        inicio = self.ahora - 2 * HORA
+        for i in range(120):
+            # Dos eventos por minuto durante una hora, de cada importancia
+            for importancia in (1, 2, 4):
+                self.bodega.almacenar(**entrada(inicio + i * 30, importancia, n=i))
+        self.bodega.compactar(ahora=self.ahora)
+        self.assertEqual(len(self.bodega.caliente), 0)
+
+        self.assertEqual(len(self.disco.buscar({"importancia_min": 4})), 120)
+        bajas = [e for e in self.disco.buscar({"importancia_min": 2}) if e["importancia"] == 2]
+        self.assertEqual(len(bajas), 60)
+        self.assertTrue(all(e["contenido"]["agrupadas"] == 2 for e in bajas))
+        resumenes = [e for e in self.disco.buscar({}) if e["importancia"] == RESUMEN]
+        self.assertEqual(len(resumenes), 1)
+        self.assertEqual(resumenes[0]["contenido"]["cantidad"], 120)
+
+    def test_03_frio_resume_por_dias(self):
+        """Test de que lo antiguo de importancia baja pasa a recuentos diarios."""
+        self.disco.almacenar_lote([entrada(self.ahora - 40 * DIA + i * 60, 2, agrupadas=3) for i in range(100)])
+        self.disco.almacenar_lote([entrada(self.ahora - 40 * DIA + i * 60, 4) for i in range(10)])
+        resultado = self.bodega.compactar(ahora=self.ahora)
+        self.assertEqual(resultado["resumidas"], 100)
+        resumenes = [e for e in self.disco.buscar({}) if e["importancia"] == RESUMEN]
+        self.assertEqual(sum(e["contenido"]["cantidad"] for e in resumenes), 300)
+        self.assertLessEqual(len(resumenes), 2)
+        self.assertEqual(len(self.disco), 10 + len(resumenes))
+        # Los resúmenes no se vuelven a compactar
+        self.assertEqual(self.bodega.compactar(ahora=self.ahora)["resumidas"], 0)
+
+    def test_04_limite_de_memoria_y_vaciado(self):
+        """Test de que el nivel caliente no pasa de su máximo y vaciar lo pasa todo a disco."""
+        bodega = BodegaEscalonada(self.disco, max_caliente=50, iniciar=False)
+        ahora = time.time()
+        for i in range(80):
+            bodega.almacenar(**entrada(ahora + i * 0.001, 4, n=i))
+        bodega.compactar()
+        self.assertEqual(len(bodega.caliente), 50)
+        self.assertEqual([e["contenido"]["n"] for e in bodega.buscar({"limite": 3})], [79, 78, 77])
+        bodega.vaciar()
+        self.assertEqual((len(bodega.caliente), len(self.disco)), (0, 80))
+
+    def test_05_muestrear_y_resumir(self):
+        """Test de las funciones de compactación por separado."""
+        eventos = [entrada(self.ahora + i, 2) for i in range(10)] + [entrada(self.ahora, 2, usuario="luis")]
+        self.assertEqual(len(muestrear(eventos, 60)), 2)
+        resumen = resumir(resumir(eventos, 60) + [entrada(self.ahora + 30, 2)], 3600)
+        self.assertEqual(sorted(r["contenido"]["cantidad"] for r in resumen), [1, 11])
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
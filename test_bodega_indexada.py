@@ -0,0 +1,110 @@
+"""
+Tests para la bodega de conocimiento indexada de Aria
+"""
+
+import random
+import time
+import unittest
+from enum import Enum
+from bodega_indexada import BodegaIndexada, _buscar_secuencial
+
+class Tipo(Enum):
+    CONVERSACION = "conversacion"
+    EXPERIENCIA = "experiencia"
+
+class Importancia(Enum):
+    BAJA = 2
+    MEDIA = 3
+    ALTA = 4
+
+def bodega_aleatoria(entradas=3000, semilla=7):
+    """Bodega con entradas repartidas en los últimos diez días."""
+    azar = random.Random(semilla)
+    bodega = BodegaIndexada()
+    ahora = time.time()
+    palabras = ["audio", "visual", "rostro", "movimiento", "tecnologia", "ciencia"]
+    for i in range(entradas):
+        bodega.almacenar(
+            tipo=azar.choice(list(Tipo)),
+            contenido={"texto": f"entrada {i}"},
+            importancia=azar.choice(list(Importancia)),
+            usuario_id=azar.choice(["ana", "luis", "eva", None]),
+            palabras_clave=azar.sample(palabras, azar.randint(0, 3)),
+            timestamp=ahora - 10 * 86400 + i * 10 * 86400 / entradas
+        )
+    return bodega, ahora
+
+class TestBodegaIndexada(unittest.TestCase):
+    """Suite de pruebas para la bodega indexada."""
+
+    def test_01_mismos_resultados_que_recorrer_todo(self):
+        """Test de que los índices devuelven lo mismo que un recorrido completo."""
+        bodega, ahora = bodega_aleatoria()
+        azar = random.Random(3)
+        for _ in range(200):
+            criterios = {}
+            if azar.random() < 0.5:
+                criterios["usuario_id"] = azar.choice(["ana", "luis", "nadie"])
+            if azar.random() < 0.5:
+                criterios["tipo"] = azar.choice(list(Tipo))
+            if azar.random() < 0.5:
+                criterios["palabras_clave"] = azar.sample(["Audio", "rostro", "ciencia", "otra"], azar.randint(1, 2))
+            if azar.random() < 0.3:
+                criterios["importancia_min"] = azar.choice(list(Importancia))
+            if azar.random() < 0.4:
+                criterios["fecha_desde"] = ahora - azar.uniform(0, 11) * 86400
+            if azar.random() < 0.5:
+                criterios["limite"] = azar.randint(1, 30)
+            esperado = _buscar_secuencial(bodega._registros.values(), criterios)
+            self.assertEqual(bodega.buscar(criterios), esperado, criterios)
+
+    def test_02_limite_y_orden(self):
+        """Test de que se devuelven las más recientes primero y se para en el límite."""
+        bodega = BodegaIndexada()
+        for i in range(100):
+            bodega.almacenar(tipo=Tipo.CONVERSACION, contenido={"n": i}, importancia=Importancia.MEDIA,
+                             usuario_id="ana", palabras_clave=["Conversación"])
+        resultados = bodega.buscar({"usuario_id": "ana", "palabras_clave": ["conversación"], "limite": 3})
+        self.assertEqual([r["contenido"]["n"] for r in resultados], [99, 98, 97])
+        self.assertEqual(resultados[0]["tipo"], "conversacion")
+        self.assertEqual(resultados[0]["importancia"], 3)
+
+    def test_03_limpieza_y_eliminacion(self):
+        """Test de que limpiar_datos_antiguos y eliminar quitan las entradas de todos los índices."""
+        bodega, ahora = bodega_aleatoria(entradas=2000)
+        eliminados = bodega.limpiar_datos_antiguos(dias_antiguedad=5)
+        self.assertAlmostEqual(eliminados, 1000, delta=2)
+        self.assertEqual(len(bodega), 2000 - eliminados)
+        self.assertEqual(bodega.buscar({"fecha_desde": ahora - 20 * 86400}),
+                         bodega.buscar({"fecha_desde": ahora - 5 * 86400}))
+        self.assertFalse([r for r in bodega.buscar({"usuario_id": "ana"}) if r["timestamp"] < ahora - 5 * 86400])
+
+        id_entrada = bodega.buscar({"limite": 1})[0]["id"]
+        self.assertTrue(bodega.eliminar(id_entrada))
+        self.assertIsNone(bodega.obtener(id_entrada))
+        self.assertFalse(bodega.eliminar(id_entrada))
+
+    def test_04_resumen_y_estadisticas(self):
+        """Test del resumen de usuario y las estadísticas."""
+        bodega = BodegaIndexada()
+        bodega.almacenar_lote([
+            {"tipo": Tipo.CONVERSACION, "contenido": {}, "importancia": Importancia.MEDIA,
+             "usuario_id": "ana", "palabras_clave": ["tecnologia", "audio"]},
+            {"tipo": Tipo.EXPERIENCIA, "contenido": {}, "importancia": Importancia.ALTA,
+             "usuario_id": "ana", "palabras_clave": ["tecnologia"]},
+            {"tipo": Tipo.EXPERIENCIA, "contenido": {}, "importancia": Importancia.BAJA},
+        ])
+        resumen = bodega.obtener_resumen_usuario("ana")
+        self.assertEqual(resumen["total_entradas"], 2)
+        self.assertEqual(resumen["temas_frecuentes"][0], ("tecnologia", 2))
+        estadisticas = bodega.obtener_estadisticas()
+        self.assertEqual(estadisticas["total_entradas"], 3)
+        self.assertEqual(estadisticas["por_tipo"], {"conversacion": 1, "experiencia": 2})
+        self.assertEqual(estadisticas["usuarios_registrados"], 1)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Tests para la bodega de conocimiento sobre SQLite de Aria
+"""
+
+import random
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from bodega_indexada import BodegaIndexada
+from bodega_escalonada import BodegaEscalonada, RESUMEN
+from bodega_sqlite import BodegaSQLite, crear_bodega
+
+def entradas_aleatorias(cantidad=1500, semilla=11):
+    """Entradas repartidas en los últimos diez días, en orden de llegada."""
+    azar = random.Random(semilla)
+    ahora = time.time()
+    palabras = ["audio", "visual", "rostro", "movimiento", "tecnologia", "ciencia"]
+    return [
+        {
+            "tipo": azar.choice(["conversacion", "experiencia"]),
+            "contenido": {"texto": f"entrada {i} sobre {azar.choice(palabras)}", "n": i},
+            "importancia": azar.randint(1, 5),
+            "usuario_id": azar.choice(["ana", "luis", None]),
+            "palabras_clave": azar.sample(palabras, azar.randint(0, 3)),
+            "timestamp": ahora - 10 * 86400 + i * 10 * 86400 / cantidad,
+        }
+        for i in range(cantidad)
+    ], ahora
+
+class TestBodegaSQLite(unittest.TestCase):
+    """Suite de pruebas para la bodega SQLite."""
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = Path(self.directorio.name) / "bodega.db"
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_01_mismos_resultados_que_la_bodega_indexada(self):
+        """Test de que SQLite y la bodega en memoria responden igual."""
+        entradas, ahora = entradas_aleatorias()
+        sqlite = BodegaSQLite(self.ruta)
+        memoria = BodegaIndexada()
+        self.assertEqual(sqlite.almacenar_lote(entradas), memoria.almacenar_lote(entradas))
+        consultas = [
+            {"usuario_id": "ana", "palabras_clave": ["Audio", "rostro"], "limite": 15},
+            {"tipo": "experiencia", "importancia_min": 4},
+            {"fecha_desde": ahora - 2 * 86400, "limite": 30},
+            {"usuario_id": "luis", "tipo": "conversacion", "fecha_desde": ahora - 5 * 86400},
+            {},
+        ]
+        for criterios in consultas:
+            self.assertEqual(sqlite.buscar(criterios), memoria.buscar(criterios), criterios)
+        resumen_sqlite = sqlite.obtener_resumen_usuario("ana")
+        resumen_memoria = memoria.obtener_resumen_usuario("ana")
+        self.assertEqual(resumen_sqlite["total_entradas"], resumen_memoria["total_entradas"])
+        self.assertEqual(resumen_sqlite["por_tipo"], resumen_memoria["por_tipo"])
+        self.assertEqual(dict(resumen_sqlite["temas_frecuentes"]), dict(resumen_memoria["temas_frecuentes"]))
+        sqlite.cerrar()
+
+    def test_02_persistencia(self):
+        """Test de que las entradas sobreviven a cerrar y abrir la bodega."""
+        bodega = BodegaSQLite(self.ruta)
+        id_entrada = bodega.almacenar(tipo="conversacion", contenido={"texto": "hola"}, importancia=3,
+                                      usuario_id="ana", palabras_clave=["saludo"])
+        bodega.cerrar()
+
+        bodega = BodegaSQLite(self.ruta)
+        self.assertEqual(len(bodega), 1)
+        self.assertEqual(bodega.obtener(id_entrada)["contenido"], {"texto": "hola"})
+        self.assertEqual(bodega.obtener_estadisticas()["usuarios_registrados"], 1)
+        self.assertTrue(bodega.eliminar(id_entrada))
+        self.assertIsNone(bodega.obtener(id_entrada))
+        bodega.cerrar()
+
+    def test_03_texto_completo(self):
+        """Test de la búsqueda por texto del contenido."""
+        bodega = BodegaSQLite(self.ruta)
+        bodega.almacenar(tipo="conversacion", contenido={"texto": "Me encanta programar en Python"}, importancia=3)
+        bodega.almacenar(tipo="conversacion", contenido={"texto": "Hoy jugué al fútbol"}, importancia=3)
+        self.assertEqual(len(bodega.buscar({"texto": "programar"})), 1)
+        self.assertEqual(len(bodega.buscar({"texto": "futbol"})), 1)
+        self.assertEqual(bodega.buscar({"texto": 'python "OR'}), [])
+        bodega.cerrar()
+
+    def test_04_lectores_concurrentes(self):
+        """Test de que se puede leer desde otros hilos mientras se escribe."""
+        bodega = BodegaSQLite(self.ruta)
+        errores = []
+        terminado = threading.Event()
+
+        def leer():
+            try:
+                while not terminado.is_set():
+                    bodega.buscar({"usuario_id": "ana", "limite": 5})
+            except Exception as e:
+                errores.append(e)
+
+        lectores = [threading.Thread(target=leer) for _ in range(3)]
+        for lector in lectores:
+            lector.start()
+        for i in range(20):
+            bodega.almacenar_lote([{"tipo": "conversacion", "contenido": {"n": i * 10 + j}, "importancia": 3,
+                                    "usuario_id": "ana"} for j in range(10)])
+        terminado.set()
+        for lector in lectores:
+            lector.join()
+        self.assertEqual(errores, [])
+        self.assertEqual(bodega.buscar({"usuario_id": "ana", "limite": 1})[0]["contenido"], {"n": 199})
+        self.assertEqual(bodega.limpiar_datos_antiguos(dias_antiguedad=0), 200)
+        bodega.cerrar()
+
+    def test_05_crear_bodega(self):
+        """Test de la elección del motor."""
+        self.assertIsInstance(crear_bodega("memoria"), BodegaIndexada)
+
+    def test_06_limite_tras_compactar_en_frio(self):
+        """Test de que los resúmenes reinsertados por la compactación no tapan lo reciente."""
+        bodega = BodegaSQLite(self.ruta)
+        ahora = time.time()
+        recientes = [bodega.almacenar(tipo="experiencia", contenido={"n": i}, importancia=4, usuario_id="ana",
+                                      palabras_clave=["visual"], timestamp=ahora - 3600 + i) for i in range(5)]
+        bodega.almacenar_lote([{"tipo": "experiencia", "contenido": {"tipo": "deteccion_movimiento"},
+                                "importancia": 2, "usuario_id": "ana", "palabras_clave": ["visual"],
+                                "timestamp": ahora - 400 * 86400 + i * 60} for i in range(20)])
+        escalonada = BodegaEscalonada(bodega, iniciar=False)
+        self.assertEqual(escalonada.compactar(ahora=ahora)["resumidas"], 20)
+        self.assertTrue(any(e["importancia"] == RESUMEN for e in bodega.buscar({"usuario_id": "ana"})))
+        resultado = bodega.buscar({"usuario_id": "ana", "limite": 3})
+        self.assertEqual([e["id"] for e in resultado], recientes[:-4:-1])
+        bodega.cerrar()
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
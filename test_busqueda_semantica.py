@@ -0,0 +1,181 @@
+"""
+Tests para la búsqueda semántica en la bodega de Aria
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from busqueda_semantica import IndiceSemantico, BodegaSemantica, terminos, np
+from bodega_indexada import BodegaIndexada
+
+FRASES = [
+    "me encanta programar",
+    "ayer fui al cine con mi hermana",
+    "tengo hambre",
+    "mi perro se llama toby",
+    "el partido de fútbol estuvo increíble",
+]
+
+def corpus(cantidad):
+    """Textos de varios temas, repartidos entre dos usuarios."""
+    temas = ["programar", "fútbol", "película", "empresa", "planeta"]
+    return [{"texto": f"hoy hablamos de {temas[i % 5]} y de {temas[(i * 3) % 5]} número {i}",
+             "id": f"e{i}", "usuario_id": "ana" if i % 2 else "luis"} for i in range(cantidad)]
+
+CONSULTAS = ["tecnología", "deporte", "vi una película", "mi trabajo", "el universo"]
+
+def registro(texto, usuario_id="ana", tipo="entrada_usuario"):
+    return {"tipo": "conversacion", "contenido": {"texto": texto, "tipo": tipo, "timestamp": 1_700_000_000.0},
+            "importancia": 3, "usuario_id": usuario_id, "palabras_clave": ["conversación"]}
+
+class TestBusquedaSemantica(unittest.TestCase):
+    """Suite de pruebas para la búsqueda semántica."""
+
+    def comprobar_indice(self, indice):
+        for frase in FRASES:
+            indice.agregar(frase, usuario_id="ana")
+        self.assertEqual(indice.buscar("tecnología", k=1)[0]["texto"], "me encanta programar")
+        self.assertEqual(indice.buscar("vi una película", k=1)[0]["texto"], "ayer fui al cine con mi hermana")
+        self.assertEqual(indice.buscar("programación", k=5, usuario_id="luis"), [])
+        self.assertEqual(indice.buscar("quiero comer"), [])
+
+    def test_01_terminos(self):
+        """Test de que los términos ignoran tildes y palabras vacías y añaden el tema."""
+        self.assertEqual(terminos("Programación"), terminos("programar"))
+        self.assertIn("#tecnologia", terminos("me encanta programar"))
+        self.assertNotIn("que", terminos("que bonito"))
+
+    def test_02_indice_disperso(self):
+        """Test de que el índice sin NumPy encuentra textos del mismo tema."""
+        self.comprobar_indice(IndiceSemantico(usar_numpy=False))
+
+    @unittest.skipIf(np is None, "NumPy no está instalado")
+    def test_03_indice_numpy_ivf(self):
+        """Test de que el índice IVF en disco encuentra lo mismo y sobrevive a reabrirse."""
+        with tempfile.TemporaryDirectory() as directorio:
+            indice = IndiceSemantico(directorio, listas=4, sondeo=4, entrenar_desde=4)
+            self.comprobar_indice(indice)
+            self.assertEqual(indice.obtener_estadisticas()["listas"], 4)
+            indice.cerrar()
+            reabierto = IndiceSemantico(directorio, listas=4, sondeo=4, entrenar_desde=4)
+            self.assertEqual(len(reabierto), len(FRASES))
+            self.assertEqual(reabierto.buscar("tecnología", k=1)[0]["texto"], "me encanta programar")
+            reabierto.cerrar()
+
+    def test_04_persistencia(self):
+        """Test de que los documentos guardados se recuperan al reabrir el índice."""
+        with tempfile.TemporaryDirectory() as directorio:
+            indice = IndiceSemantico(directorio, usar_numpy=False)
+            indice.agregar("me encanta programar", id_entrada="e1", usuario_id="ana")
+            indice.cerrar()
+            with open(f"{directorio}/documentos.jsonl", "a", encoding="utf-8") as archivo:
+                archivo.write('{"texto": "a medio')
+            reabierto = IndiceSemantico(directorio, usar_numpy=False)
+            resultado = reabierto.buscar("programación", k=1)
+            self.assertEqual((len(reabierto), resultado[0]["id"]), (1, "e1"))
+            reabierto.cerrar()
+
+    def test_05_bodega_semantica(self):
+        """Test de que la bodega indexa el texto de las entradas y delega el resto."""
+        bodega = BodegaSemantica(BodegaIndexada(), IndiceSemantico(usar_numpy=False))
+        id_entrada = bodega.almacenar(**registro("me encanta programar"))
+        bodega.almacenar_lote([registro("hoy jugué al tenis", "luis"),
+                               {**registro(""), "contenido": {"objetos": ["taza"]}}])
+        similares = bodega.buscar_similares("tecnología", k=3)
+        self.assertEqual([(s["id"], s["origen"]) for s in similares], [(id_entrada, "entrada_usuario")])
+        self.assertEqual(bodega.buscar_similares("deporte", usuario_id="luis")[0]["texto"], "hoy jugué al tenis")
+        estadisticas = bodega.obtener_estadisticas()
+        self.assertEqual((estadisticas["total_entradas"], estadisticas["semantica"]["documentos"]), (3, 2))
+        self.assertEqual(len(bodega.buscar({"usuario_id": "luis"})), 1)
+
+    @unittest.skipIf(np is None, "NumPy no está instalado")
+    def test_06_denso_igual_que_disperso(self):
+        """Test de que la matriz NumPy sin IVF puntúa igual que el índice disperso."""
+        denso = IndiceSemantico(entrenar_desde=10 ** 9)
+        disperso = IndiceSemantico(usar_numpy=False)
+        documentos = corpus(1500)
+        self.assertEqual(denso.agregar_lote(documentos), disperso.agregar_lote(documentos))
+        self.assertEqual(denso.obtener_estadisticas()["motor"], "numpy")
+        for consulta in CONSULTAS:
+            for usuario_id in (None, "ana"):
+                esperado = disperso.buscar(consulta, k=5, usuario_id=usuario_id)
+                obtenido = denso.buscar(consulta, k=5, usuario_id=usuario_id)
+                self.assertEqual(len(obtenido), 5)
+                for a, b in zip(obtenido, esperado):
+                    self.assertAlmostEqual(a["similitud"], b["similitud"], places=3)
+
+    @unittest.skipIf(np is None, "NumPy no está instalado")
+    def test_07_ivf_al_crecer_y_reabrir(self):
+        """Test de que el IVF sondeando parte de las listas encuentra lo mismo, también al reabrir."""
+        exacto = IndiceSemantico(usar_numpy=False)
+        exacto.agregar_lote(corpus(3000))
+        with tempfile.TemporaryDirectory() as directorio:
+            indice = IndiceSemantico(directorio, listas=16, sondeo=4, entrenar_desde=1000)
+            # Por lotes: la matriz crece varias veces y el IVF se reagrupa al doblarse
+            for desde in range(0, 3000, 500):
+                indice.agregar_lote(corpus(3000)[desde:desde + 500])
+            self.assertEqual(indice.obtener_estadisticas()["listas"], 16)
+            self.assertEqual(indice._entrenado_con, 2000)
+            indice.cerrar()
+            reabierto = IndiceSemantico(directorio, listas=16, sondeo=4, entrenar_desde=1000)
+            self.assertEqual(len(reabierto), 3000)
+            for consulta in CONSULTAS:
+                mejor = exacto.buscar(consulta, k=1)[0]["similitud"]
+                self.assertAlmostEqual(reabierto.buscar(consulta, k=1)[0]["similitud"], mejor, places=3)
+            reabierto.cerrar()
+
+    def test_08_borrados_en_la_bodega(self):
+        """Test de que lo eliminado, limpiado o retirado de la bodega deja de encontrarse."""
+        bodega = BodegaSemantica(BodegaIndexada(), IndiceSemantico(usar_numpy=False))
+        programar = bodega.almacenar(**registro("me encanta programar"))
+        bodega.almacenar(**registro("mi perro se llama toby"))
+        bodega.almacenar(**{**registro("ayer fui al cine"), "timestamp": time.time() - 400 * 86400})
+        bodega.almacenar(**{**registro("el partido de fútbol", tipo="respuesta_aria"), "importancia": 2,
+                            "timestamp": time.time() - 40 * 86400})
+        self.assertTrue(bodega.eliminar(programar))
+        self.assertEqual(bodega.buscar_similares("tecnología"), [])
+        self.assertEqual(bodega.limpiar_datos_antiguos(365), 1)
+        self.assertEqual(bodega.buscar_similares("vi una película"), [])
+        retiradas = bodega.retirar(time.time() - 30 * 86400, importancia_max=2)
+        self.assertEqual(len(retiradas), 1)
+        self.assertEqual(bodega.buscar_similares("deporte"), [])
+        self.assertEqual(bodega.buscar_similares("mi perro")[0]["texto"], "mi perro se llama toby")
+        self.assertEqual(bodega.obtener_estadisticas()["semantica"]["documentos"], 1)
+
+    def test_09_compactar(self):
+        """Test de que los borrados se quitan de memoria y del archivo, con y sin NumPy."""
+        for usar_numpy in (False, True) if np is not None else (False,):
+            with self.subTest(usar_numpy=usar_numpy), tempfile.TemporaryDirectory() as directorio:
+                opciones = {"listas": 4, "sondeo": 2, "entrenar_desde": 100, "usar_numpy": usar_numpy}
+                indice = IndiceSemantico(directorio, **opciones)
+                indice.agregar_lote(corpus(300))
+                self.assertEqual(indice.eliminar(f"e{i}" for i in range(0, 300, 3)), 100)
+                self.assertEqual(indice.eliminar(["e0", "no_existe"]), 0)
+                self.assertEqual((len(indice), indice.obtener_estadisticas()["borrados"]), (200, 100))
+                indice.cerrar()
+
+                # Al abrir se aplican las marcas de borrado y se compacta el archivo
+                indice = IndiceSemantico(directorio, **opciones)
+                self.assertEqual((len(indice), indice.obtener_estadisticas()["borrados"]), (200, 0))
+                with open(f"{directorio}/documentos.jsonl", encoding="utf-8") as archivo:
+                    self.assertEqual(sum(1 for _ in archivo), 200)
+                encontrados = {d["id"] for d in indice.buscar("tecnología", k=300)}
+                self.assertTrue(encontrados)
+                self.assertFalse(encontrados & {f"e{i}" for i in range(0, 300, 3)})
+                self.assertEqual(indice.eliminar(["e1"]), 1)
+                self.assertEqual(indice.compactar(), 1)
+                self.assertNotIn("e1", {d["id"] for d in indice.buscar("deporte", k=300)})
+                indice.cerrar()
+
+                # Sin borrados ni líneas rotas, abrir no reescribe el archivo
+                antes = os.stat(f"{directorio}/documentos.jsonl").st_ino
+                IndiceSemantico(directorio, **opciones).cerrar()
+                self.assertEqual(os.stat(f"{directorio}/documentos.jsonl").st_ino, antes)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
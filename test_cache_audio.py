@@ -0,0 +1,132 @@
+"""
+Tests para la caché de audio sintetizado de Aria
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import wave
+from pathlib import Path
+from cache_audio import CacheAudio, clave_audio
+from motor_voz import BackendNulo, TrabajadorVoz, MotorVoz
+
+class BackendGrabador(BackendNulo):
+    """Motor sin audio que además renderiza WAV de silencio."""
+
+    nombre = "grabador"
+    graba_audio = True
+
+    def __init__(self):
+        super().__init__()
+        self.renderizadas = []
+
+    def sintetizar(self, texto, ruta):
+        self.renderizadas.append(texto)
+        with wave.open(str(ruta), "wb") as archivo:
+            archivo.setnchannels(1)
+            archivo.setsampwidth(2)
+            archivo.setframerate(8000)
+            archivo.writeframes(b"\0\0" * 80 * len(texto))
+
+class ReproductorFalso:
+    """Reproductor que solo anota lo que reproduce."""
+
+    def __init__(self):
+        self.reproducidas = []
+
+    def reproducir(self, ruta):
+        self.reproducidas.append(Path(ruta).name)
+        return True
+
+    def reproduciendo(self):
+        return False
+
+    def detener(self):
+        pass
+
+def escribir(cache, clave, tamano):
+    temporal = cache.reservar(clave)
+    temporal.write_bytes(b"x" * tamano)
+    return cache.guardar(clave, temporal)
+
+class TestCacheAudio(unittest.TestCase):
+    """Suite de pruebas para la caché de audio."""
+
+    def setUp(self):
+        self._directorio = tempfile.TemporaryDirectory()
+        self.directorio = Path(self._directorio.name)
+
+    def tearDown(self):
+        self._directorio.cleanup()
+
+    def test_01_clave_de_contenido(self):
+        """Test de que la clave depende del texto y de los parámetros de voz."""
+        parametros = {"backend": "sapi", "voz": None, "velocidad": 0, "volumen": 100}
+        self.assertEqual(clave_audio("Hola  Aria", parametros), clave_audio("Hola Aria", parametros))
+        self.assertNotEqual(clave_audio("Hola", parametros), clave_audio("Hola", {**parametros, "velocidad": 2}))
+
+    def test_02_desalojo_lru(self):
+        """Test de desalojo por tamaño de la entrada usada hace más tiempo."""
+        cache = CacheAudio(self.directorio, max_bytes=250)
+        escribir(cache, "a" * 64, 100)
+        escribir(cache, "b" * 64, 100)
+        self.assertIsNotNone(cache.obtener("a" * 64))
+        escribir(cache, "c" * 64, 100)
+
+        self.assertTrue(cache.contiene("a" * 64))
+        self.assertFalse(cache.contiene("b" * 64))
+        self.assertFalse(cache.ruta("b" * 64).exists())
+        estadisticas = cache.obtener_estadisticas()
+        self.assertEqual(estadisticas["bytes"], 200)
+        self.assertEqual(estadisticas["desalojadas"], 1)
+
+    def test_03_indice_desde_disco(self):
+        """Test de reconstrucción del índice al arrancar."""
+        cache = CacheAudio(self.directorio)
+        escribir(cache, "a" * 64, 100)
+        escribir(cache, "b" * 64, 100)
+        os.utime(cache.ruta("a" * 64), (time.time() - 60, time.time() - 60))
+        cache.reservar("c" * 64).write_bytes(b"a medias")
+
+        cache = CacheAudio(self.directorio, max_bytes=150)
+        self.assertEqual(cache.obtener_estadisticas()["entradas"], 1)
+        self.assertTrue(cache.contiene("b" * 64))
+        self.assertFalse(cache.reservar("c" * 64).exists())
+
+    def test_04_frases_repetidas(self):
+        """Test de que una frase repetida se renderiza y luego se reproduce desde disco."""
+        backend = BackendGrabador()
+        reproductor = ReproductorFalso()
+        trabajador = TrabajadorVoz(backend, cache=CacheAudio(self.directorio), reproductor=reproductor)
+        for _ in range(3):
+            self.assertTrue(trabajador.decir("Tarea completada exitosamente", timeout=5))
+        trabajador.cerrar()
+
+        self.assertEqual(backend.pronunciadas, ["Tarea completada exitosamente"] * 2)
+        self.assertEqual(backend.renderizadas, ["Tarea completada exitosamente"])
+        self.assertEqual(len(reproductor.reproducidas), 1)
+        self.assertEqual(trabajador.obtener_estadisticas()["desde_cache"], 1)
+
+    def test_05_prerenderizar(self):
+        """Test de renderizado previo: la primera vez ya suena desde disco."""
+        backend = BackendGrabador()
+        reproductor = ReproductorFalso()
+        motor = MotorVoz(backend, cache=CacheAudio(self.directorio))
+        motor.trabajador.reproductor = reproductor
+        futuros = motor.prerenderizar(["Hasta luego.", "Error en la tarea", "Hasta luego."])
+        self.assertTrue(all(futuro.result(5) for futuro in futuros))
+        self.assertFalse(motor.hablando())
+
+        self.assertTrue(motor.decir("Error en la tarea", timeout=5))
+        motor.cerrar()
+        self.assertEqual(sorted(backend.renderizadas), ["Error en la tarea", "Hasta luego."])
+        self.assertEqual(backend.pronunciadas, [])
+        self.assertEqual(len(reproductor.reproducidas), 1)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
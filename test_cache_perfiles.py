@@ -0,0 +1,111 @@
+"""
+Tests para la caché de perfiles de usuario de Aria
+"""
+
+import threading
+import unittest
+from cache_perfiles import CachePerfiles, espera_proactiva
+from estilo_texto import ALTO, MEDIO, BAJO
+
+class AdaptacionFalsa:
+    """Sistema de adaptación que cuenta los cálculos de perfil."""
+
+    def __init__(self):
+        self.calculos = 0
+        self.perfiles = {}
+        self.interacciones = []
+
+    def obtener_perfil(self, usuario_id):
+        self.calculos += 1
+        perfil = self.perfiles.get(usuario_id)
+        return dict(perfil) if perfil else None
+
+    def procesar_interaccion(self, usuario_id, datos):
+        self.interacciones.append((usuario_id, datos))
+        self.perfiles.setdefault(usuario_id, {
+            "estilo_comunicacion": {"formalidad": 0.5, "verbosidad": 0.5, "emocionalidad": 0.5, "proactividad": 0.5},
+            "temas_interes": {}
+        })
+        temas = self.perfiles[usuario_id]["temas_interes"]
+        for tema in datos.get("temas", []):
+            temas[tema] = temas.get(tema, 0) + 1
+        return {"ok": True}
+
+    def resumen(self):
+        return "delegado"
+
+class TestCachePerfiles(unittest.TestCase):
+    """Suite de pruebas para la caché de perfiles."""
+
+    def test_01_un_calculo_por_cambio(self):
+        """Test de que el perfil se calcula una vez por interacción, no por frase."""
+        adaptacion = AdaptacionFalsa()
+        perfiles = CachePerfiles(adaptacion)
+        self.assertIsNone(perfiles.obtener_perfil("ana"))
+        self.assertIsNone(perfiles.obtener_perfil("ana"))
+        self.assertEqual(adaptacion.calculos, 1)
+
+        self.assertEqual(perfiles.procesar_interaccion("ana", {"temas": ["ciencia"]}), {"ok": True})
+        for _ in range(10):
+            perfiles.obtener_perfil("ana")
+        self.assertEqual(adaptacion.calculos, 2)
+
+        perfiles.procesar_interaccion("ana", {"temas": ["arte", "arte"]})
+        self.assertEqual(perfiles.obtener("ana").tema_principal, "arte")
+        self.assertEqual(adaptacion.calculos, 3)
+
+    def test_02_derivados(self):
+        """Test de los valores derivados precalculados."""
+        adaptacion = AdaptacionFalsa()
+        adaptacion.perfiles["luis"] = {
+            "estilo_comunicacion": {"formalidad": 0.9, "verbosidad": 0.1, "emocionalidad": 0.5, "proactividad": 0.8},
+            "temas_interes": {"tecnologia": 3, "deportes": 5}
+        }
+        perfil = CachePerfiles(adaptacion).obtener("luis")
+        self.assertEqual(perfil.tema_principal, "deportes")
+        self.assertEqual(perfil.espera_proactiva, 15.0)
+        self.assertEqual(perfil.cubeta_estilo, (ALTO, BAJO, MEDIO))
+        self.assertEqual((espera_proactiva(0.1), espera_proactiva(0.5)), (60.0, 30.0))
+
+    def test_03_solo_lectura_y_delegacion(self):
+        """Test de que el perfil en caché no se puede modificar y el resto se delega."""
+        adaptacion = AdaptacionFalsa()
+        perfiles = CachePerfiles(adaptacion)
+        perfiles.procesar_interaccion("ana", {})
+        perfil = perfiles.obtener_perfil("ana")
+        with self.assertRaises(TypeError):
+            perfil["estilo_comunicacion"]["formalidad"] = 1.0
+        self.assertEqual(perfiles.resumen(), "delegado")
+
+    def test_04_interaccion_durante_el_calculo(self):
+        """Test de que un perfil calculado antes de una interacción no se guarda."""
+        adaptacion = AdaptacionFalsa()
+        perfiles = CachePerfiles(adaptacion)
+        perfiles.procesar_interaccion("ana", {})
+        calculando = threading.Event()
+        continuar = threading.Event()
+        original = adaptacion.obtener_perfil
+
+        def obtener_lento(usuario_id):
+            perfil = original(usuario_id)
+            calculando.set()
+            continuar.wait(1)
+            return perfil
+
+        adaptacion.obtener_perfil = obtener_lento
+        hilo = threading.Thread(target=perfiles.obtener, args=("ana",))
+        hilo.start()
+        calculando.wait(1)
+        perfiles.procesar_interaccion("ana", {"temas": ["ciencia"]})
+        continuar.set()
+        hilo.join()
+
+        adaptacion.obtener_perfil = original
+        self.assertEqual(perfiles.obtener("ana").tema_principal, "ciencia")
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
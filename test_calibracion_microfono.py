@@ -0,0 +1,101 @@
+"""
+Tests para la calibración del micrófono de Aria
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from calibracion_microfono import CalibracionMicrofono, UmbralAdaptativo, calibrar
+
+class MicrofonoFalso:
+    """Micrófono sin PyAudio (nombre de dispositivo por defecto)."""
+
+    SAMPLE_RATE = 16000
+    device_index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+class ReconocedorFalso:
+    """Reconocedor que anota las calibraciones."""
+
+    def __init__(self):
+        self.energy_threshold = 300
+        self.calibraciones = 0
+
+    def adjust_for_ambient_noise(self, source, duration=1):
+        self.calibraciones += 1
+        self.energy_threshold = 420.0
+
+class TestCalibracionMicrofono(unittest.TestCase):
+    """Suite de pruebas para la calibración del micrófono."""
+
+    def setUp(self):
+        self._directorio = tempfile.TemporaryDirectory()
+        self.ruta = Path(self._directorio.name) / "calibracion.json"
+
+    def tearDown(self):
+        self._directorio.cleanup()
+
+    def test_01_guardar_por_dispositivo(self):
+        """Test de persistencia por dispositivo y de escrituras espaciadas."""
+        calibracion = CalibracionMicrofono(self.ruta, intervalo_guardado=60)
+        self.assertIsNone(calibracion.cargar("usb@16000"))
+        self.assertTrue(calibracion.guardar("usb@16000", 350.0))
+        self.assertTrue(calibracion.guardar("interno@16000", 120.0))
+        self.assertFalse(calibracion.guardar("usb@16000", 360.0))
+
+        calibracion = CalibracionMicrofono(self.ruta)
+        self.assertEqual(calibracion.cargar("usb@16000"), 350.0)
+        self.assertEqual(calibracion.cargar("interno@16000"), 120.0)
+
+    def test_02_calibrar_una_vez(self):
+        """Test de que el ruido ambiente solo se mide en el primer arranque."""
+        calibracion = CalibracionMicrofono(self.ruta)
+        reconocedor = ReconocedorFalso()
+        dispositivo = calibrar(MicrofonoFalso(), reconocedor, calibracion)
+        self.assertEqual(reconocedor.calibraciones, 1)
+
+        reconocedor = ReconocedorFalso()
+        self.assertEqual(calibrar(MicrofonoFalso(), reconocedor, calibracion), dispositivo)
+        self.assertEqual(reconocedor.calibraciones, 0)
+        self.assertEqual(reconocedor.energy_threshold, 420.0)
+        with open(self.ruta, encoding="utf-8") as archivo:
+            self.assertIn(dispositivo, json.load(archivo))
+
+    def test_03_sigue_al_ruido(self):
+        """Test de que el umbral sube y baja con el suelo de ruido."""
+        umbral = UmbralAdaptativo(300.0, duracion_bloque=0.1, ventana=1.0, relacion=2.5)
+        for _ in range(5):
+            umbral.observar(40)
+        self.assertEqual(umbral(), 300.0)
+
+        for _ in range(200):
+            umbral.observar(40)
+        self.assertAlmostEqual(umbral(), 100.0, delta=1.0)
+
+        # La sala se vuelve ruidosa
+        for _ in range(200):
+            umbral.observar(200)
+        self.assertAlmostEqual(umbral(), 500.0, delta=5.0)
+
+    def test_04_la_voz_no_sube_el_piso(self):
+        """Test de que las pausas entre palabras mantienen el suelo de ruido."""
+        umbral = UmbralAdaptativo(100.0, duracion_bloque=0.1, ventana=1.0, relacion=2.5)
+        for _ in range(50):
+            umbral.observar(40)
+        for _ in range(40):
+            for energia in (2000, 2500, 1800, 45):
+                umbral.observar(energia)
+        self.assertLess(umbral(), 150.0)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
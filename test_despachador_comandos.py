@@ -0,0 +1,98 @@
+"""
+Tests para el despachador de comandos administrativos de Aria
+"""
+
+import os
+import tempfile
+import unittest
+from despachador_comandos import DespachadorComandos, ErrorComando, Parametro
+
+class TestDespachadorComandos(unittest.TestCase):
+    """Suite de pruebas para el despachador de comandos."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        self.conexiones = {"local": 0, "nube": 0}
+        self.despachador = DespachadorComandos()
+        self.despachador.registrar("sistema:estado", lambda: "ok")
+        self.despachador.registrar("red:{conexion}:reconectar", self.reconectar,
+                                   conexion=Parametro("conexion", opciones=lambda: self.conexiones))
+        self.despachador.registrar("red:todas:reconectar", lambda: "todas")
+        self.despachador.registrar("tareas:{limite}:listar", lambda limite: list(range(limite)),
+                                   limite=int)
+
+    def reconectar(self, conexion):
+        self.conexiones[conexion] += 1
+        return conexion
+
+    def test_01_comando_literal(self):
+        """Test de comandos sin argumentos."""
+        self.assertEqual(self.despachador.ejecutar("sistema:estado"), {"resultado": "ok"})
+        self.assertEqual(self.despachador.ejecutar("sistema:otro"), {"error": "Comando no reconocido"})
+        self.assertEqual(self.despachador.ejecutar("sistema"), {"error": "Comando no reconocido"})
+
+    def test_02_argumentos(self):
+        """Test de validación y conversión de argumentos."""
+        self.assertEqual(self.despachador.ejecutar("red:nube:reconectar"), {"resultado": "nube"})
+        self.assertEqual(self.conexiones["nube"], 1)
+        self.assertIn("error", self.despachador.ejecutar("red:marte:reconectar"))
+
+        self.assertEqual(self.despachador.ejecutar("tareas:3:listar"), {"resultado": [0, 1, 2]})
+        self.assertIn("error", self.despachador.ejecutar("tareas:tres:listar"))
+
+    def test_03_literal_antes_que_parametro(self):
+        """Test de preferencia de segmentos literales."""
+        self.assertEqual(self.despachador.ejecutar("red:todas:reconectar"), {"resultado": "todas"})
+
+    def test_04_vuelta_atras(self):
+        """Test de que un literal que no lleva a ningún comando deja paso al parámetro."""
+        self.despachador.registrar("red:local:estado", lambda: "estado local")
+        self.assertEqual(self.despachador.ejecutar("red:local:estado"), {"resultado": "estado local"})
+        self.assertEqual(self.despachador.ejecutar("red:local:reconectar"), {"resultado": "local"})
+        self.assertEqual(self.conexiones["local"], 1)
+
+    def test_05_segmentos_de_mas(self):
+        """Test de que los segmentos sobrantes se rechazan en lugar de ignorarse."""
+        self.assertEqual(self.despachador.ejecutar("red:nube:reconectar:ya"), {"error": "Comando no reconocido"})
+        self.assertEqual(self.despachador.ejecutar("sistema:estado:"), {"error": "Comando no reconocido"})
+        self.assertEqual(self.conexiones["nube"], 0)
+
+    def test_06_lote_y_script(self):
+        """Test de ejecución por lotes y desde archivo."""
+        resultados = self.despachador.ejecutar_lote([
+            "# comentario", "", "sistema:estado", "red:marte:reconectar", "red:local:reconectar"
+        ])
+        self.assertEqual([r["comando"] for r in resultados],
+                         ["sistema:estado", "red:marte:reconectar", "red:local:reconectar"])
+        self.assertIn("error", resultados[1])
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as script:
+            script.write("sistema:estado\nred:marte:reconectar\nred:local:reconectar\n")
+        try:
+            resultados = self.despachador.ejecutar_script(script.name)
+        finally:
+            os.remove(script.name)
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual(self.conexiones["local"], 1)
+
+    def test_07_registro_invalido(self):
+        """Test de patrones duplicados o ambiguos."""
+        with self.assertRaises(ValueError):
+            self.despachador.registrar("sistema:estado", lambda: None)
+        with self.assertRaises(ValueError):
+            self.despachador.registrar("red:{otra}:cerrar", lambda otra: None)
+
+    def test_08_error_comando(self):
+        """Test de errores esperados lanzados por el manejador."""
+        def fallar():
+            raise ErrorComando("No disponible")
+        self.despachador.registrar("sensorial:iniciar", fallar)
+        self.assertEqual(self.despachador.ejecutar("sensorial:iniciar"), {"error": "No disponible"})
+        self.assertEqual(self.despachador.obtener_estadisticas()["sensorial:iniciar"], 0)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Tests para el enrutador de intenciones de Aria
+"""
+
+import unittest
+from enrutador_intenciones import AutomataAhoCorasick, EnrutadorIntenciones, medir_rendimiento
+
+class TestEnrutadorIntenciones(unittest.TestCase):
+    """Suite de pruebas para el enrutador de intenciones."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        self.enrutador = EnrutadorIntenciones()
+        self.enrutador.registrar("estado", ["estado del sistema", "cómo estás"], lambda t: "estado")
+        self.enrutador.registrar("hora", ["qué hora es"], lambda t: "hora")
+        self.enrutador.registrar("saludo", ["hola", "buenos días"], lambda t: "saludo")
+        self.enrutador.registrar("gracias", ["gracias"], lambda t: "gracias")
+
+    def test_01_automata(self):
+        """Test de búsqueda de patrones solapados."""
+        automata = AutomataAhoCorasick()
+        for patron in ["he", "she", "his", "hers"]:
+            automata.agregar(patron, patron)
+        self.assertEqual(sorted(automata.buscar("ushers")), ["he", "hers", "she"])
+
+    def test_02_enrutar(self):
+        """Test de enrutado con normalización a minúsculas."""
+        self.assertEqual(self.enrutador.despachar("Oye, ¿QUÉ HORA ES?"), ("hora", "hora"))
+        self.assertEqual(self.enrutador.despachar("Buenos días Aria"), ("saludo", "saludo"))
+        self.assertEqual(self.enrutador.despachar("cuéntame un chiste"), (None, None))
+
+    def test_03_prioridad_por_orden(self):
+        """Test de que gana la intención registrada primero, como en una cadena de if."""
+        intencion = self.enrutador.enrutar("hola, gracias, ¿cómo estás?")
+        self.assertEqual(intencion.nombre, "estado")
+
+    def test_04_contadores(self):
+        """Test de contadores de aciertos por intención."""
+        self.enrutador.enrutar("hola")
+        self.enrutador.enrutar("hola de nuevo")
+        self.enrutador.enrutar("nada que ver")
+
+        estadisticas = self.enrutador.obtener_estadisticas()
+        self.assertEqual(estadisticas["aciertos"]["saludo"], 2)
+        self.assertEqual(estadisticas["aciertos"]["hora"], 0)
+        self.assertEqual(estadisticas["sin_coincidencia"], 1)
+
+    def test_05_registro_tras_compilar(self):
+        """Test de registro de intenciones después del primer uso."""
+        self.enrutador.enrutar("hola")
+        self.enrutador.registrar("ayuda", ["ayuda"], lambda t: "ayuda")
+        self.assertEqual(self.enrutador.enrutar("necesito ayuda").nombre, "ayuda")
+
+        # Recompilar no debe duplicar las salidas del autómata
+        nombres = [intencion.nombre for intencion in self.enrutador._automata.buscar("hola")]
+        self.assertEqual(nombres, ["saludo"])
+
+    def test_06_rendimiento(self):
+        """Test de que el benchmark se ejecuta."""
+        resultado = medir_rendimiento(num_intenciones=50, repeticiones=50)
+        self.assertGreater(resultado["enrutador_us"], 0)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Tests para la escucha continua de Aria
+"""
+
+import array
+import threading
+import time
+import unittest
+from escucha_continua import (BufferCircular, DetectorActividadVoz, EscuchaContinua, ReconocimientoSimulado,
+                              MotorReconocimiento, ErrorReconocimiento)
+
+def bloque(amplitud, muestras=160):
+    return array.array("h", [amplitud, -amplitud] * (muestras // 2)).tobytes()
+
+class StreamGuionado:
+    """Stream que reproduce un guion de amplitudes y después silencio."""
+
+    def __init__(self, guion):
+        self.guion = list(guion)
+        self.terminado = threading.Event()
+
+    def read(self, tamano):
+        time.sleep(0.001)
+        if self.guion:
+            return bloque(self.guion.pop(0), tamano)
+        self.terminado.set()
+        return bloque(0, tamano)
+
+class FuenteSimulada:
+    """Fuente con la interfaz de sr.Microphone."""
+
+    SAMPLE_RATE = 8000
+    SAMPLE_WIDTH = 2
+    CHUNK = 160
+
+    def __init__(self, guion):
+        self.stream = StreamGuionado(guion)
+        self.aperturas = 0
+
+    def __enter__(self):
+        self.aperturas += 1
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+class MotorCaido(MotorReconocimiento):
+    nombre = "caido"
+
+    def reconocer(self, segmento):
+        raise ErrorReconocimiento("sin conexión")
+
+def frase(bloques_voz):
+    # Cada bloque son 20 ms: 30 bloques de silencio cierran la frase de sobra
+    return [0] * 10 + [3000] * bloques_voz + [0] * 30
+
+class TestEscuchaContinua(unittest.TestCase):
+    """Suite de pruebas para la escucha continua."""
+
+    def test_01_buffer_circular(self):
+        """Test de lectura con vuelta al principio y de audio perdido."""
+        buffer = BufferCircular(10)
+        buffer.escribir(b"abcdefgh")
+        self.assertEqual(buffer.leer(6), b"abcdef")
+        buffer.escribir(b"ijklmn")
+        self.assertEqual(buffer.leer(8), b"ghijklmn")
+
+        buffer.escribir(b"0123456789AB")
+        self.assertEqual(buffer.perdidos, 2)
+        self.assertEqual(buffer.leer(20, timeout=0.01), b"23456789AB")
+
+    def test_02_segmentacion(self):
+        """Test de segmentación de una frase con audio previo y silencio final recortado."""
+        inicios = []
+        detector = DetectorActividadVoz(8000, 2, 160, umbral=lambda: 500, silencio=0.2, previo=0.1,
+                                        al_iniciar=lambda: inicios.append(1))
+        segmentos = [detector.procesar(bloque(amplitud)) for amplitud in frase(20)]
+        segmentos = [segmento for segmento in segmentos if segmento is not None]
+
+        self.assertEqual(len(segmentos), 1)
+        self.assertEqual(inicios, [1])
+        # 5 bloques previos (el 2º de voz abre la frase) + 18 de voz + 1 de silencio
+        self.assertAlmostEqual(segmentos[0].duracion, (5 + 18 + 1) * 0.02)
+        self.assertFalse(detector.en_frase)
+
+    def test_03_duracion_maxima(self):
+        """Test de que una frase demasiado larga se corta."""
+        detector = DetectorActividadVoz(8000, 2, 160, umbral=lambda: 500, duracion_maxima=1.0)
+        segmentos = [detector.procesar(bloque(3000)) for _ in range(120)]
+        self.assertEqual(sum(segmento is not None for segmento in segmentos), 2)
+
+    def test_04_sin_perder_frases_entre_turnos(self):
+        """Test de que lo dicho entre dos llamadas a escuchar no se pierde."""
+        fuente = FuenteSimulada(frase(20) + frase(30))
+        motor = ReconocimientoSimulado(["hola aria", "qué hora es"])
+        escucha = EscuchaContinua(fuente, motor, umbral=lambda: 500)
+
+        primera = escucha.escuchar(timeout=5)
+        fuente.stream.terminado.wait(5)
+        segunda = escucha.escuchar(timeout=5)
+        escucha.detener()
+
+        self.assertEqual((primera.texto, segunda.texto), ("hola aria", "qué hora es"))
+        self.assertEqual(fuente.aperturas, 1)
+        estadisticas = escucha.obtener_estadisticas()
+        self.assertEqual(estadisticas["segmentos"], 2)
+        self.assertEqual(estadisticas["reconocidos"], 2)
+        self.assertEqual(estadisticas["bytes_perdidos"], 0)
+
+    def test_05_silencio_y_errores(self):
+        """Test de timeout sin voz y de errores del servicio de reconocimiento."""
+        escucha = EscuchaContinua(FuenteSimulada([]), ReconocimientoSimulado(), umbral=lambda: 500)
+        self.assertIsNone(escucha.escuchar(timeout=0.2))
+        escucha.detener()
+
+        escucha = EscuchaContinua(FuenteSimulada(frase(20)), MotorCaido(), umbral=lambda: 500)
+        resultado = escucha.escuchar(timeout=5)
+        escucha.detener()
+        self.assertIsNone(resultado.texto)
+        self.assertEqual(resultado.error, "sin conexión")
+        self.assertEqual(escucha.obtener_estadisticas()["errores"], 1)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
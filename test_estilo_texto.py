@@ -0,0 +1,65 @@
+"""
+Tests para la adaptación de estilo de las respuestas de Aria
+"""
+
+import unittest
+from estilo_texto import (adaptar_texto, adaptar_por_cubeta, cubeta_estilo, compilar_estilo,
+                          obtener_estadisticas, ALTO, MEDIO, BAJO)
+
+def estilo(formalidad=0.5, verbosidad=0.5, emocionalidad=0.5):
+    return {"formalidad": formalidad, "verbosidad": verbosidad, "emocionalidad": emocionalidad}
+
+class TestEstiloTexto(unittest.TestCase):
+    """Suite de pruebas para la adaptación de estilo."""
+
+    def test_01_cubetas(self):
+        """Test de los niveles de estilo con los umbrales de siempre."""
+        self.assertEqual(cubeta_estilo(estilo(0.8, 0.2, 0.5)), (ALTO, BAJO, MEDIO))
+        self.assertEqual(cubeta_estilo(estilo(0.7, 0.3, 0.71)), (MEDIO, MEDIO, ALTO))
+
+    def test_02_formal_sin_corromper_palabras(self):
+        """Test de tuteo a usted solo en palabras completas."""
+        resultado = adaptar_texto("Te dejo tu texto listo, gracias por contarme esto.", estilo(formalidad=0.9))
+        self.assertEqual(resultado, "Le dejo su texto listo, gracias por contarme esto.")
+
+        resultado = adaptar_texto("Es un placer hablar contigo.", estilo(formalidad=0.9))
+        self.assertEqual(resultado, "Por favor, Es un placer hablar con usted.")
+
+    def test_03_informal(self):
+        """Test de usted a tuteo sin tocar palabras como 'leer'."""
+        resultado = adaptar_texto("Le recomiendo leer esto con usted mismo.", estilo(formalidad=0.1))
+        self.assertEqual(resultado, "Te recomiendo leer esto contigo mismo.")
+
+    def test_04_verbosidad_y_emocion(self):
+        """Test de concisión, coletilla adaptada a la formalidad y exclamación sin duplicar."""
+        self.assertEqual(adaptar_texto("Son las 3.5 horas. Y algo más.", estilo(verbosidad=0.1)),
+                         "Son las 3.5 horas.")
+        self.assertEqual(adaptar_texto("¿Cómo estás?", estilo(verbosidad=0.1)), "¿Cómo estás?")
+        self.assertEqual(adaptar_texto("Gracias por venir.", estilo(formalidad=0.9, verbosidad=0.9)),
+                         "Gracias por venir. ¿Le gustaría saber más al respecto?")
+        self.assertEqual(adaptar_texto("¡Hola!", estilo(emocionalidad=0.9)), "¡Hola!")
+        self.assertEqual(adaptar_texto("Hola", estilo(emocionalidad=0.9)), "¡Hola!")
+
+    def test_05_memoria_por_cubeta(self):
+        """Test de memorización por cubeta y de reutilización de la transformación compilada."""
+        antes = obtener_estadisticas()["aciertos"]
+        adaptar_texto("Frase repetida para ti.", estilo(0.8, 0.5, 0.5))
+        adaptar_texto("Frase repetida para ti.", estilo(0.95, 0.6, 0.4))
+        self.assertEqual(obtener_estadisticas()["aciertos"], antes + 1)
+
+        cubeta = (ALTO, BAJO, BAJO)
+        transformacion = compilar_estilo(cubeta)
+        compiladas = obtener_estadisticas()["transformaciones"]
+        reutilizadas = compilar_estilo.cache_info().hits
+        for i in range(3):
+            adaptar_por_cubeta(f"Texto distinto número {i} para ti.", cubeta)
+        self.assertIs(compilar_estilo(cubeta), transformacion)
+        self.assertEqual(obtener_estadisticas()["transformaciones"], compiladas)
+        self.assertEqual(compilar_estilo.cache_info().hits, reutilizadas + 4)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
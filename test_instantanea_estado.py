@@ -0,0 +1,98 @@
+"""
+Tests para la instantánea de estado de Aria
+"""
+
+import threading
+import time
+import unittest
+from instantanea_estado import InstantaneaEstado, congelar
+
+class TestInstantaneaEstado(unittest.TestCase):
+    """Suite de pruebas para la instantánea de estado."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        self.sondeos = 0
+        self.instantanea = InstantaneaEstado({"modo_admin": True})
+
+    def sonda(self):
+        self.sondeos += 1
+        return {"local": True, "sondeos": self.sondeos}
+
+    def test_01_inmutable(self):
+        """Test de que los lectores reciben una copia de solo lectura."""
+        self.instantanea.actualizar("sistema", {"activos": ["sensorial"]})
+        estado = self.instantanea.obtener()
+
+        with self.assertRaises(TypeError):
+            estado["sistema"]["activos"] = []
+        self.assertEqual(estado["sistema"]["activos"], ("sensorial",))
+        self.assertTrue(estado["modo_admin"])
+
+    def test_02_sin_cambios_misma_vista(self):
+        """Test de que sin cambios no se reconstruye la vista."""
+        self.instantanea.actualizar("sistema", {"estado": "activo"})
+        primera = self.instantanea.obtener()
+        self.instantanea.actualizar("sistema", {"estado": "activo"})
+        self.assertIs(self.instantanea.obtener(), primera)
+
+        self.instantanea.actualizar("sistema", {"estado": "detenido"})
+        self.assertIsNot(self.instantanea.obtener(), primera)
+        self.assertEqual(self.instantanea.obtener_estadisticas()["reconstrucciones"], 2)
+
+    def test_03_ttl_e_invalidacion(self):
+        """Test de reutilización del sondeo hasta que vence o se invalida."""
+        self.instantanea.registrar_sonda("conexiones", self.sonda, ttl=0.1)
+        for _ in range(10):
+            self.instantanea.obtener()
+        self.assertEqual(self.sondeos, 1)
+
+        self.instantanea.invalidar("conexiones")
+        self.assertEqual(self.instantanea.obtener()["conexiones"]["sondeos"], 2)
+
+        time.sleep(0.15)
+        self.assertEqual(self.instantanea.obtener()["conexiones"]["sondeos"], 3)
+
+    def test_04_segundo_plano(self):
+        """Test de que un sondeo caducado en segundo plano no bloquea al lector."""
+        liberar = threading.Event()
+
+        def sonda_lenta():
+            if self.sondeos:
+                liberar.wait(1)
+            return self.sonda()
+
+        self.instantanea.registrar_sonda("conexiones", sonda_lenta, ttl=0, en_segundo_plano=True)
+        self.assertEqual(self.instantanea.obtener()["conexiones"]["sondeos"], 1)
+
+        inicio = time.monotonic()
+        self.assertEqual(self.instantanea.obtener()["conexiones"]["sondeos"], 1)
+        self.assertLess(time.monotonic() - inicio, 0.5)
+
+        liberar.set()
+        time.sleep(0.1)
+        self.instantanea.registrar_sonda("otra", lambda: None)
+        self.assertGreaterEqual(self.instantanea.obtener()["conexiones"]["sondeos"], 2)
+
+    def test_05_sonda_vacia_y_error(self):
+        """Test de secciones omitidas y de sondas que fallan."""
+        self.instantanea.registrar_sonda("sensorial", lambda: None)
+        self.assertNotIn("sensorial", self.instantanea.obtener())
+
+        def fallar():
+            raise RuntimeError("sin respuesta")
+        self.instantanea.registrar_sonda("conexiones", fallar)
+        self.assertNotIn("conexiones", self.instantanea.obtener())
+
+    def test_06_congelar(self):
+        """Test de congelación de estructuras anidadas."""
+        valor = congelar({"a": [1, {"b": {2}}]})
+        self.assertEqual(valor["a"][1]["b"], frozenset({2}))
+        self.assertIsInstance(valor["a"], tuple)
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
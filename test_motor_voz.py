@@ -0,0 +1,244 @@
+"""
+Tests para el motor de voz persistente de Aria
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from motor_voz import (BackendVoz, BackendNulo, BackendEspeak, TrabajadorVoz, MotorVoz, PrioridadVoz,
+                       crear_backend, seleccionar_backend, sondear_backends, _elegir,
+                       VERSION_SONDEO)
+
+class BackendDiferido(BackendVoz):
+    """Motor cuyo hablar() vuelve al instante; solo sintetizar() espera al audio."""
+
+    nombre = "diferido"
+    hablar_sincrono = False
+    graba_audio = True
+
+    def hablar(self, texto):
+        pass
+
+    def sintetizar(self, texto, ruta):
+        Path(ruta).write_bytes(b"")
+
+class BackendSinGrabar(BackendDiferido):
+    nombre = "sin_grabar"
+    graba_audio = False
+
+class BackendInestable(BackendVoz):
+    """Motor que cae en la primera frase y funciona tras reiniciarse."""
+
+    nombre = "inestable"
+
+    def __init__(self):
+        self.inicios = 0
+        self.pronunciadas = []
+
+    def iniciar(self):
+        self.inicios += 1
+
+    def hablar(self, texto):
+        if self.inicios == 1:
+            raise RuntimeError("motor caído")
+        self.pronunciadas.append(texto)
+
+class BackendLento(BackendVoz):
+    """Motor que habla hasta que se le detiene (o pasa un segundo)."""
+
+    nombre = "lento"
+
+    def __init__(self, duracion=1.0):
+        self.duracion = duracion
+        self.pronunciadas = []
+        self.hablando = threading.Event()
+        self._detener = threading.Event()
+
+    def hablar(self, texto):
+        self.hablando.set()
+        self._detener.wait(self.duracion)
+        self._detener.clear()
+        self.pronunciadas.append(texto)
+
+    def detener(self):
+        self._detener.set()
+
+# espeak falso: apunta la frase y no termina hasta que aparece el archivo "fin"
+ESPEAK_FALSO = """#!/bin/sh
+for ultimo; do :; done
+echo "$ultimo" >> "$(dirname "$0")/dichas"
+while [ ! -e "$(dirname "$0")/fin" ]; do sleep 0.02; done
+"""
+
+def esperar_hasta(condicion, plazo=2.0):
+    limite = time.monotonic() + plazo
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.01)
+    return condicion()
+
+class TestMotorVoz(unittest.TestCase):
+    """Suite de pruebas para el trabajador de voz."""
+
+    def test_01_orden_y_motor_unico(self):
+        """Test de que las frases se pronuncian en orden con un solo motor."""
+        backend = BackendNulo()
+        trabajador = TrabajadorVoz(backend)
+        for i in range(5):
+            self.assertTrue(trabajador.decir(f"frase {i}"))
+        trabajador.cerrar()
+
+        self.assertEqual(backend.pronunciadas, [f"frase {i}" for i in range(5)])
+        self.assertEqual(trabajador.obtener_estadisticas()["frases"], 5)
+
+    def test_02_sin_esperar(self):
+        """Test de que cerrar termina las frases encoladas sin esperar."""
+        backend = BackendNulo()
+        trabajador = TrabajadorVoz(backend)
+        for i in range(20):
+            trabajador.decir(str(i), esperar=False)
+        trabajador.cerrar()
+        self.assertEqual(len(backend.pronunciadas), 20)
+
+    def test_03_reinicio_tras_fallo(self):
+        """Test de reinicio del motor cuando cae."""
+        backend = BackendInestable()
+        trabajador = TrabajadorVoz(backend)
+        self.assertTrue(trabajador.decir("hola"))
+        trabajador.cerrar()
+
+        self.assertEqual(backend.pronunciadas, ["hola"])
+        self.assertEqual(backend.inicios, 2)
+        self.assertEqual(trabajador.obtener_estadisticas()["reinicios"], 1)
+
+    def test_04_crear_backend(self):
+        """Test de creación explícita de un motor."""
+        self.assertIsInstance(crear_backend("nulo"), BackendNulo)
+
+    def test_05_eleccion_mas_rapido(self):
+        """Test de elección del motor más rápido disponible."""
+        resultados = {
+            "pyttsx3": {"disponible": True, "frase_ms": 40.0},
+            "powershell": {"disponible": True, "frase_ms": 12.0},
+            "sapi": {"disponible": False, "frase_ms": None},
+            "nulo": {"disponible": True, "frase_ms": 0.0},
+        }
+        self.assertEqual(_elegir(resultados), "powershell")
+        self.assertEqual(_elegir({"nulo": {"disponible": True, "frase_ms": 0.0}}), "nulo")
+
+    def test_06_sondeo_motor_diferido(self):
+        """Test de que un motor con hablar() no bloqueante se mide sintetizando o queda sin medir."""
+        backends = {"diferido": BackendDiferido, "sin_grabar": BackendSinGrabar}
+        with mock.patch.dict("motor_voz.BACKENDS", backends):
+            resultados = sondear_backends(list(backends))
+        self.assertEqual(resultados["diferido"]["medida"], "sintetizar")
+        self.assertIsNotNone(resultados["diferido"]["frase_ms"])
+        self.assertTrue(resultados["sin_grabar"]["disponible"])
+        self.assertIsNone(resultados["sin_grabar"]["frase_ms"])
+
+        medidos = {
+            "espeak": {"disponible": True, "frase_ms": None},
+            "pyttsx3": {"disponible": True, "frase_ms": 80.0},
+        }
+        self.assertEqual(_elegir(medidos), "pyttsx3")
+
+    def test_07_sondeo_en_disco(self):
+        """Test de que el sondeo se guarda y se reutiliza."""
+        with tempfile.TemporaryDirectory() as directorio, mock.patch.dict(os.environ, {"ARIA_VOZ": ""}):
+            ruta = Path(directorio) / "motor_voz.json"
+            nombre = seleccionar_backend(ruta)
+            with open(ruta, encoding="utf-8") as archivo:
+                self.assertEqual(json.load(archivo)["backend"], nombre)
+
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                json.dump({"version": VERSION_SONDEO, "backend": "nulo", "plataforma": sys.platform}, archivo)
+            with mock.patch("motor_voz.sondear_backends") as sondear:
+                self.assertEqual(seleccionar_backend(ruta), "nulo")
+                sondear.assert_not_called()
+
+    def test_08_medir(self):
+        """Test del micro-benchmark del motor."""
+        motor = MotorVoz(BackendNulo())
+        resultado = motor.medir()
+        motor.cerrar()
+        self.assertEqual(resultado["backend"], "nulo")
+        self.assertGreaterEqual(resultado["maximo_ms"], resultado["media_ms"])
+
+    def test_09_prioridad_y_fusion(self):
+        """Test de prioridades y de fusión de frases repetidas."""
+        backend = BackendLento(duracion=0.1)
+        trabajador = TrabajadorVoz(backend)
+        trabajador.decir("ocupado", esperar=False)
+        backend.hablando.wait(1)
+
+        trabajador.decir("aviso 1", esperar=False, prioridad=PrioridadVoz.BAJA, clave="proactiva")
+        trabajador.decir("respuesta", esperar=False)
+        trabajador.decir("respuesta", esperar=False)
+        trabajador.decir("aviso 2", esperar=False, prioridad=PrioridadVoz.BAJA, clave="proactiva")
+        trabajador.decir("urgente", esperar=False, prioridad=PrioridadVoz.ALTA)
+        self.assertEqual(trabajador.obtener_estadisticas()["en_cola"], 3)
+
+        trabajador.cerrar()
+        self.assertEqual(backend.pronunciadas, ["ocupado", "urgente", "respuesta", "aviso 2"])
+        self.assertEqual(trabajador.obtener_estadisticas()["fusionadas"], 2)
+
+    def test_10_interrumpir(self):
+        """Test de barge-in: se corta la frase en curso y se vacía la cola."""
+        backend = BackendLento(duracion=5.0)
+        trabajador = TrabajadorVoz(backend)
+        primera = trabajador.encolar("una frase muy larga")
+        segunda = trabajador.encolar("otra frase")
+        backend.hablando.wait(1)
+
+        self.assertEqual(trabajador.interrumpir(), 2)
+        self.assertFalse(primera.result(1))
+        self.assertFalse(segunda.result(1))
+        self.assertFalse(trabajador.hablando())
+
+        backend.duracion = 0.0
+        self.assertTrue(trabajador.decir("después", timeout=1))
+        trabajador.cerrar()
+        self.assertEqual(backend.pronunciadas, ["una frase muy larga", "después"])
+
+    @unittest.skipIf(sys.platform == "win32", "espeak falso en sh")
+    def test_11_espeak_habla_hasta_el_final(self):
+        """Test de que con espeak hablando() sigue True hasta que termina la frase y se puede cortar."""
+        with tempfile.TemporaryDirectory() as directorio:
+            ejecutable = Path(directorio) / "espeak"
+            ejecutable.write_text(ESPEAK_FALSO)
+            ejecutable.chmod(0o755)
+            dichas = Path(directorio) / "dichas"
+            fin = Path(directorio) / "fin"
+            self.assertTrue(BackendEspeak.hablar_sincrono)
+            trabajador = TrabajadorVoz(BackendEspeak(ejecutable=str(ejecutable)))
+
+            primera = trabajador.encolar("hola")
+            segunda = trabajador.encolar("qué tal")
+            self.assertTrue(esperar_hasta(dichas.exists))
+            # Una sola frase entregada al motor y la otra esperando su turno
+            self.assertEqual(dichas.read_text().split("\n")[:-1], ["hola"])
+            self.assertTrue(trabajador.hablando())
+            self.assertFalse(primera.done())
+
+            self.assertEqual(trabajador.interrumpir(), 2)
+            self.assertFalse(primera.result(2))
+            self.assertFalse(segunda.result(2))
+            self.assertFalse(trabajador.hablando())
+
+            fin.touch()
+            self.assertTrue(trabajador.decir("adiós", timeout=2))
+            self.assertFalse(trabajador.hablando())
+            trabajador.cerrar()
+            self.assertEqual(dichas.read_text().split("\n")[:-1], ["hola", "adiós"])
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Tests para el pool de conexiones de Aria
+"""
+
+import unittest
+import threading
+import time
+from pool_conexiones import PoolConexiones
+
+class ConexionFalsa:
+    """Conexión de prueba con la interfaz de ``conexiones``."""
+
+    def __init__(self):
+        self.activa = False
+        self.inicializaciones = 0
+        self.cierres = 0
+        self.sondeos = 0
+
+    def inicializar(self):
+        self.inicializaciones += 1
+        self.activa = True
+        return True
+
+    def cerrar(self):
+        self.cierres += 1
+        self.activa = False
+        return True
+
+    def esta_activa(self):
+        self.sondeos += 1
+        return self.activa
+
+class TestPoolConexiones(unittest.TestCase):
+    """Suite de pruebas para el pool de conexiones."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        self.creadas = []
+
+        def fabrica():
+            conexion = ConexionFalsa()
+            self.creadas.append(conexion)
+            return conexion
+
+        self.pool = PoolConexiones("prueba", fabrica, minimo=1, maximo=2,
+                                   max_inactividad=0.05, intervalo_sondeo=0.02)
+
+    def tearDown(self):
+        """Limpieza después de cada prueba."""
+        self.pool.cerrar()
+
+    def test_01_reutilizacion(self):
+        """Test de reutilización de la misma conexión."""
+        self.pool.iniciar()
+        with self.pool.prestar() as primera:
+            pass
+        with self.pool.prestar() as segunda:
+            pass
+
+        self.assertIs(primera, segunda)
+        self.assertEqual(len(self.creadas), 1)
+        self.assertEqual(self.pool.obtener_estadisticas()["prestamos"], 2)
+
+    def test_02_reconexion_transparente(self):
+        """Test de reconexión de una conexión caída al prestarla."""
+        self.pool.iniciar()
+        conexion = self.creadas[0]
+        conexion.activa = False
+
+        with self.pool.prestar() as prestada:
+            self.assertIs(prestada, conexion)
+            self.assertTrue(prestada.esta_activa())
+        self.assertEqual(conexion.inicializaciones, 2)
+
+    def test_03_maximo_y_espera(self):
+        """Test del límite máximo de conexiones abiertas."""
+        self.pool.iniciar()
+        a = self.pool.adquirir()
+        b = self.pool.adquirir()
+        self.assertIsNot(a, b)
+
+        with self.assertRaises(TimeoutError):
+            self.pool.adquirir(timeout=0.05)
+
+        threading.Timer(0.05, self.pool.liberar, args=(a,)).start()
+        self.assertIs(self.pool.adquirir(timeout=1), a)
+
+    def test_04_desalojo_inactivas(self):
+        """Test de cierre de conexiones sobrantes inactivas."""
+        self.pool.iniciar()
+        a = self.pool.adquirir()
+        b = self.pool.adquirir()
+        self.pool.liberar(a)
+        self.pool.liberar(b)
+
+        time.sleep(0.3)
+        estadisticas = self.pool.obtener_estadisticas()
+        self.assertEqual(estadisticas["total"], 1)
+        self.assertEqual(estadisticas["libres"], 1)
+
+    def test_05_adoptar(self):
+        """Test de incorporación de una conexión ya inicializada."""
+        existente = ConexionFalsa()
+        existente.inicializar()
+        self.pool.adoptar(existente)
+        self.pool.iniciar()
+
+        self.assertEqual(self.creadas, [])
+        with self.pool.prestar() as prestada:
+            self.assertIs(prestada, existente)
+
+    def test_06_mantenimiento_por_intervalo(self):
+        """Test de que el mantenimiento no se dispara con cada devolución."""
+        pool = PoolConexiones("intervalo", ConexionFalsa, minimo=1, maximo=2, intervalo_sondeo=30)
+        pool.iniciar()
+        for _ in range(200):
+            with pool.prestar() as conexion:
+                pass
+        time.sleep(0.05)
+        # Solo la comprobación de cada préstamo; ningún sondeo de mantenimiento
+        self.assertEqual(conexion.sondeos, 200)
+        self.assertEqual(pool.obtener_estadisticas()["creadas"], 1)
+
+        pool.cerrar()
+        pool._hilo_mantenimiento.join(1)
+        self.assertFalse(pool._hilo_mantenimiento.is_alive())
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
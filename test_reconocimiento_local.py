@@ -0,0 +1,101 @@
+"""
+Tests para el reconocimiento local de comandos de Aria
+"""
+
+import math
+import tempfile
+import unittest
+import array
+from pathlib import Path
+from escucha_continua import Segmento, ReconocimientoSimulado, MotorReconocimiento, ErrorReconocimiento
+from reconocimiento_local import (CacheHuellas, ReconocimientoEscalonado, calcular_huella, normalizar_frase)
+
+def audio(patron, volumen=1.0):
+    """Segmento de 8 kHz con una trama de 20 ms por (amplitud, periodo en muestras)."""
+    muestras = array.array("h")
+    for amplitud, periodo in patron:
+        for i in range(160):
+            muestras.append(int(amplitud * volumen * math.sin(2 * math.pi * i / periodo)))
+    datos = muestras.tobytes()
+    return Segmento(datos, 8000, 2, 0.0, 0.0)
+
+# "qué hora es": tres golpes de voz; "salir": fricativa (periodo corto) y dos sílabas
+QUE_HORA_ES = [(0, 20)] * 5 + [(6000, 40)] * 10 + [(800, 40)] * 3 + [(8000, 50)] * 15 + [(1500, 4)] * 8 + [(0, 20)] * 5
+SALIR = [(0, 20)] * 5 + [(2500, 3)] * 10 + [(7000, 45)] * 8 + [(3000, 60)] * 12 + [(0, 20)] * 5
+HABLA_LIBRE = [(5000, 40), (300, 40)] * 90
+
+class MotorContado(ReconocimientoSimulado):
+    """Reconocedor pesado que cuenta sus llamadas."""
+
+    nombre = "pesado"
+
+class MotorSinRed(MotorReconocimiento):
+    nombre = "sin_red"
+
+    def reconocer(self, segmento):
+        raise ErrorReconocimiento("sin conexión")
+
+class TestReconocimientoLocal(unittest.TestCase):
+    """Suite de pruebas para el reconocimiento local."""
+
+    def test_01_normalizar(self):
+        """Test de normalización de transcripciones."""
+        self.assertEqual(normalizar_frase("¿Qué hora es?"), "que hora es")
+        self.assertEqual(normalizar_frase("  Por   ESCRITO. "), "por escrito")
+
+    def test_02_huella_independiente_del_volumen(self):
+        """Test de que la huella distingue comandos y no depende del volumen."""
+        huella = calcular_huella(audio(QUE_HORA_ES))
+        cache = CacheHuellas(ruta=None)
+        cache.aprender("qué hora es", huella, 0.9)
+        cache.aprender("salir", calcular_huella(audio(SALIR)), 0.8)
+
+        self.assertEqual(cache.buscar(calcular_huella(audio(QUE_HORA_ES, volumen=0.5)), 0.9), "qué hora es")
+        self.assertEqual(cache.buscar(calcular_huella(audio(SALIR, volumen=1.3)), 0.8), "salir")
+        self.assertIsNone(cache.buscar(calcular_huella(audio(QUE_HORA_ES)), 3.0))
+
+    def test_03_comando_repetido_local(self):
+        """Test de que un comando ya oído se resuelve sin el reconocedor pesado."""
+        pesado = MotorContado(lambda segmento: "¿Qué hora es?")
+        motor = ReconocimientoEscalonado(pesado, huellas=CacheHuellas(ruta=None))
+        self.assertEqual(motor.reconocer(audio(QUE_HORA_ES)), "¿Qué hora es?")
+        self.assertEqual(motor.reconocer(audio(QUE_HORA_ES, volumen=0.7)), "qué hora es")
+
+        self.assertEqual(len(pesado.segmentos), 1)
+        estadisticas = motor.obtener_estadisticas()
+        self.assertEqual(estadisticas["huella"]["frases"], 1)
+        self.assertEqual(estadisticas["pesado"]["frases"], 1)
+
+    def test_04_habla_libre_al_pesado(self):
+        """Test de que el habla libre (y lo que no es comando) no se aprende."""
+        pesado = MotorContado(lambda segmento: "cuéntame algo sobre los volcanes")
+        huellas = CacheHuellas(ruta=None)
+        motor = ReconocimientoEscalonado(pesado, huellas=huellas)
+        motor.reconocer(audio(QUE_HORA_ES))
+        motor.reconocer(audio(HABLA_LIBRE))
+        motor.reconocer(audio(QUE_HORA_ES))
+        self.assertEqual(len(pesado.segmentos), 3)
+        self.assertEqual(len(huellas), 0)
+
+    def test_05_respaldo_y_persistencia(self):
+        """Test del respaldo local sin red y de las huellas guardadas en disco."""
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = Path(directorio) / "huellas.json"
+            motor = ReconocimientoEscalonado(MotorContado(["salir"]), huellas=CacheHuellas(ruta))
+            motor.reconocer(audio(SALIR))
+
+            respaldo = ReconocimientoSimulado(["hola qué tal"])
+            motor = ReconocimientoEscalonado(MotorSinRed(), huellas=CacheHuellas(ruta), respaldo=respaldo)
+            self.assertEqual(motor.reconocer(audio(SALIR)), "salir")
+            self.assertEqual(motor.reconocer(audio(HABLA_LIBRE)), "hola qué tal")
+
+            motor = ReconocimientoEscalonado(MotorSinRed(), huellas=CacheHuellas(ruta))
+            with self.assertRaises(ErrorReconocimiento):
+                motor.reconocer(audio(HABLA_LIBRE))
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
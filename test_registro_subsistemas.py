@@ -0,0 +1,76 @@
+"""
+Tests para el registro de subsistemas con carga diferida
+"""
+
+import unittest
+from registro_subsistemas import RegistroSubsistemas, SubsistemaPerezoso
+
+class Componente:
+    creados = 0
+
+    def __init__(self):
+        Componente.creados += 1
+
+class Sistema:
+    componente = SubsistemaPerezoso()
+    ausente = SubsistemaPerezoso()
+
+    def __init__(self, registro):
+        self.subsistemas = registro
+
+class TestRegistroSubsistemas(unittest.TestCase):
+    """Suite de pruebas para la carga diferida de subsistemas."""
+
+    def setUp(self):
+        """Configuración para cada prueba."""
+        Componente.creados = 0
+        self.importados = []
+
+        def importador(modulo, nombre):
+            self.importados.append(modulo)
+            return Componente if modulo == "componentes" else None
+
+        self.registro = RegistroSubsistemas({
+            "componente": ("componentes", "Componente", True),
+            "ausente": ("no_existe", "Nada", True),
+        }, importador=importador)
+
+    def test_01_carga_en_primer_acceso(self):
+        """Test de que nada se importa hasta el primer acceso."""
+        sistema = Sistema(self.registro)
+        self.assertEqual(self.importados, [])
+        self.assertFalse(self.registro.cargado("componente"))
+
+        self.assertIsInstance(sistema.componente, Componente)
+        self.assertIs(sistema.componente, sistema.componente)
+        self.assertEqual(Componente.creados, 1)
+        self.assertEqual(self.importados, ["componentes"])
+        self.assertTrue(self.registro.cargado("componente"))
+
+    def test_02_fallo_en_cache(self):
+        """Test de que un subsistema ausente no se reintenta en cada acceso."""
+        sistema = Sistema(self.registro)
+        self.assertIsNone(sistema.ausente)
+        self.assertIsNone(sistema.ausente)
+        self.assertEqual(self.importados, ["no_existe"])
+
+    def test_03_precalentar(self):
+        """Test de precalentamiento explícito."""
+        resultado = self.registro.precalentar(["componente", "ausente"])
+        self.assertEqual(resultado, {"componente": True, "ausente": False})
+        self.assertEqual(Componente.creados, 1)
+
+    def test_04_establecer(self):
+        """Test de sustitución de un subsistema."""
+        sistema = Sistema(self.registro)
+        sustituto = object()
+        sistema.componente = sustituto
+        self.assertIs(sistema.componente, sustituto)
+        self.assertEqual(self.importados, [])
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()
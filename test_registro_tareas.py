@@ -0,0 +1,73 @@
+"""
+Tests para el registro de tareas de Aria
+"""
+
+import unittest
+import threading
+from registro_tareas import GeneradorIdTareas, RegistroTareas
+
+class TestRegistroTareas(unittest.TestCase):
+    """Suite de pruebas para IDs y registro de tareas."""
+
+    def test_01_ids_unicos_y_ordenados(self):
+        """Test de IDs sin colisiones dentro del mismo segundo."""
+        generador = GeneradorIdTareas()
+        ids = [generador.generar() for _ in range(5000)]
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(i.startswith("TAREA-") for i in ids))
+
+    def test_02_ids_concurrentes(self):
+        """Test de IDs únicos generados desde varios hilos."""
+        generador = GeneradorIdTareas()
+        ids = []
+        lock = threading.Lock()
+
+        def generar():
+            locales = [generador.generar() for _ in range(1000)]
+            with lock:
+                ids.extend(locales)
+
+        hilos = [threading.Thread(target=generar) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(ids), 4000)
+        self.assertEqual(len(set(ids)), 4000)
+
+    def test_03_finalizar_retira_pendiente(self):
+        """Test de retirada automática al finalizar."""
+        registro = RegistroTareas()
+        registro.registrar("T1", tipo="administrativo", prioridad="ALTA")
+
+        self.assertEqual(len(registro), 1)
+        self.assertEqual(registro.obtener("T1")["estado"], "pendiente")
+
+        registro.finalizar("T1", estado="error", error="fallo")
+
+        self.assertEqual(len(registro), 0)
+        self.assertEqual(registro.pendientes(), [])
+        self.assertEqual(registro.obtener("T1")["estado"], "error")
+        self.assertEqual(registro.obtener("T1")["error"], "fallo")
+        self.assertIsNone(registro.finalizar("T1"))
+
+    def test_04_recientes_acotadas(self):
+        """Test del historial acotado de tareas recientes."""
+        registro = RegistroTareas(max_recientes=3)
+        for i in range(10):
+            registro.registrar(f"T{i}")
+            registro.finalizar(f"T{i}")
+
+        recientes = [r["id"] for r in registro.recientes()]
+        self.assertEqual(recientes, ["T7", "T8", "T9"])
+        self.assertIsNone(registro.obtener("T0"))
+
+def main():
+    """Función principal de testing."""
+    unittest.main(verbosity=2)
+
+if __name__ == "__main__":
+    main()